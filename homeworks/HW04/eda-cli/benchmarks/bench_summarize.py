@@ -0,0 +1,70 @@
+"""
+Бенчмарк summarize_dataset: как время растёт с числом колонок.
+
+Сравнивает блочный движок ``summarize_dataset`` с поколоночным путём
+(``_summarize_column`` для каждой колонки, как было раньше).
+
+Запуск:
+
+    uv run python benchmarks/bench_summarize.py --rows 20000 --cols 10 100 500 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.core import _summarize_column, summarize_dataset
+
+
+def make_wide_frame(n_rows: int, n_cols: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Синтетическая «телеметрия»: 90% float-колонок с пропусками, 10% строковых.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for j in range(n_cols):
+        if j % 10 == 9:
+            data[f"cat_{j}"] = rng.choice(["a", "b", "c", "d"], size=n_rows).astype(object)
+        else:
+            values = rng.normal(size=n_rows)
+            values[rng.random(n_rows) < 0.1] = np.nan
+            data[f"num_{j}"] = values
+    return pd.DataFrame(data)
+
+
+def _per_column(df: pd.DataFrame) -> None:
+    for i in range(df.shape[1]):
+        _summarize_column(df.iloc[:, i], 3)
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--cols", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'cols':>6} {'engine, s':>10} {'per-column, s':>14} {'speedup':>8}")
+    for n_cols in args.cols:
+        df = make_wide_frame(args.rows, n_cols)
+        engine = _best_of(lambda: summarize_dataset(df), args.repeat)
+        per_column = _best_of(lambda: _per_column(df), args.repeat)
+        print(f"{n_cols:>6} {engine:>10.3f} {per_column:>14.3f} {per_column / engine:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Набор бенчмарков eda_cli: функции ядра, команда report, эндпоинты API
+и время старта CLI.
+
+Для каждого синтетического датасета (см. ``synthetic.py``) замеряется
+время каждого случая (минимум и медиана по ``--repeat`` запускам) и пиковая
+память - отдельным запуском под ``tracemalloc`` (учитываются аллокации
+Python и numpy/pandas, но не pyarrow). Результаты сохраняются в JSON;
+``compare`` сравнивает два таких файла и отмечает регрессии.
+
+Группа ``summary`` замеряет ``DatasetSummary``: ``to_dict`` и память,
+которую занимают 100 независимых копий сводки (как в кэше API) - для неё
+``peak_mb`` и есть эта память. Заметна на широких таблицах (``--cols``).
+
+Группа ``startup`` запускает CLI в чистых процессах (``--help`` и ``head``)
+и разбирает ``python -X importtime``: время импорта ``eda_cli.cli`` и
+список тяжёлых зависимостей, которые он подтянул. Память для неё не
+замеряется.
+
+Запуск:
+
+    uv run python benchmarks/suite.py run --preset small --out bench.json
+    uv run python benchmarks/suite.py run --rows 50000 --cols 40 --dtype-mix numeric=0.7,category=0.3
+    uv run python benchmarks/suite.py compare baseline.json bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from synthetic import PRESETS, DatasetSpec, make_dataset, parse_dtype_mix
+
+GROUPS = ("core", "summary", "cli", "api", "startup")
+
+# Тяжёлые зависимости, появление которых при старте CLI стоит заметить.
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "pyarrow", "fastapi")
+
+# Случай: имя, функция для замера и (необязательно) подготовка перед
+# каждым запуском, которая в замер не входит.
+Case = Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]
+
+
+# ---------- замеры ----------
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "peak_mb": peak / 1024**2,
+    }
+
+
+def _timing_stats(timings: List[float]) -> Dict[str, float]:
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "peak_mb": 0.0,
+    }
+
+
+# ---------- случаи ----------
+
+
+def core_cases(df: pd.DataFrame) -> Iterator[Case]:
+    from eda_cli.core import (
+        compute_quality_flags,
+        correlation_matrix,
+        missing_table,
+        summarize_dataset,
+        top_categories,
+    )
+
+    summary = summarize_dataset(df)
+    missing_df = missing_table(df)
+    yield "summarize_dataset", lambda: summarize_dataset(df), None
+    yield "missing_table", lambda: missing_table(df), None
+    yield "correlation_matrix", lambda: correlation_matrix(df), None
+    yield "correlation_matrix[spearman]", lambda: correlation_matrix(df, method="spearman"), None
+    yield "correlation_matrix[kendall]", lambda: correlation_matrix(df, method="kendall", max_rows=10_000), None
+    yield "correlation_matrix[association]", lambda: correlation_matrix(df, method="association"), None
+    yield "top_categories", lambda: top_categories(df), None
+    yield "compute_quality_flags", lambda: compute_quality_flags(df, summary, missing_df), None
+
+
+def summary_cases(df: pd.DataFrame) -> Iterator[Case]:
+    from eda_cli.core import summarize_dataset
+
+    summary = summarize_dataset(df)
+    blob = pickle.dumps(summary, protocol=pickle.HIGHEST_PROTOCOL)
+    yield "DatasetSummary.to_dict", summary.to_dict, None
+    # Копии, а не ссылки на один объект: так сводки лежат в кэше API.
+    yield "DatasetSummary x100 in memory", lambda: [pickle.loads(blob) for _ in range(100)], None
+
+
+def cli_cases(csv_path: Path, workdir: Path) -> Iterator[Case]:
+    from typer.testing import CliRunner
+
+    from eda_cli.cli import app
+
+    runner = CliRunner()
+
+    def run_report() -> None:
+        result = runner.invoke(app, ["report", str(csv_path), "--out-dir", str(workdir / "report")])
+        if result.exit_code != 0:
+            raise RuntimeError(f"report завершился с кодом {result.exit_code}: {result.output}")
+
+    yield "report", run_report, None
+
+
+def api_cases(csv_bytes: bytes, client: Any, clear_cache: Callable[[], None]) -> Iterator[Case]:
+    def upload(url: str) -> Callable[[], None]:
+        def call() -> None:
+            response = client.post(url, files={"file": ("data.csv", csv_bytes, "text/csv")})
+            response.raise_for_status()
+
+        return call
+
+    def stream(url: str) -> Callable[[], None]:
+        def call() -> None:
+            response = client.post(url, content=csv_bytes, headers={"content-type": "text/csv"})
+            response.raise_for_status()
+
+        return call
+
+    # Кэш результатов очищается перед каждым запуском: меряем обработку, а не попадание в кэш.
+    yield "POST /quality-from-csv", upload("/quality-from-csv"), clear_cache
+    yield "POST /quality-flags-from-csv", upload("/quality-flags-from-csv"), clear_cache
+    yield "POST /quality-from-csv-stream", stream("/quality-from-csv-stream"), None
+    yield "POST /quality-flags-from-csv-stream", stream("/quality-flags-from-csv-stream"), None
+    yield "POST /head", upload("/head?n=10"), clear_cache
+
+
+def import_times(statement: str) -> Dict[str, float]:
+    """
+    Накопленное время импорта каждого модуля (с) по ``python -X importtime``
+    при выполнении ``statement`` в чистом процессе.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    times: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def startup_results(csv_path: Path, repeat: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    commands = {
+        "eda-cli --help": ["--help"],
+        "eda-cli head -n 5": ["head", str(csv_path), "-n", "5"],
+    }
+    for name, args in commands.items():
+        timings = []
+        for _ in range(repeat):
+            start = perf_counter()
+            subprocess.run([sys.executable, "-m", "eda_cli.cli", *args], capture_output=True, check=True)
+            timings.append(perf_counter() - start)
+        yield name, _timing_stats(timings)
+
+    samples = [import_times("import eda_cli.cli") for _ in range(repeat)]
+    stats: Dict[str, Any] = _timing_stats([sample["eda_cli.cli"] for sample in samples])
+    stats["heavy_imports"] = [module for module in HEAVY_MODULES if module in samples[0]]
+    yield "importtime eda_cli.cli", stats
+
+
+@contextlib.contextmanager
+def _api_client() -> Iterator[Tuple[Any, Callable[[], None]]]:
+    # Дисковый кэш пережил бы очистку между запусками.
+    os.environ.pop("EDA_API_CACHE_DIR", None)
+    from fastapi.testclient import TestClient
+
+    from eda_cli import api
+
+    with TestClient(api.app) as client:
+        yield client, api.result_cache.clear
+
+
+# ---------- запуск ----------
+
+
+def _dataset_specs(args: argparse.Namespace) -> List[DatasetSpec]:
+    if args.rows is None and args.cols is None:
+        return list(PRESETS[args.preset])
+    defaults = DatasetSpec(rows=10_000, cols=20)
+    return [
+        DatasetSpec(
+            rows=args.rows or defaults.rows,
+            cols=args.cols or defaults.cols,
+            missing_rate=args.missing_rate,
+            cardinality=args.cardinality,
+            dtype_mix=parse_dtype_mix(args.dtype_mix) if args.dtype_mix else defaults.dtype_mix,
+            seed=args.seed,
+        )
+    ]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _meta() -> Dict[str, Any]:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    groups = args.only or list(GROUPS)
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="eda-bench-") as tmp, contextlib.ExitStack() as stack:
+        workdir = Path(tmp)
+        api = stack.enter_context(_api_client()) if "api" in groups else None
+
+        for spec in _dataset_specs(args):
+            csv_path = workdir / f"{spec.name}.csv"
+            make_dataset(spec).to_csv(csv_path, index=False)
+            csv_bytes = csv_path.read_bytes()
+            # Ядро получает таблицу в том виде, в каком её прочитает CLI.
+            df = pd.read_csv(csv_path)
+
+            cases: List[Tuple[str, Case]] = []
+            if "core" in groups:
+                cases += [("core", case) for case in core_cases(df)]
+            if "summary" in groups:
+                cases += [("summary", case) for case in summary_cases(df)]
+            if "cli" in groups:
+                cases += [("cli", case) for case in cli_cases(csv_path, workdir)]
+            if "api" in groups:
+                cases += [("api", case) for case in api_cases(csv_bytes, *api)]
+
+            print(f"\n{spec.name} ({len(csv_bytes) / 1024**2:.1f} МБ CSV)", file=sys.stderr)
+
+            def record(group: str, name: str, stats: Dict[str, Any]) -> None:
+                results.append(
+                    {
+                        "group": group,
+                        "case": name,
+                        "dataset": spec.name,
+                        "spec": spec.to_dict(),
+                        "repeat": args.repeat,
+                        **stats,
+                    }
+                )
+                print(
+                    f"  {group:<7} {name:<36} {stats['seconds_min']:>9.4f} s "
+                    f"(медиана {stats['seconds_median']:.4f}) {stats['peak_mb']:>9.1f} МБ",
+                    file=sys.stderr,
+                )
+
+            for group, (name, fn, setup) in cases:
+                # API и CLI печатают в stdout свои логи - не смешиваем их с отчётом.
+                with contextlib.redirect_stdout(io.StringIO()):
+                    stats = measure(fn, args.repeat, setup)
+                record(group, name, stats)
+            if "startup" in groups:
+                for name, stats in startup_results(csv_path, args.repeat):
+                    record("startup", name, stats)
+
+    return {"meta": _meta(), "results": results}
+
+
+# ---------- сравнение ----------
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_seconds: float,
+) -> List[Dict[str, Any]]:
+    """
+    Строки сравнения для случаев, которые есть в обоих файлах.
+    Регрессия - рост времени (минимума) или пиковой памяти больше допуска;
+    случаи быстрее ``min_seconds`` по времени не сравниваются (шум).
+    """
+    base_index = {(r["case"], r["dataset"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        base = base_index.get((r["case"], r["dataset"]))
+        if base is None:
+            continue
+        time_ratio = r["seconds_min"] / base["seconds_min"] if base["seconds_min"] > 0 else float("inf")
+        memory_ratio = r["peak_mb"] / base["peak_mb"] if base["peak_mb"] > 0 else 1.0
+        slow = max(r["seconds_min"], base["seconds_min"]) >= min_seconds and time_ratio > 1 + time_tolerance
+        rows.append(
+            {
+                "case": r["case"],
+                "dataset": r["dataset"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "time_regression": slow,
+                "memory_regression": memory_ratio > 1 + memory_tolerance,
+            }
+        )
+    return rows
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    rows = compare_results(
+        baseline, current, args.time_tolerance, args.memory_tolerance, args.min_seconds
+    )
+    if not rows:
+        print("Нет общих случаев для сравнения.")
+        return 2
+
+    print(f"{'case':<36} {'dataset':<60} {'time':>7} {'memory':>7}")
+    for row in rows:
+        marks = []
+        if row["time_regression"]:
+            marks.append("ВРЕМЯ")
+        if row["memory_regression"]:
+            marks.append("ПАМЯТЬ")
+        print(
+            f"{row['case']:<36} {row['dataset']:<60} {row['time_ratio']:>6.2f}x "
+            f"{row['memory_ratio']:>6.2f}x  {' '.join(marks)}"
+        )
+
+    regressions = [r for r in rows if r["time_regression"] or r["memory_regression"]]
+    print(f"\nРегрессий: {len(regressions)} из {len(rows)}")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Запустить бенчмарки и сохранить JSON.")
+    run_parser.add_argument("--preset", choices=sorted(PRESETS), default="default")
+    run_parser.add_argument("--rows", type=int, help="Свой датасет вместо пресета: число строк.")
+    run_parser.add_argument("--cols", type=int, help="Свой датасет вместо пресета: число колонок.")
+    run_parser.add_argument("--missing-rate", type=float, default=0.1)
+    run_parser.add_argument("--cardinality", type=int, default=50)
+    run_parser.add_argument("--dtype-mix", help="Доли типов колонок, например numeric=0.6,category=0.4.")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--only", nargs="+", choices=GROUPS, help="Только эти группы случаев.")
+    run_parser.add_argument("--out", help="Куда сохранить JSON (по умолчанию - stdout).")
+
+    compare_parser = sub.add_parser("compare", help="Сравнить результаты с базовыми.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--time-tolerance", type=float, default=0.15, help="Допустимый рост времени (доля).")
+    compare_parser.add_argument("--memory-tolerance", type=float, default=0.10, help="Допустимый рост памяти (доля).")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.005, help="Не сравнивать время более быстрых случаев.")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+
+    payload = json.dumps(run(args), ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
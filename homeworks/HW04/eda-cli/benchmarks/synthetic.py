@@ -0,0 +1,109 @@
+"""
+Генераторы синтетических датасетов для бенчмарков.
+
+Датасет задаётся ``DatasetSpec``: число строк и колонок, доля пропусков,
+число различных значений в строковых колонках и доли типов колонок
+(числа, строки, bool, даты). Генерация детерминирована по ``seed``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+DTYPE_KINDS = ("numeric", "integer", "category", "bool", "datetime")
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    rows: int
+    cols: int
+    missing_rate: float = 0.1
+    cardinality: int = 50
+    # Доли типов колонок; нормируются при генерации.
+    dtype_mix: Dict[str, float] = field(
+        default_factory=lambda: {"numeric": 0.5, "integer": 0.2, "category": 0.2, "bool": 0.05, "datetime": 0.05}
+    )
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        mix = "-".join(f"{kind[:3]}{share:g}" for kind, share in sorted(self.dtype_mix.items()) if share)
+        return (
+            f"r{self.rows}_c{self.cols}_m{self.missing_rate:g}_k{self.cardinality}_{mix}"
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["name"] = self.name
+        return data
+
+
+# Наборы датасетов для `suite.py run --preset ...`.
+PRESETS: Dict[str, list] = {
+    "small": [DatasetSpec(rows=10_000, cols=20)],
+    "default": [
+        DatasetSpec(rows=100_000, cols=30),
+        DatasetSpec(rows=5_000, cols=500, dtype_mix={"numeric": 0.9, "category": 0.1}),
+        DatasetSpec(rows=100_000, cols=10, missing_rate=0.4, cardinality=20_000,
+                    dtype_mix={"category": 0.7, "numeric": 0.3}),
+    ],
+    "large": [DatasetSpec(rows=1_000_000, cols=30)],
+}
+
+
+def parse_dtype_mix(text: str) -> Dict[str, float]:
+    """
+    Разобрать строку вида ``numeric=0.6,category=0.4``.
+    """
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        kind, _, share = part.partition("=")
+        kind = kind.strip()
+        if kind not in DTYPE_KINDS:
+            raise ValueError(f"Неизвестный тип колонки '{kind}', ожидается один из: {', '.join(DTYPE_KINDS)}")
+        mix[kind] = float(share)
+    return mix
+
+
+def _column_kinds(spec: DatasetSpec) -> list:
+    total = sum(spec.dtype_mix.values())
+    if total <= 0:
+        raise ValueError("Сумма долей типов колонок должна быть положительной")
+    kinds = []
+    for kind in DTYPE_KINDS:
+        kinds += [kind] * int(round(spec.cols * spec.dtype_mix.get(kind, 0.0) / total))
+    # Округление могло дать не ровно cols колонок.
+    main_kind = max(spec.dtype_mix, key=spec.dtype_mix.get)
+    kinds = (kinds + [main_kind] * spec.cols)[: spec.cols]
+    return kinds
+
+
+def make_dataset(spec: DatasetSpec) -> pd.DataFrame:
+    rng = np.random.default_rng(spec.seed)
+    n = spec.rows
+    vocabulary = np.array([f"v{i:06d}" for i in range(max(1, spec.cardinality))], dtype=object)
+    data = {}
+    for j, kind in enumerate(_column_kinds(spec)):
+        missing = rng.random(n) < spec.missing_rate
+        if kind == "numeric":
+            values = pd.Series(rng.normal(loc=j, scale=1 + j % 7, size=n))
+        elif kind == "integer":
+            # С пропусками pandas всё равно хранит целые как float64 (как после read_csv).
+            values = pd.Series(rng.integers(0, 1000, size=n))
+        elif kind == "category":
+            # Частоты по Ципфу: несколько частых значений и длинный хвост.
+            codes = np.minimum(rng.zipf(1.3, size=n) - 1, len(vocabulary) - 1)
+            values = pd.Series(vocabulary[codes])
+        elif kind == "bool":
+            values = pd.Series(rng.random(n) < 0.3)
+        else:
+            seconds = rng.integers(0, 3 * 365 * 24 * 3600, size=n)
+            values = pd.Series(pd.Timestamp("2022-01-01") + pd.to_timedelta(seconds, unit="s"))
+        if missing.any():
+            values = values.mask(missing)
+        data[f"{kind}_{j}"] = values
+    return pd.DataFrame(data)
@@ -4,9 +4,22 @@ eda_cli – мини-утилита для EDA CSV-файлов.
 Используется:
 - на Семинаре 03 как CLI-приложение;
 - на Семинаре 04 как библиотека для обёрток (HTTP-сервис и т.п.).
+
+Подмодули импортируются при первом обращении (``eda_cli.core``,
+``eda_cli.viz``), а не при импорте пакета: так CLI не тянет pandas и
+matplotlib туда, где они не нужны.
 """
 
-from . import core, viz
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = ["core", "viz"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
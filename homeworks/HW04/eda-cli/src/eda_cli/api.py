@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
 from datetime import datetime
 from time import perf_counter
-from typing import Dict, Optional, Any
+from typing import Any, AsyncIterator, Callable, ContextManager, Dict, List, Optional, Tuple, TypeVar
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from .cache import ResultCache, hash_stream, make_key
+from .dispatch import BoundedExecutor, SaturatedError
+
 from .core import (
     compute_quality_flags,
     correlation_matrix,
@@ -16,6 +29,140 @@ from .core import (
     top_categories,
     DatasetSummary,
 )
+from .export import iter_summary_ndjson, summary_bytes
+from .loaders import count_rows, detect_format, load_table, load_table_compact
+from .metrics import (
+    ROWS_PER_SECOND_BUCKETS,
+    MetricsRegistry,
+    RequestMetrics,
+    get_logger,
+    log_event,
+)
+from .parallel import ColumnPool
+from .rules import quality_rules
+from .sampling import estimate_quality, sample_table
+from .scoring import (
+    METADATA_FIELDS,
+    MetadataColumns,
+    iter_scores_ndjson,
+    metadata_rules,
+    parse_records,
+    record_columns,
+    score_metadata,
+)
+from .streaming import CsvStreamProfiler
+from .tracing import Tracer, bind, traced
+
+# ---------- Настройки сервиса (переменные окружения) ----------
+
+# Сколько процессов использовать для поколоночного профилирования CSV
+# (1 - считать в процессе сервиса, без пула).
+API_WORKERS = int(os.environ.get("EDA_API_WORKERS", "1"))
+
+# Бюджет кэша результатов в памяти (байты); 0 - не кэшировать в памяти.
+API_CACHE_BYTES = int(os.environ.get("EDA_API_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+# Каталог дискового уровня кэша (пусто - без диска) и его бюджет в байтах.
+API_CACHE_DIR = os.environ.get("EDA_API_CACHE_DIR") or None
+API_CACHE_DISK_BYTES = int(os.environ.get("EDA_API_CACHE_DISK_BYTES", str(4 * 1024 * 1024 * 1024)))
+
+# Сколько CSV-загрузок профилируется одновременно и сколько может ждать
+# в очереди; сверх этого сервис отвечает 503 с заголовком Retry-After.
+API_CONCURRENCY = int(os.environ.get("EDA_API_CONCURRENCY", "2"))
+API_QUEUE_DEPTH = int(os.environ.get("EDA_API_QUEUE_DEPTH", "8"))
+
+# Читать загрузки с компактными типами колонок (category/string, int8-int32),
+# чтобы профилирование больших таблиц занимало меньше памяти.
+API_COMPACT_DTYPES = os.environ.get("EDA_API_COMPACT_DTYPES", "0").lower() in ("1", "true", "yes")
+
+# Максимальный размер тела запроса (байты); больше - ответ 413.
+API_MAX_UPLOAD_BYTES = int(os.environ.get("EDA_API_MAX_UPLOAD_BYTES", str(8 * 1024 * 1024 * 1024)))
+
+# Уровень структурированного лога запросов (JSON-строка на запрос в stdout).
+API_LOG_LEVEL = os.environ.get("EDA_API_LOG_LEVEL", "INFO")
+# Сколько последних профилей запросов (заголовок X-EDA-Profile) хранить
+# для GET /profiles/{id}.
+API_PROFILE_KEEP = int(os.environ.get("EDA_API_PROFILE_KEEP", "32"))
+
+PROFILE_HEADER = "X-EDA-Profile"
+# Значения PROFILE_HEADER: только время или время и аллокации.
+_PROFILE_MODES = {"1": False, "true": False, "time": False, "alloc": True}
+
+# Потоковые эндпоинты: сколько байтов тела копить перед передачей разборщику
+# и сколько таких порций может ждать разбора (дальше приём тела притормаживает).
+_STREAM_FEED_BYTES = 1024 * 1024
+_STREAM_QUEUE_BLOCKS = 4
+_STREAM_POLL_S = 0.005
+
+_CSV_CONTENT_TYPES = ("text/csv", "application/vnd.ms-excel", "application/octet-stream")
+
+# Multipart-эндпоинты принимают и колоночные форматы (формат определяется
+# по сигнатуре файла, см. loaders.detect_format).
+_TABLE_CONTENT_TYPES = _CSV_CONTENT_TYPES + (
+    "application/vnd.apache.parquet",
+    "application/x-parquet",
+    "application/vnd.apache.arrow.file",
+)
+
+column_pool = ColumnPool(API_WORKERS)
+result_cache = ResultCache(API_CACHE_BYTES, API_CACHE_DIR, API_CACHE_DISK_BYTES)
+profiling_executor = BoundedExecutor(API_CONCURRENCY, API_QUEUE_DEPTH)
+logger = get_logger("eda_cli.api", API_LOG_LEVEL)
+# id -> трассировщик профилированного запроса (последние API_PROFILE_KEEP).
+profiles: "OrderedDict[str, Tracer]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+# ---------- Метрики (GET /metrics) ----------
+
+metrics_registry = MetricsRegistry()
+requests_total = metrics_registry.counter(
+    "eda_api_requests_total", "Обработанные запросы.", ("endpoint", "method", "status")
+)
+requests_in_flight = metrics_registry.gauge(
+    "eda_api_requests_in_flight", "Запросы, которые обрабатываются сейчас."
+)
+request_seconds = metrics_registry.histogram(
+    "eda_api_request_duration_seconds", "Время обработки запроса, с.", ("endpoint",)
+)
+stage_seconds = metrics_registry.histogram(
+    "eda_api_stage_duration_seconds",
+    "Время стадии обработки запроса (upload, queue_wait, read_table, summarize_dataset...), с.",
+    ("endpoint", "stage"),
+)
+ingested_bytes = metrics_registry.counter(
+    "eda_api_ingested_bytes_total", "Принятые байты тела запроса.", ("endpoint",)
+)
+rows_processed = metrics_registry.counter(
+    "eda_api_rows_processed_total", "Строки, профилированные без кэша.", ("endpoint",)
+)
+rows_per_second = metrics_registry.histogram(
+    "eda_api_rows_per_second",
+    "Скорость профилирования (строк в секунду запроса), без попаданий в кэш.",
+    ("endpoint",),
+    ROWS_PER_SECOND_BUCKETS,
+)
+cache_requests = metrics_registry.counter(
+    "eda_api_cache_requests_total", "Обращения к кэшу результатов.", ("endpoint", "result")
+)
+profiling_tasks = metrics_registry.gauge(
+    "eda_api_profiling_tasks", "Задачи пула профилирования: в работе и в очереди."
+)
+profiling_rejected = metrics_registry.counter(
+    "eda_api_profiling_rejected_total", "Задачи, отклонённые пулом профилирования (503)."
+)
+cache_bytes = metrics_registry.gauge(
+    "eda_api_cache_bytes", "Объём кэша результатов в памяти, байты."
+)
+
+T = TypeVar("T")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    profiling_executor.shutdown()
+    column_pool.close()
+
 
 app = FastAPI(
     title="AIE Dataset Quality API",
@@ -26,8 +173,127 @@ app = FastAPI(
     ),
     docs_url="/docs",
     redoc_url=None,
+    lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next: Callable[[Request], Any]) -> Any:
+    """
+    Отклонить запрос с Content-Length больше лимита до чтения тела.
+    Тела без Content-Length потоковые эндпоинты проверяют по мере приёма.
+    """
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > API_MAX_UPLOAD_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Файл больше допустимого размера ({API_MAX_UPLOAD_BYTES} байт)."},
+        )
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next: Callable[[Request], Any]) -> Any:
+    """
+    Метрики и строка лога на каждый запрос. Обработчики дописывают стадии,
+    строки и кэш в ``request.state.metrics`` (см. ``_request_metrics``).
+    С заголовком ``X-EDA-Profile`` работа запроса в пуле профилирования
+    трассируется (см. ``_request_tracer``), а id профиля возвращается
+    в ``X-EDA-Profile-Id``.
+    """
+    metrics = RequestMetrics(request.url.path)
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit():
+        metrics.bytes_in = int(length)
+    request.state.metrics = metrics
+    mode = request.headers.get(PROFILE_HEADER, "").strip().lower()
+    request.state.tracer = Tracer(allocations=_PROFILE_MODES[mode]) if mode in _PROFILE_MODES else None
+    requests_in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if metrics.stages:
+            response.headers["Server-Timing"] = metrics.server_timing()
+        tracer = request.state.tracer
+        if tracer is not None and tracer.events:
+            profile_id = _keep_profile(tracer)
+            response.headers["X-EDA-Profile-Id"] = profile_id
+            metrics.fields["profile_id"] = profile_id
+        return response
+    finally:
+        requests_in_flight.dec()
+        _record_request(request, metrics, status)
+
+
+def _record_request(request: Request, metrics: RequestMetrics, status: int) -> None:
+    latency = perf_counter() - metrics.started
+    # Метка - шаблон пути маршрута, чтобы число рядов не зависело от URL.
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", None) or "other"
+
+    requests_total.inc(endpoint=endpoint, method=request.method, status=status)
+    request_seconds.observe(latency, endpoint=endpoint)
+    for stage, seconds in metrics.stages.items():
+        stage_seconds.observe(seconds, endpoint=endpoint, stage=stage)
+    if metrics.bytes_in:
+        ingested_bytes.inc(metrics.bytes_in, endpoint=endpoint)
+    if metrics.cache is not None:
+        cache_requests.inc(endpoint=endpoint, result=metrics.cache)
+    if metrics.rows is not None and metrics.cache != "hit":
+        rows_processed.inc(metrics.rows, endpoint=endpoint)
+        if latency > 0:
+            rows_per_second.observe(metrics.rows / latency, endpoint=endpoint)
+
+    log_event(
+        logger,
+        "request",
+        endpoint=endpoint,
+        method=request.method,
+        status=status,
+        latency_ms=round(latency * 1000.0, 3),
+        bytes_in=metrics.bytes_in,
+        rows=metrics.rows,
+        cache=metrics.cache,
+        stages_ms=metrics.stages_ms(),
+        **metrics.fields,
+    )
+
+
+def _request_metrics(request: Request, upload: bool = False) -> RequestMetrics:
+    """
+    Замеры текущего запроса. ``upload=True`` - записать стадию ``upload``:
+    время от начала запроса до вызова обработчика, то есть приём и разбор
+    multipart-тела.
+    """
+    metrics = getattr(request.state, "metrics", None)
+    if metrics is None:
+        metrics = request.state.metrics = RequestMetrics(request.url.path)
+    if upload:
+        metrics.add("upload", perf_counter() - metrics.started)
+    return metrics
+
+
+def _stage(metrics: Optional[RequestMetrics], name: str) -> ContextManager[Any]:
+    return metrics.stage(name) if metrics is not None else nullcontext()
+
+
+def _request_tracer(request: Request) -> Optional[Tracer]:
+    """
+    Трассировщик запроса с заголовком ``X-EDA-Profile`` (иначе None).
+    Обработчики передают в пул профилирования ``bind(tracer, fn)``.
+    """
+    return getattr(request.state, "tracer", None)
+
+
+def _keep_profile(tracer: Tracer) -> str:
+    profile_id = uuid.uuid4().hex
+    with _profiles_lock:
+        profiles[profile_id] = tracer
+        while len(profiles) > API_PROFILE_KEEP:
+            profiles.popitem(last=False)
+    return profile_id
+
 # --------------------
 
 class QualityRequest(BaseModel):
@@ -45,6 +311,19 @@ class QualityResponse(BaseModel):
     latency_ms: float = Field(..., ge=0.0, description="Время обработки, мс")
     flags: Optional[Dict[str, bool]] = Field(default=None, description="Булевы флаги")
     dataset_shape: Optional[Dict[str, int]] = Field(default=None, description="Размеры датасета")
+    queue_wait_ms: Optional[float] = Field(
+        default=None, ge=0.0, description="Ожидание в очереди профилирования, мс (входит в latency_ms)"
+    )
+    stages_ms: Optional[Dict[str, float]] = Field(
+        default=None, description="Время по стадиям обработки, мс (при timings=true)"
+    )
+    approximate: bool = Field(
+        default=False, description="Оценка по выборке строк (параметр sample), а не по всему файлу"
+    )
+    sample_rows: Optional[int] = Field(default=None, description="Строк в выборке (при sample)")
+    quality_score_interval: Optional[List[float]] = Field(
+        default=None, description="95%-ный интервал quality_score (при sample)"
+    )
 
 
 
@@ -64,6 +343,401 @@ class QualityFlagsResponse(BaseModel):
         ge=0.0,
         description="Время обработки запроса на сервере, миллисекунды"
     )
+    queue_wait_ms: float = Field(
+        0.0,
+        ge=0.0,
+        description="Ожидание в очереди профилирования, миллисекунды (входит в latency_ms)"
+    )
+    stages_ms: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Время по стадиям обработки, миллисекунды (при timings=true)"
+    )
+    approximate: bool = Field(
+        default=False,
+        description="Флаги посчитаны по выборке строк (параметр sample); границы - поля *_low/*_high"
+    )
+    sample_rows: Optional[int] = Field(default=None, description="Строк в выборке (при sample)")
+
+
+@dataclass
+class CsvProfile:
+    """
+    Результат профилирования загруженного CSV - то, что кладётся в кэш.
+    """
+
+    summary: DatasetSummary
+    missing_df: pd.DataFrame
+    flags: Dict[str, Any]
+    n_rows: int
+    n_cols: int
+    # Строк в выборке, если профиль приближённый (sampling.estimate_quality).
+    sample_rows: Optional[int] = None
+
+
+def _read_table_upload(file: UploadFile, nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Прочитать загруженный CSV, Parquet или Feather (формат - по сигнатуре файла).
+    """
+    try:
+        if API_COMPACT_DTYPES and nrows is None:
+            df, _ = load_table_compact(file.file)
+        else:
+            df = load_table(file.file, nrows=nrows)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+
+    if df.empty:
+        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
+    return df
+
+
+@traced
+def _profile_upload(
+    file: UploadFile,
+    min_missing_share: float,
+    metrics: Optional[RequestMetrics] = None,
+    refresh: bool = False,
+    sample: Optional[int] = None,
+) -> Tuple[CsvProfile, bool]:
+    """
+    Профиль загруженного CSV и признак попадания в кэш. При попадании
+    файл не парсится и EDA-ядро не вызывается. Время стадий пишется
+    в ``metrics``. ``refresh`` - посчитать заново, не заглядывая в кэш
+    (для профилируемых запросов). ``sample`` - приближённый профиль по
+    выборке из стольких строк (``sampling``).
+    """
+    with _stage(metrics, "hash"):
+        content_hash = hash_stream(file.file)
+        # Флаги зависят от правил оценки, а dtype в сводке - от
+        # EDA_API_COMPACT_DTYPES: при смене конфига или настройки старые
+        # записи (в том числе дисковые) не используются.
+        params = {
+            "min_missing_share": min_missing_share,
+            "rules": quality_rules("dataset").digest,
+            "compact": API_COMPACT_DTYPES,
+        }
+        if sample is None:
+            key = make_key(content_hash, "profile", **params)
+        else:
+            key = make_key(content_hash, "profile_sample", sample=sample, **params)
+        cached = None if refresh else result_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    if sample is not None:
+        profile = _sample_upload(file, min_missing_share, sample, metrics)
+        result_cache.put(key, profile)
+        return profile, False
+
+    with _stage(metrics, "read_table"):
+        df = _read_table_upload(file)
+
+    # Используем EDA-ядро
+    with _stage(metrics, "summarize_dataset"):
+        summary = column_pool.summarize_dataset(df)
+    with _stage(metrics, "missing_table"):
+        missing_df = missing_table(df)
+    with _stage(metrics, "compute_quality_flags"):
+        flags_all = column_pool.compute_quality_flags(
+            df, summary, missing_df, min_missing_share=min_missing_share
+        )
+
+    profile = CsvProfile(
+        summary=summary,
+        missing_df=missing_df,
+        flags=flags_all,
+        n_rows=int(df.shape[0]),
+        n_cols=int(df.shape[1]),
+    )
+    result_cache.put(key, profile)
+    return profile, False
+
+
+def _sample_upload(
+    file: UploadFile,
+    min_missing_share: float,
+    sample: int,
+    metrics: Optional[RequestMetrics] = None,
+) -> CsvProfile:
+    with _stage(metrics, "sample_table"):
+        try:
+            table_sample = sample_table(file.file, sample)
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    if table_sample.n_rows == 0:
+        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
+
+    with _stage(metrics, "estimate_quality"):
+        estimate = estimate_quality(table_sample, min_missing_share=min_missing_share)
+    return CsvProfile(
+        summary=estimate.summary,
+        missing_df=estimate.missing_df,
+        flags=estimate.flags,
+        n_rows=estimate.n_rows,
+        n_cols=estimate.summary.n_cols,
+        sample_rows=estimate.sample_rows if estimate.approximate else None,
+    )
+
+
+@traced
+def _head_upload(
+    file: UploadFile,
+    n: int,
+    metrics: Optional[RequestMetrics] = None,
+    refresh: bool = False,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Первые n строк загруженного CSV и признак попадания в кэш.
+    """
+    with _stage(metrics, "hash"):
+        key = make_key(hash_stream(file.file), "head", n=n)
+        cached = None if refresh else result_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    # У колоночных форматов число строк есть в метаданных, поэтому читаются
+    # только первые n строк; CSV приходится разобрать целиком.
+    try:
+        total_rows = count_rows(file.file, detect_format(file.file))
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    file.file.seek(0)
+    with _stage(metrics, "read_table"):
+        df = _read_table_upload(file, nrows=n if total_rows is not None else None)
+
+    # Берем первые n строк
+    head_df = df.head(n)
+    
+    # Конвертируем в словарь для JSON
+    result = {
+        "n_rows": n,
+        "total_rows": int(total_rows if total_rows is not None else df.shape[0]),
+        "data": head_df.to_dict(orient="records")
+    }
+    result_cache.put(key, result)
+    return result, False
+
+
+async def _run_profiling(fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+    """
+    Выполнить тяжёлую функцию в пуле профилирования, не блокируя event loop.
+    Возвращает результат и время ожидания в очереди (мс).
+    """
+    return await _submit_profiling(fn, *args)
+
+
+def _submit_profiling(fn: Callable[..., T], *args: Any) -> "asyncio.Future[Tuple[T, float]]":
+    try:
+        return profiling_executor.submit(fn, *args)
+    except SaturatedError as exc:
+        profiling_rejected.inc()
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+
+@traced
+def _consume_csv_stream(
+    blocks: "queue.Queue[Optional[bytes]]",
+    aborted: threading.Event,
+    min_missing_share: float,
+    approx_error: Optional[float],
+    metrics: Optional[RequestMetrics] = None,
+) -> CsvProfile:
+    """
+    Разбирать порции тела запроса по мере поступления (выполняется в пуле
+    профилирования). None в очереди - конец тела.
+    """
+    profiler = CsvStreamProfiler(approx_error=approx_error)
+    try:
+        while True:
+            try:
+                data = blocks.get(timeout=0.1)
+            except queue.Empty:
+                if aborted.is_set():
+                    raise RuntimeError("Приём тела запроса прерван.")
+                continue
+            if data is None:
+                break
+            with _stage(metrics, "parse"):
+                profiler.feed(data)
+        with _stage(metrics, "parse"):
+            stream_profile = profiler.finish()
+    except RuntimeError:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    finally:
+        profiler.close()
+
+    if stream_profile.n_rows == 0:
+        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
+
+    with _stage(metrics, "summarize_dataset"):
+        summary = stream_profile.summary()
+    with _stage(metrics, "missing_table"):
+        missing_df = stream_profile.missing_table()
+    with _stage(metrics, "compute_quality_flags"):
+        flags = stream_profile.quality_flags(
+            summary, missing_df, min_missing_share=min_missing_share
+        )
+    return CsvProfile(
+        summary=summary,
+        missing_df=missing_df,
+        flags=flags,
+        n_rows=stream_profile.n_rows,
+        n_cols=len(stream_profile.columns),
+    )
+
+
+async def _put_block(
+    blocks: "queue.Queue[Optional[bytes]]",
+    item: Optional[bytes],
+    consumer: "asyncio.Future[Any]",
+) -> bool:
+    # Очередь ограничена: если разбор отстаёт, приём тела ждёт. False -
+    # разборщик уже завершился (с ошибкой), передавать данные некому.
+    while not consumer.done():
+        try:
+            blocks.put_nowait(item)
+            return True
+        except queue.Full:
+            await asyncio.sleep(_STREAM_POLL_S)
+    return False
+
+
+async def _profile_request_stream(
+    request: Request,
+    min_missing_share: float,
+    approx_error: Optional[float],
+) -> Tuple[CsvProfile, float]:
+    """
+    Профилировать CSV из тела запроса, не сохраняя его целиком: порции
+    передаются разборщику в пуле профилирования по мере приёма.
+    """
+    content_type = request.headers.get("content-type", "text/csv").split(";")[0].strip()
+    if content_type not in _CSV_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
+
+    metrics = _request_metrics(request)
+    blocks: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=_STREAM_QUEUE_BLOCKS)
+    aborted = threading.Event()
+    consumer = _submit_profiling(
+        bind(_request_tracer(request), _consume_csv_stream),
+        blocks, aborted, min_missing_share, approx_error, metrics,
+    )
+
+    # upload - приём тела; идёт параллельно с разбором (стадия parse).
+    received = 0
+    upload_started = perf_counter()
+    try:
+        pending = bytearray()
+        complete = True
+        async for data in request.stream():
+            received += len(data)
+            if received > API_MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Файл больше допустимого размера ({API_MAX_UPLOAD_BYTES} байт).",
+                )
+            pending += data
+            if len(pending) >= _STREAM_FEED_BYTES:
+                complete = await _put_block(blocks, bytes(pending), consumer)
+                pending.clear()
+                if not complete:
+                    break
+        if complete and await _put_block(blocks, bytes(pending), consumer):
+            await _put_block(blocks, None, consumer)
+    except BaseException:
+        aborted.set()
+        # Ошибку разборщика уже не ждём, но забираем, чтобы она не попала в лог.
+        consumer.add_done_callback(lambda future: future.exception())
+        raise
+    finally:
+        metrics.bytes_in = received
+        metrics.add("upload", perf_counter() - upload_started)
+
+    profile, queue_wait_ms = await consumer
+    metrics.add("queue_wait", queue_wait_ms / 1000.0)
+    metrics.rows = profile.n_rows
+    return profile, queue_wait_ms
+
+
+async def _profile_file(
+    request: Request,
+    file: UploadFile,
+    min_missing_share: float,
+    sample: Optional[int] = None,
+) -> Tuple[CsvProfile, bool, float, RequestMetrics]:
+    """
+    Профиль multipart-загрузки в пуле профилирования: профиль, попадание
+    в кэш, ожидание в очереди (мс) и замеры запроса. ``sample`` - см.
+    ``_profile_upload``.
+    """
+    metrics = _request_metrics(request, upload=True)
+    if file.content_type not in _TABLE_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
+
+    tracer = _request_tracer(request)
+    (profile, cache_hit), queue_wait_ms = await _run_profiling(
+        bind(tracer, _profile_upload), file, min_missing_share, metrics, tracer is not None, sample
+    )
+    metrics.add("queue_wait", queue_wait_ms / 1000.0)
+    metrics.cache = "hit" if cache_hit else "miss"
+    metrics.rows = profile.sample_rows or profile.n_rows
+    metrics.fields["filename"] = file.filename
+    if profile.sample_rows is not None:
+        metrics.fields["sample_rows"] = profile.sample_rows
+    return profile, cache_hit, queue_wait_ms, metrics
+
+
+def _quality_response(
+    profile: CsvProfile,
+    latency_ms: float,
+    queue_wait_ms: float,
+    stages_ms: Optional[Dict[str, float]] = None,
+) -> QualityResponse:
+    flags_all = profile.flags
+
+    score = float(flags_all.get("quality_score", 0.0))
+    score = max(0.0, min(1.0, score))
+    ok_for_model = score >= 0.7
+
+    if ok_for_model:
+        message = "CSV выглядит достаточно качественным для обучения модели (по текущим эвристикам)."
+    else:
+        message = "CSV требует доработки перед обучением модели (по текущим эвристикам)."
+    interval = None
+    if profile.sample_rows is not None:
+        message += f" Оценка приближённая: по выборке из {profile.sample_rows} строк."
+        interval = [float(flags_all["quality_score_low"]), float(flags_all["quality_score_high"])]
+
+    # Оставляем только булевы флаги для компактности
+    flags_bool: Dict[str, bool] = {
+        key: bool(value)
+        for key, value in flags_all.items()
+        if isinstance(value, bool)
+    }
+
+    return QualityResponse(
+        ok_for_model=ok_for_model,
+        quality_score=score,
+        message=message,
+        latency_ms=latency_ms,
+        flags=flags_bool,
+        dataset_shape={"n_rows": profile.n_rows, "n_cols": profile.n_cols},
+        queue_wait_ms=queue_wait_ms,
+        stages_ms=stages_ms,
+        approximate=profile.sample_rows is not None,
+        sample_rows=profile.sample_rows,
+        quality_score_interval=interval,
+    )
+
+
+def _set_cache_header(response: Response, hit: bool) -> None:
+    response.headers["X-Cache"] = "hit" if hit else "miss"
 
 
 # ---------- Системный эндпоинт ----------
@@ -77,26 +751,73 @@ def health() -> Dict[str, str]:
     }
 
 
+@app.get("/cache/stats", tags=["system"])
+def cache_stats() -> Dict[str, Any]:
+    """
+    Счётчики кэша результатов: попадания (в памяти и на диске), промахи,
+    вытеснения и занятый объём.
+    """
+    return result_cache.stats()
+
+
+@app.get("/profiling/stats", tags=["system"])
+def profiling_stats() -> Dict[str, Any]:
+    """
+    Состояние пула профилирования: лимиты, задачи в работе и в очереди,
+    число выполненных и отклонённых (503) задач.
+    """
+    return profiling_executor.stats()
+
+
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """
+    Метрики сервиса в текстовом формате Prometheus: запросы, время запросов
+    и стадий, принятые байты, строки и скорость профилирования, кэш и пул.
+    """
+    pool = profiling_executor.stats()
+    profiling_tasks.set(pool["in_flight"])
+    cache_bytes.set(result_cache.stats()["bytes"])
+    return PlainTextResponse(metrics_registry.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
+
+@app.get("/profiles/{profile_id}", tags=["system"])
+def get_profile(profile_id: str) -> Dict[str, Any]:
+    """
+    Профиль запроса, отправленного с заголовком ``X-EDA-Profile``: события
+    Chrome Trace (для Perfetto / ``chrome://tracing``) и сводка по функциям
+    и колонкам. Хранятся последние ``EDA_API_PROFILE_KEEP`` профилей.
+    """
+    return _stored_profile(profile_id).trace()
+
+
+@app.get("/profiles/{profile_id}/collapsed", tags=["system"], response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: str) -> PlainTextResponse:
+    """
+    Тот же профиль свёрнутыми стеками для flamegraph.pl / speedscope.
+    """
+    return PlainTextResponse(_stored_profile(profile_id).collapsed())
+
+
+def _stored_profile(profile_id: str) -> Tracer:
+    with _profiles_lock:
+        tracer = profiles.get(profile_id)
+    if tracer is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден (или уже вытеснен).")
+    return tracer
+
+
 # ----------  /quality  ----------
 
 @app.post("/quality", response_model=QualityResponse, tags=["quality"])
-def quality(req: QualityRequest) -> QualityResponse:
+def quality(req: QualityRequest, request: Request) -> QualityResponse:
     start = perf_counter()
-    score = 1.0
-    score -= req.max_missing_share
-    
-    if req.n_rows < 1000:
-        score -= 0.2
-    if req.n_cols > 100:
-        score -= 0.1
-    if req.numeric_cols == 0 and req.categorical_cols > 0:
-        score -= 0.1
-    if req.categorical_cols == 0 and req.numeric_cols > 0:
-        score -= 0.05
-        
-    score = max(0.0, min(1.0, score))
-    ok_for_model = score >= 0.7
-    
+    # Те же правила, что у /quality/batch (набор metadata, eda_cli.rules).
+    rules = metadata_rules()
+    scores = rules.score_one({name: getattr(req, name) for name in METADATA_FIELDS})
+    score = scores["quality_score"]
+    ok_for_model = scores["ok_for_model"]
+
     if ok_for_model:
         message = "Данных достаточно, модель можно обучать (по текущим эвристикам)."
     else:
@@ -104,18 +825,13 @@ def quality(req: QualityRequest) -> QualityResponse:
 
     latency_ms = (perf_counter() - start) * 1000.0
 
-    flags = {
-        "too_few_rows": req.n_rows < 1000,
-        "too_many_columns": req.n_cols > 100,
-        "too_many_missing": req.max_missing_share > 0.5,
-        "no_numeric_columns": req.numeric_cols == 0,
-        "no_categorical_columns": req.categorical_cols == 0,
-    }
+    flags = {name: scores[name] for name in rules.flags}
 
-    print(
-        f"[quality] n_rows={req.n_rows} n_cols={req.n_cols} "
-        f"max_missing_share={req.max_missing_share:.3f} "
-        f"score={score:.3f} latency_ms={latency_ms:.1f} ms"
+    _request_metrics(request).fields.update(
+        n_rows=req.n_rows,
+        n_cols=req.n_cols,
+        max_missing_share=req.max_missing_share,
+        quality_score=round(score, 3),
     )
 
     return QualityResponse(
@@ -128,6 +844,91 @@ def quality(req: QualityRequest) -> QualityResponse:
     )
 
 
+# ---------- /quality/batch ----------
+
+async def _read_body(request: Request, metrics: RequestMetrics) -> bytes:
+    """
+    Тело запроса целиком (стадия ``upload``). Лимит ``API_MAX_UPLOAD_BYTES``
+    проверяется и для тел без Content-Length.
+    """
+    body = bytearray()
+    with metrics.stage("upload"):
+        async for data in request.stream():
+            body += data
+            if len(body) > API_MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Файл больше допустимого размера ({API_MAX_UPLOAD_BYTES} байт).",
+                )
+    metrics.bytes_in = len(body)
+    return bytes(body)
+
+
+@traced
+def _score_batch(
+    body: bytes,
+    metrics: Optional[RequestMetrics] = None,
+) -> Tuple[MetadataColumns, Dict[str, np.ndarray]]:
+    with _stage(metrics, "parse"):
+        try:
+            records = parse_records(body)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Не удалось разобрать записи: {exc}")
+    with _stage(metrics, "validate"):
+        batch = record_columns(records)
+    with _stage(metrics, "score"):
+        scores = score_metadata(batch.columns)
+    return batch, scores
+
+
+@app.post(
+    "/quality/batch",
+    tags=["quality"],
+    summary="Оценка качества по метаданным для пакета записей (NDJSON-поток)",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/QualityRequest"}}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def quality_batch(request: Request) -> StreamingResponse:
+    """
+    Те же эвристики, что у ``/quality``, для многих записей за один запрос.
+    Тело - JSON-массив записей ``QualityRequest`` или NDJSON (по записи на
+    строку); необязательное поле ``id`` возвращается в ответе.
+
+    Ответ - NDJSON в порядке записей, отдаётся частями:
+    ``{"index", "ok_for_model", "quality_score", "flags"}``; неверная
+    запись получает ``{"index", "error"}`` и не роняет весь пакет.
+    Число записей и неверных записей - в заголовках ``X-Records`` и
+    ``X-Invalid-Records``.
+    """
+    metrics = _request_metrics(request)
+    body = await _read_body(request, metrics)
+    (batch, scores), queue_wait_ms = await _run_profiling(
+        bind(_request_tracer(request), _score_batch), body, metrics
+    )
+    metrics.add("queue_wait", queue_wait_ms / 1000.0)
+    metrics.rows = len(batch)
+    metrics.fields.update(records=len(batch), invalid_records=len(batch.errors))
+    return StreamingResponse(
+        iter_scores_ndjson(batch, scores),
+        media_type="application/x-ndjson",
+        headers={
+            "X-Records": str(len(batch)),
+            "X-Invalid-Records": str(len(batch.errors)),
+            "X-Queue-Wait-Ms": f"{queue_wait_ms:.1f}",
+        },
+    )
+
+
 # ---------- /quality-from-csv ----------
 
 @app.post(
@@ -136,62 +937,66 @@ def quality(req: QualityRequest) -> QualityResponse:
     tags=["quality"],
     summary="Оценка качества по CSV-файлу с использованием EDA-ядра",
 )
-async def quality_from_csv(file: UploadFile = File(...)) -> QualityResponse:
+async def quality_from_csv(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    min_missing_share: float = Query(0.3, ge=0.0, le=1.0),
+    timings: bool = Query(False, description="Вернуть время по стадиям обработки (stages_ms)."),
+    sample: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Приближённая оценка по выборке из стольких строк (с интервалами), а не по всему файлу.",
+    ),
+) -> QualityResponse:
     start = perf_counter()
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
-        raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
-
-    try:
-        df = pd.read_csv(file.file)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
-
-    if df.empty:
-        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
-
-    # Используем EDA-ядро
-    summary = summarize_dataset(df)
-    missing_df = missing_table(df)
-    
-    # ИСПРАВЛЕНИЕ: передаём все необходимые параметры
-    flags_all = compute_quality_flags(df, summary, missing_df)
-
-    score = float(flags_all.get("quality_score", 0.0))
-    score = max(0.0, min(1.0, score))
-    ok_for_model = score >= 0.7
-
-    if ok_for_model:
-        message = "CSV выглядит достаточно качественным для обучения модели (по текущим эвристикам)."
-    else:
-        message = "CSV требует доработки перед обучением модели (по текущим эвристикам)."
+    profile, cache_hit, queue_wait_ms, metrics = await _profile_file(
+        request, file, min_missing_share, sample
+    )
+    _set_cache_header(response, cache_hit)
 
     latency_ms = (perf_counter() - start) * 1000.0
+    result = _quality_response(
+        profile, latency_ms, queue_wait_ms, metrics.stages_ms() if timings else None
+    )
+    metrics.fields["quality_score"] = round(result.quality_score, 3)
+    return result
 
-    # Оставляем только булевы флаги для компактности
-    flags_bool: Dict[str, bool] = {
-        key: bool(value)
-        for key, value in flags_all.items()
-        if isinstance(value, bool)
-    }
 
-    n_rows = int(df.shape[0])
-    n_cols = int(df.shape[1])
+# ---------- /quality-from-csv-stream ----------
 
-    print(
-        f"[quality-from-csv] filename={file.filename!r} "
-        f"n_rows={n_rows} n_cols={n_cols} score={score:.3f} "
-        f"latency_ms={latency_ms:.1f} ms"
+@app.post(
+    "/quality-from-csv-stream",
+    response_model=QualityResponse,
+    tags=["quality"],
+    summary="Оценка качества по CSV в теле запроса (потоковый разбор)",
+)
+async def quality_from_csv_stream(
+    request: Request,
+    min_missing_share: float = Query(0.3, ge=0.0, le=1.0),
+    approx_error: Optional[float] = Query(None, ge=1e-4, le=0.5),
+    timings: bool = Query(False, description="Вернуть время по стадиям обработки (stages_ms)."),
+) -> QualityResponse:
+    """
+    То же, что ``/quality-from-csv``, но CSV передаётся телом запроса
+    (не multipart) и разбирается по мере приёма: файл не сохраняется целиком,
+    память ограничена размером блока и состоянием профиля. ``approx_error``
+    включает скетчи вместо точных частот значений.
+    """
+    start = perf_counter()
+
+    profile, queue_wait_ms = await _profile_request_stream(
+        request, min_missing_share, approx_error
     )
 
-    return QualityResponse(
-        ok_for_model=ok_for_model,
-        quality_score=score,
-        message=message,
-        latency_ms=latency_ms,
-        flags=flags_bool,
-        dataset_shape={"n_rows": n_rows, "n_cols": n_cols},
+    latency_ms = (perf_counter() - start) * 1000.0
+    metrics = _request_metrics(request)
+    result = _quality_response(
+        profile, latency_ms, queue_wait_ms, metrics.stages_ms() if timings else None
     )
+    metrics.fields["quality_score"] = round(result.quality_score, 3)
+    return result
 
 
 # ---------- /quality-flags-from-csv ----------
@@ -202,7 +1007,18 @@ async def quality_from_csv(file: UploadFile = File(...)) -> QualityResponse:
     tags=["quality"],
     summary="Полный набор флагов качества из CSV-файла",
 )
-async def quality_flags_from_csv(file: UploadFile = File(...)) -> QualityFlagsResponse:
+async def quality_flags_from_csv(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    min_missing_share: float = Query(0.3, ge=0.0, le=1.0),
+    timings: bool = Query(False, description="Вернуть время по стадиям обработки (stages_ms)."),
+    sample: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Приближённая оценка по выборке из стольких строк (с интервалами), а не по всему файлу.",
+    ),
+) -> QualityFlagsResponse:
     """
     Эндпоинт для получения полного набора флагов качества из CSV-файла.
     Возвращает все флаги, включая те, что были добавлены в HW03.
@@ -210,39 +1026,62 @@ async def quality_flags_from_csv(file: UploadFile = File(...)) -> QualityFlagsRe
     
     start = perf_counter()
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
-        raise HTTPException(status_code=400, detail="Ожидается CSV-файл (content-type text/csv).")
+    # Получаем все флаги качества
+    profile, cache_hit, queue_wait_ms, metrics = await _profile_file(
+        request, file, min_missing_share, sample
+    )
+    _set_cache_header(response, cache_hit)
+    flags_all = profile.flags
 
-    try:
-        df = pd.read_csv(file.file)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    latency_ms = (perf_counter() - start) * 1000.0
 
-    if df.empty:
-        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
+    n_rows = profile.n_rows
+    n_cols = profile.n_cols
+    metrics.fields["flags_count"] = len(flags_all)
 
-    # Используем EDA-ядро
-    summary = summarize_dataset(df)
-    missing_df = missing_table(df)
-    
-    # Получаем все флаги качества
-    flags_all = compute_quality_flags(df, summary, missing_df)
+    return QualityFlagsResponse(
+        flags=flags_all,
+        dataset_shape={"n_rows": n_rows, "n_cols": n_cols},
+        latency_ms=latency_ms,
+        queue_wait_ms=queue_wait_ms,
+        stages_ms=metrics.stages_ms() if timings else None,
+        approximate=profile.sample_rows is not None,
+        sample_rows=profile.sample_rows,
+    )
 
-    latency_ms = (perf_counter() - start) * 1000.0
 
-    n_rows = int(df.shape[0])
-    n_cols = int(df.shape[1])
+@app.post(
+    "/quality-flags-from-csv-stream",
+    response_model=QualityFlagsResponse,
+    tags=["quality"],
+    summary="Полный набор флагов качества по CSV в теле запроса (потоковый разбор)",
+)
+async def quality_flags_from_csv_stream(
+    request: Request,
+    min_missing_share: float = Query(0.3, ge=0.0, le=1.0),
+    approx_error: Optional[float] = Query(None, ge=1e-4, le=0.5),
+    timings: bool = Query(False, description="Вернуть время по стадиям обработки (stages_ms)."),
+) -> QualityFlagsResponse:
+    """
+    Потоковый аналог ``/quality-flags-from-csv``: CSV передаётся телом
+    запроса и разбирается по мере приёма.
+    """
+    start = perf_counter()
 
-    print(
-        f"[quality-flags-from-csv] filename={file.filename!r} "
-        f"n_rows={n_rows} n_cols={n_cols} "
-        f"flags_count={len(flags_all)} latency_ms={latency_ms:.1f} ms"
+    profile, queue_wait_ms = await _profile_request_stream(
+        request, min_missing_share, approx_error
     )
 
+    latency_ms = (perf_counter() - start) * 1000.0
+    metrics = _request_metrics(request)
+    metrics.fields["flags_count"] = len(profile.flags)
+
     return QualityFlagsResponse(
-        flags=flags_all,
-        dataset_shape={"n_rows": n_rows, "n_cols": n_cols},
+        flags=profile.flags,
+        dataset_shape={"n_rows": profile.n_rows, "n_cols": profile.n_cols},
         latency_ms=latency_ms,
+        queue_wait_ms=queue_wait_ms,
+        stages_ms=metrics.stages_ms() if timings else None,
     )
 
 
@@ -252,6 +1091,8 @@ async def quality_flags_from_csv(file: UploadFile = File(...)) -> QualityFlagsRe
     summary="Первые N строк датасета",
 )
 async def get_head(
+    request: Request,
+    response: Response,
     file: UploadFile = File(...),
     n: int = 10
 ) -> Dict[str, Any]:
@@ -262,23 +1103,57 @@ async def get_head(
     if n < 1 or n > 1000:
         raise HTTPException(status_code=400, detail="Параметр n должен быть от 1 до 1000")
 
-    if file.content_type not in ("text/csv", "application/vnd.ms-excel", "application/octet-stream"):
+    if file.content_type not in _TABLE_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Ожидается CSV-файл.")
 
-    try:
-        df = pd.read_csv(file.file)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}")
+    metrics = _request_metrics(request, upload=True)
+    tracer = _request_tracer(request)
+    (result, cache_hit), queue_wait_ms = await _run_profiling(
+        bind(tracer, _head_upload), file, n, metrics, tracer is not None
+    )
+    metrics.add("queue_wait", queue_wait_ms / 1000.0)
+    metrics.cache = "hit" if cache_hit else "miss"
+    _set_cache_header(response, cache_hit)
+    return {**result, "queue_wait_ms": queue_wait_ms}
 
-    if df.empty:
-        raise HTTPException(status_code=400, detail="CSV-файл не содержит данных.")
 
-    # Берем первые n строк
-    head_df = df.head(n)
-    
-    # Конвертируем в словарь для JSON
-    return {
-        "n_rows": n,
-        "total_rows": int(df.shape[0]),
-        "data": head_df.to_dict(orient="records")
-    }
\ No newline at end of file
+_SUMMARY_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+}
+
+
+@app.post(
+    "/summary-from-csv",
+    tags=["quality"],
+    summary="Сводка по колонкам: NDJSON-поток, Parquet или Feather",
+)
+async def summary_from_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|parquet|feather)$"),
+) -> Response:
+    """
+    Сводка по колонкам без сборки одного большого JSON-документа:
+    ``ndjson`` - первая строка с размерами датасета, дальше по строке на
+    колонку (поля как в ``ColumnSummary.to_dict``), ответ отдаётся частями;
+    ``parquet``/``feather`` - таблица Arrow со строкой на колонку.
+    Профиль берётся из того же кэша, что и у ``/quality-flags-from-csv``.
+    """
+    profile, cache_hit, queue_wait_ms, _ = await _profile_file(request, file, 0.3)
+    headers = {
+        "X-Cache": "hit" if cache_hit else "miss",
+        "X-Queue-Wait-Ms": f"{queue_wait_ms:.1f}",
+    }
+    if fmt == "ndjson":
+        return StreamingResponse(
+            iter_summary_ndjson(profile.summary),
+            media_type=_SUMMARY_MEDIA_TYPES[fmt],
+            headers=headers,
+        )
+    try:
+        body = summary_bytes(profile.summary, fmt)
+    except ImportError as exc:
+        raise HTTPException(status_code=501, detail=str(exc)) from exc
+    return Response(body, media_type=_SUMMARY_MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,385 @@
+"""
+Ранговые корреляции и меры связи категориальных признаков.
+
+- ``spearman_matrix`` - Спирмен: числовые колонки ранжируются векторным
+  проходом (``rank_columns``; при разных масках пропусков - заново по общим
+  строкам пары групп колонок), дальше - корреляция Пирсона по рангам на
+  общем движке со-моментов (``correlation``);
+- ``kendall_matrix`` - тау-b Кендалла по алгоритму Найта: сортировка пары
+  по первой колонке и подсчёт инверсий во второй сортировкой слиянием,
+  вместо O(n²) сравнений всех пар строк;
+- ``association_matrix`` - смешанная матрица: V Крамера для пар
+  категориальных колонок, корреляционное отношение (эта) для пар
+  «категориальная x числовая» и Пирсон для числовых.
+
+Эти методы требуют всех значений колонки сразу (ранги, таблицы
+сопряжённости), поэтому на больших таблицах и в потоковом режиме они
+считаются по выборке строк фиксированного размера (``sample_rows`` и
+``RowSample``): выбираются строки с наименьшими 64-битными хэшами, так что
+выборка по чанкам файла совпадает с выборкой по таблице целиком.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .correlation import correlation_matrix as _pearson_matrix
+from .defaults import DEFAULT_SAMPLE_ROWS  # noqa: F401 - прежнее место константы
+from .duplicates import row_hashes
+
+
+# ---------- выборка строк ----------
+
+
+def sample_rows(df: pd.DataFrame, max_rows: Optional[int]) -> pd.DataFrame:
+    """
+    Не больше ``max_rows`` строк таблицы: строки с наименьшими хэшами
+    (``duplicates.row_hashes``) в исходном порядке. Та же выборка, что
+    собирает ``RowSample`` по чанкам.
+    """
+    if max_rows is None or len(df) <= max_rows:
+        return df
+    hashes = row_hashes(df)
+    keep = np.sort(np.argpartition(hashes, max_rows - 1)[:max_rows])
+    return df.iloc[keep]
+
+
+class RowSample:
+    """
+    Выборка не более ``capacity`` строк по чанкам таблицы (для потокового
+    режима): хранятся строки с наименьшими хэшами, поэтому выборки по
+    разным частям файла объединяются через ``merge``.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.frame: Optional[pd.DataFrame] = None
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def add(self, chunk: pd.DataFrame, hashes: Optional[np.ndarray] = None) -> None:
+        """
+        Добавить чанк; ``hashes`` - уже посчитанные хэши его строк.
+        """
+        if self.capacity <= 0 or len(chunk) == 0:
+            return
+        if hashes is None:
+            hashes = row_hashes(chunk)
+        if len(self.hashes) >= self.capacity:
+            # Строки с хэшем больше текущего максимума в выборку не попадут.
+            keep = hashes < self.hashes.max()
+            chunk, hashes = chunk[keep], hashes[keep]
+            if len(chunk) == 0:
+                return
+
+        frame = chunk if self.frame is None else pd.concat([self.frame, chunk], ignore_index=True)
+        hashes = np.concatenate([self.hashes, hashes])
+        if len(hashes) > self.capacity:
+            keep = np.sort(np.argpartition(hashes, self.capacity - 1)[: self.capacity])
+            frame, hashes = frame.iloc[keep], hashes[keep]
+        self.frame = frame.reset_index(drop=True)
+        self.hashes = hashes
+
+    def merge(self, other: "RowSample") -> None:
+        """
+        Влить выборку по следующей части файла.
+        """
+        if other.frame is not None:
+            self.add(other.frame, other.hashes)
+
+
+# ---------- ранги и Спирмен ----------
+
+
+def rank_columns(values: np.ndarray) -> np.ndarray:
+    """
+    Средние ранги (1..n, у равных значений - среднее их мест) каждой колонки
+    float-массива (строки x колонки) за одну сортировку всех колонок сразу.
+    Пропуски (NaN) остаются пропусками и в ранжировании не участвуют.
+    """
+    # Колонки - строками C-массива: сортировка и накопления идут по
+    # непрерывной памяти.
+    columns = np.ascontiguousarray(values.T, dtype=np.float64)
+    n = columns.shape[1]
+    if n == 0:
+        return columns.T.copy()
+    order = np.argsort(columns, axis=1)
+    ordered = np.take_along_axis(columns, order, axis=1)
+
+    # Для каждой позиции в отсортированной колонке - первая и последняя
+    # позиция её группы равных значений (NaN != NaN, поэтому каждый пропуск -
+    # отдельная группа). От порядка равных значений средний ранг не зависит.
+    positions = np.arange(n, dtype=np.float64)
+    starts = np.ones(columns.shape, dtype=bool)
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=starts[:, 1:])
+    ends = np.ones(columns.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, positions, 0.0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, positions, float(n))[:, ::-1], axis=1)[:, ::-1]
+    ranks_sorted = (first + last) / 2 + 1
+    ranks_sorted[np.isnan(ordered)] = np.nan
+
+    ranks = np.empty_like(ranks_sorted)
+    np.put_along_axis(ranks, order, ranks_sorted, axis=1)
+    return ranks.T
+
+
+def rank_frame(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Таблица средних рангов числовых колонок (см. ``rank_columns``).
+    """
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    return pd.DataFrame(rank_columns(values), index=numeric_df.index, columns=numeric_df.columns)
+
+
+def _rank_cross_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Пирсон между колонками ``x`` и ``y`` (не меньше двух строк без
+    пропусков); NaN для постоянной колонки.
+    """
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = np.sqrt(np.outer((x * x).sum(axis=0), (y * y).sum(axis=0)))
+        r = (x.T @ y) / denom
+    r[~(denom > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def spearman_matrix(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Корреляция Спирмена (как ``DataFrame.corr(method="spearman")``):
+    Пирсон по средним рангам, ранги - по строкам, где непусты обе колонки.
+
+    Если у колонок одинаковые маски пропусков (в частности, пропусков нет),
+    общие строки пары - все непустые строки колонки, и ранги считаются один
+    раз для всех колонок. Колонки группируются по маске пропусков; для пары
+    групп с разными масками колонки обеих групп заново ранжируются по общим
+    строкам одним вызовом ``rank_columns``.
+    """
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(values)
+    if present.all():
+        return _pearson_matrix(rank_frame(numeric_df))
+
+    groups: dict = {}
+    for j in range(values.shape[1]):
+        groups.setdefault(present[:, j].tobytes(), []).append(j)
+    members = list(groups.values())
+
+    # Пары внутри группы: ранги по непустым строкам колонки.
+    result = _pearson_matrix(rank_frame(numeric_df)).to_numpy(copy=True)
+    for a in range(len(members)):
+        for b in range(a + 1, len(members)):
+            left, right = members[a], members[b]
+            rows = present[:, left[0]] & present[:, right[0]]
+            if rows.sum() < 2:
+                block = np.full((len(left), len(right)), np.nan)
+            else:
+                ranks = rank_columns(values[np.ix_(rows, left + right)])
+                block = _rank_cross_correlation(ranks[:, : len(left)], ranks[:, len(left) :])
+            result[np.ix_(left, right)] = block
+            result[np.ix_(right, left)] = block.T
+    return pd.DataFrame(result, index=numeric_df.columns, columns=numeric_df.columns)
+
+
+# ---------- Кендалл ----------
+
+
+def _dense_codes(values: np.ndarray) -> np.ndarray:
+    """
+    Плотные коды значений (0..k-1 в порядке возрастания), -1 для NaN.
+    """
+    codes = np.full(len(values), -1, dtype=np.int64)
+    present = ~np.isnan(values)
+    codes[present] = np.unique(values[present], return_inverse=True)[1]
+    return codes
+
+
+def _tied_pairs(counts: np.ndarray) -> float:
+    counts = counts.astype(np.float64)
+    return float((counts * (counts - 1) / 2).sum())
+
+
+def count_inversions(values: np.ndarray) -> int:
+    """
+    Число пар i < j с ``values[i] > values[j]`` для неотрицательных целых.
+
+    Сортировка слиянием снизу вверх: на уровне с отрезками длины ``width``
+    соседние отрезки сливаются все сразу. Ключ ``номер пары отрезков * span +
+    значение`` делает все левые отрезки одним отсортированным массивом, и
+    число инверсий для каждого элемента правого отрезка даёт один
+    ``searchsorted``, а слияние - одна сортировка почти упорядоченных ключей.
+    """
+    n = len(values)
+    keys = values.astype(np.int64)
+    span = int(keys.max()) + 1 if n else 1
+    positions = np.arange(n, dtype=np.int64)
+    total = 0
+    width = 1
+    while width < n:
+        pair = positions // (2 * width)
+        combined = pair * span + keys
+        is_left = (positions // width) % 2 == 0
+        left_keys = combined[is_left]
+        right_keys = combined[~is_left]
+        # Левых элементов той же пары, больших значения правого элемента.
+        left_end = np.searchsorted(left_keys, (pair[~is_left] + 1) * span)
+        total += int((left_end - np.searchsorted(left_keys, right_keys, side="right")).sum())
+        keys = np.sort(combined, kind="stable") - pair * span
+        width *= 2
+    return total
+
+
+def _kendall_from_codes(x: np.ndarray, y: np.ndarray) -> float:
+    n = len(x)
+    if n < 2:
+        return float("nan")
+    span = int(y.max()) + 1
+    key = x * span + y
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    pairs = n * (n - 1) / 2
+    ties_x = _tied_pairs(np.bincount(x))
+    ties_y = _tied_pairs(np.bincount(y))
+    run_starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+    ties_xy = _tied_pairs(np.diff(np.r_[run_starts, n]))
+    # После сортировки по (x, y) каждая инверсия в y - дискордантная пара.
+    discordant = count_inversions(y[order])
+
+    denominator = np.sqrt((pairs - ties_x) * (pairs - ties_y))
+    if denominator == 0:
+        return float("nan")
+    tau = (pairs - ties_x - ties_y + ties_xy - 2 * discordant) / denominator
+    return float(np.clip(tau, -1.0, 1.0))
+
+
+def kendall_tau(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Тау-b Кендалла двух float-массивов по строкам, где оба непусты
+    (как ``DataFrame.corr(method="kendall")``), за O(n log² n) операций numpy.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    present = ~(np.isnan(x) | np.isnan(y))
+    return _kendall_from_codes(_dense_codes(x[present]), _dense_codes(y[present]))
+
+
+def kendall_matrix(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Матрица тау-b Кендалла (попарно по общим непустым строкам).
+    """
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = [_dense_codes(values[:, j]) for j in range(values.shape[1])]
+    p = len(codes)
+    result = np.full((p, p), np.nan)
+    for i in range(p):
+        present_i = codes[i] >= 0
+        if present_i.sum() >= 2 and codes[i].max() > 0:
+            result[i, i] = 1.0
+        for j in range(i + 1, p):
+            present = present_i & (codes[j] >= 0)
+            x, y = codes[i][present], codes[j][present]
+            if len(x) >= 2:
+                # Коды после отбора строк остаются монотонными, но не плотными.
+                x = np.unique(x, return_inverse=True)[1]
+                y = np.unique(y, return_inverse=True)[1]
+            result[i, j] = result[j, i] = _kendall_from_codes(x, y)
+    return pd.DataFrame(result, index=numeric_df.columns, columns=numeric_df.columns)
+
+
+# ---------- категориальные признаки ----------
+
+
+def cramers_v(left: np.ndarray, right: np.ndarray) -> float:
+    """
+    V Крамера для двух массивов неотрицательных кодов категорий одной длины.
+
+    Хи-квадрат считается по непустым ячейкам таблицы сопряжённости:
+    ``chi² = n * (Σ O²/(R·C) - 1)``, так что память - O(n), а не
+    (число категорий слева x справа).
+    """
+    n = len(left)
+    if n == 0:
+        return float("nan")
+    row_totals = np.bincount(left).astype(np.float64)
+    col_totals = np.bincount(right).astype(np.float64)
+    k = min(int((row_totals > 0).sum()), int((col_totals > 0).sum()))
+    if k < 2:
+        return float("nan")
+    span = len(col_totals)
+    cells, observed = np.unique(left * span + right, return_counts=True)
+    expected = row_totals[cells // span] * col_totals[cells % span]
+    chi2 = n * (float((observed.astype(np.float64) ** 2 / expected).sum()) - 1.0)
+    return float(np.sqrt(np.clip(chi2 / (n * (k - 1)), 0.0, 1.0)))
+
+
+def correlation_ratio(codes: np.ndarray, values: np.ndarray) -> float:
+    """
+    Корреляционное отношение (эта) числового признака по категориям:
+    ``sqrt(межгрупповая сумма квадратов / общая сумма квадратов)``.
+    """
+    n = len(values)
+    if n < 2:
+        return float("nan")
+    mean = values.mean()
+    total = float(((values - mean) ** 2).sum())
+    if total <= 0:
+        return float("nan")
+    counts = np.bincount(codes).astype(np.float64)
+    sums = np.bincount(codes, weights=values)
+    filled = counts > 0
+    group_means = sums[filled] / counts[filled]
+    between = float((counts[filled] * (group_means - mean) ** 2).sum())
+    return float(np.sqrt(np.clip(between / total, 0.0, 1.0)))
+
+
+def association_matrix(df: pd.DataFrame, categorical: Sequence[Any]) -> pd.DataFrame:
+    """
+    Смешанная матрица связи колонок ``df`` (попарно по общим непустым строкам):
+
+    - обе колонки из ``categorical`` - V Крамера;
+    - категориальная и числовая - корреляционное отношение (эта);
+    - обе числовые - корреляция Пирсона.
+
+    V и эта лежат в [0, 1] и не имеют знака, Пирсон - в [-1, 1].
+    """
+    columns = list(df.columns)
+    categorical_set = set(categorical)
+    is_categorical = [c in categorical_set for c in columns]
+    p = len(columns)
+    result = np.full((p, p), np.nan)
+
+    numeric_positions = [j for j in range(p) if not is_categorical[j]]
+    if numeric_positions:
+        pearson = _pearson_matrix(df.iloc[:, numeric_positions]).to_numpy()
+        result[np.ix_(numeric_positions, numeric_positions)] = pearson
+
+    arrays = []
+    for j, (_, s) in enumerate(df.items()):
+        if is_categorical[j]:
+            arrays.append(pd.factorize(s, use_na_sentinel=True)[0].astype(np.int64))
+        else:
+            arrays.append(s.to_numpy(dtype=np.float64, na_value=np.nan))
+    present = [a >= 0 if is_categorical[j] else ~np.isnan(a) for j, a in enumerate(arrays)]
+
+    for i in range(p):
+        if not is_categorical[i]:
+            continue
+        codes_i = arrays[i][present[i]]
+        if len(codes_i) and codes_i.max() > 0:
+            result[i, i] = 1.0
+        for j in range(p):
+            if j == i or (is_categorical[j] and j < i):
+                continue
+            both = present[i] & present[j]
+            codes = arrays[i][both]
+            if is_categorical[j]:
+                value = cramers_v(codes, arrays[j][both])
+            else:
+                value = correlation_ratio(codes, arrays[j][both])
+            result[i, j] = result[j, i] = value
+    return pd.DataFrame(result, index=columns, columns=columns)
@@ -0,0 +1,264 @@
+"""
+Пакетные отчёты: много датасетов за один запуск CLI.
+
+- входы - файлы, каталоги (все таблицы внутри, рекурсивно), glob-шаблоны
+  и файлы-списки (путь или шаблон на строку), см. ``expand_inputs``;
+- каждый датасет обрабатывается в своём дочернем процессе
+  (``run_isolated``). На Linux процесс создаётся через fork, поэтому
+  pandas, matplotlib и typer, уже импортированные родителем, повторно не
+  грузятся. Падение одного датасета (исключение, segfault, OOM) не задевает
+  остальные, а процесс, не уложившийся в таймаут, останавливается;
+- результат каждого датасета сразу дописывается строкой в ``index.csv``
+  (``BatchIndex``), поэтому прерванный запуск можно продолжить: успешно
+  обработанные и с тех пор не изменившиеся файлы пропускаются.
+"""
+
+from __future__ import annotations
+
+import csv
+import glob
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .loaders import _SUFFIXES
+
+# Расширения, по которым в каталогах ищутся таблицы (.txt - слишком общее).
+TABLE_SUFFIXES = tuple(suffix for suffix in _SUFFIXES if suffix != ".txt")
+
+INDEX_NAME = "index.csv"
+INDEX_COLUMNS = [
+    "path",
+    "report_dir",
+    "status",
+    "seconds",
+    "error",
+    "size",
+    "mtime_ns",
+    "n_rows",
+    "n_cols",
+    "quality_score",
+    "max_missing_share",
+    "too_few_rows",
+    "too_many_columns",
+    "too_many_missing",
+]
+
+
+def _has_magic(pattern: str) -> bool:
+    return any(ch in pattern for ch in "*?[")
+
+
+def expand_inputs(patterns: Sequence[str], list_files: Sequence[str] = ()) -> List[Path]:
+    """
+    Список датасетов по путям, каталогам и glob-шаблонам (``**`` - рекурсивно).
+    В файлах-списках пустые строки и строки с ``#`` пропускаются, относительные
+    пути считаются от каталога списка. Явно указанный, но отсутствующий файл
+    остаётся в списке - его ошибка попадёт в индекс. Повторы убираются.
+    """
+    entries = list(patterns)
+    for list_file in list_files:
+        base = Path(list_file).parent
+        for line in Path(list_file).read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entries.append(line if Path(line).is_absolute() else str(base / line))
+
+    paths: List[Path] = []
+    seen = set()
+    for entry in entries:
+        if _has_magic(entry):
+            matches = [Path(p) for p in sorted(glob.glob(entry, recursive=True))]
+        else:
+            matches = [Path(entry)]
+        for match in matches:
+            if match.is_dir():
+                found = sorted(
+                    p for p in match.rglob("*") if p.is_file() and p.suffix.lower() in TABLE_SUFFIXES
+                )
+            else:
+                found = [match]
+            for path in found:
+                key = os.path.abspath(path)
+                if key not in seen:
+                    seen.add(key)
+                    paths.append(path)
+    return paths
+
+
+def report_dirs(paths: Sequence[Path]) -> List[Path]:
+    """
+    Каталог отчёта для каждого датасета относительно общего каталога отчётов:
+    путь файла от общего корня входов без расширения (``part=1/a.csv`` ->
+    ``part=1/a``). Если имена совпали без расширения, к второму добавляется
+    расширение (``a_parquet``).
+    """
+    if not paths:
+        return []
+    absolute = [Path(os.path.abspath(p)) for p in paths]
+    root = Path(os.path.commonpath([str(p.parent) for p in absolute]))
+    dirs: List[Path] = []
+    taken = set()
+    for path in absolute:
+        rel = path.relative_to(root)
+        target = rel.parent / rel.stem
+        if target in taken:
+            target = rel.parent / f"{rel.stem}_{rel.suffix.lstrip('.')}"
+        taken.add(target)
+        dirs.append(target)
+    return dirs
+
+
+# ---------- изолированные процессы ----------
+
+
+def _context() -> Any:
+    # fork: дочерний процесс получает уже импортированные модули родителя.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _run_job(sender: Any, func: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+    started = time.perf_counter()
+    try:
+        result: Dict[str, Any] = {"status": "ok", "value": func(*args)}
+    except BaseException as exc:  # noqa: BLE001 - в том числе SystemExit от typer
+        result = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+    result["seconds"] = time.perf_counter() - started
+    sender.send(result)
+    sender.close()
+
+
+def run_isolated(
+    func: Callable[..., Any],
+    jobs: Sequence[Tuple[Any, ...]],
+    workers: int = 1,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Выполнить ``func(*job)`` для каждого задания в отдельном процессе,
+    не больше ``workers`` процессов одновременно. Отдаёт пары
+    (номер задания, результат) по мере завершения. Результат - словарь
+    со ``status``: ``ok`` (значение в ``value``), ``error`` (текст в
+    ``error``; в том числе процесс умер, не вернув результат) или
+    ``timeout`` (процесс работал дольше ``timeout`` секунд и остановлен);
+    ``seconds`` - время работы.
+    """
+    ctx = _context()
+    pending: Deque[Tuple[int, Tuple[Any, ...]]] = deque(enumerate(jobs))
+    # номер задания -> (процесс, конец канала для результата, время запуска)
+    running: Dict[int, Tuple[Any, Any, float]] = {}
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                index, args = pending.popleft()
+                receiver, sender = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=_run_job, args=(sender, func, args))
+                process.start()
+                sender.close()
+                running[index] = (process, receiver, time.monotonic())
+
+            wait_for = None
+            if timeout is not None:
+                deadline = min(started for _, _, started in running.values()) + timeout
+                wait_for = max(0.0, deadline - time.monotonic())
+            # Канал готов, когда пришёл результат или процесс завершился.
+            ready = wait([receiver for _, receiver, _ in running.values()], timeout=wait_for)
+
+            now = time.monotonic()
+            for index in list(running):
+                process, receiver, started = running[index]
+                if receiver in ready:
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        process.join()
+                        result = {
+                            "status": "error",
+                            "error": f"процесс завершился с кодом {process.exitcode}",
+                            "seconds": now - started,
+                        }
+                elif timeout is not None and now - started >= timeout:
+                    process.kill()
+                    result = {
+                        "status": "timeout",
+                        "error": f"не уложился в {timeout:g} с",
+                        "seconds": now - started,
+                    }
+                else:
+                    continue
+                process.join()
+                receiver.close()
+                del running[index]
+                yield index, result
+    finally:
+        for process, receiver, _ in running.values():
+            process.kill()
+            process.join()
+            receiver.close()
+
+
+# ---------- индекс ----------
+
+
+class BatchIndex:
+    """
+    ``index.csv`` пакетного запуска: строка на датасет (``INDEX_COLUMNS``).
+    Во время запуска строки дописываются в конец файла по мере готовности,
+    при чтении последняя строка пути перекрывает прежние; ``rewrite``
+    оставляет по строке на датасет в порядке входов.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.rows: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchIndex":
+        index = cls(path)
+        if index.path.is_file():
+            with index.path.open(newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    index.rows[row["path"]] = row
+        return index
+
+    def is_done(self, path: Path) -> bool:
+        """
+        Датасет обработан успешно, и файл с тех пор не менялся (размер и mtime).
+        """
+        row = self.rows.get(str(path))
+        if row is None or row.get("status") != "ok":
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return row.get("size") == str(stat.st_size) and row.get("mtime_ns") == str(stat.st_mtime_ns)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        row = {name: "" if row.get(name) is None else str(row[name]) for name in INDEX_COLUMNS}
+        new_file = not self.path.is_file()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_COLUMNS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(row)
+        self.rows[row["path"]] = row
+
+    def rewrite(self, order: Sequence[str]) -> Path:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_COLUMNS)
+            writer.writeheader()
+            for path in order:
+                if path in self.rows:
+                    writer.writerow(self.rows[path])
+        os.replace(tmp_path, self.path)
+        return self.path
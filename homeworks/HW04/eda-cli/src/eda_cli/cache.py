@@ -0,0 +1,211 @@
+"""
+Кэш результатов HTTP-сервиса по содержимому загруженного файла.
+
+Ключ - sha256 байтов загрузки (считается потоково, файл целиком в память
+не читается) плюс параметры запроса, влияющие на результат. Значения
+хранятся в памяти с вытеснением LRU по бюджету в байтах (размер оценивается
+по длине pickle) и, опционально, в каталоге на диске - этот уровень
+переживает перезапуск сервиса.
+
+Каталог дискового уровня должен быть доступен только сервису: значения
+читаются оттуда через pickle.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+# Размер блока при потоковом хэшировании загрузки.
+_HASH_BLOCK_BYTES = 1 << 20
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """
+    sha256 содержимого файлового объекта. Позиция возвращается в начало,
+    чтобы файл можно было прочитать ещё раз.
+    """
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while True:
+        block = stream.read(_HASH_BLOCK_BYTES)
+        if not block:
+            break
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def make_key(content_hash: str, kind: str, **params: Any) -> str:
+    """
+    Ключ кэша: хэш содержимого + тип результата + параметры запроса.
+    """
+    payload = json.dumps(
+        {"content": content_hash, "kind": kind, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU-кэш с бюджетом в байтах и необязательным дисковым уровнем.
+
+    - ``max_bytes`` - бюджет памяти; 0 отключает кэш в памяти;
+    - ``disk_dir`` - каталог дискового уровня (None - без диска);
+    - ``max_disk_bytes`` - бюджет диска, при превышении удаляются
+      самые давно использованные файлы.
+
+    Значение больше бюджета целиком в память не кладётся (но может
+    попасть на диск). Методы потокобезопасны.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or self.disk_dir is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Значение по ключу или None. Найденное на диске поднимается в память.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        data = self._read_disk(key)
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value = pickle.loads(data)
+        with self._lock:
+            self.disk_hits += 1
+            self._put_memory(key, value, len(data))
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._put_memory(key, value, len(data))
+        self._write_disk(key, data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_dir": str(self.disk_dir) if self.disk_dir is not None else None,
+            }
+
+    # ---------- память ----------
+
+    def _put_memory(self, key: str, value: Any, size: int) -> None:
+        # Вызывается под self._lock.
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    # ---------- диск ----------
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.pkl"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        # mtime служит отметкой последнего использования для вытеснения.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".tmp{threading.get_ident()}")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        if self.disk_dir is None or self.max_disk_bytes is None:
+            return
+        files = []
+        for path in self.disk_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
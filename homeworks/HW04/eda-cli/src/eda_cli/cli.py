@@ -1,48 +1,325 @@
 from __future__ import annotations
 
+import contextlib
+import io
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
-import pandas as pd
 import typer
 
-from .core import (
-    DatasetSummary,
-    compute_quality_flags,
-    correlation_matrix,
-    flatten_summary_for_print,
-    missing_table,
-    summarize_dataset,
-    top_categories,
+from . import __version__
+from .defaults import (
+    CORRELATION_METHODS,
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_MISSING_BINS,
+    DEFAULT_SAMPLE_ROWS,
+    STREAMING_THRESHOLD_BYTES,
 )
-from .viz import (
-    plot_correlation_heatmap,
-    plot_missing_matrix,
-    plot_histograms_per_column,
-    save_top_categories_tables,
+
+# pandas, numpy, matplotlib и модули расчёта импортируются внутри команд и
+# помощников: `eda-cli --help` и простые команды не платят за их загрузку.
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .core import DatasetSummary
+    from .dtypes import MemoryReport
+    from .manifest import ReportManifest
+    from .streaming import StreamingProfile
+
+app = typer.Typer(help="Мини-CLI для EDA CSV-, Parquet- и Feather-файлов")
+
+FORMAT_HELP = "Формат файла: auto (по расширению/сигнатуре), csv, parquet или feather."
+COLUMNS_HELP = "Читать только эти колонки (через запятую)."
+OPTIMIZE_DTYPES_HELP = (
+    "Подобрать компактные типы колонок при загрузке (category/string, int8-int32) "
+    "и показать экономию памяти. Не действует в потоковом режиме."
+)
+ALLOW_FLOAT32_HELP = "Вместе с --optimize-dtypes: хранить в float32 колонки, где это без потерь."
+# Подпись шкалы heatmap для каждого метода корреляции.
+CORR_LABELS = {
+    "pearson": "Pearson r",
+    "spearman": "Spearman rho",
+    "kendall": "Kendall tau",
+    "association": "Cramer's V / eta / r",
+}
+# Стадии отчёта для manifest.json и опции, от которых зависят их файлы
+# (кроме общих: входной файл, формат, колонки, размер чанка). Стадия
+# "overview" файлов не пишет - хранит цифры для report.md; сам report.md
+# зависит от всех опций.
+REPORT_STAGES = {
+    "tables": ("approx_error", "optimize_dtypes", "allow_float32", "summary_format"),
+    "top_categories": ("top_k_categories", "approx_error"),
+    "correlation": ("corr_method", "corr_sample_rows", "max_corr_columns", "top_corr_pairs"),
+    "histograms": ("max_hist_columns", "optimize_dtypes", "allow_float32"),
+    "missing_matrix": ("missing_bins",),
+    "overview": ("approx_error", "optimize_dtypes", "allow_float32", "min_missing_share", "quality_rules"),
+}
+PROFILE_HELP = (
+    "Профилировать запуск: время и аллокации по функциям и колонкам в "
+    "<profile-out>.json (Chrome Trace) и <profile-out>.collapsed (flamegraph)."
 )
+PROFILE_OUT_HELP = "Префикс файлов профиля (по умолчанию {default})."
+CORR_METHOD_HELP = (
+    "Метод корреляции: pearson, spearman, kendall или association "
+    "(V Крамера и корреляционное отношение для категориальных колонок)."
+)
+
+
+def _parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    return names or None
 
-app = typer.Typer(help="Мини-CLI для EDA CSV-файлов")
 
+@contextlib.contextmanager
+def _profiling(enabled: bool, out: Optional[str], default: Path, echo: bool = True) -> Iterator[None]:
+    """
+    Выполнить тело под ``tracing.Tracer`` и записать профиль в ``out``
+    (или ``default``), даже если команда упала. Без ``enabled`` - ничего.
+    """
+    if not enabled:
+        yield
+        return
 
-def _load_csv(
+    from .tracing import Tracer
+
+    tracer = Tracer()
+    try:
+        with tracer.activate():
+            yield
+    finally:
+        json_path, collapsed_path = tracer.write(Path(out) if out else default)
+        if echo:
+            typer.echo(f"Профиль: {json_path}, {collapsed_path}", err=True)
+
+
+def _load_table(
     path: Path,
     sep: str = ",",
     encoding: str = "utf-8",
+    fmt: str = "auto",
+    columns: Optional[List[str]] = None,
+    nrows: Optional[int] = None,
 ) -> pd.DataFrame:
+    from .loaders import load_table
+
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        return load_table(
+            path, fmt=fmt, sep=sep, encoding=encoding, columns=columns, nrows=nrows
+        )
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+
+
+def _load_table_compact(
+    path: Path,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    fmt: str = "auto",
+    columns: Optional[List[str]] = None,
+    allow_float32: bool = False,
+) -> Tuple[pd.DataFrame, MemoryReport]:
+    from .loaders import load_table_compact
+
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        return load_table_compact(
+            path, fmt=fmt, sep=sep, encoding=encoding, columns=columns,
+            allow_float32=allow_float32,
+        )
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+
+
+def _resolve_chunksize(path: Path, chunksize: Optional[int]) -> Optional[int]:
+    """
+    Размер чанка для потокового режима или None, если файл читается целиком.
+    Без явного --chunksize большие файлы читаются потоково автоматически;
+    --chunksize 0 отключает потоковый режим.
+    """
+    if chunksize is not None:
+        return chunksize if chunksize > 0 else None
+    if path.exists() and path.stat().st_size > STREAMING_THRESHOLD_BYTES:
+        return DEFAULT_CHUNKSIZE
+    return None
+
+
+def _profile_table(
+    path: Path,
+    sep: str,
+    encoding: str,
+    chunksize: int,
+    approx_error: Optional[float] = None,
+    top_k: int = 5,
+    fmt: str = "auto",
+    columns: Optional[List[str]] = None,
+    sample_rows: int = 0,
+    missing_bins: int = DEFAULT_MISSING_BINS,
+) -> StreamingProfile:
+    from .loaders import iter_chunks, read_columns
+    from .streaming import profile_chunks
+
     if not path.exists():
         raise typer.BadParameter(f"Файл '{path}' не найден")
     try:
-        return pd.read_csv(path, sep=sep, encoding=encoding)
+        chunks = iter_chunks(
+            path, chunksize, fmt=fmt, sep=sep, encoding=encoding, columns=columns
+        )
+        header = columns if columns is not None else read_columns(path, fmt, sep, encoding)
+        return profile_chunks(
+            chunks, header, approx_error=approx_error, top_k=top_k,
+            sample_rows=sample_rows, missing_bins=missing_bins,
+        )
     except Exception as exc:  # noqa: BLE001
-        raise typer.BadParameter(f"Не удалось прочитать CSV: {exc}") from exc
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+
+
+def _correlation_tables(
+    df: pd.DataFrame,
+    profile: Optional[StreamingProfile],
+    max_columns: int,
+    k: int,
+    method: str = "pearson",
+    max_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Матрица корреляции (пустая, если колонок больше ``max_columns``)
+    и top-k пар по |r|. Для Пирсона обе таблицы считаются за один проход
+    по всем данным, для остальных методов - по выборке из ``max_rows`` строк.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from .association import rank_frame, sample_rows
+    from .core import correlation_matrix
+    from .correlation import matrix_top_pairs
+
+    if method != "pearson":
+        data = profile.sample_frame() if profile is not None else sample_rows(df, max_rows)
+        numeric = data.select_dtypes(include="number")
+        if method == "spearman" and not numeric.isna().to_numpy().any():
+            # Без пропусков Спирмен - Пирсон по рангам: тот же путь, что и
+            # для Пирсона. С пропусками ранги зависят от пары колонок.
+            return _pearson_tables(rank_frame(numeric), max_columns, k)
+        corr_df = correlation_matrix(data, method=method)
+        present = data[corr_df.columns].notna().to_numpy(dtype=np.float64)
+        pairs = matrix_top_pairs(corr_df, present.T @ present, k)
+        return (pd.DataFrame() if corr_df.shape[1] > max_columns else corr_df), pairs
+
+    if profile is not None:
+        too_wide = len(profile.correlation_columns()) > max_columns
+        corr_df = pd.DataFrame() if too_wide else profile.correlation_matrix()
+        return corr_df, profile.correlation_top_pairs(k)
+    return _pearson_tables(df.select_dtypes(include="number"), max_columns, k)
+
+
+def _pearson_tables(numeric_df: pd.DataFrame, max_columns: int, k: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    import pandas as pd
+
+    from .correlation import accumulate, top_pairs
+
+    if numeric_df.empty or numeric_df.shape[1] > max_columns:
+        # Полосами по колонкам: вся матрица p x p в памяти не нужна.
+        return pd.DataFrame(), top_pairs(numeric_df, k)
+    acc = accumulate(numeric_df)
+    names = list(numeric_df.columns)
+    return pd.DataFrame(acc.matrix(), index=names, columns=names), acc.top_pairs(names, k)
+
+
+def _overview_data(
+    summary: DatasetSummary,
+    missing_df: pd.DataFrame,
+    quality_flags: Dict[str, Any],
+    preview_rows: Optional[int],
+    memory_report: Optional[MemoryReport],
+) -> Dict[str, Any]:
+    """
+    Цифры для report.md в виде, пригодном для JSON манифеста.
+    """
+    return {
+        "n_rows": int(summary.n_rows),
+        "n_cols": int(summary.n_cols),
+        "preview_rows": preview_rows,
+        "memory": memory_report.format() if memory_report is not None else None,
+        "missing_share": (
+            {str(name): float(share) for name, share in missing_df["missing_share"].items()}
+            if not missing_df.empty
+            else {}
+        ),
+        "quality": {
+            "quality_score": float(quality_flags["quality_score"]),
+            "max_missing_share": float(quality_flags["max_missing_share"]),
+            "too_few_rows": bool(quality_flags["too_few_rows"]),
+            "too_many_columns": bool(quality_flags["too_many_columns"]),
+            "too_many_missing": bool(quality_flags["too_many_missing"]),
+        },
+    }
+
+
+def _print_metadata_overview(path: Path, fmt: str, columns: Optional[List[str]]) -> None:
+    from .loaders import count_rows, detect_format, parquet_metadata_stats
+
+    if not path.exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    if detect_format(path, fmt) != "parquet":
+        raise typer.BadParameter("--metadata-only поддерживается только для Parquet-файлов")
+    try:
+        stats = parquet_metadata_stats(path)
+        n_rows = count_rows(path, "parquet")
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать метаданные: {exc}") from exc
+    if columns is not None:
+        stats = stats.loc[columns]
+
+    typer.echo(f"Строк: {n_rows}")
+    typer.echo(f"Столбцов: {len(stats)}")
+    typer.echo("\nКолонки (по статистикам row group'ов, данные не читались):")
+    typer.echo(stats.to_string())
 
 
 @app.command()
 def overview(
-    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    path: str = typer.Argument(..., help="Путь к файлу (CSV, Parquet или Feather)."),
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    fmt: str = typer.Option("auto", "--format", help=FORMAT_HELP),
+    columns: Optional[str] = typer.Option(None, help=COLUMNS_HELP),
+    metadata_only: bool = typer.Option(
+        False,
+        help="Только для Parquet: пропуски, min и max по метаданным, без чтения данных.",
+    ),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        help="Читать CSV по чанкам заданного размера (0 - всегда целиком). "
+        "По умолчанию большие файлы читаются потоково автоматически.",
+    ),
+    approx_error: Optional[float] = typer.Option(
+        None,
+        min=1e-4,
+        max=0.5,
+        help="Приближённый режим: unique через HyperLogLog и top-k через Space-Saving "
+        "с указанной относительной ошибкой.",
+    ),
+    workers: int = typer.Option(
+        1,
+        min=1,
+        help="Сколько процессов использовать для поколоночных статистик "
+        "(в потоковом режиме не используется).",
+    ),
+    optimize_dtypes: bool = typer.Option(False, help=OPTIMIZE_DTYPES_HELP),
+    allow_float32: bool = typer.Option(False, help=ALLOW_FLOAT32_HELP),
+    sample_rows: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Приближённая оценка по выборке из стольких строк (Parquet - по row group'ам) "
+        "с 95%-ными интервалами для долей пропусков, средних и оценки качества.",
+    ),
+    profile: bool = typer.Option(False, "--profile", help=PROFILE_HELP),
+    profile_out: Optional[str] = typer.Option(None, help=PROFILE_OUT_HELP.format(default="eda-profile")),
 ) -> None:
     """
     Напечатать краткий обзор датасета:
@@ -50,43 +327,519 @@ def overview(
     - типы;
     - простая табличка по колонкам.
     """
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
-    summary: DatasetSummary = summarize_dataset(df)
+    if sample_rows is not None:
+        # Выборка читается и описывается целиком в памяти: опции загрузки
+        # и пула процессов к ней неприменимы - лучше отказать, чем молча их игнорировать.
+        conflicts = [
+            option
+            for option, used in (
+                ("--metadata-only", metadata_only),
+                ("--workers", workers != 1),
+                ("--optimize-dtypes", optimize_dtypes),
+                ("--allow-float32", allow_float32),
+            )
+            if used
+        ]
+        if conflicts:
+            raise typer.BadParameter(
+                f"--sample-rows несовместим с {', '.join(conflicts)}", param_hint="--sample-rows"
+            )
+    with _profiling(profile, profile_out, Path("eda-profile")):
+        if sample_rows is not None:
+            _sampled_overview(path, sep, encoding, fmt, columns, chunksize, sample_rows, approx_error)
+            return
+        _overview(
+            path, sep, encoding, fmt, columns, metadata_only, chunksize, approx_error,
+            workers, optimize_dtypes, allow_float32,
+        )
+
+
+def _sampled_overview(
+    path: str,
+    sep: str,
+    encoding: str,
+    fmt: str,
+    columns: Optional[str],
+    chunksize: Optional[int],
+    sample_rows: int,
+    approx_error: Optional[float] = None,
+) -> None:
+    from .core import flatten_summary_for_print
+    from .sampling import estimate_quality, sample_table
+
+    if not Path(path).exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    try:
+        sample = sample_table(
+            Path(path), sample_rows, fmt=fmt, sep=sep, encoding=encoding,
+            columns=_parse_columns(columns), chunksize=chunksize or DEFAULT_CHUNKSIZE,
+        )
+    except Exception as exc:  # noqa: BLE001
+        raise typer.BadParameter(f"Не удалось прочитать файл: {exc}") from exc
+    estimate = estimate_quality(sample, approx_error=approx_error)
+    flags = estimate.flags
+
+    typer.echo(f"Строк: {estimate.n_rows}")
+    typer.echo(f"Столбцов: {estimate.summary.n_cols}")
+    if estimate.approximate:
+        typer.echo(
+            f"ПРИБЛИЖЁННО: по выборке из {estimate.sample_rows} строк ({estimate.method}), "
+            f"интервалы {estimate.confidence:.0%}"
+        )
+    typer.echo(
+        f"Оценка качества: {flags['quality_score']:.3f} "
+        f"[{flags['quality_score_low']:.3f}; {flags['quality_score_high']:.3f}]"
+    )
+    typer.echo(
+        f"Доля дубликатов строк: {flags['duplicate_rows_share']:.2%} "
+        f"[{flags['duplicate_rows_share_low']:.2%}; {flags['duplicate_rows_share_high']:.2%}]"
+    )
+    typer.echo("\nКолонки (по выборке):")
+    typer.echo(flatten_summary_for_print(estimate.summary).to_string(index=False))
+    typer.echo("\nДоли пропусков:")
+    typer.echo(estimate.missing_df.to_string())
+    if not estimate.intervals.empty:
+        typer.echo("\nСредние и доли нулей числовых колонок:")
+        typer.echo(estimate.intervals.to_string())
+
+
+def _overview(
+    path: str,
+    sep: str,
+    encoding: str,
+    fmt: str,
+    columns: Optional[str],
+    metadata_only: bool,
+    chunksize: Optional[int],
+    approx_error: Optional[float],
+    workers: int,
+    optimize_dtypes: bool,
+    allow_float32: bool,
+) -> None:
+    column_list = _parse_columns(columns)
+    if metadata_only:
+        _print_metadata_overview(Path(path), fmt, column_list)
+        return
+
+    from .core import flatten_summary_for_print
+    from .parallel import ColumnPool
+
+    chunksize = _resolve_chunksize(Path(path), chunksize)
+    if chunksize is not None:
+        profile = _profile_table(
+            Path(path), sep, encoding, chunksize, approx_error, fmt=fmt, columns=column_list
+        )
+        summary: DatasetSummary = profile.summary()
+    elif optimize_dtypes:
+        df, memory_report = _load_table_compact(
+            Path(path), sep, encoding, fmt, column_list, allow_float32
+        )
+        with ColumnPool(workers) as pool:
+            summary = pool.summarize_dataset(df, approx_error=approx_error)
+    else:
+        df = _load_table(Path(path), sep=sep, encoding=encoding, fmt=fmt, columns=column_list)
+        with ColumnPool(workers) as pool:
+            summary = pool.summarize_dataset(df, approx_error=approx_error)
     summary_df = flatten_summary_for_print(summary)
 
     typer.echo(f"Строк: {summary.n_rows}")
     typer.echo(f"Столбцов: {summary.n_cols}")
     typer.echo("\nКолонки:")
     typer.echo(summary_df.to_string(index=False))
+    if chunksize is None and optimize_dtypes:
+        typer.echo(f"\n{memory_report.format()}")
 
 
 @app.command()
 def head(
-    path: str = typer.Argument(..., help = "Путь к csv-файлу"),
+    path: str = typer.Argument(..., help = "Путь к файлу (CSV, Parquet или Feather)"),
     sep: str = typer.Option(',', help = "Разделитель в csv-файле"),
     encoding: str = typer.Option('utf-8', help = "Кодировка файла"),
-    lines: int = typer.Option(5, "--lines", "-n", help = "Количество строк, которые надо показать")
+    lines: int = typer.Option(5, "--lines", "-n", help = "Количество строк, которые надо показать"),
+    fmt: str = typer.Option("auto", "--format", help = FORMAT_HELP),
+    columns: Optional[str] = typer.Option(None, help = COLUMNS_HELP),
+    profile: bool = typer.Option(False, "--profile", help=PROFILE_HELP),
+    profile_out: Optional[str] = typer.Option(None, help=PROFILE_OUT_HELP.format(default="eda-profile")),
 ) -> None:
     """
         Показать первые N строк датасета
     """
-    df = _load_csv(Path(path), sep = sep, encoding = encoding)
-    preview_df = df.head(lines)
+    # Читаем только первые строки, а не весь файл.
+    with _profiling(profile, profile_out, Path("eda-profile")):
+        preview_df = _load_table(
+            Path(path), sep = sep, encoding = encoding, fmt = fmt,
+            columns = _parse_columns(columns), nrows = lines,
+        )
     typer.echo(f"=====Отчет работы команды HEAD===== \n")
     typer.echo(f"Первые {lines} строк датасета {path}:")
     typer.echo(preview_df.to_string(index=True))
 
 
+def _build_report(
+    path: str,
+    out_dir: str,
+    *,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    fmt: str = "auto",
+    columns: Optional[str] = None,
+    max_hist_columns: int = 6,
+    top_k_categories: int = 5,
+    title: str = "EDA-отчет",
+    min_missing_share: float = 0.3,
+    chunksize: Optional[int] = None,
+    approx_error: Optional[float] = None,
+    workers: int = 1,
+    optimize_dtypes: bool = False,
+    allow_float32: bool = False,
+    top_corr_pairs: int = 20,
+    max_corr_columns: int = 200,
+    corr_method: str = "pearson",
+    corr_sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    missing_bins: int = DEFAULT_MISSING_BINS,
+    summary_format: str = "csv",
+    force: bool = False,
+) -> ReportManifest:
+    """
+    Тело команды ``report`` (значения по умолчанию - те же). Вынесено, чтобы
+    ``batch-report`` строил отчёты в уже запущенном процессе. Возвращает
+    манифест каталога отчёта.
+    """
+    import pandas as pd
+
+    from .core import missing_matrix, missing_table
+    from .export import SUMMARY_FORMATS, write_summary
+    from .manifest import ReportManifest, file_fingerprint
+    from .parallel import ColumnPool
+    from .rules import quality_rules
+    from .viz import (
+        correlation_heatmap_figure,
+        histogram_figures,
+        missing_matrix_figure,
+        save_top_categories_tables,
+    )
+
+    if corr_method not in CORRELATION_METHODS:
+        raise typer.BadParameter(
+            f"Неизвестный метод корреляции '{corr_method}', ожидается один из: {', '.join(CORRELATION_METHODS)}"
+        )
+    if summary_format not in SUMMARY_FORMATS:
+        raise typer.BadParameter(
+            f"Неизвестный формат сводки '{summary_format}', ожидается один из: {', '.join(SUMMARY_FORMATS)}"
+        )
+    if not Path(path).exists():
+        raise typer.BadParameter(f"Файл '{path}' не найден")
+    out_root = Path(out_dir)
+    summary_name = f"summary.{summary_format}"
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    chunksize = _resolve_chunksize(Path(path), chunksize)
+    column_list = _parse_columns(columns)
+    memory_report: Optional[MemoryReport] = None
+    profile: Optional[StreamingProfile] = None
+
+    # 0. Что уже построено: стадии с прежним ключом и целыми файлами не трогаем
+    settings: Dict[str, Any] = {
+        "max_hist_columns": max_hist_columns,
+        "top_k_categories": top_k_categories,
+        "min_missing_share": min_missing_share,
+        "approx_error": approx_error,
+        "optimize_dtypes": optimize_dtypes,
+        "allow_float32": allow_float32,
+        "top_corr_pairs": top_corr_pairs,
+        "max_corr_columns": max_corr_columns,
+        "corr_method": corr_method,
+        "corr_sample_rows": corr_sample_rows,
+        "missing_bins": missing_bins,
+        "summary_format": summary_format,
+        # Отпечаток правил оценки качества: флаги в report.md зависят от них.
+        "quality_rules": quality_rules("dataset").digest,
+    }
+    source = {
+        "version": __version__,
+        "format": fmt,
+        "sep": sep,
+        "encoding": encoding,
+        "columns": column_list,
+        "chunksize": chunksize,
+    }
+    manifest = ReportManifest.load(out_root)
+    manifest.input = file_fingerprint(Path(path), None if force else manifest.input)
+    keys = {
+        stage: manifest.stage_key(stage, **source, **{name: settings[name] for name in names})
+        for stage, names in REPORT_STAGES.items()
+    }
+    keys["report"] = manifest.stage_key("report", **source, **settings, title=title)
+    stale = {stage for stage, key in keys.items() if force or not manifest.is_fresh(stage, key)}
+
+    # Файлы пересобранных стадий; записываются в манифест после отрисовки.
+    built: Dict[str, List[Path]] = {}
+    overview_data: Optional[Dict[str, Any]] = None
+    if stale - {"report"}:
+        if chunksize is not None:
+            # Потоковый режим: статистики, корреляция и матрица пропусков по
+            # всему файлу из аккумуляторов, гистограммы - по первому чанку.
+            profile = _profile_table(
+                Path(path), sep, encoding, chunksize, approx_error, top_k_categories,
+                fmt=fmt, columns=column_list,
+                sample_rows=corr_sample_rows if corr_method != "pearson" else 0,
+                missing_bins=missing_bins,
+            )
+            missing_blocks = profile.missing_matrix
+            df = profile.preview if profile.preview is not None else pd.DataFrame(columns=profile.columns)
+            summary = profile.summary()
+            missing_df = profile.missing_table()
+            top_cats = profile.top_categories(top_k = top_k_categories)
+            quality_flags = profile.quality_flags(summary, missing_df, min_missing_share=min_missing_share)
+        else:
+            if optimize_dtypes:
+                df, memory_report = _load_table_compact(
+                    Path(path), sep, encoding, fmt, column_list, allow_float32
+                )
+            else:
+                df = _load_table(Path(path), sep=sep, encoding=encoding, fmt=fmt, columns=column_list)
+            missing_df = missing_table(df)
+            missing_blocks = missing_matrix(df, missing_bins) if "missing_matrix" in stale else None
+            # Считаем только то, что нужно пересобираемым стадиям.
+            with ColumnPool(workers) as pool:
+                if stale & {"tables", "overview"}:
+                    summary = pool.summarize_dataset(df, approx_error=approx_error)
+                if "top_categories" in stale:
+                    top_cats = pool.top_categories(df, top_k = top_k_categories, approx_error=approx_error)
+                if "overview" in stale:
+                    quality_flags = pool.compute_quality_flags(
+                        df, summary, missing_df, min_missing_share=min_missing_share
+                    )
+
+        # 1. Табличные артефакты
+        if "tables" in stale:
+            built["tables"] = [out_root / summary_name]
+            write_summary(summary, out_root / summary_name, summary_format)
+            if not missing_df.empty:
+                missing_df.to_csv(out_root / "missing.csv", index=True)
+                built["tables"].append(out_root / "missing.csv")
+        if "top_categories" in stale:
+            built["top_categories"] = save_top_categories_tables(top_cats, out_root / "top_categories")
+
+        # 2. Корреляция и описания картинок: картинкам нужны только счётчики
+        # гистограмм, доли пропусков по блокам строк и матрица корреляции -
+        # готовим их сразу, рисуем в конце.
+        figures: List[Any] = []
+        if "correlation" in stale:
+            corr_df, corr_pairs = _correlation_tables(
+                df, profile, max_corr_columns, top_corr_pairs, corr_method, corr_sample_rows
+            )
+            built["correlation"] = []
+            if not corr_df.empty:
+                corr_df.to_csv(out_root / "correlation.csv", index=True)
+                built["correlation"].append(out_root / "correlation.csv")
+            if not corr_pairs.empty:
+                corr_pairs.to_csv(out_root / "correlation_top_pairs.csv", index=False)
+                built["correlation"].append(out_root / "correlation_top_pairs.csv")
+            if not corr_df.empty or corr_pairs.empty:
+                heatmap = correlation_heatmap_figure(
+                    corr_df, out_root / "correlation_heatmap.png", label=CORR_LABELS[corr_method]
+                )
+                figures.append(heatmap)
+                built["correlation"].append(heatmap.out_path)
+        if "histograms" in stale:
+            histograms = histogram_figures(df, out_root, max_columns=max_hist_columns)
+            figures.extend(histograms)
+            built["histograms"] = [figure.out_path for figure in histograms]
+        if "missing_matrix" in stale:
+            figures.append(missing_matrix_figure(missing_blocks, out_root / "missing_matrix.png"))
+            built["missing_matrix"] = [out_root / "missing_matrix.png"]
+
+        # 3. Картинки (при --workers > 1 - параллельно в пуле процессов)
+        with ColumnPool(workers) as pool:
+            pool.render_figures(figures)
+
+        if "overview" in stale:
+            overview_data = _overview_data(
+                summary, missing_df, quality_flags,
+                preview_rows=len(df) if chunksize is not None else None,
+                memory_report=memory_report,
+            )
+            built["overview"] = []
+        for stage, paths in built.items():
+            manifest.record(
+                stage, keys[stage], paths, data=overview_data if stage == "overview" else None
+            )
+
+    # 4. Markdown-отчёт: цифры - из манифеста, чтобы при смене одного
+    # заголовка не читать данные заново
+    md_path = out_root / "report.md"
+    if "report" in stale:
+        overview = manifest.data("overview")
+        flags = overview["quality"]
+        missing_shares: Dict[str, float] = overview["missing_share"]
+        # Фильтруем колонки с долей пропусков выше порога
+        problematic_missing_cols = {
+            name: share for name, share in missing_shares.items() if share > min_missing_share
+        }
+        corr_files = manifest.artifacts("correlation")
+        with md_path.open("w", encoding="utf-8") as f:
+            f.write(f"# {title}\n")
+            f.write(f"Исходный файл: `{Path(path).name}`\n\n")
+            f.write(f"Строк: **{overview['n_rows']}**, столбцов: **{overview['n_cols']}**\n\n")
+            if approx_error is not None:
+                f.write(
+                    f"Приближённый режим: `unique` и top-k категорий оценены скетчами "
+                    f"с относительной ошибкой до **{approx_error:.2%}** "
+                    f"(см. столбцы `unique_error` и `count_error`).\n\n"
+                )
+            if chunksize is not None:
+                f.write(
+                    f"Файл обработан потоково (чанки по {chunksize} строк); гистограммы "
+                    f"построены по первым **{overview['preview_rows']}** строкам.\n\n"
+                )
+            if overview["memory"] is not None:
+                f.write(f"{overview['memory']} (компактные типы колонок).\n\n")
+
+            f.write(f"##Настройка анализа:")
+            f.write(f"- Макс. кол-во гистограмм: **{max_hist_columns}**\n")
+            f.write(f"- Top-k категорий: **{top_k_categories}**\n")
+            f.write(f"- Порог проблемных пропусков: **{min_missing_share:.0%}**\n\n")
+
+            f.write("## Качество данных (эвристики)\n\n")
+            f.write(f"- Оценка качества: **{flags['quality_score']:.2f}**\n")
+            f.write(f"- Макс. доля пропусков по колонке: **{flags['max_missing_share']:.2%}**\n")
+            f.write(f"- Слишком мало строк: **{flags['too_few_rows']}**\n")
+            f.write(f"- Слишком много колонок: **{flags['too_many_columns']}**\n")
+            f.write(f"- Слишком много пропусков: **{flags['too_many_missing']}**\n\n")
+
+            if problematic_missing_cols:
+                f.write(f"- Колонок с пропусками > {min_missing_share:.0%}: **{len(problematic_missing_cols)}**\n")
+                f.write("\n")
+
+                f.write("## Колонки\n\n")
+                f.write(f"См. файл `{summary_name}`.\n\n")
+
+                f.write("## Пропуски\n\n")
+                if not missing_shares:
+                    f.write("Пропусков нет или датасет пуст.\n\n")
+                else:
+                    f.write("См. файлы `missing.csv` и `missing_matrix.png`.\n\n")
+
+                    if problematic_missing_cols:
+                        f.write(f"### Колонки с долей пропусков > {min_missing_share:.0%}\n\n")
+                        f.write("| Колонка | Доля пропусков |\n")
+                        f.write("|---------|----------------|\n")
+                        for col_name, missing_share in problematic_missing_cols.items():
+                            f.write(f"| `{col_name}` | {missing_share:.2%} |\n")
+                        f.write("\n")
+
+                f.write("## Корреляция числовых признаков\n\n")
+                f.write(f"Метод: **{corr_method}**")
+                if corr_method != "pearson" and overview["n_rows"] > corr_sample_rows:
+                    f.write(f" (по выборке из {corr_sample_rows} строк)")
+                f.write("\n\n")
+                if "correlation.csv" not in corr_files and "correlation_top_pairs.csv" not in corr_files:
+                    f.write("Недостаточно числовых колонок для корреляции.\n\n")
+                elif "correlation.csv" not in corr_files:
+                    f.write(
+                        f"Числовых колонок больше {max_corr_columns}: полная матрица не строилась, "
+                        f"см. `correlation_top_pairs.csv`.\n\n"
+                    )
+                else:
+                    f.write("См. `correlation.csv`, `correlation_top_pairs.csv` и `correlation_heatmap.png`.\n\n")
+
+                f.write("## Категориальные признаки\n\n")
+                if not manifest.artifacts("top_categories"):
+                    f.write("Категориальные/строковые признаки не найдены.\n\n")
+                else:
+                    f.write(f"См. файлы в папке `top_categories/` (топ-{top_k_categories} значений).\n\n")
+
+                f.write("## Гистограммы числовых колонок\n\n")
+                f.write(f"Сгенерировано гистограмм (не более {max_hist_columns}): см. файлы `hist_*.png`.\n\n")
+        manifest.record("report", keys["report"], [md_path])
+    manifest.save()
+
+    # 5. Выводим информацию в консоль
+    typer.echo(f"Отчёт сгенерирован в каталоге: {out_root}")
+    typer.echo(f"- Основной markdown: {md_path}")
+    typer.echo(
+        f"- Табличные файлы: {summary_name}, missing.csv, correlation.csv, "
+        "correlation_top_pairs.csv, top_categories/*.csv"
+    )
+    typer.echo("- Графики: hist_*.png, missing_matrix.png, correlation_heatmap.png")
+    rebuilt = [stage for stage in keys if stage in stale]
+    fresh = [stage for stage in keys if stage not in stale]
+    typer.echo(f"- Пересобрано: {', '.join(rebuilt) or 'ничего'}")
+    if fresh:
+        typer.echo(f"- Без изменений (см. {manifest.path.name}): {', '.join(fresh)}")
+
+    typer.echo(f"\nИспользованные настройки:")
+    typer.echo(f"- Top-k категорий: {top_k_categories}")
+    typer.echo(f"- Порог проблемных пропусков: {min_missing_share:.0%}")
+    typer.echo(f"- Заголовок отчёта: '{title}'")
+    if memory_report is not None:
+        typer.echo(f"- {memory_report.format()}")
+
+    return manifest
+
+
 @app.command()
 def report(
-    path: str = typer.Argument(..., help="Путь к CSV-файлу."),
+    path: str = typer.Argument(..., help="Путь к файлу (CSV, Parquet или Feather)."),
     out_dir: str = typer.Option("reports", help="Каталог для отчёта."),
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    fmt: str = typer.Option("auto", "--format", help=FORMAT_HELP),
+    columns: Optional[str] = typer.Option(None, help=COLUMNS_HELP),
     max_hist_columns: int = typer.Option(6, help="Максимум числовых колонок для гистограмм."),
     top_k_categories: int = typer.Option(5, help="Сколько top-значений выводить для категориальных признаков"),
     title: str = typer.Option("EDA-отчет", help = "Заголовок отчета MarkDown"),
     min_missing_share: float = typer.Option(0.3, help = "Порог для пропусков для выделения проблемных колонок"),
+    chunksize: Optional[int] = typer.Option(
+        None,
+        help="Читать CSV по чанкам заданного размера (0 - всегда целиком). "
+        "По умолчанию большие файлы читаются потоково автоматически.",
+    ),
+    approx_error: Optional[float] = typer.Option(
+        None,
+        min=1e-4,
+        max=0.5,
+        help="Приближённый режим: unique через HyperLogLog и top-k через Space-Saving "
+        "с указанной относительной ошибкой.",
+    ),
+    workers: int = typer.Option(
+        1,
+        min=1,
+        help="Сколько процессов использовать для поколоночных статистик "
+        "и отрисовки картинок (в потоковом режиме - только для картинок).",
+    ),
+    optimize_dtypes: bool = typer.Option(False, help=OPTIMIZE_DTYPES_HELP),
+    allow_float32: bool = typer.Option(False, help=ALLOW_FLOAT32_HELP),
+    top_corr_pairs: int = typer.Option(20, min=0, help="Сколько пар с наибольшим |r| сохранить."),
+    max_corr_columns: int = typer.Option(
+        200,
+        min=2,
+        help="При большем числе числовых колонок полная матрица корреляции "
+        "не строится, сохраняются только top-пары.",
+    ),
+    corr_method: str = typer.Option("pearson", help=CORR_METHOD_HELP),
+    corr_sample_rows: int = typer.Option(
+        DEFAULT_SAMPLE_ROWS,
+        min=2,
+        help="Для методов, кроме pearson: сколько строк выборки использовать (ограничивает память).",
+    ),
+    missing_bins: int = typer.Option(
+        DEFAULT_MISSING_BINS,
+        min=1,
+        help="Разрешение матрицы пропусков: на сколько блоков строк делить таблицу.",
+    ),
+    summary_format: str = typer.Option(
+        "csv",
+        help="Формат сводки по колонкам: csv, parquet или feather (Parquet/Feather "
+        "сохраняют типы и требуют pyarrow).",
+    ),
+    force: bool = typer.Option(
+        False,
+        help="Пересобрать все артефакты, не глядя на manifest.json в каталоге отчёта.",
+    ),
+    profile: bool = typer.Option(False, "--profile", help=PROFILE_HELP),
+    profile_out: Optional[str] = typer.Option(None, help=PROFILE_OUT_HELP.format(default="<out-dir>/profile")),
 ) -> None:
     """
     Сгенерировать полный EDA-отчёт:
@@ -95,107 +848,158 @@ def report(
     - корреляционная матрица;
     - top-k категорий по категориальным признакам;
     - картинки: гистограммы, матрица пропусков, heatmap корреляции.
+
+    Повторный запуск в тот же каталог пересобирает только артефакты,
+    входы которых изменились (см. manifest.json).
     """
-    out_root = Path(out_dir)
-    out_root.mkdir(parents=True, exist_ok=True)
+    with _profiling(profile, profile_out, Path(out_dir) / "profile"):
+        _build_report(
+            path, out_dir, sep=sep, encoding=encoding, fmt=fmt, columns=columns,
+            max_hist_columns=max_hist_columns, top_k_categories=top_k_categories,
+            title=title, min_missing_share=min_missing_share, chunksize=chunksize,
+            approx_error=approx_error, workers=workers, optimize_dtypes=optimize_dtypes,
+            allow_float32=allow_float32, top_corr_pairs=top_corr_pairs,
+            max_corr_columns=max_corr_columns, corr_method=corr_method,
+            corr_sample_rows=corr_sample_rows, missing_bins=missing_bins,
+            summary_format=summary_format, force=force,
+        )
 
-    df = _load_csv(Path(path), sep=sep, encoding=encoding)
 
-    # 1. Обзор
-    summary = summarize_dataset(df)
-    summary_df = flatten_summary_for_print(summary)
-    missing_df = missing_table(df)
-    corr_df = correlation_matrix(df)
-    top_cats = top_categories(df, top_k = top_k_categories)
+def _batch_job(
+    path: str, report_dir: str, options: Dict[str, Any], profile: bool = False
+) -> Dict[str, Any]:
+    """
+    Отчёт по одному датасету в дочернем процессе ``batch-report``:
+    вывод ``report`` в консоль не нужен, возвращаются цифры для индекса.
+    С ``profile`` профиль пишется в ``<report_dir>/profile.*``.
+    """
+    with contextlib.redirect_stdout(io.StringIO()), _profiling(
+        profile, None, Path(report_dir) / "profile", echo=False
+    ):
+        manifest = _build_report(path, report_dir, **options)
+    return manifest.data("overview")
 
-    # 2. Качество в целом
-    quality_flags = compute_quality_flags(df, summary, missing_df, min_missing_share=min_missing_share)
-    if not missing_df.empty:
-        # Фильтруем колонки с долей пропусков выше порога
-        problematic_missing_cols = missing_df[missing_df['missing_share'] > min_missing_share]
-    else:
-        problematic_missing_cols = pd.DataFrame()
 
+def _index_row(path: Path, report_dir: Path, result: Dict[str, Any]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {
+        "path": str(path),
+        "report_dir": report_dir.as_posix(),
+        "status": result["status"],
+        "seconds": f"{result['seconds']:.3f}",
+        "error": result.get("error"),
+    }
+    try:
+        stat = path.stat()
+        row.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    except OSError:
+        pass
+    if result["status"] == "ok":
+        overview = result["value"]
+        row.update(n_rows=overview["n_rows"], n_cols=overview["n_cols"], **overview["quality"])
+    return row
 
-    # 3. Сохраняем табличные артефакты
-    summary_df.to_csv(out_root / "summary.csv", index=False)
-    if not missing_df.empty:
-        missing_df.to_csv(out_root / "missing.csv", index=True)
-    if not corr_df.empty:
-        corr_df.to_csv(out_root / "correlation.csv", index=True)
-    save_top_categories_tables(top_cats, out_root / "top_categories")
 
-    # 4. Markdown-отчёт
-    md_path = out_root / "report.md"
-    with md_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {title}\n")
-        f.write(f"Исходный файл: `{Path(path).name}`\n\n")
-        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
-
-        f.write(f"##Настройка анализа:")
-        f.write(f"- Макс. кол-во гистограмм: **{max_hist_columns}**\n")
-        f.write(f"- Top-k категорий: **{top_k_categories}**\n")
-        f.write(f"- Порог проблемных пропусков: **{min_missing_share:.0%}**\n\n")
-
-        f.write("## Качество данных (эвристики)\n\n")
-        f.write(f"- Оценка качества: **{quality_flags['quality_score']:.2f}**\n")
-        f.write(f"- Макс. доля пропусков по колонке: **{quality_flags['max_missing_share']:.2%}**\n")
-        f.write(f"- Слишком мало строк: **{quality_flags['too_few_rows']}**\n")
-        f.write(f"- Слишком много колонок: **{quality_flags['too_many_columns']}**\n")
-        f.write(f"- Слишком много пропусков: **{quality_flags['too_many_missing']}**\n\n")
-
-        if not problematic_missing_cols.empty:
-            f.write(f"- Колонок с пропусками > {min_missing_share:.0%}: **{len(problematic_missing_cols)}**\n")
-            f.write("\n")
-
-            f.write("## Колонки\n\n")
-            f.write("См. файл `summary.csv`.\n\n")
-
-            f.write("## Пропуски\n\n")
-            if missing_df.empty:
-                f.write("Пропусков нет или датасет пуст.\n\n")
-            else:
-                f.write("См. файлы `missing.csv` и `missing_matrix.png`.\n\n")
-                
-                if not problematic_missing_cols.empty:
-                    f.write(f"### Колонки с долей пропусков > {min_missing_share:.0%}\n\n")
-                    f.write("| Колонка | Доля пропусков |\n")
-                    f.write("|---------|----------------|\n")
-                    for col_name in problematic_missing_cols.index:
-                        missing_share = problematic_missing_cols.loc[col_name, 'missing_share']
-                        f.write(f"| `{col_name}` | {missing_share:.2%} |\n")
-                    f.write("\n")
-
-            f.write("## Корреляция числовых признаков\n\n")
-            if corr_df.empty:
-                f.write("Недостаточно числовых колонок для корреляции.\n\n")
-            else:
-                f.write("См. `correlation.csv` и `correlation_heatmap.png`.\n\n")
+@app.command("batch-report")
+def batch_report(
+    inputs: Optional[List[str]] = typer.Argument(
+        None, help="Файлы, каталоги (все таблицы внутри) или glob-шаблоны в кавычках ('lake/**/*.parquet')."
+    ),
+    list_file: Optional[List[str]] = typer.Option(
+        None, "--list", help="Файл со списком путей или шаблонов, по одному на строку."
+    ),
+    out_dir: str = typer.Option("reports", help="Каталог для отчётов: подкаталог на датасет и index.csv."),
+    workers: int = typer.Option(1, min=1, help="Сколько датасетов обрабатывать одновременно (процесс на датасет)."),
+    timeout: Optional[float] = typer.Option(
+        None, min=0.1, help="Лимит времени на датасет в секундах; не уложившийся процесс останавливается."
+    ),
+    resume: bool = typer.Option(
+        True,
+        help="Пропускать датасеты, которые в index.csv уже обработаны успешно и с тех пор не менялись.",
+    ),
+    sep: str = typer.Option(",", help="Разделитель в CSV."),
+    encoding: str = typer.Option("utf-8", help="Кодировка файла."),
+    fmt: str = typer.Option("auto", "--format", help=FORMAT_HELP),
+    title: str = typer.Option("EDA-отчет", help="Заголовок отчета MarkDown"),
+    max_hist_columns: int = typer.Option(6, help="Максимум числовых колонок для гистограмм."),
+    top_k_categories: int = typer.Option(5, help="Сколько top-значений выводить для категориальных признаков"),
+    min_missing_share: float = typer.Option(0.3, help="Порог для пропусков для выделения проблемных колонок"),
+    chunksize: Optional[int] = typer.Option(
+        None, help="Размер чанка для потокового чтения (0 - всегда целиком), как в report."
+    ),
+    approx_error: Optional[float] = typer.Option(
+        None, min=1e-4, max=0.5, help="Приближённый режим unique и top-k, как в report."
+    ),
+    corr_method: str = typer.Option("pearson", help=CORR_METHOD_HELP),
+    profile: bool = typer.Option(
+        False, "--profile", help="Профилировать каждый датасет: <подкаталог отчёта>/profile.json и profile.collapsed."
+    ),
+) -> None:
+    """
+    Отчёты по многим датасетам за один запуск: по отчёту (как у report)
+    в подкаталоге out_dir на датасет и общий index.csv с оценкой качества
+    и флагами. Каждый датасет - в отдельном процессе: ошибка или таймаут
+    одного не останавливает остальные. Код выхода 1, если были ошибки.
+    """
+    from . import core, parallel, streaming, viz  # noqa: F401
+    from .batch import INDEX_NAME, BatchIndex, expand_inputs, report_dirs, run_isolated
 
-            f.write("## Категориальные признаки\n\n")
-            if not top_cats:
-                f.write("Категориальные/строковые признаки не найдены.\n\n")
-            else:
-                f.write(f"См. файлы в папке `top_categories/` (топ-{top_k_categories} значений).\n\n")
+    # Модули отчёта и matplotlib загружаются здесь, до fork: дочерние
+    # процессы получают их готовыми и не импортируют заново.
+    viz.load_backend()
+
+    if corr_method not in CORRELATION_METHODS:
+        raise typer.BadParameter(
+            f"Неизвестный метод корреляции '{corr_method}', ожидается один из: {', '.join(CORRELATION_METHODS)}"
+        )
+    try:
+        paths = expand_inputs(inputs or [], list_file or [])
+    except OSError as exc:
+        raise typer.BadParameter(f"Не удалось прочитать список файлов: {exc}") from exc
+    if not paths:
+        raise typer.BadParameter("Не найдено ни одного датасета")
+
+    out_root = Path(out_dir)
+    out_root.mkdir(parents=True, exist_ok=True)
+    dirs = report_dirs(paths)
+    if resume:
+        index = BatchIndex.load(out_root / INDEX_NAME)
+    else:
+        (out_root / INDEX_NAME).unlink(missing_ok=True)
+        index = BatchIndex(out_root / INDEX_NAME)
 
-            f.write("## Гистограммы числовых колонок\n\n")
-            f.write(f"Сгенерировано гистограмм (не более {max_hist_columns}): см. файлы `hist_*.png`.\n\n")
+    options = {
+        "sep": sep,
+        "encoding": encoding,
+        "fmt": fmt,
+        "title": title,
+        "max_hist_columns": max_hist_columns,
+        "top_k_categories": top_k_categories,
+        "min_missing_share": min_missing_share,
+        "chunksize": chunksize,
+        "approx_error": approx_error,
+        "corr_method": corr_method,
+    }
+    todo = [i for i, path in enumerate(paths) if not (resume and index.is_done(path))]
+    jobs = [(str(paths[i]), str(out_root / dirs[i]), options, profile) for i in todo]
+    if len(todo) < len(paths):
+        typer.echo(f"Уже обработано ранее (см. {INDEX_NAME}): {len(paths) - len(todo)}")
 
-    # 5. Картинки
-    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns)
-    plot_missing_matrix(df, out_root / "missing_matrix.png")
-    plot_correlation_heatmap(df, out_root / "correlation_heatmap.png")
+    counts: Dict[str, int] = {}
+    for done, (n, result) in enumerate(run_isolated(_batch_job, jobs, workers, timeout), start=1):
+        i = todo[n]
+        index.append(_index_row(paths[i], dirs[i], result))
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        line = f"[{done}/{len(jobs)}] {result['status']:<7} {paths[i]} ({result['seconds']:.1f} с)"
+        if result["status"] != "ok":
+            line += f": {result['error']}"
+        typer.echo(line)
 
-    # 6. Выводим информацию в консоль
-    typer.echo(f"Отчёт сгенерирован в каталоге: {out_root}")
-    typer.echo(f"- Основной markdown: {md_path}")
-    typer.echo("- Табличные файлы: summary.csv, missing.csv, correlation.csv, top_categories/*.csv")
-    typer.echo("- Графики: hist_*.png, missing_matrix.png, correlation_heatmap.png")
-    
-    typer.echo(f"\nИспользованные настройки:")
-    typer.echo(f"- Top-k категорий: {top_k_categories}")
-    typer.echo(f"- Порог проблемных пропусков: {min_missing_share:.0%}")
-    typer.echo(f"- Заголовок отчёта: '{title}'")
+    index_path = index.rewrite([str(path) for path in paths])
+    typer.echo(f"\nОтчёты в каталоге: {out_root}")
+    typer.echo(f"- Индекс: {index_path}")
+    typer.echo("- Итог: " + (", ".join(f"{status}: {n}" for status, n in sorted(counts.items())) or "нечего делать"))
+    if counts.get("error") or counts.get("timeout"):
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Sequence
+from collections.abc import Sequence as _SequenceABC
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 from pandas.api import types as ptypes
 
+from .association import association_matrix, kendall_matrix, sample_rows, spearman_matrix
+from .correlation import correlation_matrix as _pearson_matrix
+from .defaults import CORRELATION_METHODS, DEFAULT_MISSING_BINS
+from .duplicates import count_duplicate_rows
+from .rules import quality_rules
+from .sketches import HyperLogLog, SpaceSaving, approx_top_categories_table
+from .tracing import span, traced
 
-@dataclass
+
+@dataclass(slots=True)
 class ColumnSummary:
     name: str
     dtype: str
@@ -21,28 +31,250 @@ class ColumnSummary:
     max: Optional[float] = None
     mean: Optional[float] = None
     std: Optional[float] = None
+    # Относительная стандартная ошибка ``unique`` в приближённом режиме
+    # (None - значение посчитано точно).
+    unique_error: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Без dataclasses.asdict: он рекурсивно копирует каждое значение.
+        result = {field: getattr(self, field) for field in _COLUMN_FIELDS}
+        result["example_values"] = list(self.example_values)
+        return result
+
+
+_COLUMN_FIELDS = tuple(field.name for field in fields(ColumnSummary))
+
+# Скалярные поля ``ColumnSummary`` и типы их массивов в ``DatasetSummary``.
+SUMMARY_FIELDS = {
+    "name": object,
+    "dtype": object,
+    "non_null": np.int64,
+    "missing": np.int64,
+    "missing_share": np.float64,
+    "unique": np.int64,
+    "is_numeric": np.bool_,
+    "min": np.float64,
+    "max": np.float64,
+    "mean": np.float64,
+    "std": np.float64,
+    "unique_error": np.float64,
+}
+
+# По сколько колонок ``DatasetSummary.to_dict`` собирает словари за раз.
+_DICT_BLOCK_COLUMNS = 2048
+
+# Поля, которые могут быть None: в массиве - NaN, отдельно - маска None
+# (NaN бывает и настоящим значением, например std по одному значению).
+_OPTIONAL_FIELDS = ("min", "max", "mean", "std", "unique_error")
 
 
-@dataclass
 class DatasetSummary:
-    n_rows: int
-    n_cols: int
-    columns: List[ColumnSummary]
+    """
+    Обзор датасета, поля колонок хранятся по столбцам: массив NumPy на
+    каждое скалярное поле ``ColumnSummary``, имена типов - коды в общий
+    список, примеры значений - один плоский массив со смещениями. На
+    десятки тысяч колонок это в несколько раз компактнее списка объектов.
+
+    ``columns`` - последовательность ``ColumnSummary``, которые создаются при
+    обращении и не хранятся; их изменение на сводку не влияет.
+    """
+
+    __slots__ = (
+        "n_rows",
+        "n_cols",
+        "_fields",
+        "_none",
+        "_dtype_codes",
+        "_dtype_names",
+        "_examples",
+        "_example_offsets",
+    )
+
+    def __init__(self, n_rows: int, n_cols: int, columns: Iterable[ColumnSummary]) -> None:
+        columns = list(columns)
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self._fields: Dict[str, np.ndarray] = {}
+        self._none: Dict[str, np.ndarray] = {}
+        for field, dtype in SUMMARY_FIELDS.items():
+            if field == "dtype":
+                continue
+            values = [getattr(col, field) for col in columns]
+            if field in _OPTIONAL_FIELDS:
+                none = np.array([value is None for value in values], dtype=np.bool_)
+                values = [np.nan if value is None else value for value in values]
+                self._none[field] = none
+            self._fields[field] = _field_array(values, dtype)
+
+        # Типов колонок обычно единицы - храним коды, а не строку на колонку.
+        names: Dict[str, int] = {}
+        self._dtype_codes = np.array(
+            [names.setdefault(col.dtype, len(names)) for col in columns], dtype=np.int32
+        )
+        self._dtype_names: List[str] = list(names)
+
+        lengths = [len(col.example_values) for col in columns]
+        self._example_offsets = np.zeros(len(columns) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._example_offsets[1:])
+        self._examples = _field_array(
+            [value for col in columns for value in col.example_values], object
+        )
+
+    @property
+    def columns(self) -> "SummaryColumns":
+        return SummaryColumns(self)
+
+    def column(self, i: int) -> ColumnSummary:
+        values = {field: array[i] for field, array in self._fields.items()}
+        for field, none in self._none.items():
+            values[field] = None if none[i] else float(values[field])
+        return ColumnSummary(
+            name=values["name"],
+            dtype=self._dtype_names[self._dtype_codes[i]],
+            non_null=int(values["non_null"]),
+            missing=int(values["missing"]),
+            missing_share=float(values["missing_share"]),
+            unique=int(values["unique"]),
+            example_values=self.example_values(i, i + 1)[0],
+            is_numeric=bool(values["is_numeric"]),
+            min=values["min"],
+            max=values["max"],
+            mean=values["mean"],
+            std=values["std"],
+            unique_error=values["unique_error"],
+        )
+
+    def example_values(self, start: int = 0, stop: Optional[int] = None) -> List[List[Any]]:
+        """
+        Примеры значений колонок ``start:stop`` - по списку на колонку.
+        """
+        size = len(self._dtype_codes)
+        stop = size if stop is None else min(stop, size)
+        offsets = self._example_offsets[start : stop + 1].tolist()
+        flat = self._examples[offsets[0] : offsets[-1]].tolist() if offsets else []
+        base = offsets[0] if offsets else 0
+        return [flat[a - base : b - base] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def arrays(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Скалярные поля колонок ``start:stop`` - копии массивов
+        (``SUMMARY_FIELDS``, None - NaN).
+        """
+        rows = slice(start, stop)
+        dtype_names = _field_array(self._dtype_names, object)
+        result: Dict[str, np.ndarray] = {}
+        for field in SUMMARY_FIELDS:
+            if field == "dtype":
+                result[field] = dtype_names[self._dtype_codes[rows]]
+            else:
+                result[field] = self._fields[field][rows].copy()
+        return result
+
+    def column_dicts(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        ``ColumnSummary.to_dict`` колонок ``start:stop`` - прямо из массивов,
+        без промежуточных объектов ``ColumnSummary``.
+        """
+        rows = slice(start, stop)
+        data = self.arrays(start, stop)
+        lists = {}
+        for field in _COLUMN_FIELDS:
+            if field == "example_values":
+                lists[field] = self.example_values(start, stop)
+            elif field in self._none:
+                values = data[field].astype(object)
+                values[self._none[field][rows]] = None
+                lists[field] = values.tolist()
+            else:
+                lists[field] = data[field].tolist()
+        return [
+            dict(zip(_COLUMN_FIELDS, row)) for row in zip(*(lists[field] for field in _COLUMN_FIELDS))
+        ]
 
     def to_dict(self) -> Dict[str, Any]:
+        # Блоками: промежуточные списки полей не растут с числом колонок.
+        columns: List[Dict[str, Any]] = []
+        for start in range(0, len(self._dtype_codes), _DICT_BLOCK_COLUMNS):
+            columns.extend(self.column_dicts(start, start + _DICT_BLOCK_COLUMNS))
         return {
             "n_rows": self.n_rows,
             "n_cols": self.n_cols,
-            "columns": [c.to_dict() for c in self.columns],
+            "columns": columns,
         }
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DatasetSummary):
+            return NotImplemented
+        return (self.n_rows, self.n_cols, list(self.columns)) == (
+            other.n_rows,
+            other.n_cols,
+            list(other.columns),
+        )
+
+    __hash__ = None  # type: ignore[assignment]
 
+    def __repr__(self) -> str:
+        return f"DatasetSummary(n_rows={self.n_rows}, n_cols={self.n_cols}, columns=<{len(self.columns)}>)"
+
+
+class SummaryColumns(_SequenceABC):
+    """
+    ``DatasetSummary.columns``: ``ColumnSummary`` по индексу (срез - список).
+    """
+
+    __slots__ = ("_summary",)
+
+    def __init__(self, summary: DatasetSummary) -> None:
+        self._summary = summary
+
+    def __len__(self) -> int:
+        return len(self._summary._dtype_codes)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self._summary.column(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._summary.column(index)
+
+
+def _field_array(values: List[Any], dtype: Any) -> np.ndarray:
+    # np.array(..., dtype=object) разворачивает вложенные последовательности.
+    if dtype is object:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    return np.array(values, dtype=dtype)
+
+
+# Размер float64-блока числовых колонок (строки x колонки x 8 байт):
+# число колонок в блоке подбирается под него, так что дополнительная
+# память движка не растёт ни с шириной, ни с высотой таблицы.
+_NUMERIC_BLOCK_BYTES = 64 * 1024 * 1024
+
+# По сколько байтов блока (строки x колонки) редуцировать за раз: размер
+# временных буферов ``_numeric_block_stats``.
+_REDUCE_SLICE_BYTES = 4 * 1024 * 1024
+
+# По сколько строк колонка подаётся в скетчи в приближённом режиме:
+# ограничивает размер промежуточных хэш-таблиц value_counts.
+_SKETCH_SLICE_ROWS = 100_000
+
+# По сколько строк строить маску пропусков для ``MissingMatrix``.
+_MISSING_SLICE_ROWS = 262_144
+
+# Целые по модулю больше 2**53 нельзя без потерь перевести во float64,
+# такие колонки считаются «по-старому», через pandas.
+_FLOAT64_EXACT_INT = 2**53
+
+
+@traced
 def summarize_dataset(
     df: pd.DataFrame,
     example_values_per_column: int = 3,
+    approx_error: Optional[float] = None,
 ) -> DatasetSummary:
     """
     Полный обзор датасета по колонкам:
@@ -52,58 +284,316 @@ def summarize_dataset(
     - количество уникальных;
     - несколько примерных значений;
     - базовые числовые статистики (для numeric).
+
+    Числовые колонки обрабатываются блоками: пропуски, моменты и min/max
+    считаются одной векторной редукцией по float64-матрице, а не отдельным
+    проходом pandas на каждую статистику. Остальные колонки проходят через
+    один вызов ``pd.factorize`` (пропуски и число уникальных за один хэш-проход).
+
+    Если задан ``approx_error``, число уникальных оценивается HyperLogLog
+    с относительной стандартной ошибкой не больше ``approx_error`` (она же
+    пишется в ``ColumnSummary.unique_error``) - без полной хэш-таблицы значений.
     """
     n_rows, n_cols = df.shape
-    columns: List[ColumnSummary] = []
+    series = [s for _, s in df.items()]
+    columns: List[Optional[ColumnSummary]] = [None] * n_cols
+
+    block_positions = [i for i, s in enumerate(series) if _is_block_numeric(s)]
+    width = numeric_block_width(n_rows)
+    for start in range(0, len(block_positions), width):
+        batch = block_positions[start : start + width]
+        with span("numeric_block", columns=len(batch)):
+            batch_summaries = _summarize_numeric_block(
+                [series[i] for i in batch], n_rows, example_values_per_column, approx_error
+            )
+        for i, col_summary in zip(batch, batch_summaries):
+            columns[i] = col_summary
 
-    for name in df.columns:
-        s = df[name]
-        dtype_str = str(s.dtype)
+    for i, s in enumerate(series):
+        if columns[i] is None:
+            with span("column", column=s.name):
+                columns[i] = _summarize_column(s, example_values_per_column, approx_error)
 
-        non_null = int(s.notna().sum())
-        missing = n_rows - non_null
-        missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
-        unique = int(s.nunique(dropna=True))
-
-        # Примерные значения выводим как строки
-        examples = (
-            s.dropna().astype(str).unique()[:example_values_per_column].tolist()
-            if non_null > 0
-            else []
+    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=list(columns))
+
+
+def numeric_block_width(n_rows: int) -> int:
+    """
+    Сколько числовых колонок из ``n_rows`` строк помещается в один
+    float64-блок размером ``_NUMERIC_BLOCK_BYTES`` (не меньше одной).
+    """
+    return max(1, _NUMERIC_BLOCK_BYTES // (max(1, n_rows) * 8))
+
+
+def _is_block_numeric(s: pd.Series) -> bool:
+    """
+    Можно ли колонку без потерь обработать в общем float64-блоке.
+    """
+    dtype = s.dtype
+    if not ptypes.is_numeric_dtype(dtype) or ptypes.is_complex_dtype(dtype):
+        return False
+    if ptypes.is_integer_dtype(dtype) and len(s) > 0:
+        values = s.dropna() if s.hasnans else s
+        if values.empty:
+            return True
+        return bool(
+            -_FLOAT64_EXACT_INT <= values.min() and values.max() <= _FLOAT64_EXACT_INT
         )
+    return True
+
+
+def _is_category_like(dtype: Any) -> bool:
+    """
+    Колонка значений-меток: object, category или строковый тип pandas
+    (в т.ч. ``string[pyarrow]``). По таким колонкам считаются top-k категорий.
+    """
+    return (
+        ptypes.is_object_dtype(dtype)
+        or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))
+    )
+
+
+def _example_values(s: pd.Series, k: int) -> List[Any]:
+    """
+    Первые k различных непустых значений колонки (как строки).
 
-        is_numeric = bool(ptypes.is_numeric_dtype(s))
-        min_val: Optional[float] = None
-        max_val: Optional[float] = None
-        mean_val: Optional[float] = None
-        std_val: Optional[float] = None
+    Эквивалентно ``s.dropna().astype(str).unique()[:k]``, но смотрит только
+    на начало колонки, постепенно расширяя окно.
+    """
+    if k <= 0:
+        return []
+    # Для float64/целых/bool строковое представление pandas совпадает со str()
+    # питоновского скаляра, поэтому обходимся без astype на каждую колонку.
+    fast = isinstance(s.dtype, np.dtype) and (
+        s.dtype == np.float64 or s.dtype.kind in "iub"
+    )
+    window = max(64, 4 * k)
+    while True:
+        if fast:
+            examples: List[Any] = []
+            for value in s.iloc[:window].tolist():
+                if value != value:  # NaN
+                    continue
+                text = str(value)
+                if text not in examples:
+                    examples.append(text)
+                    if len(examples) == k:
+                        break
+        else:
+            head = s.iloc[:window].dropna()
+            examples = head.astype(str).unique()[:k].tolist()
+        if len(examples) >= k or window >= len(s):
+            return examples
+        window *= 4
+
+
+def _approx_unique(s: pd.Series, approx_error: float) -> HyperLogLog:
+    """
+    HyperLogLog по колонке; колонка подаётся кусками фиксированного размера.
+    """
+    sketch = HyperLogLog.for_error(approx_error)
+    for start in range(0, len(s), _SKETCH_SLICE_ROWS):
+        sketch.add_series(s.iloc[start : start + _SKETCH_SLICE_ROWS])
+    return sketch
+
+
+def _summarize_numeric_block(
+    series: Sequence[pd.Series],
+    n_rows: int,
+    example_values_per_column: int,
+    approx_error: Optional[float] = None,
+) -> List[ColumnSummary]:
+    """
+    Статистики для группы числовых колонок за одну векторную редукцию.
+    """
+    block = np.empty((n_rows, len(series)), dtype=np.float64, order="F")
+    for j, s in enumerate(series):
+        block[:, j] = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    stats = _numeric_block_stats(block, approx_error)
+    return _numeric_block_summaries(series, stats, n_rows, example_values_per_column)
 
-        if is_numeric and non_null > 0:
-            min_val = float(s.min())
-            max_val = float(s.max())
-            mean_val = float(s.mean())
-            std_val = float(s.std())
 
-        columns.append(
+def _numeric_block_stats(
+    block: np.ndarray,
+    approx_error: Optional[float] = None,
+    with_zeros: bool = False,
+) -> Dict[str, Any]:
+    """
+    Векторные статистики по float64-блоку (строки x колонки, NaN = пропуск).
+    Результат для каждой колонки зависит только от самой колонки, поэтому
+    блок можно резать по колонкам как угодно (см. ``parallel``).
+
+    Блок не изменяется (он может лежать в разделяемой памяти): редукции
+    идут по срезам строк через два переиспользуемых буфера размером
+    ``_REDUCE_SLICE_BYTES``, так что дополнительная память не зависит от
+    высоты блока. ``with_zeros`` - заодно посчитать нули в колонках.
+    """
+    n_rows, n_cols = block.shape
+    step = max(1, _REDUCE_SLICE_BYTES // (max(1, n_cols) * 8))
+    values_buf = np.empty((min(step, n_rows), n_cols), dtype=np.float64)
+    mask_buf = np.empty((min(step, n_rows), n_cols), dtype=bool)
+
+    non_null = np.zeros(n_cols, dtype=np.int64)
+    total = np.zeros(n_cols, dtype=np.float64)
+    zeros = np.zeros(n_cols, dtype=np.int64)
+    # fmin/fmax пропускают NaN; у колонки без значений остаётся ±inf.
+    min_vals = np.full(n_cols, np.inf)
+    max_vals = np.full(n_cols, -np.inf)
+    for start in range(0, n_rows, step):
+        part = block[start : start + step]
+        rows = part.shape[0]
+        mask = np.isnan(part, out=mask_buf[:rows])
+        non_null += rows - mask.sum(axis=0)
+        values = values_buf[:rows]
+        np.copyto(values, part)
+        values[mask] = 0.0
+        total += values.sum(axis=0)
+        np.fmin(min_vals, np.fmin.reduce(part, axis=0), out=min_vals)
+        np.fmax(max_vals, np.fmax.reduce(part, axis=0), out=max_vals)
+        if with_zeros:
+            zeros += np.equal(part, 0.0, out=mask).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / non_null
+        # Второй проход: сумма квадратов отклонений от среднего.
+        m2 = np.zeros(n_cols, dtype=np.float64)
+        for start in range(0, n_rows, step):
+            part = block[start : start + step]
+            rows = part.shape[0]
+            mask = np.isnan(part, out=mask_buf[:rows])
+            values = np.subtract(part, mean, out=values_buf[:rows])
+            values[mask] = 0.0
+            np.multiply(values, values, out=values)
+            m2 += values.sum(axis=0)
+        var = m2 / (non_null - 1)
+    std = np.where(non_null > 1, np.sqrt(np.where(non_null > 1, var, 0.0)), np.nan)
+
+    # Число уникальных: колонка по очереди сортируется в один буфер, NaN
+    # уходят в конец, остаётся посчитать смены значения среди первых
+    # non_null элементов (-0.0 и 0.0 равны, как в nunique).
+    unique_error: Optional[float] = None
+    if approx_error is not None:
+        sketches = [
+            _approx_unique(pd.Series(block[:, j]), approx_error)
+            for j in range(n_cols)
+        ]
+        unique = np.array([sketch.estimate() for sketch in sketches], dtype=np.int64)
+        unique_error = sketches[0].rel_error if sketches else None
+    else:
+        unique = np.zeros(n_cols, dtype=np.int64)
+        column_buf = np.empty(n_rows, dtype=np.float64)
+        for j in range(n_cols):
+            count = int(non_null[j])
+            if count == 0:
+                continue
+            np.copyto(column_buf, block[:, j])
+            column_buf.sort()
+            unique[j] = 1 + np.count_nonzero(column_buf[1:count] != column_buf[: count - 1])
+
+    stats = {
+        "non_null": non_null,
+        "mean": mean,
+        "std": std,
+        "min": min_vals,
+        "max": max_vals,
+        "unique": unique,
+        "unique_error": unique_error,
+    }
+    if with_zeros:
+        stats["zeros"] = zeros
+    return stats
+
+
+def _numeric_block_summaries(
+    series: Sequence[pd.Series],
+    stats: Dict[str, Any],
+    n_rows: int,
+    example_values_per_column: int,
+) -> List[ColumnSummary]:
+    """
+    ``ColumnSummary`` по результатам ``_numeric_block_stats``.
+    """
+    summaries: List[ColumnSummary] = []
+    for j, s in enumerate(series):
+        col_non_null = int(stats["non_null"][j])
+        missing = n_rows - col_non_null
+        valid = col_non_null > 0
+        summaries.append(
             ColumnSummary(
-                name=name,
-                dtype=dtype_str,
-                non_null=non_null,
+                name=s.name,
+                dtype=str(s.dtype),
+                non_null=col_non_null,
                 missing=missing,
-                missing_share=missing_share,
-                unique=unique,
-                example_values=examples,
-                is_numeric=is_numeric,
-                min=min_val,
-                max=max_val,
-                mean=mean_val,
-                std=std_val,
+                missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+                unique=int(stats["unique"][j]),
+                example_values=(
+                    _example_values(s, example_values_per_column) if valid else []
+                ),
+                is_numeric=True,
+                min=float(stats["min"][j]) if valid else None,
+                max=float(stats["max"][j]) if valid else None,
+                mean=float(stats["mean"][j]) if valid else None,
+                std=float(stats["std"][j]) if valid else None,
+                unique_error=stats["unique_error"],
             )
         )
+    return summaries
 
-    return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
+
+def _summarize_column(
+    s: pd.Series,
+    example_values_per_column: int,
+    approx_error: Optional[float] = None,
+) -> ColumnSummary:
+    """
+    Статистики одной колонки: пропуски и уникальные за один проход factorize.
+    Используется для нечисловых колонок и числовых, не влезающих во float64-блок.
+    """
+    n_rows = len(s)
+    unique_error: Optional[float] = None
+    if approx_error is not None:
+        non_null = int(s.notna().sum())
+        sketch = _approx_unique(s, approx_error)
+        unique = sketch.estimate()
+        unique_error = sketch.rel_error
+    else:
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)
+        non_null = int(np.count_nonzero(codes >= 0))
+        unique = len(uniques)
+    missing = n_rows - non_null
+
+    is_numeric = bool(ptypes.is_numeric_dtype(s))
+    min_val: Optional[float] = None
+    max_val: Optional[float] = None
+    mean_val: Optional[float] = None
+    std_val: Optional[float] = None
+
+    if is_numeric and non_null > 0:
+        min_val = float(s.min())
+        max_val = float(s.max())
+        mean_val = float(s.mean())
+        std_val = float(s.std())
+
+    return ColumnSummary(
+        name=s.name,
+        dtype=str(s.dtype),
+        non_null=non_null,
+        missing=missing,
+        missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+        unique=unique,
+        example_values=(
+            _example_values(s, example_values_per_column) if non_null > 0 else []
+        ),
+        is_numeric=is_numeric,
+        min=min_val,
+        max=max_val,
+        mean=mean_val,
+        std=std_val,
+        unique_error=unique_error,
+    )
 
 
+@traced
 def missing_table(df: pd.DataFrame) -> pd.DataFrame:
     """
     Таблица пропусков по колонкам: count/share.
@@ -111,8 +601,18 @@ def missing_table(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return pd.DataFrame(columns=["missing_count", "missing_share"])
 
-    total = df.isna().sum()
-    share = total / len(df)
+    return missing_table_from_counts(df.isna().sum(), len(df))
+
+
+def missing_table_from_counts(total: pd.Series, n_rows: int) -> pd.DataFrame:
+    """
+    Таблица пропусков по уже посчитанному числу пропусков в каждой колонке.
+    Используется потоковым режимом, где целого DataFrame нет.
+    """
+    if n_rows == 0 or total.empty:
+        return pd.DataFrame(columns=["missing_count", "missing_share"])
+
+    share = total / n_rows
     result = (
         pd.DataFrame(
             {
@@ -125,51 +625,220 @@ def missing_table(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
-def correlation_matrix(df: pd.DataFrame) -> pd.DataFrame:
+class MissingMatrix:
+    """
+    Матрица пропусков с ограниченным разрешением: доля пропусков в каждой
+    колонке по блокам подряд идущих строк.
+
+    Строки делятся на блоки одинаковой ширины (степень двойки), и блоков не
+    больше ``resolution``: когда строк становится больше, соседние блоки
+    сливаются попарно, а ширина удваивается. Поэтому матрица копится по
+    чанкам (``update``) в памяти ``resolution x колонки`` независимо от числа
+    строк, и итоговые блоки не зависят от размера чанков.
+    """
+
+    def __init__(self, columns: Sequence[Any], resolution: int = DEFAULT_MISSING_BINS) -> None:
+        self.columns: List[Any] = list(columns)
+        self.resolution = max(1, int(resolution))
+        self.width = 1
+        self.n_rows = 0
+        self.missing = np.zeros((0, len(self.columns)), dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Добавить следующие по порядку строки таблицы.
+        """
+        # Маска пропусков строится по кускам строк: её память ограничена.
+        for start in range(0, len(chunk), _MISSING_SLICE_ROWS):
+            self._add(chunk.iloc[start : start + _MISSING_SLICE_ROWS])
+
+    def _add(self, part: pd.DataFrame) -> None:
+        n = len(part)
+        start = self.n_rows
+        self.n_rows += n
+        while -(-self.n_rows // self.width) > self.resolution:
+            self._coarsen()
+
+        bins = np.arange(start // self.width, (self.n_rows - 1) // self.width + 1)
+        self._grow(bins[-1] + 1)
+        offsets = np.maximum(bins * self.width - start, 0)
+        self.rows[bins] += np.diff(np.r_[offsets, n])
+        if len(self.columns):
+            mask = part.isna().to_numpy()
+            self.missing[bins] += np.add.reduceat(mask, offsets, axis=0, dtype=np.int64)
+
+    def merge(self, other: "MissingMatrix") -> None:
+        """
+        Влить матрицу по следующей части таблицы. Блок другой матрицы
+        целиком относится к блоку, где лежит его первая строка.
+        """
+        offset = self.n_rows
+        self.n_rows += other.n_rows
+        while -(-self.n_rows // self.width) > self.resolution:
+            self._coarsen()
+        if other.n_rows == 0:
+            return
+        starts = offset + np.arange(len(other.rows)) * other.width
+        bins = starts // self.width
+        self._grow(int(bins[-1]) + 1)
+        np.add.at(self.rows, bins, other.rows)
+        np.add.at(self.missing, bins, other.missing)
+
+    def shares(self) -> np.ndarray:
+        """
+        Доли пропусков (блоки строк x колонки).
+        """
+        rows = np.maximum(self.rows, 1)[:, None]
+        return self.missing / rows
+
+    def _grow(self, n_bins: int) -> None:
+        extra = n_bins - len(self.rows)
+        if extra > 0:
+            self.rows = np.r_[self.rows, np.zeros(extra, dtype=np.int64)]
+            self.missing = np.vstack(
+                [self.missing, np.zeros((extra, len(self.columns)), dtype=np.int64)]
+            )
+
+    def _coarsen(self) -> None:
+        self.width *= 2
+        if len(self.rows) % 2:
+            self._grow(len(self.rows) + 1)
+        self.rows = self.rows[0::2] + self.rows[1::2]
+        self.missing = self.missing[0::2] + self.missing[1::2]
+
+
+@traced
+def missing_matrix(df: pd.DataFrame, resolution: int = DEFAULT_MISSING_BINS) -> MissingMatrix:
+    """
+    ``MissingMatrix`` по всей таблице (не больше ``resolution`` блоков строк).
+    """
+    matrix = MissingMatrix(df.columns, resolution)
+    matrix.update(df)
+    return matrix
+
+
+@traced
+def correlation_matrix(
+    df: pd.DataFrame,
+    method: str = "pearson",
+    max_rows: Optional[int] = None,
+) -> pd.DataFrame:
     """
-    Корреляция Пирсона для числовых колонок.
+    Матрица связи колонок (попарно по строкам, где обе колонки непусты,
+    как ``DataFrame.corr``). ``method``:
+
+    - ``pearson`` (по умолчанию), ``spearman``, ``kendall`` - по числовым
+      колонкам;
+    - ``association`` - по числовым и категориальным (строковым, category,
+      bool) колонкам: V Крамера, корреляционное отношение и Пирсон
+      (см. ``association.association_matrix``).
+
+    ``max_rows`` ограничивает память: считать по выборке из не более чем
+    стольких строк (``association.sample_rows``).
     """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(
+            f"Неизвестный метод корреляции '{method}', ожидается один из: {', '.join(CORRELATION_METHODS)}"
+        )
+    df = sample_rows(df, max_rows)
+
+    if method == "association":
+        categorical = [
+            name
+            for name, dtype in df.dtypes.items()
+            if _is_category_like(dtype) or ptypes.is_bool_dtype(dtype)
+        ]
+        selected = [
+            name
+            for name, dtype in df.dtypes.items()
+            if name in categorical or (ptypes.is_numeric_dtype(dtype) and not ptypes.is_complex_dtype(dtype))
+        ]
+        if not selected:
+            return pd.DataFrame()
+        return association_matrix(df[selected], categorical)
+
     numeric_df = df.select_dtypes(include="number")
     if numeric_df.empty:
         return pd.DataFrame()
-    return numeric_df.corr(numeric_only=True)
+    if method == "spearman":
+        return spearman_matrix(numeric_df)
+    if method == "kendall":
+        return kendall_matrix(numeric_df)
+    return _pearson_matrix(numeric_df)
 
 
+@traced
 def top_categories(
     df: pd.DataFrame,
     max_columns: int = 5,
     top_k: int = 5,
+    approx_error: Optional[float] = None,
 ) -> Dict[str, pd.DataFrame]:
     """
     Для категориальных/строковых колонок считает top-k значений.
     Возвращает словарь: колонка -> DataFrame со столбцами value/count/share.
+
+    Если задан ``approx_error``, частоты оцениваются скетчем Space-Saving
+    (переоценка не больше ``approx_error`` * число строк), а в таблицу
+    добавляется столбец ``count_error`` - максимальная переоценка count.
     """
     result: Dict[str, pd.DataFrame] = {}
     candidate_cols: List[str] = []
 
     for name in df.columns:
         s = df[name]
-        if ptypes.is_object_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+        if _is_category_like(s.dtype):
             candidate_cols.append(name)
 
     for name in candidate_cols[:max_columns]:
-        s = df[name]
-        vc = s.value_counts(dropna=True).head(top_k)
-        if vc.empty:
-            continue
-        share = vc / vc.sum()
-        table = pd.DataFrame(
-            {
-                "value": vc.index.astype(str),
-                "count": vc.values,
-                "share": share.values,
-            }
-        )
-        result[name] = table
+        with span("column", column=name):
+            table = _column_top_categories(df[name], top_k, approx_error)
+        if table is not None:
+            result[name] = table
 
     return result
 
 
+def _column_top_categories(
+    s: pd.Series,
+    top_k: int,
+    approx_error: Optional[float] = None,
+) -> Optional[pd.DataFrame]:
+    if approx_error is None:
+        return top_categories_table(s.value_counts(dropna=True), top_k)
+    sketch = SpaceSaving.for_error(approx_error, top_k)
+    for start in range(0, len(s), _SKETCH_SLICE_ROWS):
+        sketch.add_series(s.iloc[start : start + _SKETCH_SLICE_ROWS])
+    return approx_top_categories_table(sketch, top_k)
+
+
+def top_categories_table(value_counts: pd.Series, top_k: int) -> Optional[pd.DataFrame]:
+    """
+    Таблица value/count/share из уже отсортированных частот значений колонки.
+    None, если значений нет.
+    """
+    if value_counts.empty or top_k <= 0:
+        return None
+    # Равные частоты упорядочиваем по строковому значению: порядок таких
+    # значений у value_counts зависит от dtype колонки (object, category,
+    # string[pyarrow]), а таблица от него зависеть не должна.
+    threshold = value_counts.iloc[min(top_k, len(value_counts)) - 1]
+    candidates = value_counts[value_counts >= threshold]
+    counts = candidates.to_numpy(dtype=np.int64)
+    values = candidates.index.astype(str).to_numpy(dtype=object)
+    order = np.lexsort((values, -counts))[:top_k]
+    counts, values = counts[order], values[order]
+    return pd.DataFrame(
+        {
+            "value": values,
+            "count": counts,
+            "share": counts / counts.sum(),
+        }
+    )
+
+
+@traced
 def compute_quality_flags(
     df: pd.DataFrame,
     summary: DatasetSummary,
@@ -182,87 +851,126 @@ def compute_quality_flags(
     - подозрительно мало строк;
     и т.п.
     """
-    flags: Dict[str, Any] = {}
-    flags["too_few_rows"] = summary.n_rows < 100
-    flags["too_many_columns"] = summary.n_cols > 100
-
-    max_missing_share = float(missing_df["missing_share"].max()) if not missing_df.empty else 0.0
-    flags["max_missing_share"] = max_missing_share
-    flags["too_many_missing"] = max_missing_share > 0.5
-
-    summary_df = flatten_summary_for_print(summary)
-    num_constant_columns = int((summary_df["unique"] <= 1).sum())
-    flags["no_constant_columns"] = num_constant_columns == 0
-    flags["some_constant_columns"] = 0 < num_constant_columns < 10
-    flags["too_many_constant_columns"] = num_constant_columns > 9
-
-    duplicate_rows_mask = df.duplicated(keep=False)
-    num_duplicate_rows = int(duplicate_rows_mask.sum())
-    duplicate_rows_share = num_duplicate_rows / summary.n_rows if summary.n_rows > 0 else 0.0
-    flags["num_duplicate_rows"] = num_duplicate_rows
-    flags["duplicate_rows_share"] = float(duplicate_rows_share)
-    flags["has_duplicate_rows"] = num_duplicate_rows > 0
+    with span("count_duplicate_rows"):
+        num_duplicate_rows = count_duplicate_rows(df)
 
-    threshold = min_missing_share
-    numeric_cols = df.select_dtypes(include=["number"]).columns
-
-    if len(numeric_cols) == 0:
-        flags["has_many_zero_values"] = False
-        flags["zero_ratios"] = {}
-    else:
-        zero_ratios: Dict[str, float] = {}
-        for col in numeric_cols:
+    zero_ratios: Dict[str, float] = {}
+    for col in df.select_dtypes(include=["number"]).columns:
+        with span("zero_ratio", column=col):
             col_series = df[col]
             total_count = col_series.notna().sum()
             if total_count > 0:
                 zero_count = (col_series == 0).sum()
                 zero_ratios[col] = zero_count / total_count
 
-        has_many_zeros = any(ratio > threshold for ratio in zero_ratios.values())
-        flags["has_many_zero_values"] = has_many_zeros
-        flags["zero_ratios"] = zero_ratios
-
-    # Простейший «скор» качества
-    score = 1.0
-    score -= max_missing_share  # чем больше пропусков, тем хуже
-    if summary.n_rows < 100:
-        score -= 0.2
-    if summary.n_cols > 100:
-        score -= 0.1
-    if (num_constant_columns > 0) and (num_constant_columns < 10):
-        score -= 0.05
-    if num_constant_columns > 9:
-        score -= 0.1
-    if has_many_zeros: 
-        score -= 0.1
-    if num_duplicate_rows > 0:
-        score -= min(0.1, duplicate_rows_share * 0.5) 
-
-    score = max(0.0, min(1.0, score))
-    flags["quality_score"] = score
+    return quality_flags_from_stats(
+        summary,
+        missing_df,
+        num_duplicate_rows=num_duplicate_rows,
+        zero_ratios=zero_ratios,
+        min_missing_share=min_missing_share,
+    )
+
+
+# Порядок ключей словаря флагов (флаги правил плюс статистики); флаги,
+# добавленные в конфиг правил, идут следом.
+_QUALITY_FLAG_ORDER = (
+    "too_few_rows",
+    "too_many_columns",
+    "max_missing_share",
+    "too_many_missing",
+    "no_constant_columns",
+    "some_constant_columns",
+    "too_many_constant_columns",
+    "num_duplicate_rows",
+    "duplicate_rows_share",
+    "has_duplicate_rows",
+    "has_many_zero_values",
+    "zero_ratios",
+)
+
+
+def quality_stats(
+    summary: DatasetSummary,
+    missing_df: pd.DataFrame,
+    num_duplicate_rows: int,
+    zero_ratios: Dict[str, float],
+) -> Dict[str, float]:
+    """
+    Статистики датасета - входные поля набора правил ``dataset``
+    (``eda_cli.rules``). Таблица таких словарей оценивается одним вызовом
+    ``score_quality_stats``.
+    """
+    max_missing_share = float(missing_df["missing_share"].max()) if not missing_df.empty else 0.0
+    summary_df = flatten_summary_for_print(summary)
+    num_constant_columns = int((summary_df["unique"] <= 1).sum()) if not summary_df.empty else 0
+    duplicate_rows_share = num_duplicate_rows / summary.n_rows if summary.n_rows > 0 else 0.0
+    return {
+        "n_rows": summary.n_rows,
+        "n_cols": summary.n_cols,
+        "max_missing_share": max_missing_share,
+        "num_constant_columns": num_constant_columns,
+        "num_duplicate_rows": num_duplicate_rows,
+        "duplicate_rows_share": float(duplicate_rows_share),
+        # Без числовых колонок - NaN: условие на долю нулей не выполняется.
+        "max_zero_share": max(zero_ratios.values(), default=float("nan")),
+    }
+
+
+def score_quality_stats(stats: pd.DataFrame, min_missing_share: float = 0.3) -> pd.DataFrame:
+    """
+    ``quality_score`` и булевы флаги для таблицы статистик (по строке на
+    датасет, столбцы - как у ``quality_stats``) одним вызовом.
+    """
+    scores = quality_rules("dataset").evaluate(stats, min_missing_share=min_missing_share)
+    return pd.DataFrame(scores, index=stats.index)
+
 
+@traced
+def quality_flags_from_stats(
+    summary: DatasetSummary,
+    missing_df: pd.DataFrame,
+    num_duplicate_rows: int,
+    zero_ratios: Dict[str, float],
+    min_missing_share: float = 0.3,
+) -> Dict[str, Any]:
+    """
+    Те же эвристики, что и в ``compute_quality_flags``, но по заранее
+    посчитанным статистикам (число дубликатов, доли нулей по числовым колонкам).
+    Позволяет получить флаги без целого DataFrame в памяти. Пороги и штрафы -
+    набор правил ``dataset`` (``eda_cli.rules``).
+    """
+    stats = quality_stats(summary, missing_df, num_duplicate_rows, zero_ratios)
+    values: Dict[str, Any] = quality_rules("dataset").score_one(stats, min_missing_share=min_missing_share)
+    values.update(
+        max_missing_share=stats["max_missing_share"],
+        num_duplicate_rows=num_duplicate_rows,
+        duplicate_rows_share=stats["duplicate_rows_share"],
+        zero_ratios=zero_ratios,
+    )
+    score = values.pop("quality_score")
+    flags = {key: values.pop(key) for key in _QUALITY_FLAG_ORDER if key in values}
+    flags.update(values)
+    flags["quality_score"] = score
     return flags
 
 
+def summary_columns(summary: DatasetSummary) -> Dict[str, np.ndarray]:
+    """
+    Сводка по колонкам в колоночном виде: поле -> массив длины ``n_cols``
+    (``SUMMARY_FIELDS``, без ``example_values``). None в числовых полях -
+    NaN. Из этих массивов строятся и табличка для вывода, и выгрузка
+    в Parquet/Arrow (``eda_cli.export``).
+    """
+    return summary.arrays()
+
+
 def flatten_summary_for_print(summary: DatasetSummary) -> pd.DataFrame:
     """
     Превращает DatasetSummary в табличку для более удобного вывода.
     """
-    rows: List[Dict[str, Any]] = []
-    for col in summary.columns:
-        rows.append(
-            {
-                "name": col.name,
-                "dtype": col.dtype,
-                "non_null": col.non_null,
-                "missing": col.missing,
-                "missing_share": col.missing_share,
-                "unique": col.unique,
-                "is_numeric": col.is_numeric,
-                "min": col.min,
-                "max": col.max,
-                "mean": col.mean,
-                "std": col.std,
-            }
-        )
-    return pd.DataFrame(rows)
+    data = summary_columns(summary)
+    # Столбец ошибки появляется только в приближённом режиме.
+    if np.isnan(data["unique_error"]).all():
+        del data["unique_error"]
+    return pd.DataFrame(data)
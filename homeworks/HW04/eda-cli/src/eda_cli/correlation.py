@@ -0,0 +1,332 @@
+"""
+Корреляция Пирсона по накопленным со-моментам.
+
+Корреляция считается «попарно по полным строкам», как ``DataFrame.corr``:
+для пары колонок берутся строки, где обе непустые. Вместо цикла по парам
+для каждого блока строк считаются несколько матричных произведений (BLAS)
+над центрированными значениями и масками непустых значений:
+
+- ``N = Mᵀ M`` - число строк, где непусты обе колонки пары;
+- ``Xᵀ M`` - сумма значений одной колонки по строкам, где непуста другая;
+- ``Xᵀ X`` и ``(X²)ᵀ M`` - суммы произведений и квадратов.
+
+Из них получаются средние, со-момент и суммы квадратов отклонений по каждой
+паре, а блоки строк объединяются по формулам Чана. Поэтому один и тот же
+накопитель работает и для таблицы в памяти (блоками строк), и в потоковом
+режиме (по чанкам), а ``top_pairs`` находит самые сильно коррелирующие
+пары широкой таблицы, не держа в памяти всю матрицу p x p.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Сколько строк обрабатывать за одно матричное произведение.
+DEFAULT_BLOCK_ROWS = 65_536
+
+# Сколько колонок брать в левый блок при поиске top-пар.
+DEFAULT_BLOCK_COLUMNS = 256
+
+TOP_PAIRS_COLUMNS = ["left", "right", "r", "n"]
+
+
+class PairStats:
+    """
+    Со-моменты для всех пар (левая колонка, правая колонка): число общих
+    непустых строк ``n``, средние обеих колонок по этим строкам, со-момент и
+    суммы квадратов отклонений. Матрицы размера (левых колонок x правых).
+    """
+
+    def __init__(self, n_left: int, n_right: int) -> None:
+        shape = (n_left, n_right)
+        self.n = np.zeros(shape)
+        self.mean_left = np.zeros(shape)
+        self.mean_right = np.zeros(shape)
+        self.comoment = np.zeros(shape)
+        self.ssq_left = np.zeros(shape)
+        self.ssq_right = np.zeros(shape)
+
+    @classmethod
+    def from_block(
+        cls,
+        left: np.ndarray,
+        right: Optional[np.ndarray] = None,
+        dtype: type = np.float64,
+    ) -> "PairStats":
+        """
+        Статистики по одному блоку строк. ``left``/``right`` - float-массивы
+        (строки x колонки) с NaN на месте пропусков; без ``right`` - пары
+        колонок ``left`` между собой.
+        """
+        xl, ml, shift_left = _center(left, dtype)
+        if right is None:
+            xr, mr, shift_right = xl, ml, shift_left
+        else:
+            xr, mr, shift_right = _center(right, dtype)
+
+        stats = cls(xl.shape[1], xr.shape[1])
+        n_rows = xl.shape[0]
+        if ml.all() and mr.all():
+            # Пропусков нет: суммы по парам - это суммы по колонкам.
+            n = np.full(stats.n.shape, float(n_rows))
+            sum_left = np.broadcast_to(xl.sum(axis=0, dtype=np.float64)[:, None], n.shape)
+            sum_right = np.broadcast_to(xr.sum(axis=0, dtype=np.float64)[None, :], n.shape)
+            sq_left = np.broadcast_to(
+                np.einsum("ij,ij->j", xl, xl, dtype=np.float64)[:, None], n.shape
+            )
+            sq_right = np.broadcast_to(
+                np.einsum("ij,ij->j", xr, xr, dtype=np.float64)[None, :], n.shape
+            )
+        else:
+            mlf = ml.astype(dtype)
+            mrf = mlf if right is None else mr.astype(dtype)
+            n = (mlf.T @ mrf).astype(np.float64)
+            sum_left = (xl.T @ mrf).astype(np.float64)
+            sum_right = sum_left.T if right is None else (mlf.T @ xr).astype(np.float64)
+            sq_left = ((xl * xl).T @ mrf).astype(np.float64)
+            sq_right = sq_left.T if right is None else (mlf.T @ (xr * xr)).astype(np.float64)
+        products = (xl.T @ xr).astype(np.float64)
+
+        safe_n = np.where(n > 0, n, 1.0)
+        stats.n = n
+        stats.mean_left = shift_left[:, None] + sum_left / safe_n
+        stats.mean_right = shift_right[None, :] + sum_right / safe_n
+        stats.comoment = products - sum_left * sum_right / safe_n
+        stats.ssq_left = np.maximum(sq_left - sum_left * sum_left / safe_n, 0.0)
+        stats.ssq_right = np.maximum(sq_right - sum_right * sum_right / safe_n, 0.0)
+        return stats
+
+    def merge(
+        self,
+        other: "PairStats",
+        left: Optional[Sequence[int]] = None,
+        right: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        Влить статистики другого блока строк (формулы Чана). ``left``/``right`` -
+        позиции его колонок в этом накопителе (по умолчанию - те же колонки).
+        """
+        if left is None or right is None:
+            idx: Any = (slice(None), slice(None))
+        else:
+            idx = np.ix_(left, right)
+        n_a = self.n[idx]
+        n_b = other.n
+        n = n_a + n_b
+        safe_n = np.where(n > 0, n, 1.0)
+        delta_left = other.mean_left - self.mean_left[idx]
+        delta_right = other.mean_right - self.mean_right[idx]
+        weight = n_a * n_b / safe_n
+
+        self.comoment[idx] += other.comoment + delta_left * delta_right * weight
+        self.ssq_left[idx] += other.ssq_left + delta_left * delta_left * weight
+        self.ssq_right[idx] += other.ssq_right + delta_right * delta_right * weight
+        self.mean_left[idx] += delta_left * n_b / safe_n
+        self.mean_right[idx] += delta_right * n_b / safe_n
+        self.n[idx] = n
+
+    def correlation(self) -> np.ndarray:
+        """
+        Коэффициенты Пирсона; NaN, если у пары нет общих строк или одна из
+        колонок на них постоянна.
+        """
+        denominator = np.sqrt(self.ssq_left * self.ssq_right)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = np.where(denominator > 0, self.comoment / denominator, np.nan)
+        return np.clip(r, -1.0, 1.0)
+
+
+def _center(block: np.ndarray, dtype: type) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Центрировать колонки блока по их средним (пропуски -> 0).
+    Возвращает центрированный блок, маску непустых значений и средние.
+    """
+    mask = ~np.isnan(block)
+    counts = mask.sum(axis=0)
+    zero_filled = np.where(mask, block, 0.0)
+    means = np.divide(
+        zero_filled.sum(axis=0), counts, out=np.zeros(block.shape[1]), where=counts > 0
+    )
+    centered = np.where(mask, zero_filled - means, 0.0).astype(dtype, copy=False)
+    return centered, mask, means
+
+
+class CorrelationAccumulator:
+    """
+    Накопитель корреляции по блокам строк (чанкам) для ``n_columns`` колонок.
+
+    Использование::
+
+        acc = CorrelationAccumulator(n_columns)
+        for block, positions in blocks:
+            acc.update(block, positions)
+        r = acc.matrix()
+
+    ``dtype=np.float32`` ускоряет матричные произведения ценой точности
+    (порядка 1e-6); суммы между блоками всегда копятся в float64.
+    """
+
+    def __init__(self, n_columns: int, dtype: type = np.float64) -> None:
+        self.n_columns = n_columns
+        self.dtype = dtype
+        self.stats = PairStats(n_columns, n_columns)
+
+    def update(self, block: np.ndarray, positions: Optional[Sequence[int]] = None) -> None:
+        """
+        Добавить блок строк: float-массив (строки x колонки) с NaN на месте
+        пропусков. ``positions`` - номера его колонок среди всех колонок
+        накопителя (колонки, которых в блоке нет, считаются пустыми).
+        """
+        if block.shape[0] == 0 or block.shape[1] == 0:
+            return
+        stats = PairStats.from_block(block, dtype=self.dtype)
+        if positions is None or list(positions) == list(range(self.n_columns)):
+            self.stats.merge(stats)
+        else:
+            self.stats.merge(stats, positions, positions)
+
+    def merge(self, other: "CorrelationAccumulator") -> None:
+        self.stats.merge(other.stats)
+
+    def matrix(self, positions: Optional[Sequence[int]] = None) -> np.ndarray:
+        r = self.stats.correlation()
+        # Матричные произведения симметричны лишь с точностью до округления.
+        r = (r + r.T) / 2
+        diagonal = np.diag(r).copy()
+        np.fill_diagonal(r, np.where(np.isnan(diagonal), np.nan, 1.0))
+        if positions is not None:
+            r = r[np.ix_(positions, positions)]
+        return r
+
+    def top_pairs(self, names: Sequence[object], k: int = 20, positions: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        ``k`` пар колонок с наибольшим |r| (``positions`` - какие колонки
+        учитывать, ``names`` - их имена).
+        """
+        positions = list(range(self.n_columns)) if positions is None else list(positions)
+        idx = np.ix_(positions, positions)
+        r = self.matrix()[idx]
+        n = self.stats.n[idx]
+        heap: List[Tuple[float, int, int, float, float]] = []
+        _push_top_pairs(heap, r, n, 0, 0, k)
+        return _top_pairs_frame(heap, names)
+
+
+def accumulate(
+    numeric_df: pd.DataFrame,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    dtype: type = np.float64,
+) -> CorrelationAccumulator:
+    """
+    Накопитель по всем строкам таблицы (блоками по ``block_rows``): из него
+    берутся и матрица, и top-пары без повторного прохода по данным.
+    """
+    acc = CorrelationAccumulator(numeric_df.shape[1], dtype=dtype)
+    for start in range(0, len(numeric_df), block_rows):
+        block = numeric_df.iloc[start : start + block_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+        acc.update(block)
+    return acc
+
+
+def correlation_matrix(
+    numeric_df: pd.DataFrame,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    dtype: type = np.float64,
+) -> pd.DataFrame:
+    """
+    Матрица корреляции Пирсона для числовых колонок (как ``DataFrame.corr``).
+    """
+    columns = numeric_df.columns
+    acc = accumulate(numeric_df, block_rows, dtype)
+    return pd.DataFrame(acc.matrix(), index=columns, columns=columns)
+
+
+def top_pairs(
+    numeric_df: pd.DataFrame,
+    k: int = 20,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    block_columns: int = DEFAULT_BLOCK_COLUMNS,
+    dtype: type = np.float64,
+) -> pd.DataFrame:
+    """
+    ``k`` пар числовых колонок с наибольшим |r| (столбцы left, right, r, n).
+
+    Колонки обрабатываются полосами по ``block_columns``: полоса
+    коррелируется со всеми колонками правее, поэтому в памяти одновременно
+    только ``block_columns x p`` коэффициентов, а не вся матрица p x p.
+    """
+    names = list(numeric_df.columns)
+    p = len(names)
+    heap: List[Tuple[float, int, int, float, float]] = []
+    for start in range(0, p, block_columns):
+        stop = min(p, start + block_columns)
+        stats: Optional[PairStats] = None
+        for row_start in range(0, len(numeric_df), block_rows):
+            block = numeric_df.iloc[row_start : row_start + block_rows, start:].to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+            part = PairStats.from_block(block[:, : stop - start], block, dtype=dtype)
+            if stats is None:
+                stats = part
+            else:
+                stats.merge(part)
+        if stats is None:
+            break
+        _push_top_pairs(heap, stats.correlation(), stats.n, start, start, k)
+    return _top_pairs_frame(heap, names)
+
+
+def matrix_top_pairs(corr: pd.DataFrame, n: np.ndarray, k: int = 20) -> pd.DataFrame:
+    """
+    ``k`` пар с наибольшим |r| по уже посчитанной матрице ``corr``
+    (``n`` - число общих непустых строк каждой пары).
+    """
+    heap: List[Tuple[float, int, int, float, float]] = []
+    _push_top_pairs(heap, corr.to_numpy(dtype=np.float64), n, 0, 0, k)
+    return _top_pairs_frame(heap, list(corr.columns))
+
+
+def _push_top_pairs(
+    heap: List[Tuple[float, int, int, float, float]],
+    r: np.ndarray,
+    n: np.ndarray,
+    row_offset: int,
+    col_offset: int,
+    k: int,
+) -> None:
+    """
+    Добавить в кучу (минимум по |r| на вершине) лучшие пары блока ``r``;
+    учитываются только пары выше диагонали.
+    """
+    if k <= 0 or r.size == 0:
+        return
+    rows = np.arange(r.shape[0])[:, None] + row_offset
+    cols = np.arange(r.shape[1])[None, :] + col_offset
+    strength = np.where((cols > rows) & ~np.isnan(r), np.abs(r), -1.0)
+    flat = strength.ravel()
+    take = min(k, flat.size)
+    best = np.argpartition(flat, flat.size - take)[flat.size - take :]
+    for index in best:
+        if flat[index] < 0:
+            continue
+        i, j = divmod(int(index), r.shape[1])
+        item = (float(flat[index]), i + row_offset, j + col_offset, float(r[i, j]), float(n[i, j]))
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+
+def _top_pairs_frame(
+    heap: List[Tuple[float, int, int, float, float]],
+    names: Sequence[object],
+) -> pd.DataFrame:
+    rows = [
+        {"left": names[i], "right": names[j], "r": r, "n": int(n)}
+        for _, i, j, r, n in sorted(heap, key=lambda item: (-item[0], item[1], item[2]))
+    ]
+    return pd.DataFrame(rows, columns=TOP_PAIRS_COLUMNS)
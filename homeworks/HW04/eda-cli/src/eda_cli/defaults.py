@@ -0,0 +1,23 @@
+"""
+Значения по умолчанию, общие для CLI и модулей расчёта.
+
+Модуль без тяжёлых зависимостей: CLI строит по нему опции команд, не
+импортируя pandas и matplotlib (см. ``cli``). Модули расчёта импортируют
+константы отсюда, поэтому прежние имена (``core.DEFAULT_MISSING_BINS``,
+``streaming.DEFAULT_CHUNKSIZE`` и т.п.) тоже доступны.
+"""
+
+# Методы ``core.correlation_matrix``.
+CORRELATION_METHODS = ("pearson", "spearman", "kendall", "association")
+
+# Сколько блоков строк по умолчанию в матрице пропусков.
+DEFAULT_MISSING_BINS = 256
+
+# Размер выборки строк по умолчанию для ранговых методов и мер связи.
+DEFAULT_SAMPLE_ROWS = 100_000
+
+# Размер чанка по умолчанию (в строках).
+DEFAULT_CHUNKSIZE = 100_000
+
+# Файлы больше этого порога CLI профилирует в потоковом режиме автоматически.
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
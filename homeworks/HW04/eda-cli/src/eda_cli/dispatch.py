@@ -0,0 +1,121 @@
+"""
+Ограниченный пул для тяжёлых (CPU-bound) задач HTTP-сервиса.
+
+Парсинг CSV и профилирование нельзя выполнять прямо в ``async``-обработчике:
+пока они идут, event loop не обслуживает другие запросы (включая ``/health``).
+``BoundedExecutor`` выполняет такие задачи в пуле потоков с ограничением
+одновременно выполняемых (``max_concurrency``) и ожидающих (``max_queue``)
+задач. Если всё занято, задача сразу отклоняется с ``SaturatedError`` -
+сервис отвечает 503 вместо того, чтобы копить очередь без конца.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Вес нового наблюдения в скользящем среднем времени выполнения задачи.
+_EWMA_ALPHA = 0.2
+
+
+class SaturatedError(Exception):
+    """
+    Пул занят: все слоты выполнения и очереди заняты.
+    ``retry_after`` - рекомендуемая пауза перед повтором, секунды.
+    """
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Сервис перегружен, повторите запрос позже.")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Пул потоков с ограниченной очередью.
+
+    ``run`` возвращает результат функции и время ожидания в очереди (мс).
+    Слот освобождается, когда функция завершилась, даже если клиент
+    отключился раньше: так лимит отражает реальную загрузку пула.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 8) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="eda-profiling"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._avg_run_s = 1.0
+
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_concurrency + self.max_queue
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> Tuple[T, float]:
+        return await self.submit(fn, *args)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "asyncio.Future[Tuple[T, float]]":
+        """
+        Поставить задачу в пул и сразу вернуть future (вызывать из event loop).
+        В отличие от ``run``, ``SaturatedError`` бросается сразу при вызове -
+        удобно, когда до ожидания результата нужно сделать что-то ещё
+        (например, передавать задаче данные по мере их поступления).
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise SaturatedError(self._retry_after())
+            self._in_flight += 1
+
+        submitted = perf_counter()
+
+        def call() -> Tuple[T, float]:
+            started = perf_counter()
+            try:
+                return fn(*args), (started - submitted) * 1000.0
+            finally:
+                self._release(perf_counter() - started)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self._executor, call)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_run_ms": self._avg_run_s * 1000.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _release(self, run_s: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+            self._avg_run_s += _EWMA_ALPHA * (run_s - self._avg_run_s)
+
+    def _retry_after(self) -> int:
+        # Вызывается под self._lock: сколько примерно нужно, чтобы пул
+        # разгрёб текущую очередь.
+        waves = self._in_flight / self.max_concurrency
+        return max(1, math.ceil(waves * self._avg_run_s))
@@ -0,0 +1,242 @@
+"""
+Компактные типы колонок при загрузке таблицы.
+
+По умолчанию ``pd.read_csv`` хранит числа в int64/float64, а строки -
+Python-объектами, что на таблицах с категориальными признаками в разы
+увеличивает память. Здесь:
+
+- строковые колонки читаются сразу с явным ``dtype=``: ``category`` для
+  колонок с небольшим числом различных значений, ``string[pyarrow]`` для
+  остальных (если установлен pyarrow). Типы выводятся по первым строкам файла;
+- целые колонки после чтения сжимаются до int8/16/32 по фактическим
+  min/max всей колонки. По выборке это делать нельзя: ``read_csv`` с
+  ``dtype=int8`` молча переполняет значения, не попавшие в диапазон;
+- float32 - только по явному запросу и только для колонок, где все
+  значения представимы в float32 без потерь.
+
+Статистики ``summarize_dataset`` при этом не меняются (кроме поля ``dtype``):
+значения колонок остаются теми же.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+# Сколько первых строк файла использовать для вывода строковых типов.
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Колонка становится category, если различных значений в выборке не больше
+# этой доли от непустых (и не больше _MAX_CATEGORIES).
+DEFAULT_CATEGORY_MAX_SHARE = 0.5
+_MAX_CATEGORIES = 32_767
+
+_INT_TYPES = (np.int8, np.int16, np.int32)
+
+
+@dataclass
+class MemoryReport:
+    """
+    Память таблицы до и после подбора типов.
+
+    ``columns`` - по колонкам: dtype_before, dtype_after, bytes_before,
+    bytes_after. ``bytes_before`` для строковых колонок - оценка по выборке
+    (целиком в типах по умолчанию таблица не читалась).
+    """
+
+    columns: pd.DataFrame
+
+    @property
+    def bytes_before(self) -> int:
+        return int(self.columns["bytes_before"].sum())
+
+    @property
+    def bytes_after(self) -> int:
+        return int(self.columns["bytes_after"].sum())
+
+    def format(self) -> str:
+        saved = 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0.0
+        return (
+            f"Память: {_format_bytes(self.bytes_before)} -> "
+            f"{_format_bytes(self.bytes_after)} (экономия {saved:.0%})"
+        )
+
+
+def _format_bytes(n_bytes: float) -> str:
+    if n_bytes < 1024:
+        return f"{int(n_bytes)} Б"
+    for unit in ("КБ", "МБ"):
+        n_bytes /= 1024
+        if n_bytes < 1024:
+            return f"{n_bytes:.1f} {unit}"
+    return f"{n_bytes / 1024:.1f} ГБ"
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def infer_string_dtypes(
+    sample: pd.DataFrame,
+    category_max_share: float = DEFAULT_CATEGORY_MAX_SHARE,
+    arrow_strings: bool = True,
+) -> Dict[Any, Any]:
+    """
+    Карта ``dtype=`` для строковых колонок выборки. Колонки, где встречаются
+    не только строки (или нет ни одного значения), не трогаем.
+    """
+    use_arrow = arrow_strings and _has_pyarrow()
+    result: Dict[Any, Any] = {}
+    for name, s in sample.items():
+        if not ptypes.is_object_dtype(s.dtype):
+            continue
+        values = s.dropna()
+        if values.empty or not all(isinstance(v, str) for v in values):
+            continue
+        n_unique = values.nunique()
+        if n_unique <= _MAX_CATEGORIES and n_unique <= category_max_share * len(values):
+            result[name] = "category"
+        elif use_arrow:
+            result[name] = "string[pyarrow]"
+    return result
+
+
+def _compact_integer(s: pd.Series) -> pd.Series:
+    if s.empty:
+        return s
+    lo, hi = s.min(), s.max()
+    for int_type in _INT_TYPES:
+        info = np.iinfo(int_type)
+        if np.dtype(int_type).itemsize >= s.dtype.itemsize:
+            break
+        if info.min <= lo and hi <= info.max:
+            return s.astype(int_type)
+    return s
+
+
+def _compact_float(s: pd.Series) -> pd.Series:
+    values = s.to_numpy()
+    with np.errstate(over="ignore"):
+        as_float32 = values.astype(np.float32)
+    # Только если все значения (включая inf) переживают float32 без потерь.
+    same = (as_float32.astype(np.float64) == values) | np.isnan(values)
+    if bool(same.all()):
+        return pd.Series(as_float32, index=s.index, name=s.name)
+    return s
+
+
+def compact_numeric(df: pd.DataFrame, allow_float32: bool = False) -> pd.DataFrame:
+    """
+    Сжать числовые колонки по фактическим значениям (на месте, колонка за
+    колонкой, чтобы не держать две копии таблицы).
+    """
+    for name in list(df.columns):
+        s = df[name]
+        dtype = s.dtype
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype.kind == "i" and dtype.itemsize > 1:
+            compacted = _compact_integer(s)
+        elif dtype.kind == "f" and dtype.itemsize > 4 and allow_float32:
+            compacted = _compact_float(s)
+        else:
+            continue
+        if compacted is not s:
+            df[name] = compacted
+    return df
+
+
+def _bytes_per_column(df: pd.DataFrame) -> pd.Series:
+    return df.memory_usage(deep=True, index=False)
+
+
+def _report(
+    before_dtypes: pd.Series,
+    before_bytes: pd.Series,
+    df: pd.DataFrame,
+) -> MemoryReport:
+    columns = pd.DataFrame(
+        {
+            "dtype_before": before_dtypes.astype(str),
+            "dtype_after": df.dtypes.astype(str),
+            "bytes_before": before_bytes.round().astype(np.int64),
+            "bytes_after": _bytes_per_column(df).astype(np.int64),
+        }
+    )
+    columns.index.name = "column"
+    return MemoryReport(columns=columns)
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    allow_float32: bool = False,
+    category_max_share: float = DEFAULT_CATEGORY_MAX_SHARE,
+    arrow_strings: bool = True,
+) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Подобрать компактные типы для уже загруженной таблицы (например, из
+    Parquet/Feather). Пиковая память - исходная таблица плюс одна колонка.
+    """
+    before_dtypes = df.dtypes
+    before_bytes = _bytes_per_column(df).astype(np.float64)
+    string_dtypes = infer_string_dtypes(df, category_max_share, arrow_strings)
+    for name, dtype in string_dtypes.items():
+        df[name] = df[name].astype(dtype)
+    compact_numeric(df, allow_float32)
+    return df, _report(before_dtypes, before_bytes, df)
+
+
+def read_csv_compact(
+    source: Union[str, BinaryIO, Any],
+    sep: str = ",",
+    encoding: str = "utf-8",
+    usecols: Optional[Sequence[str]] = None,
+    nrows: Optional[int] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    allow_float32: bool = False,
+    category_max_share: float = DEFAULT_CATEGORY_MAX_SHARE,
+    arrow_strings: bool = True,
+) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Прочитать CSV с компактными типами и отчётом о памяти.
+
+    Сначала читаются первые ``sample_rows`` строк с типами по умолчанию,
+    по ним строится карта ``dtype=`` для строковых колонок; затем файл
+    читается целиком с этой картой, после чего сжимаются числовые колонки.
+    """
+    position = source.tell() if hasattr(source, "tell") else None
+    sample_size = sample_rows if nrows is None else min(sample_rows, nrows)
+    sample = pd.read_csv(
+        source, sep=sep, encoding=encoding, usecols=usecols, nrows=sample_size
+    )
+    if position is not None:
+        source.seek(position)
+
+    string_dtypes = infer_string_dtypes(sample, category_max_share, arrow_strings)
+    df = pd.read_csv(
+        source,
+        sep=sep,
+        encoding=encoding,
+        usecols=usecols,
+        nrows=nrows,
+        dtype=string_dtypes or None,
+    )
+
+    # Память «до»: числовые колонки в типах по умолчанию считаются точно,
+    # строковые - по средней длине значения в выборке.
+    before_dtypes = sample.dtypes.reindex(df.columns)
+    sample_bytes = _bytes_per_column(sample).reindex(df.columns)
+    per_row = sample_bytes / max(1, len(sample))
+    before_bytes = per_row * len(df)
+
+    compact_numeric(df, allow_float32)
+    return df, _report(before_dtypes, before_bytes, df)
+
@@ -0,0 +1,272 @@
+"""
+Поиск полных дубликатов строк по 64-битным хэшам строк.
+
+``df.duplicated(keep=False)`` строит групповые ключи по всем колонкам сразу
+и на широких таблицах с миллионами строк оказывается самым дорогим шагом
+``compute_quality_flags``. Здесь каждая строка один раз сворачивается в
+uint64 (векторный хэш по колонкам, см. ``row_hashes``), и дальше работаем
+только с этим массивом:
+
+- ``count_duplicate_rows`` - для таблицы в памяти: кандидаты - строки с
+  повторяющимся хэшем, они сверяются по значениям, поэтому коллизии хэшей
+  не влияют на результат;
+- ``DuplicateCounter`` - для потокового режима: хэши копятся в памяти до
+  бюджета, дальше раскладываются по файлам-разделам на диске (по старшим
+  битам хэша), и дубликаты считаются по одному разделу за раз. В
+  приближённом режиме хранится только выборка строк с наименьшими хэшами
+  фиксированного размера, и число дубликатов оценивается по ней.
+"""
+
+from __future__ import annotations
+
+import math
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .sketches import hash_series
+
+# Константы для комбинирования хэшей колонок в хэш строки.
+_HASH_MULT = np.uint64(0x100000001B3)
+_HASH_NULL = np.uint64(0x9E3779B97F4A7C15)
+
+# Сколько байтов хэшей держать в памяти до выгрузки на диск (8 байт на строку).
+DEFAULT_MEMORY_BYTES = 256 * 1024 * 1024
+
+# Число разделов на диске: при подсчёте в памяти один раздел.
+_PARTITION_BITS = 6
+
+# Минимальный размер выборки хэшей в приближённом режиме.
+_MIN_SAMPLE_SIZE = 1 << 16
+
+_MAX_HASH = np.uint64(np.iinfo(np.uint64).max)
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-битные хэши строк таблицы.
+
+    Хэш считается по каждой колонке отдельно (``sketches.hash_series``),
+    пропуск любого типа даёт одну и ту же константу. Так одна и та же строка
+    получает одинаковый хэш, даже если в разных чанках pandas вывел для
+    колонки разные типы.
+    """
+    acc = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for _, s in df.items():
+            h, null_mask = hash_series(s)
+            h[null_mask] = _HASH_NULL
+            acc = acc * _HASH_MULT ^ h
+    return acc
+
+
+def count_duplicate_rows(df: pd.DataFrame) -> int:
+    """
+    Число строк, у которых есть полный дубликат - то же, что
+    ``int(df.duplicated(keep=False).sum())``.
+    """
+    if len(df) < 2 or df.shape[1] == 0:
+        return int(df.duplicated(keep=False).sum())
+    if df.shape[1] == 1 and df.dtypes.iloc[0] == object:
+        # У одной колонки pandas сравнивает значения хэш-таблицей объектов:
+        # None, NaN, NaT и pd.NA там - разные значения (у нескольких колонок -
+        # одинаковые). Пропуск не совпадает с непустым значением, поэтому
+        # пропуски считаем самим pandas отдельно от остальных строк.
+        s = df.iloc[:, 0]
+        null_mask = s.isna().to_numpy()
+        if null_mask.any():
+            nulls = int(s[null_mask].duplicated(keep=False).sum())
+            return nulls + count_duplicate_rows(df[~null_mask])
+
+    hashes = row_hashes(df)
+    sorted_hashes = np.sort(hashes)
+    repeats = sorted_hashes[1:] == sorted_hashes[:-1]
+    if not repeats.any():
+        return 0
+    repeated_hashes = np.unique(sorted_hashes[1:][repeats])
+    del sorted_hashes, repeats
+
+    # Кандидаты - строки с повторяющимся хэшем; группируем их по хэшу и
+    # сверяем каждую с первой строкой её группы.
+    positions = np.searchsorted(repeated_hashes, hashes).clip(max=len(repeated_hashes) - 1)
+    rows = np.flatnonzero(repeated_hashes[positions] == hashes)
+    candidate_hashes = hashes[rows]
+    del hashes, positions
+    order = np.argsort(candidate_hashes, kind="stable")
+    rows, candidate_hashes = rows[order], candidate_hashes[order]
+
+    starts = np.flatnonzero(np.r_[True, candidate_hashes[1:] != candidate_hashes[:-1]])
+    sizes = np.diff(np.r_[starts, len(rows)])
+    group_ids = np.repeat(np.arange(len(starts)), sizes)
+    firsts = rows[starts][group_ids]
+    same = np.ones(len(rows), dtype=bool)
+    for _, s in df.items():
+        values = s.to_numpy()
+        a, b = values[rows], values[firsts]
+        same &= (a == b) | (pd.isna(a) & pd.isna(b))
+
+    collided = np.zeros(len(starts), dtype=bool)
+    collided[group_ids[~same]] = True
+    count = int(sizes[~collided].sum())
+    if collided.any():
+        # Редкий случай коллизии хэшей: такие группы проверяем напрямую.
+        collided_rows = np.sort(rows[collided[group_ids]])
+        count += int(df.iloc[collided_rows].duplicated(keep=False).sum())
+    return count
+
+
+def sample_size_for_error(rel_error: float) -> int:
+    """
+    Размер выборки хэшей для приближённого режима с заданной ошибкой.
+    """
+    return max(_MIN_SAMPLE_SIZE, math.ceil(1.0 / rel_error**2))
+
+
+class DuplicateCounter:
+    """
+    Накопитель хэшей строк для подсчёта дубликатов по частям таблицы.
+
+    - ``max_memory_bytes`` - сколько хэшей держать в памяти; сверх этого
+      они выгружаются в разделы во временном каталоге (``spill_dir`` -
+      где его создать, по умолчанию системный);
+    - ``sample_size`` - приближённый режим: хранить не больше стольких
+      хэшей, оставляя строки с хэшем не больше порога (порог уменьшается
+      вдвое при переполнении). Дубликаты строки имеют тот же хэш, поэтому
+      попадают в выборку вместе с ней, и число дубликатов в выборке,
+      делённое на долю выборки, - несмещённая оценка.
+
+    Результат точен (с точностью до коллизий 64-битного хэша), пока
+    выборка не переполнялась.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        spill_dir: Optional[str] = None,
+        sample_size: Optional[int] = None,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self.sample_size = sample_size
+        self.threshold = _MAX_HASH
+        self.n_rows = 0
+
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+        self._spill: Optional[tempfile.TemporaryDirectory] = None
+        self._count: Optional[int] = None
+
+    @property
+    def sample_rate(self) -> float:
+        return (int(self.threshold) + 1) / 2.0**64
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill is not None
+
+    def add(self, hashes: np.ndarray) -> None:
+        self.n_rows += len(hashes)
+        self._count = None
+        if self.sample_size is not None and self.threshold != _MAX_HASH:
+            hashes = hashes[hashes <= self.threshold]
+        self._buffer.append(hashes)
+        self._buffered += len(hashes)
+
+        if self.sample_size is not None:
+            if self._buffered > self.sample_size:
+                self._shrink_sample()
+        elif self._buffered * 8 > self.max_memory_bytes:
+            self._spill_buffer()
+
+    def merge(self, other: "DuplicateCounter") -> None:
+        """
+        Добавить хэши другого накопителя (например, по другой части файла).
+        """
+        n_rows = self.n_rows + other.n_rows
+        if self.sample_size is not None and other.threshold < self.threshold:
+            self.threshold = other.threshold
+            self._buffer = [h[h <= self.threshold] for h in self._buffer]
+            self._buffered = sum(len(h) for h in self._buffer)
+        for hashes in other._iter_hashes():
+            self.add(hashes)
+        self.n_rows = n_rows
+
+    def count(self) -> int:
+        """
+        Число строк, у которых есть полный дубликат (оценка в приближённом
+        режиме).
+        """
+        if self._count is None:
+            if self._spill is not None:
+                self._spill_buffer()
+            duplicates = sum(_duplicated_in(hashes) for hashes in self._iter_groups())
+            if self.threshold != _MAX_HASH:
+                duplicates = min(self.n_rows, round(duplicates / self.sample_rate))
+            self._count = int(duplicates)
+        return self._count
+
+    # ---------- выборка ----------
+
+    def _shrink_sample(self) -> None:
+        assert self.sample_size is not None
+        hashes = np.concatenate(self._buffer)
+        while len(hashes) > self.sample_size and self.threshold > 0:
+            self.threshold = self.threshold >> np.uint64(1)
+            hashes = hashes[hashes <= self.threshold]
+        self._buffer = [hashes]
+        self._buffered = len(hashes)
+
+    # ---------- разделы на диске ----------
+
+    def _partition_path(self, p: int) -> Path:
+        assert self._spill is not None
+        return Path(self._spill.name) / f"part-{p:03d}.u64"
+
+    def _spill_buffer(self) -> None:
+        if not self._buffer:
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryDirectory(prefix="eda-duplicates-", dir=self.spill_dir)
+        hashes = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        partitions = (hashes >> np.uint64(64 - _PARTITION_BITS)).astype(np.intp)
+        order = np.argsort(partitions, kind="stable")
+        hashes, partitions = hashes[order], partitions[order]
+        bounds = np.searchsorted(partitions, np.arange((1 << _PARTITION_BITS) + 1))
+        for p in range(1 << _PARTITION_BITS):
+            start, stop = bounds[p], bounds[p + 1]
+            if start < stop:
+                with open(self._partition_path(p), "ab") as f:
+                    hashes[start:stop].tofile(f)
+
+    def _iter_groups(self) -> Iterator[np.ndarray]:
+        """
+        Наборы хэшей, внутри которых и ищутся дубликаты: разделы на диске
+        или весь буфер в памяти.
+        """
+        if self._spill is None:
+            if self._buffer:
+                self._buffer = [np.concatenate(self._buffer)]
+                yield self._buffer[0]
+            return
+        for p in range(1 << _PARTITION_BITS):
+            path = self._partition_path(p)
+            if path.exists():
+                yield np.fromfile(path, dtype=np.uint64)
+
+    def _iter_hashes(self) -> Iterator[np.ndarray]:
+        yield from self._iter_groups()
+        if self._spill is not None:
+            yield from self._buffer
+
+
+def _duplicated_in(hashes: np.ndarray) -> int:
+    if len(hashes) < 2:
+        return 0
+    _, counts = np.unique(hashes, return_counts=True)
+    return int(counts[counts > 1].sum())
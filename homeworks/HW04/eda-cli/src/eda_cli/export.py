@@ -0,0 +1,151 @@
+"""
+Выгрузка сводки по колонкам (``DatasetSummary``) без промежуточных
+строк-словарей.
+
+- ``summary_table`` - таблица Arrow прямо из колоночных массивов
+  ``core.summary_columns``; ``write_summary`` пишет её в Parquet или
+  Feather (Arrow IPC), CSV - как раньше, через pandas. Размеры датасета
+  хранятся в метаданных схемы (``n_rows``, ``n_cols``);
+- ``iter_summary_ndjson`` - NDJSON по частям: первая строка - размеры
+  датасета, дальше по строке на колонку (поля - как в
+  ``ColumnSummary.to_dict``). Колонки сериализуются блоками, так что
+  длинный список колонок не собирается в один JSON-документ.
+
+Для Parquet и Feather нужен pyarrow (``pip install "eda-cli[arrow]"``).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .core import DatasetSummary, flatten_summary_for_print, summary_columns
+from .loaders import _require_pyarrow
+
+SUMMARY_FORMATS = ("csv", "parquet", "feather")
+
+# Сколько колонок сводки сериализуется в одну часть NDJSON.
+NDJSON_BATCH_COLUMNS = 1000
+
+# Поля строки NDJSON - в порядке ``ColumnSummary.to_dict``.
+_NDJSON_FIELDS = (
+    "name",
+    "dtype",
+    "non_null",
+    "missing",
+    "missing_share",
+    "unique",
+    "example_values",
+    "is_numeric",
+    "min",
+    "max",
+    "mean",
+    "std",
+    "unique_error",
+)
+
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+
+
+def summary_table(summary: DatasetSummary) -> Any:
+    """
+    Сводка как ``pyarrow.Table``: столбец на поле ``SUMMARY_FIELDS`` (NaN -
+    null) и ``example_values`` - список строк.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+
+    arrays = {
+        field: pa.array(values, from_pandas=True)
+        for field, values in summary_columns(summary).items()
+    }
+    arrays["example_values"] = pa.array(summary.example_values(), type=pa.list_(pa.string()))
+    table = pa.table(arrays)
+    return table.replace_schema_metadata(
+        {"n_rows": str(summary.n_rows), "n_cols": str(summary.n_cols)}
+    )
+
+
+def summary_format(path: Union[str, Path], fmt: Optional[str] = None) -> str:
+    """
+    Формат выгрузки: явно заданный ``fmt``, иначе по расширению (по умолчанию CSV).
+    """
+    if fmt is not None:
+        if fmt not in SUMMARY_FORMATS:
+            raise ValueError(
+                f"Неизвестный формат сводки '{fmt}', ожидается один из: {', '.join(SUMMARY_FORMATS)}"
+            )
+        return fmt
+    return _SUFFIX_FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def write_summary(
+    summary: DatasetSummary,
+    out: Union[str, Path, io.BufferedIOBase],
+    fmt: Optional[str] = None,
+) -> None:
+    """
+    Записать сводку в файл или файловый объект ``out`` в формате ``fmt``
+    (по умолчанию - по расширению пути).
+    """
+    fmt = summary_format(out if isinstance(out, (str, Path)) else "", fmt)
+    if fmt == "csv":
+        flatten_summary_for_print(summary).to_csv(out, index=False)
+        return
+
+    table = summary_table(summary)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, out)
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, out)
+
+
+def summary_bytes(summary: DatasetSummary, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    write_summary(summary, buffer, fmt)
+    return buffer.getvalue()
+
+
+def _json_values(values: np.ndarray) -> List[Any]:
+    if values.dtype == np.float64:
+        # NaN в JSON нет - вместо него null.
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+
+def iter_summary_ndjson(
+    summary: DatasetSummary,
+    batch_columns: int = NDJSON_BATCH_COLUMNS,
+) -> Iterator[bytes]:
+    """
+    Сводка в виде NDJSON частями по ``batch_columns`` колонок.
+    """
+    yield (json.dumps({"n_rows": summary.n_rows, "n_cols": summary.n_cols}) + "\n").encode("utf-8")
+
+    batch_columns = max(1, batch_columns)
+    data = summary_columns(summary)
+    for start in range(0, len(summary.columns), batch_columns):
+        stop = start + batch_columns
+        batch: Dict[str, List[Any]] = {
+            field: _json_values(values[start:stop]) for field, values in data.items()
+        }
+        batch["example_values"] = summary.example_values(start, stop)
+        lines = [
+            json.dumps(dict(zip(_NDJSON_FIELDS, row)), ensure_ascii=False)
+            for row in zip(*(batch[field] for field in _NDJSON_FIELDS))
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
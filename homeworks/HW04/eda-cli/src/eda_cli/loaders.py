@@ -0,0 +1,406 @@
+"""
+Чтение таблиц разных форматов: CSV, Parquet и Arrow IPC/Feather.
+
+Колоночные форматы читаются через pyarrow (необязательная зависимость,
+``pip install "eda-cli[arrow]"``), при этом:
+
+- ``columns`` - проекция: читаются только нужные колонки (в Parquet/Feather
+  остальные колонки не декодируются);
+- ``nrows`` - только первые строки (Parquet - первая порция строк,
+  Feather v2 - первые record batch'и, а не весь файл);
+- ``parquet_metadata_stats`` - число пропусков, min и max по статистикам
+  row group'ов из метаданных Parquet, без чтения самих данных.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .dtypes import MemoryReport, compact_frame, read_csv_compact
+from .tracing import traced
+
+Source = Union[str, Path, BinaryIO]
+
+FORMATS = ("csv", "parquet", "feather")
+
+_SUFFIXES = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".txt": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+# Сигнатуры в начале файла: Parquet - "PAR1", Arrow IPC (Feather v2) - "ARROW1",
+# Feather v1 - "FEA1".
+_MAGIC = ((b"PAR1", "parquet"), (b"ARROW1", "feather"), (b"FEA1", "feather"))
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "Для чтения Parquet/Feather нужен пакет pyarrow: pip install \"eda-cli[arrow]\""
+        ) from exc
+
+
+def detect_format(source: Source, fmt: Optional[str] = None) -> str:
+    """
+    Формат таблицы: явно заданный ``fmt`` (кроме "auto"), иначе по
+    расширению файла, иначе по первым байтам. По умолчанию - CSV.
+    """
+    if fmt is not None and fmt != "auto":
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат '{fmt}', ожидается один из: {', '.join(FORMATS)}")
+        return fmt
+
+    if isinstance(source, (str, Path)):
+        by_suffix = _SUFFIXES.get(Path(source).suffix.lower())
+        if by_suffix is not None:
+            return by_suffix
+        with open(source, "rb") as f:
+            head = f.read(8)
+    else:
+        position = source.tell()
+        head = source.read(8)
+        source.seek(position)
+
+    for magic, name in _MAGIC:
+        if head.startswith(magic):
+            return name
+    return "csv"
+
+
+@traced
+def load_table(
+    source: Source,
+    fmt: Optional[str] = None,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    nrows: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Прочитать таблицу в DataFrame. ``columns`` задаёт проекцию (и порядок
+    колонок результата), ``nrows`` - сколько первых строк прочитать.
+    """
+    fmt = detect_format(source, fmt)
+    columns = list(columns) if columns is not None else None
+
+    if fmt == "csv":
+        df = pd.read_csv(source, sep=sep, encoding=encoding, usecols=columns, nrows=nrows)
+        # usecols сохраняет порядок колонок файла, а не запрошенный.
+        return df[columns] if columns is not None else df
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        return _load_parquet(source, columns, nrows)
+    return _load_feather(source, columns, nrows)
+
+
+@traced
+def load_table_compact(
+    source: Source,
+    fmt: Optional[str] = None,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    nrows: Optional[int] = None,
+    allow_float32: bool = False,
+) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    ``load_table`` с компактными типами колонок (см. ``eda_cli.dtypes``)
+    и отчётом о памяти. CSV сразу читается с явной картой ``dtype=``,
+    колоночные форматы сжимаются после чтения.
+    """
+    fmt = detect_format(source, fmt)
+    if fmt == "csv":
+        columns = list(columns) if columns is not None else None
+        df, report = read_csv_compact(
+            source,
+            sep=sep,
+            encoding=encoding,
+            usecols=columns,
+            nrows=nrows,
+            allow_float32=allow_float32,
+        )
+        if columns is not None:
+            df = df[columns]
+            report.columns = report.columns.loc[columns]
+        return df, report
+
+    df = load_table(source, fmt=fmt, columns=columns, nrows=nrows)
+    return compact_frame(df, allow_float32=allow_float32)
+
+
+def _load_parquet(
+    source: Source,
+    columns: Optional[List[str]],
+    nrows: Optional[int],
+) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    if nrows is None:
+        return parquet_file.read(columns=columns).to_pandas()
+
+    # Читаем порции, пока не наберётся nrows строк: остальные row group'ы
+    # не декодируются.
+    batches = []
+    remaining = nrows
+    for batch in parquet_file.iter_batches(batch_size=max(1, nrows), columns=columns):
+        batches.append(batch.slice(0, remaining))
+        remaining -= min(remaining, batch.num_rows)
+        if remaining == 0:
+            break
+    if not batches:
+        return parquet_file.schema_arrow.empty_table().select(
+            columns if columns is not None else parquet_file.schema_arrow.names
+        ).to_pandas()
+    return pa.Table.from_batches(batches).to_pandas()
+
+
+def _load_feather(
+    source: Source,
+    columns: Optional[List[str]],
+    nrows: Optional[int],
+) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    if nrows is not None:
+        head = _load_ipc_head(source, columns, nrows)
+        if head is not None:
+            return head
+
+    # memory_map: несжатые колонки, не попавшие в проекцию, даже не читаются с диска.
+    table = feather.read_table(
+        source, columns=columns, memory_map=isinstance(source, (str, Path))
+    )
+    if columns is not None:
+        table = table.select(columns)
+    if nrows is not None:
+        table = table.slice(0, nrows)
+    return table.to_pandas()
+
+
+def _load_ipc_head(
+    source: Source,
+    columns: Optional[List[str]],
+    nrows: int,
+) -> Optional[pd.DataFrame]:
+    """
+    Первые ``nrows`` строк Feather v2 (Arrow IPC): record batch'и читаются,
+    пока строк не хватит, остальные не распаковываются. None - файл не в
+    формате IPC (Feather v1), его читает ``feather.read_table``.
+    """
+    import pyarrow as pa
+
+    reader = _open_ipc(source)
+    if reader is None:
+        return None
+
+    names = columns if columns is not None else reader.schema.names
+    batches = []
+    remaining = nrows
+    for i in range(reader.num_record_batches):
+        if remaining == 0:
+            break
+        batch = reader.get_batch(i).select(names)
+        batches.append(batch.slice(0, remaining))
+        remaining -= min(remaining, batch.num_rows)
+    if not batches:
+        return reader.schema.empty_table().select(names).to_pandas()
+    return pa.Table.from_batches(batches).to_pandas()
+
+
+def _open_ipc(source: Source) -> Any:
+    """
+    Читатель Arrow IPC (Feather v2) поверх memory map, или None для
+    Feather v1 - такой файл читается только целиком через ``feather.read_table``.
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.ipc.open_file(pa.memory_map(str(source)) if isinstance(source, (str, Path)) else source)
+    except pa.ArrowInvalid:
+        if not isinstance(source, (str, Path)):
+            source.seek(0)
+        return None
+
+
+def read_columns(
+    source: Source,
+    fmt: Optional[str] = None,
+    sep: str = ",",
+    encoding: str = "utf-8",
+) -> List[str]:
+    """
+    Имена колонок без чтения данных (для CSV - по строке заголовка).
+    """
+    fmt = detect_format(source, fmt)
+    if fmt == "csv":
+        return list(pd.read_csv(source, sep=sep, encoding=encoding, nrows=0).columns)
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return list(pq.ParquetFile(source).schema_arrow.names)
+
+    import pyarrow.ipc as ipc
+
+    try:
+        return list(ipc.open_file(source).schema.names)
+    except Exception:  # noqa: BLE001
+        # Feather v1 - не IPC-файл, схему даёт только полное чтение.
+        import pyarrow.feather as feather
+
+        return list(feather.read_table(source).schema.names)
+
+
+def count_rows(source: Source, fmt: Optional[str] = None) -> Optional[int]:
+    """
+    Число строк из метаданных колоночного файла; None для CSV
+    (там строки можно только пересчитать, прочитав файл).
+    """
+    fmt = detect_format(source, fmt)
+    if fmt == "csv":
+        return None
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return int(pq.ParquetFile(source).metadata.num_rows)
+
+    reader = _open_ipc(source)
+    if reader is None:
+        import pyarrow.feather as feather
+
+        return int(feather.read_table(source, memory_map=isinstance(source, (str, Path))).num_rows)
+    if hasattr(reader, "count_rows"):
+        # pyarrow >= 21: только метаданные record batch'ей, без их разбора.
+        return int(reader.count_rows())
+    return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def iter_chunks(
+    source: Source,
+    chunksize: int,
+    fmt: Optional[str] = None,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Читать таблицу порциями примерно по ``chunksize`` строк (потоковый режим).
+    """
+    fmt = detect_format(source, fmt)
+    columns = list(columns) if columns is not None else None
+
+    if fmt == "csv":
+        with pd.read_csv(
+            source, sep=sep, encoding=encoding, usecols=columns, chunksize=chunksize
+        ) as reader:
+            for chunk in reader:
+                yield chunk[columns] if columns is not None else chunk
+        return
+
+    _require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    reader = _open_ipc(source)
+    if reader is None:
+        import pyarrow.feather as feather
+
+        table = feather.read_table(
+            source, columns=columns, memory_map=isinstance(source, (str, Path))
+        )
+        if columns is not None:
+            table = table.select(columns)
+        for batch in table.to_batches(max_chunksize=chunksize):
+            yield batch.to_pandas()
+        return
+
+    # По одному record batch'у за раз: в памяти не больше одного batch'а.
+    names = columns if columns is not None else reader.schema.names
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i).select(names)
+        for start in range(0, batch.num_rows, chunksize):
+            yield batch.slice(start, chunksize).to_pandas()
+
+
+def parquet_metadata_stats(source: Source) -> pd.DataFrame:
+    """
+    Статистики колонок Parquet-файла только по метаданным (данные не читаются).
+
+    Индекс - имя колонки; столбцы: ``dtype`` (тип Arrow), ``missing_count``,
+    ``missing_share``, ``min``, ``max``. Если хоть в одном row group'е
+    статистики нет, соответствующее значение - пропуск.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.metadata
+    arrow_schema = parquet_file.schema_arrow
+    n_rows = metadata.num_rows
+
+    # Плоские (не вложенные) колонки: путь в схеме Parquet совпадает с именем.
+    leaf_index = {}
+    for i in range(metadata.num_columns):
+        path = metadata.schema.column(i).path
+        if path in arrow_schema.names:
+            leaf_index[path] = i
+
+    rows = []
+    for name in arrow_schema.names:
+        i = leaf_index.get(name)
+        null_count: Optional[int] = 0 if i is not None else None
+        min_value: Any = None
+        max_value: Any = None
+        has_min_max = i is not None
+        for rg in range(metadata.num_row_groups if i is not None else 0):
+            column = metadata.row_group(rg).column(i)
+            stats = column.statistics
+            if column.num_values == 0 and stats is None:
+                continue
+            if stats is None:
+                null_count = None
+                has_min_max = False
+                break
+            if null_count is not None:
+                null_count = null_count + stats.null_count if stats.has_null_count else None
+            if stats.has_min_max:
+                min_value = stats.min if min_value is None else min(min_value, stats.min)
+                max_value = stats.max if max_value is None else max(max_value, stats.max)
+            elif stats.null_count != column.num_values:
+                # В row group'е есть значения, но нет min/max.
+                has_min_max = False
+        rows.append(
+            {
+                "column": name,
+                "dtype": str(arrow_schema.field(name).type),
+                "missing_count": null_count,
+                "missing_share": null_count / n_rows if null_count is not None and n_rows else None,
+                "min": min_value if has_min_max else None,
+                "max": max_value if has_min_max else None,
+            }
+        )
+
+    result = pd.DataFrame(rows, columns=["column", "dtype", "missing_count", "missing_share", "min", "max"])
+    result["missing_count"] = result["missing_count"].astype("Int64")
+    return result.set_index("column")
@@ -0,0 +1,138 @@
+"""
+Манифест каталога отчёта: что и из чего уже построено.
+
+``manifest.json`` в каталоге отчёта хранит отпечаток входного файла и по
+каждой стадии отчёта (таблицы, картинки, ``report.md``...) - ключ из
+отпечатка и влияющих на стадию опций плюс sha256 каждого её файла.
+Повторный ``report`` пересобирает только стадии, у которых поменялся ключ
+или файлы (удалены или изменены вручную); остальные берутся как есть.
+
+Отпечаток входа - размер, mtime и sha256 содержимого. Если размер и mtime
+совпали с прошлым запуском, sha256 не пересчитывается; если поменялся
+только mtime (файл перезаписан тем же содержимым), совпадёт sha256 и
+стадии останутся актуальными.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .cache import hash_stream, make_key
+
+MANIFEST_NAME = "manifest.json"
+# Меняется при несовместимом изменении формата манифеста.
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: Path) -> str:
+    with path.open("rb") as stream:
+        return hash_stream(stream)
+
+
+def file_fingerprint(path: Path, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Отпечаток файла: размер, mtime (нс) и sha256. sha256 берётся из
+    ``previous``, если размер и mtime не изменились.
+    """
+    stat = path.stat()
+    fingerprint: Dict[str, Any] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if (
+        previous
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime_ns") == stat.st_mtime_ns
+        and previous.get("sha256")
+    ):
+        fingerprint["sha256"] = previous["sha256"]
+    else:
+        fingerprint["sha256"] = hash_file(path)
+    return fingerprint
+
+
+class ReportManifest:
+    """
+    Манифест каталога ``out_dir``. Стадия - именованная группа файлов
+    с ключом; пути файлов хранятся относительно ``out_dir``.
+
+    - ``is_fresh(stage, key)`` - ключ совпал и все файлы на месте с прежним sha256;
+    - ``record(stage, key, paths, data)`` - запомнить новую сборку стадии;
+      файлы прошлой сборки, которых нет среди ``paths``, удаляются;
+    - ``data(stage)`` - небольшие значения, сохранённые вместе со стадией
+      (например, цифры для ``report.md``).
+    """
+
+    def __init__(self, out_dir: Path, input_fingerprint: Optional[Dict[str, Any]] = None) -> None:
+        self.out_dir = Path(out_dir)
+        self.input = input_fingerprint
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def path(self) -> Path:
+        return self.out_dir / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, out_dir: Path) -> "ReportManifest":
+        """
+        Прочитать манифест; если его нет, он повреждён или другой версии -
+        пустой манифест (всё будет пересобрано).
+        """
+        manifest = cls(out_dir)
+        try:
+            payload = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+        if not isinstance(payload, dict) or payload.get("version") != MANIFEST_VERSION:
+            return manifest
+        manifest.input = payload.get("input")
+        manifest.stages = payload.get("stages") or {}
+        return manifest
+
+    def save(self) -> Path:
+        payload = {"version": MANIFEST_VERSION, "input": self.input, "stages": self.stages}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
+
+    def stage_key(self, stage: str, **options: Any) -> str:
+        """
+        Ключ стадии: содержимое входного файла + имя стадии + опции.
+        """
+        content = self.input["sha256"] if self.input else ""
+        return make_key(content, stage, **options)
+
+    def is_fresh(self, stage: str, key: str) -> bool:
+        entry = self.stages.get(stage)
+        if entry is None or entry.get("key") != key:
+            return False
+        for name, digest in entry.get("artifacts", {}).items():
+            artifact = self.out_dir / name
+            if not artifact.is_file() or hash_file(artifact) != digest:
+                return False
+        return True
+
+    def artifacts(self, stage: str) -> Dict[str, str]:
+        return dict(self.stages.get(stage, {}).get("artifacts", {}))
+
+    def data(self, stage: str) -> Dict[str, Any]:
+        return dict(self.stages.get(stage, {}).get("data", {}))
+
+    def record(
+        self,
+        stage: str,
+        key: str,
+        paths: Iterable[Path],
+        data: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        artifacts = {
+            Path(p).relative_to(self.out_dir).as_posix(): hash_file(Path(p)) for p in paths
+        }
+        for name in self.artifacts(stage):
+            if name not in artifacts:
+                (self.out_dir / name).unlink(missing_ok=True)
+        entry: Dict[str, Any] = {"key": key, "artifacts": artifacts}
+        if data is not None:
+            entry["data"] = data
+        self.stages[stage] = entry
@@ -0,0 +1,277 @@
+"""
+Метрики HTTP-сервиса в текстовом формате Prometheus и замер стадий запроса.
+
+- ``MetricsRegistry`` со счётчиками (``Counter``), шкалами (``Gauge``) и
+  гистограммами (``Histogram``) с метками; ``render`` отдаёт текст для
+  ``GET /metrics`` (формат exposition 0.0.4). Своя маленькая реализация
+  вместо prometheus_client - лишняя зависимость ради нескольких метрик;
+- ``RequestMetrics`` - замеры одного запроса: время стадий (загрузка тела,
+  ожидание в очереди, чтение таблицы, ``summarize_dataset``...), байты на
+  входе, строки и попадание в кэш. Обработчики заполняют его, а middleware
+  сервиса переносит в реестр и пишет строку лога;
+- ``log_event`` - структурированный лог: одна JSON-строка на событие.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import sys
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Границы гистограмм длительности (секунды): от миллисекунд до минут.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Границы гистограммы скорости обработки (строк в секунду).
+ROWS_PER_SECOND_BUCKETS = (1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labels}, получены {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """
+    Монотонный счётчик.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """
+    Значение, которое может расти и убывать (например, запросы в работе).
+    """
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """
+    Гистограмма с фиксированными границами ``buckets`` (``le``, включительно).
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> (число наблюдений по корзинам, сумма, количество)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, counts, total, count in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Набор метрик сервиса; ``render`` - текст для ``GET /metrics``.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class RequestMetrics:
+    """
+    Замеры одного запроса. ``stage(name)`` - контекстный менеджер, время
+    повторных стадий с тем же именем складывается; ``add`` - готовое время.
+    Методы вызываются и из потока пула профилирования; одновременно (приём
+    тела и разбор потокового CSV) пишутся разные стадии.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.started = perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.bytes_in = 0
+        self.rows: Optional[int] = None
+        self.cache: Optional[str] = None
+        # Дополнительные поля строки лога (имя файла, оценка качества...).
+        self.fields: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def stages_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000.0, 3) for name, seconds in self.stages.items()}
+
+    def server_timing(self) -> str:
+        """
+        Значение заголовка ``Server-Timing`` (длительности в мс).
+        """
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.stages_ms().items())
+
+
+# ---------- структурированный лог ----------
+
+
+class _StdoutHandler(logging.Handler):
+    # Пишет в текущий sys.stdout (а не в тот, что был при создании), чтобы
+    # перенаправление вывода в тестах и бенчмарках работало и для лога.
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+def get_logger(name: str, level: str = "INFO") -> logging.Logger:
+    """
+    Логгер, который пишет сообщения как есть в stdout (если обработчики
+    ему не настроены снаружи).
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(_StdoutHandler())
+        logger.propagate = False
+    logger.setLevel(level.upper())
+    return logger
+
+
+def log_event(logger: logging.Logger, event: str, **fields: Any) -> None:
+    """
+    Одна JSON-строка на событие: ``{"event": ..., поля...}``.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, **fields}, ensure_ascii=False, default=str))
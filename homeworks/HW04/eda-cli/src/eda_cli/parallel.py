@@ -0,0 +1,341 @@
+"""
+Параллельное (по колонкам) профилирование в пуле процессов.
+
+Статистики каждой колонки независимы, поэтому колонки делятся между
+процессами пула:
+
+- числовые колонки один раз копируются в float64-блок в разделяемой памяти
+  (``multiprocessing.shared_memory``), воркеры получают только имя сегмента
+  и диапазон колонок - сами данные не сериализуются;
+- нечисловые колонки (строки, даты и т.п.) в разделяемую память не
+  положить, они передаются воркерам пачками через pickle.
+
+Результаты собираются в те же ``DatasetSummary``/таблицы/флаги, что
+возвращает ``core``, в исходном порядке колонок. Статистика колонки не
+зависит от того, с какими колонками она попала в задачу, поэтому результат
+одинаков при любом числе воркеров.
+
+Тот же пул рисует картинки отчёта (``render_figures``): воркеру
+передаётся небольшое описание картинки, а не данные таблицы.
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .core import (
+    ColumnSummary,
+    DatasetSummary,
+    _column_top_categories,
+    _is_block_numeric,
+    _is_category_like,
+    _numeric_block_stats,
+    _numeric_block_summaries,
+    _summarize_column,
+    compute_quality_flags,
+    quality_flags_from_stats,
+    summarize_dataset,
+    top_categories,
+)
+from .duplicates import count_duplicate_rows
+from .tracing import span, traced
+
+# Сколько задач на воркер нарезать: немного больше 1, чтобы выровнять нагрузку.
+_TASKS_PER_WORKER = 4
+
+# Сколько нечисловых колонок передавать воркеру в одной задаче.
+_OBJECT_COLUMNS_PER_TASK = 8
+
+
+class ColumnPool:
+    """
+    Пул процессов для поколоночного профилирования.
+
+    Использование::
+
+        with ColumnPool(workers=8) as pool:
+            summary = pool.summarize_dataset(df)
+            flags = pool.compute_quality_flags(df, summary, missing_table(df))
+
+    При ``workers <= 1`` пул не создаётся и вызываются функции ``core``.
+    Методы не хранят состояния между вызовами и безопасны для вызова
+    из нескольких потоков.
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = max(1, int(workers))
+        self._executor: Optional[Executor] = None
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __enter__(self) -> "ColumnPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # ---------- публичные операции ----------
+
+    @traced
+    def summarize_dataset(
+        self,
+        df: pd.DataFrame,
+        example_values_per_column: int = 3,
+        approx_error: Optional[float] = None,
+    ) -> DatasetSummary:
+        """
+        Параллельный аналог ``core.summarize_dataset``.
+        """
+        if self._executor is None:
+            return summarize_dataset(df, example_values_per_column, approx_error)
+
+        n_rows, n_cols = df.shape
+        series = [s for _, s in df.items()]
+        columns: List[Optional[ColumnSummary]] = [None] * n_cols
+
+        numeric_positions = [i for i, s in enumerate(series) if _is_block_numeric(s)]
+        in_block = set(numeric_positions)
+        other_positions = [i for i in range(n_cols) if i not in in_block]
+
+        with _SharedBlock.from_series([series[i] for i in numeric_positions]) as block:
+            futures = [
+                (
+                    numeric_positions[start:stop],
+                    self._executor.submit(
+                        _numeric_stats_task, block.spec, start, stop, approx_error, False
+                    ),
+                )
+                for start, stop in _ranges(len(numeric_positions), self._n_tasks())
+            ]
+            object_futures = [
+                (
+                    batch,
+                    self._executor.submit(
+                        _summarize_columns_task,
+                        [series[i] for i in batch],
+                        example_values_per_column,
+                        approx_error,
+                    ),
+                )
+                for batch in _batches(other_positions, _OBJECT_COLUMNS_PER_TASK)
+            ]
+
+            for positions, future in futures:
+                stats = future.result()
+                summaries = _numeric_block_summaries(
+                    [series[i] for i in positions], stats, n_rows, example_values_per_column
+                )
+                for i, col_summary in zip(positions, summaries):
+                    columns[i] = col_summary
+
+        for positions, future in object_futures:
+            for i, col_summary in zip(positions, future.result()):
+                columns[i] = col_summary
+
+        return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=list(columns))
+
+    @traced
+    def top_categories(
+        self,
+        df: pd.DataFrame,
+        max_columns: int = 5,
+        top_k: int = 5,
+        approx_error: Optional[float] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Параллельный аналог ``core.top_categories``.
+        """
+        if self._executor is None:
+            return top_categories(df, max_columns, top_k, approx_error)
+
+        candidates = [
+            name
+            for name, s in df.items()
+            if _is_category_like(s.dtype)
+        ][:max_columns]
+        futures = [
+            (name, self._executor.submit(_top_categories_task, df[name], top_k, approx_error))
+            for name in candidates
+        ]
+        result: Dict[str, pd.DataFrame] = {}
+        for name, future in futures:
+            table = future.result()
+            if table is not None:
+                result[name] = table
+        return result
+
+    @traced
+    def compute_quality_flags(
+        self,
+        df: pd.DataFrame,
+        summary: DatasetSummary,
+        missing_df: pd.DataFrame,
+        min_missing_share: float = 0.3,
+    ) -> Dict[str, Any]:
+        """
+        Параллельный аналог ``core.compute_quality_flags``: доли нулей
+        считаются в пуле, поиск дубликатов строк - в текущем процессе.
+        """
+        if self._executor is None:
+            return compute_quality_flags(df, summary, missing_df, min_missing_share)
+
+        number_cols = list(df.select_dtypes(include=["number"]).items())
+        block_cols = [j for j, (_, s) in enumerate(number_cols) if _is_block_numeric(s)]
+
+        zero_counts: Dict[int, Tuple[Any, Any]] = {}
+        with _SharedBlock.from_series([number_cols[j][1] for j in block_cols]) as block:
+            futures = [
+                (
+                    block_cols[start:stop],
+                    self._executor.submit(
+                        _numeric_stats_task, block.spec, start, stop, None, True
+                    ),
+                )
+                for start, stop in _ranges(len(block_cols), self._n_tasks())
+            ]
+            # Дубликаты ищем в этом процессе, пока воркеры считают нули.
+            with span("count_duplicate_rows"):
+                num_duplicate_rows = count_duplicate_rows(df)
+            for positions, future in futures:
+                stats = future.result()
+                for k, j in enumerate(positions):
+                    zero_counts[j] = (stats["zeros"][k], stats["non_null"][k])
+
+        # Порядок ключей - порядок колонок, как в core.compute_quality_flags.
+        zero_ratios: Dict[str, float] = {}
+        for j, (name, s) in enumerate(number_cols):
+            if j in zero_counts:
+                zero_count, total_count = zero_counts[j]
+            else:
+                zero_count, total_count = (s == 0).sum(), s.notna().sum()
+            if total_count > 0:
+                zero_ratios[name] = zero_count / total_count
+
+        return quality_flags_from_stats(
+            summary,
+            missing_df,
+            num_duplicate_rows=num_duplicate_rows,
+            zero_ratios=zero_ratios,
+            min_missing_share=min_missing_share,
+        )
+
+    @traced
+    def render_figures(self, figures: Sequence[Any]) -> List[Any]:
+        """
+        Нарисовать картинки отчёта (описания из ``viz``) в процессах пула.
+        """
+        # viz тянет matplotlib - импортируем только когда рисуем.
+        from .viz import render_figures
+
+        return render_figures(figures, self._executor)
+
+    def _n_tasks(self) -> int:
+        return self.workers * _TASKS_PER_WORKER
+
+
+# ---------- разделяемая память ----------
+
+
+class _SharedBlock:
+    """
+    Float64-блок (строки x колонки, порядок F) в разделяемой памяти.
+    """
+
+    def __init__(self, n_rows: int, n_cols: int) -> None:
+        size = max(1, n_rows * n_cols * 8)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.spec: Tuple[str, int, int] = (self.shm.name, n_rows, n_cols)
+        self.array = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=self.shm.buf, order="F")
+
+    @classmethod
+    def from_series(cls, series: Sequence[pd.Series]) -> "_SharedBlock":
+        n_rows = len(series[0]) if series else 0
+        block = cls(n_rows, len(series))
+        for j, s in enumerate(series):
+            block.array[:, j] = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        return block
+
+    def __enter__(self) -> "_SharedBlock":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(spec: Tuple[str, int, int]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, n_rows, n_cols = spec
+    # resource_tracker у воркеров общий с родителем, поэтому повторная
+    # регистрация сегмента при подключении безвредна; удаляет его родитель.
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=shm.buf, order="F")
+    return shm, array
+
+
+# ---------- задачи воркеров ----------
+
+
+def _numeric_stats_task(
+    spec: Tuple[str, int, int],
+    start: int,
+    stop: int,
+    approx_error: Optional[float],
+    with_zeros: bool,
+) -> Dict[str, Any]:
+    shm, array = _attach(spec)
+    try:
+        block = array[:, start:stop]
+        stats = _numeric_block_stats(block, approx_error, with_zeros=with_zeros)
+        # Копии массивов, чтобы не держать ссылки на разделяемую память.
+        return {
+            key: np.array(value) if isinstance(value, np.ndarray) else value
+            for key, value in stats.items()
+        }
+    finally:
+        del array
+        shm.close()
+
+
+def _summarize_columns_task(
+    series: Sequence[pd.Series],
+    example_values_per_column: int,
+    approx_error: Optional[float],
+) -> List[ColumnSummary]:
+    return [_summarize_column(s, example_values_per_column, approx_error) for s in series]
+
+
+def _top_categories_task(
+    s: pd.Series,
+    top_k: int,
+    approx_error: Optional[float],
+) -> Optional[pd.DataFrame]:
+    return _column_top_categories(s, top_k, approx_error)
+
+
+# ---------- нарезка задач ----------
+
+
+def _ranges(n: int, n_tasks: int) -> List[Tuple[int, int]]:
+    """
+    Разбить [0, n) на не более чем n_tasks непрерывных диапазонов.
+    """
+    if n == 0:
+        return []
+    step = math.ceil(n / max(1, n_tasks))
+    return [(start, min(n, start + step)) for start in range(0, n, step)]
+
+
+def _batches(items: Sequence[int], size: int) -> List[List[int]]:
+    return [list(items[start : start + size]) for start in range(0, len(items), size)]
@@ -0,0 +1,297 @@
+"""
+Правила оценки качества: пороги и штрафы в конфиге, расчёт массивами.
+
+Эвристики ``quality_score`` и булевых флагов описаны декларативно
+в ``quality_rules.toml`` (формат - в комментариях файла) и общие для всех
+путей: ``core.quality_flags_from_stats`` берёт набор ``dataset``,
+``/quality`` и ``/quality/batch`` - набор ``metadata``.
+
+- ``load_rules`` - прочитать и скомпилировать наборы правил из файла:
+  проверяются поля, операторы и параметры, одинаковые условия разных
+  правил считаются один раз;
+- ``quality_rules(name)`` - набор из конфига по умолчанию (файл из
+  переменной окружения ``EDA_QUALITY_RULES`` или встроенный), читается
+  один раз на процесс;
+- ``RuleSet.evaluate`` - оценка и флаги для таблицы статистик (по строке
+  на датасет: ``DataFrame`` или словарь массивов) одним проходом по
+  правилам; ``RuleSet.score_one`` - то же для одного датасета.
+
+Общие правила записаны один раз в отдельном наборе и подключаются через
+``include``. Штрафы вычитаются в порядке правил, как в прежних цепочках
+``if``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import operator
+import os
+import tomllib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+# Встроенный конфиг правил; EDA_QUALITY_RULES - путь к своему.
+DEFAULT_RULES_PATH = Path(__file__).with_name("quality_rules.toml")
+RULES_ENV = "EDA_QUALITY_RULES"
+
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    ``field op threshold``; порог - число или имя параметра (``param``).
+    """
+
+    field: str
+    op: str
+    threshold: Optional[float] = None
+    param: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Правило набора: условия (номера в ``RuleSet.conditions``), флаг и штраф.
+    Штраф - ``penalty`` или значение ``penalty_field`` * ``scale`` (не
+    больше ``max_penalty``).
+    """
+
+    conditions: Tuple[int, ...] = ()
+    flag: Optional[str] = None
+    penalty: float = 0.0
+    penalty_field: Optional[str] = None
+    scale: float = 1.0
+    max_penalty: Optional[float] = None
+
+
+class RuleSet:
+    """
+    Скомпилированный набор правил. ``flags`` - имена флагов в порядке правил,
+    ``digest`` - отпечаток конфига набора (для ключей кэша и манифеста).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: List[str],
+        rules: List[Rule],
+        conditions: List[Condition],
+        params: Optional[Dict[str, float]] = None,
+        base: float = 1.0,
+        ok_threshold: Optional[float] = None,
+        digest: str = "",
+    ) -> None:
+        self.name = name
+        self.fields = list(fields)
+        self.rules = list(rules)
+        self.conditions = list(conditions)
+        self.params = dict(params or {})
+        self.base = base
+        self.ok_threshold = ok_threshold
+        self.digest = digest
+        self.flags = [rule.flag for rule in self.rules if rule.flag is not None]
+
+    @classmethod
+    def from_config(cls, name: str, config: Mapping[str, Any]) -> "RuleSet":
+        """
+        Компиляция таблицы ``[name]`` конфига; ошибки - ``ValueError``.
+        """
+        fields = [str(field) for field in config.get("fields", [])]
+        params = {key: float(value) for key, value in config.get("params", {}).items()}
+        conditions: List[Condition] = []
+        index: Dict[Condition, int] = {}
+        rules: List[Rule] = []
+        flags: set = set()
+
+        def field_name(value: Any, where: str) -> str:
+            if value not in fields:
+                raise ValueError(f"{name}: {where}: неизвестное поле '{value}' (поля: {', '.join(fields)})")
+            return str(value)
+
+        for number, spec in enumerate(config.get("rules", []), start=1):
+            where = f"правило {number}"
+            rule_conditions = []
+            for item in spec.get("when", []):
+                if not isinstance(item, (list, tuple)) or len(item) != 3:
+                    raise ValueError(f"{name}: {where}: условие - [поле, оператор, порог], получено {item!r}")
+                field, op, threshold = item
+                if op not in _OPERATORS:
+                    raise ValueError(f"{name}: {where}: неизвестный оператор '{op}'")
+                if isinstance(threshold, str):
+                    if threshold not in params:
+                        raise ValueError(f"{name}: {where}: неизвестный параметр '{threshold}'")
+                    condition = Condition(field_name(field, where), op, param=threshold)
+                else:
+                    condition = Condition(field_name(field, where), op, threshold=float(threshold))
+                if condition not in index:
+                    index[condition] = len(conditions)
+                    conditions.append(condition)
+                rule_conditions.append(index[condition])
+
+            flag = spec.get("flag")
+            penalty = spec.get("penalty")
+            if flag is None and penalty is None:
+                raise ValueError(f"{name}: {where}: нужен flag или penalty")
+            if flag is not None:
+                if flag in flags or flag in ("quality_score", "ok_for_model"):
+                    raise ValueError(f"{name}: {where}: флаг '{flag}' уже есть")
+                flags.add(flag)
+            rule = Rule(conditions=tuple(rule_conditions), flag=flag)
+            if isinstance(penalty, Mapping):
+                max_penalty = penalty.get("max")
+                rule = Rule(
+                    conditions=rule.conditions,
+                    flag=flag,
+                    penalty_field=field_name(penalty.get("field"), where),
+                    scale=float(penalty.get("scale", 1.0)),
+                    max_penalty=None if max_penalty is None else float(max_penalty),
+                )
+            elif penalty is not None:
+                rule = Rule(conditions=rule.conditions, flag=flag, penalty=float(penalty))
+            rules.append(rule)
+
+        threshold = config.get("ok_threshold")
+        digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return cls(
+            name,
+            fields,
+            rules,
+            conditions,
+            params=params,
+            base=float(config.get("base", 1.0)),
+            ok_threshold=None if threshold is None else float(threshold),
+            digest=digest,
+        )
+
+    def evaluate(self, data: Any, **params: float) -> Dict[str, np.ndarray]:
+        """
+        Оценка и флаги для таблицы статистик ``data`` (``DataFrame`` или
+        словарь: поле -> массив, по элементу на датасет). NaN в поле - условия
+        с ним не выполняются. Возвращает массивы ``quality_score``,
+        ``ok_for_model`` (если задан порог) и флагов ``flags``.
+        """
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"{self.name}: неизвестные параметры: {', '.join(sorted(unknown))}")
+        values = {**self.params, **params}
+        columns = {field: np.asarray(data[field], dtype=np.float64) for field in self.fields}
+        n = len(next(iter(columns.values()))) if columns else 0
+        for field, column in columns.items():
+            if column.shape != (n,):
+                raise ValueError(f"{self.name}: поле '{field}': ожидается массив длины {n}")
+
+        with np.errstate(invalid="ignore"):
+            masks = [
+                _OPERATORS[condition.op](
+                    columns[condition.field],
+                    values[condition.param] if condition.param is not None else condition.threshold,
+                )
+                for condition in self.conditions
+            ]
+
+        score = np.full(n, self.base, dtype=np.float64)
+        result: Dict[str, np.ndarray] = {}
+        for rule in self.rules:
+            mask = None
+            for number in rule.conditions:
+                mask = masks[number] if mask is None else mask & masks[number]
+            if rule.flag is not None:
+                result[rule.flag] = mask if mask is not None else np.ones(n, dtype=bool)
+            if rule.penalty_field is not None:
+                amount = columns[rule.penalty_field] * rule.scale
+                if rule.max_penalty is not None:
+                    amount = np.minimum(amount, rule.max_penalty)
+            elif rule.penalty:
+                amount = np.full(n, rule.penalty)
+            else:
+                continue
+            # Без штрафа значение не трогаем (вычитание 0.0 ничего не меняет),
+            # как в цепочке if.
+            score = score - (np.where(mask, amount, 0.0) if mask is not None else amount)
+
+        score = np.clip(score, 0.0, 1.0)
+        scores: Dict[str, np.ndarray] = {"quality_score": score}
+        if self.ok_threshold is not None:
+            scores["ok_for_model"] = score >= self.ok_threshold
+        scores.update(result)
+        return scores
+
+    def score_one(self, stats: Mapping[str, Any], **params: float) -> Dict[str, Any]:
+        """
+        ``evaluate`` для одного датасета: значения - числа Python.
+        """
+        scores = self.evaluate({field: [stats[field]] for field in self.fields}, **params)
+        return {name: values[0].item() for name, values in scores.items()}
+
+
+def _with_includes(name: str, tables: Mapping[str, Any], stack: Tuple[str, ...] = ()) -> Dict[str, Any]:
+    """
+    Таблица набора ``name`` с подставленными наборами из ``include``: их
+    поля и правила идут первыми (в порядке ``include``), параметры и прочие
+    ключи набора переопределяют унаследованные.
+    """
+    table = tables[name]
+    includes = table.get("include", [])
+    if isinstance(includes, str):
+        includes = [includes]
+    merged: Dict[str, Any] = {"fields": [], "params": {}, "rules": []}
+    for base in includes:
+        if base not in tables:
+            raise ValueError(f"{name}: include: неизвестный набор правил '{base}'")
+        if base in stack or base == name:
+            raise ValueError(f"{name}: include: цикл через набор '{base}'")
+        parent = _with_includes(base, tables, stack + (name,))
+        for key, value in parent.items():
+            if key not in merged:
+                merged[key] = value
+        merged["fields"] += [field for field in parent["fields"] if field not in merged["fields"]]
+        merged["params"].update(parent["params"])
+        merged["rules"] += parent["rules"]
+    for key, value in table.items():
+        if key not in ("include", "fields", "params", "rules"):
+            merged[key] = value
+    merged["fields"] += [field for field in table.get("fields", []) if field not in merged["fields"]]
+    merged["params"].update(table.get("params", {}))
+    merged["rules"] += list(table.get("rules", []))
+    return merged
+
+
+def load_rules(path: Union[str, Path]) -> Dict[str, RuleSet]:
+    """
+    Все наборы правил из TOML-файла ``path``; ``include`` набора
+    подставляется до компиляции (и входит в его ``digest``).
+    """
+    with open(path, "rb") as stream:
+        config = tomllib.load(stream)
+    tables = {name: table for name, table in config.items() if isinstance(table, Mapping)}
+    return {name: RuleSet.from_config(name, _with_includes(name, tables)) for name in tables}
+
+
+@lru_cache(maxsize=None)
+def _default_rules(path: str) -> Dict[str, RuleSet]:
+    return load_rules(path)
+
+
+def quality_rules(name: str) -> RuleSet:
+    """
+    Набор правил ``name`` из конфига по умолчанию (``EDA_QUALITY_RULES``
+    или встроенный ``quality_rules.toml``).
+    """
+    path = os.environ.get(RULES_ENV) or str(DEFAULT_RULES_PATH)
+    rules = _default_rules(path)
+    if name not in rules:
+        raise ValueError(f"В {path} нет набора правил '{name}' (есть: {', '.join(rules)})")
+    return rules[name]
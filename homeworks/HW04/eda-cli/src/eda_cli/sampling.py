@@ -0,0 +1,399 @@
+"""
+Быстрая приближённая оценка качества по выборке строк.
+
+Для беглой оценки огромного файла точные цифры не нужны: достаточно
+выборки в несколько десятков тысяч строк и доверительных интервалов.
+
+- ``sample_table`` - выборка не более ``n`` строк:
+
+  - CSV и Feather - один потоковый проход по чанкам с выборкой строк
+    с наименьшими хэшами (``association.RowSample``). Все копии строки
+    имеют один хэш и попадают в выборку вместе, поэтому доля дубликатов
+    в выборке - оценка доли дубликатов во всём файле;
+  - Parquet - случайные row group'ы целиком (по метаданным, остальные
+    группы не читаются), пока не наберётся ``n`` строк. Строки одной
+    группы обычно похожи (файл часто упорядочен), поэтому разброс
+    оценивается по группам, а не по строкам, а дубликаты из разных
+    групп не видны - доля дубликатов занижена;
+
+- ``estimate_quality`` - ``summarize_dataset``, таблица пропусков и флаги
+  ``quality_flags_from_stats`` по выборке, с интервалами: доли пропусков,
+  нулей и дубликатов - Уилсона, средние - нормальные (с поправкой на
+  конечную совокупность). Разброс считается по единицам отбора - группам
+  одинаковых строк или row group'ам. Если доля в выборке 0 или 1 (скажем,
+  все пропуски колонки лежат в непрочитанных row group'ах), интервал
+  строится как для выборки отдельных строк и может быть оптимистичен.
+  Границы ``quality_score`` - оценка при худших и лучших значениях
+  интервалов его составляющих (доли пропусков, нулей и дубликатов);
+  число строк и колонок известно точно, число константных колонок
+  берётся по выборке.
+
+Всё посчитанное по выборке помечается как приближённое
+(``flags["approximate"]``, ``SampleEstimate.approximate``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .association import RowSample, sample_rows
+from .core import DatasetSummary, quality_flags_from_stats, summarize_dataset
+from .defaults import DEFAULT_CHUNKSIZE
+from .duplicates import row_hashes
+from .loaders import _require_pyarrow, detect_format, iter_chunks, load_table
+from .tracing import traced
+
+Source = Union[str, Path, BinaryIO]
+
+SAMPLE_METHODS = ("full", "rows", "row_groups")
+
+# Сколько колонок обрабатывать за раз при расчёте интервалов (матрицы
+# строки x колонки float64).
+_INTERVAL_BLOCK_COLUMNS = 64
+
+# Порядок row group'ов Parquet выбирается с этим зерном: одна и та же
+# выборка при повторных запусках (и в кэше сервиса).
+_ROW_GROUP_SEED = 0
+# Минимум row group'ов в выборке: по одной-двум группам разброс между
+# группами не оценить.
+_MIN_ROW_GROUPS = 4
+
+
+@dataclass
+class TableSample:
+    """
+    Выборка строк таблицы.
+
+    - ``n_rows`` - строк во всей таблице;
+    - ``method``: ``full`` (таблица целиком), ``rows`` (строки с
+      наименьшими хэшами) или ``row_groups`` (row group'ы Parquet);
+    - ``groups`` - для ``row_groups``: номер row group'а каждой строки;
+    - ``fraction`` - доля выбранных единиц отбора (строк или row group'ов).
+    """
+
+    frame: pd.DataFrame
+    n_rows: int
+    method: str
+    groups: Optional[np.ndarray] = None
+    fraction: float = 1.0
+
+    @property
+    def exact(self) -> bool:
+        return len(self.frame) >= self.n_rows
+
+
+@dataclass
+class SampleEstimate:
+    """
+    Результат ``estimate_quality``.
+
+    - ``summary`` - сводка по строкам выборки (счётчики - по выборке);
+    - ``missing_df`` - доли пропусков с интервалами (``missing_share``,
+      ``missing_share_low``, ``missing_share_high``) и оценка
+      ``missing_count`` для всей таблицы;
+    - ``intervals`` - по числовым колонкам: ``mean`` и ``zero_share``
+      с границами;
+    - ``flags`` - как у ``compute_quality_flags`` плюс границы
+      (``quality_score_low``/``_high`` и т.п.), ``approximate``,
+      ``sample_rows`` и ``confidence``.
+    """
+
+    summary: DatasetSummary
+    missing_df: pd.DataFrame
+    intervals: pd.DataFrame
+    flags: Dict[str, Any]
+    n_rows: int
+    sample_rows: int
+    method: str
+    confidence: float
+
+    @property
+    def approximate(self) -> bool:
+        return self.sample_rows < self.n_rows
+
+
+# ---------- выборка ----------
+
+
+@traced
+def sample_table(
+    source: Source,
+    n: int,
+    fmt: Optional[str] = None,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    columns: Optional[Sequence[str]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> TableSample:
+    """
+    Не более ``n`` строк таблицы (способ - по формату, см. описание модуля).
+    """
+    if n < 1:
+        raise ValueError("Размер выборки должен быть положительным")
+    fmt = detect_format(source, fmt)
+    if fmt == "parquet":
+        return _sample_row_groups(source, n, columns)
+
+    sample = RowSample(n)
+    n_rows = 0
+    frame: Optional[pd.DataFrame] = None
+    for chunk in iter_chunks(source, chunksize, fmt=fmt, sep=sep, encoding=encoding, columns=columns):
+        n_rows += len(chunk)
+        if frame is None:
+            # Пустой кадр с колонками и типами - на случай таблицы без строк.
+            frame = chunk.iloc[:0]
+        sample.add(chunk)
+    if sample.frame is not None:
+        frame = sample.frame
+    if frame is None:
+        frame = load_table(source, fmt=fmt, sep=sep, encoding=encoding, columns=columns, nrows=0)
+    return _row_sample(frame, n_rows)
+
+
+def _row_sample(frame: pd.DataFrame, n_rows: int) -> TableSample:
+    if len(frame) >= n_rows:
+        return TableSample(frame, n_rows, "full")
+    return TableSample(frame, n_rows, "rows", fraction=len(frame) / n_rows)
+
+
+def _sample_row_groups(source: Source, n: int, columns: Optional[Sequence[str]]) -> TableSample:
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(source)
+    metadata = parquet.metadata
+    n_rows = int(metadata.num_rows)
+    columns = list(columns) if columns is not None else None
+    if n_rows <= n or metadata.num_row_groups < 2 * _MIN_ROW_GROUPS:
+        frame = parquet.read(columns=columns).to_pandas()
+        return _row_sample(sample_rows(frame, n).reset_index(drop=True), n_rows)
+
+    order = np.random.default_rng(_ROW_GROUP_SEED).permutation(metadata.num_row_groups)
+    chosen: List[int] = []
+    total = 0
+    for group in order:
+        chosen.append(int(group))
+        total += metadata.row_group(int(group)).num_rows
+        if total >= n and len(chosen) >= _MIN_ROW_GROUPS:
+            break
+    chosen.sort()
+
+    # Из прочитанных групп - не больше n строк, поровну от каждой группы
+    # (строки с наименьшими хэшами).
+    per_group = max(1, n // len(chosen))
+    parts = [
+        sample_rows(parquet.read_row_group(group, columns=columns).to_pandas(), per_group)
+        for group in chosen
+    ]
+    groups = np.repeat(np.arange(len(parts)), [len(part) for part in parts])
+    frame = pd.concat(parts, ignore_index=True)
+    return TableSample(
+        frame, n_rows, "row_groups", groups, fraction=len(chosen) / metadata.num_row_groups
+    )
+
+
+# ---------- интервалы ----------
+
+
+class _Design:
+    """
+    Единицы отбора выборки: строки ``labels`` с одной меткой попадают
+    в выборку вместе (копии одной строки или один row group). Разброс
+    оценок считается по суммам единиц, ``fpc`` - поправка на конечную
+    совокупность (1 - доля выбранных единиц).
+    """
+
+    def __init__(self, labels: np.ndarray, fpc: float) -> None:
+        self.fpc = fpc
+        self.order: Optional[np.ndarray] = None
+        self.starts: Optional[np.ndarray] = None
+        if len(labels) and len(np.unique(labels)) < len(labels):
+            self.order = np.argsort(labels, kind="stable")
+            ordered = labels[self.order]
+            self.starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+
+    def totals(self, values: np.ndarray) -> np.ndarray:
+        if self.order is None:
+            return values
+        return np.add.reduceat(values[self.order], self.starts, axis=0)
+
+    def ratio(self, y: np.ndarray, m: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Отношения ``sum(y) / sum(m)`` по колонкам, их дисперсии (как у
+        оценки отношения по выборке единиц без возвращения) и суммы ``m``.
+        """
+        y, m = self.totals(y), self.totals(m)
+        g = y.shape[0]
+        m_total = m.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = y.sum(axis=0) / m_total
+            residual = ((y - ratio * m) ** 2).sum(axis=0) / max(g - 1, 1)
+            variance = self.fpc * g * residual / m_total**2
+        return ratio, variance, m_total
+
+    def shares(
+        self, hits: np.ndarray, weights: np.ndarray, z: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Доли ``hits`` среди ``weights`` с интервалом Уилсона. Число
+        наблюдений в нём - эффективное, ``p(1-p) / дисперсия`` (учитывает
+        единицы отбора); если в выборке доля 0 или 1 - ``n / fpc``.
+        """
+        share, variance, n = self.ratio(hits.astype(np.float64), weights)
+        share = np.nan_to_num(share, nan=0.0)
+        if self.fpc <= 0:
+            return share, share.copy(), share.copy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n_eff = np.where(variance > 0, share * (1.0 - share) / variance, n / self.fpc)
+        observed = n_eff > 0
+        n_eff = np.where(observed, n_eff, 1.0)
+        z2 = z * z
+        denom = 1.0 + z2 / n_eff
+        center = (share + z2 / (2.0 * n_eff)) / denom
+        half = z * np.sqrt(share * (1.0 - share) / n_eff + z2 / (4.0 * n_eff**2)) / denom
+        low = np.where(observed, np.clip(center - half, 0.0, 1.0), 0.0)
+        high = np.where(observed, np.clip(center + half, 0.0, 1.0), 1.0)
+        return share, np.minimum(low, share), np.maximum(high, share)
+
+
+# ---------- оценка качества ----------
+
+
+@traced
+def estimate_quality(
+    sample: TableSample,
+    min_missing_share: float = 0.3,
+    confidence: float = 0.95,
+    example_values_per_column: int = 3,
+    approx_error: Optional[float] = None,
+) -> SampleEstimate:
+    """
+    Сводка, пропуски и флаги качества по выборке с интервалами уровня
+    ``confidence``. Если выборка - вся таблица, интервалы вырождаются
+    в точку, а оценки совпадают с точными. ``approx_error`` передаётся
+    в ``summarize_dataset`` (unique и top-k по скетчам).
+    """
+    df = sample.frame
+    n_sample = len(df)
+    n_rows = sample.n_rows
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("Уровень доверия должен быть в интервале (0, 1)")
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    summary = summarize_dataset(df, example_values_per_column, approx_error)
+
+    # Одинаковые строки (один хэш) попадают в выборку только вместе - они
+    # и есть единицы отбора, если выборка не по row group'ам.
+    hashes = row_hashes(df)
+    _, same_row, copies = np.unique(hashes, return_inverse=True, return_counts=True)
+    labels = sample.groups if sample.groups is not None else same_row
+    design = _Design(labels, max(0.0, 1.0 - sample.fraction))
+
+    # Пропуски по всем колонкам, доли нулей и средние - по числовым.
+    names = list(df.columns)
+    missing = np.zeros((3, len(names)))
+    numeric_rows: List[Dict[str, Any]] = []
+    for start in range(0, len(names), _INTERVAL_BLOCK_COLUMNS):
+        block = df.iloc[:, start : start + _INTERVAL_BLOCK_COLUMNS]
+        isna = block.isna().to_numpy()
+        missing[:, start : start + block.shape[1]] = design.shares(isna, np.ones(isna.shape), z)
+
+        # Те же колонки, что у доли нулей в compute_quality_flags.
+        numeric = [
+            name
+            for name, s in block.select_dtypes(include="number").items()
+            if not ptypes.is_complex_dtype(s.dtype)
+        ]
+        if not numeric:
+            continue
+        values = block[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        weights = present.astype(np.float64)
+        zero, zero_low, zero_high = design.shares((filled == 0) & present, weights, z)
+        mean, mean_var, counts = design.ratio(filled, weights)
+        half = z * np.sqrt(np.nan_to_num(mean_var, nan=0.0))
+        for j, name in enumerate(numeric):
+            observed = counts[j] > 0
+            numeric_rows.append(
+                {
+                    "column": name,
+                    "count": int(counts[j]),
+                    "mean": float(mean[j]) if observed else None,
+                    "mean_low": float(mean[j] - half[j]) if observed else None,
+                    "mean_high": float(mean[j] + half[j]) if observed else None,
+                    "zero_share": float(zero[j]),
+                    "zero_share_low": float(zero_low[j]),
+                    "zero_share_high": float(zero_high[j]),
+                }
+            )
+
+    missing_df = pd.DataFrame(
+        {
+            "missing_count": np.rint(missing[0] * n_rows).astype(np.int64),
+            "missing_share": missing[0],
+            "missing_share_low": missing[1],
+            "missing_share_high": missing[2],
+        },
+        index=pd.Index(names),
+    )
+    intervals = pd.DataFrame(
+        numeric_rows,
+        columns=[
+            "column", "count", "mean", "mean_low", "mean_high",
+            "zero_share", "zero_share_low", "zero_share_high",
+        ],
+    ).set_index("column")
+
+    # Строки, у которых в выборке есть копия (по 64-битным хэшам строк).
+    duplicated = (copies[same_row] > 1).reshape(-1, 1)
+    dup_share, dup_low, dup_high = (
+        design.shares(duplicated, np.ones(duplicated.shape), z)
+        if n_sample
+        else (np.zeros(1), np.zeros(1), np.zeros(1))
+    )
+
+    # Флаги: число строк и колонок - всей таблицы, доли - из выборки.
+    full_summary = DatasetSummary(n_rows, summary.n_cols, summary.columns)
+
+    def flags_for(missing_col: str, zero_col: str, dup: float) -> Dict[str, Any]:
+        observed = intervals[intervals["count"] > 0]
+        return quality_flags_from_stats(
+            full_summary,
+            missing_df[[missing_col]].rename(columns={missing_col: "missing_share"}),
+            num_duplicate_rows=int(round(dup * n_rows)),
+            zero_ratios={name: float(value) for name, value in observed[zero_col].items()},
+            min_missing_share=min_missing_share,
+        )
+
+    flags = flags_for("missing_share", "zero_share", float(dup_share[0]))
+    worst = flags_for("missing_share_high", "zero_share_high", float(dup_high[0]))
+    best = flags_for("missing_share_low", "zero_share_low", float(dup_low[0]))
+    flags.update(
+        approximate=n_sample < n_rows,
+        sample_rows=n_sample,
+        sample_method=sample.method,
+        confidence=confidence,
+        quality_score_low=float(min(worst["quality_score"], flags["quality_score"])),
+        quality_score_high=float(max(best["quality_score"], flags["quality_score"])),
+        max_missing_share_low=float(best["max_missing_share"]),
+        max_missing_share_high=float(worst["max_missing_share"]),
+        duplicate_rows_share_low=float(dup_low[0]),
+        duplicate_rows_share_high=float(dup_high[0]),
+    )
+    return SampleEstimate(
+        summary=summary,
+        missing_df=missing_df,
+        intervals=intervals,
+        flags=flags,
+        n_rows=n_rows,
+        sample_rows=n_sample,
+        method=sample.method,
+        confidence=confidence,
+    )
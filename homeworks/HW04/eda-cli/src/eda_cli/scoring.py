@@ -0,0 +1,218 @@
+"""
+Оценка качества по метаданным датасета (как у ``POST /quality``) сразу
+для многих записей.
+
+Эвристики ``/quality`` (набор правил ``metadata``, см. ``eda_cli.rules``)
+считаются над массивами NumPy: запись - позиция в массиве каждого поля,
+так что цена одной записи - разбор её JSON и строка ответа, без
+pydantic-модели и отдельного HTTP-запроса.
+
+- ``parse_records`` - тело запроса (JSON-массив или NDJSON) в список записей;
+- ``record_columns`` - поля записей в массивы с той же проверкой, что
+  у ``QualityRequest`` (неверные записи не роняют пакет, а получают ошибку);
+- ``score_metadata`` - оценка, ``ok_for_model`` и флаги для массивов полей;
+- ``iter_scores_ndjson`` - результаты NDJSON частями по ``batch_records``.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .rules import RuleSet, quality_rules
+
+# Поля записи (как у QualityRequest): целые >= 0, кроме доли max_missing_share.
+INT_FIELDS = ("n_rows", "n_cols", "numeric_cols", "categorical_cols")
+METADATA_FIELDS = ("n_rows", "n_cols", "max_missing_share", "numeric_cols", "categorical_cols")
+
+# Набор правил эвристик /quality в конфиге правил.
+METADATA_RULES = "metadata"
+
+# Сколько записей сериализуется в одну часть NDJSON.
+NDJSON_BATCH_RECORDS = 10_000
+
+
+@dataclass
+class MetadataColumns:
+    """
+    Поля пакета записей в виде массивов ``float64`` (``columns``),
+    маска верных записей ``valid`` и ``errors``: номер неверной записи ->
+    текст ошибки.
+    ``ids`` - поле ``id`` записей (если оно было хоть у одной), чтобы
+    вызывающий мог сопоставить ответы с записями.
+    """
+
+    columns: Dict[str, np.ndarray]
+    valid: np.ndarray
+    errors: Dict[int, str]
+    ids: Optional[List[Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+
+def parse_records(body: bytes) -> List[Any]:
+    """
+    Записи из тела запроса: JSON-массив (первый символ ``[``) или NDJSON -
+    по JSON-объекту на строку, пустые строки пропускаются.
+    """
+    if body.lstrip()[:1] == b"[":
+        records = json.loads(body)
+        if not isinstance(records, list):
+            raise ValueError("ожидается JSON-массив записей")
+        return records
+
+    stripped = body.strip()
+    if not stripped:
+        return []
+    # Один json.loads на весь пакет быстрее, чем по вызову на строку;
+    # если не вышло (или строка содержала несколько значений), разбираем
+    # построчно, чтобы указать номер плохой строки.
+    if b"\r" in stripped or b"\n\n" in stripped:
+        present = [line for line in stripped.splitlines() if line.strip()]
+        joined = b",".join(present)
+        expected = len(present)
+    else:
+        joined = stripped.replace(b"\n", b",")
+        expected = stripped.count(b"\n") + 1
+    try:
+        records = json.loads(b"[" + joined + b"]")
+        if len(records) == expected:
+            return records
+    except ValueError:
+        pass
+    lines = body.splitlines()
+    records = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError as exc:
+            raise ValueError(f"строка {number}: {exc}") from exc
+    return records
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, (int, float, str)):
+        try:
+            return float(value)
+        except (ValueError, OverflowError):
+            pass
+    return np.nan
+
+
+def _field_values(records: Sequence[Any], name: str) -> np.ndarray:
+    values = [record.get(name) if type(record) is dict else None for record in records]
+    try:
+        # None -> NaN, числа-строки ("10") и bool приводятся, как в
+        # нестрогом режиме pydantic.
+        array = np.array(values, dtype=np.float64)
+        if array.shape == (len(values),):
+            return array
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return np.fromiter((_to_float(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def record_columns(records: Sequence[Any]) -> MetadataColumns:
+    """
+    Поля записей в массивы и проверка каждой записи: все поля
+    ``METADATA_FIELDS`` есть, ``INT_FIELDS`` - целые >= 0,
+    ``max_missing_share`` - в [0, 1]. У неверной записи - текст ошибки по
+    первому неверному полю, её значения в ``columns`` не используются.
+    """
+    n = len(records)
+    columns: Dict[str, np.ndarray] = {}
+    messages = [
+        f"{name}: ожидается целое число >= 0"
+        if name in INT_FIELDS
+        else f"{name}: ожидается число от 0 до 1"
+        for name in METADATA_FIELDS
+    ]
+    # Номер первого неверного поля записи (-1 - запись верна).
+    bad_field = np.full(n, -1, dtype=np.int64)
+    for number, name in reversed(list(enumerate(METADATA_FIELDS))):
+        values = _field_values(records, name)
+        with np.errstate(invalid="ignore"):
+            if name in INT_FIELDS:
+                bad = ~(values >= 0) | (values != np.floor(values)) | np.isinf(values)
+            else:
+                bad = ~((values >= 0.0) & (values <= 1.0))
+        bad_field[bad] = number
+        columns[name] = np.where(bad, 0.0, values)
+
+    valid = bad_field < 0
+    errors = {int(i): messages[bad_field[i]] for i in np.flatnonzero(~valid)}
+    for i, record in enumerate(records):
+        if type(record) is not dict:
+            errors[i] = "ожидается JSON-объект с полями " + ", ".join(METADATA_FIELDS)
+
+    ids = None
+    if any("id" in record for record in records if type(record) is dict):
+        ids = [record.get("id") if type(record) is dict else None for record in records]
+    return MetadataColumns(
+        columns={name: columns[name] for name in METADATA_FIELDS},
+        valid=valid,
+        errors=errors,
+        ids=ids,
+    )
+
+
+def metadata_rules() -> RuleSet:
+    rules = quality_rules(METADATA_RULES)
+    if rules.ok_threshold is None:
+        raise ValueError(f"В наборе правил '{METADATA_RULES}' нужен ok_threshold")
+    return rules
+
+
+def score_metadata(columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Эвристики ``/quality`` для массивов полей ``METADATA_FIELDS``:
+    ``quality_score``, ``ok_for_model`` и флаги ``metadata_rules().flags``.
+    """
+    return metadata_rules().evaluate(columns)
+
+
+def iter_scores_ndjson(
+    batch: MetadataColumns,
+    scores: Mapping[str, np.ndarray],
+    batch_records: int = NDJSON_BATCH_RECORDS,
+) -> Iterator[bytes]:
+    """
+    Результаты NDJSON, по строке на запись в порядке пакета:
+    ``{"index", ["id",] "ok_for_model", "quality_score", "flags"}`` или
+    ``{"index", ["id",] "error"}`` для неверной записи.
+    """
+    # Флаги записи - номер комбинации битов; JSON каждой встретившейся
+    # комбинации сериализуется один раз.
+    flag_names = [name for name in scores if name not in ("quality_score", "ok_for_model")]
+    code = np.zeros(len(batch), dtype=np.int64)
+    for bit, name in enumerate(flag_names):
+        code |= np.asarray(scores[name], dtype=np.int64) << bit
+    flag_json = {
+        combo: json.dumps({name: bool(combo >> bit & 1) for bit, name in enumerate(flag_names)})
+        for combo in np.unique(code).tolist()
+    }
+    verdict = ('"ok_for_model":false', '"ok_for_model":true')
+
+    batch_records = max(1, batch_records)
+    for start in range(0, len(batch), batch_records):
+        stop = min(start + batch_records, len(batch))
+        ok = scores["ok_for_model"][start:stop].tolist()
+        score = scores["quality_score"][start:stop].tolist()
+        combos = code[start:stop].tolist()
+        lines = []
+        for i, (is_ok, value, combo) in enumerate(zip(ok, score, combos), start=start):
+            head = f'{{"index":{i}'
+            if batch.ids is not None:
+                head += ',"id":' + json.dumps(batch.ids[i], ensure_ascii=False, default=str)
+            error = batch.errors.get(i)
+            if error is not None:
+                lines.append(head + ',"error":' + json.dumps(error, ensure_ascii=False) + "}")
+            else:
+                lines.append(f'{head},{verdict[is_ok]},"quality_score":{value!r},"flags":{flag_json[combo]}}}')
+        yield ("\n".join(lines) + "\n").encode("utf-8")
@@ -0,0 +1,244 @@
+"""
+Вероятностные «скетчи» для приближённого режима профилирования.
+
+- ``HyperLogLog`` - оценка числа различных значений (``unique``) за O(2**p) памяти;
+- ``SpaceSaving`` - top-k частых значений за O(1/eps) памяти.
+
+Оба скетча сливаются (``merge``) и сериализуются (``to_bytes``/``from_bytes``),
+поэтому их можно считать по чанкам или в разных процессах, а потом объединить.
+"""
+
+from __future__ import annotations
+
+import math
+import pickle
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+
+def hash_series(s: pd.Series, categorize: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    64-битные хэши значений колонки и маска пропусков.
+
+    Числа приводятся к float64, bool - к object: так одно и то же значение
+    хэшируется одинаково, даже если в разных чанках pandas вывел разный тип.
+    ``categorize=False`` не строит хэш-таблицу уникальных значений
+    (дольше на колонках с повторами, но память не растёт с числом уникальных).
+    """
+    if ptypes.is_bool_dtype(s.dtype):
+        values = s.to_numpy(dtype=object)
+    elif ptypes.is_numeric_dtype(s.dtype) and not ptypes.is_complex_dtype(s.dtype):
+        # + 0.0 превращает -0.0 в 0.0: для pandas это одно значение.
+        values = s.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+    else:
+        values = s.to_numpy(dtype=object)
+    return pd.util.hash_array(values, categorize=categorize), pd.isna(values)
+
+
+# ---------- HyperLogLog ----------
+
+_HLL_MAGIC = b"HLL1"
+_SPACE_SAVING_MAGIC = b"SSV1"
+_HLL_MIN_P = 4
+_HLL_MAX_P = 18
+
+
+class HyperLogLog:
+    """
+    HyperLogLog с 2**p регистрами. Относительная стандартная ошибка
+    оценки - примерно ``1.04 / sqrt(2**p)``.
+    """
+
+    def __init__(self, p: int = 14) -> None:
+        if not _HLL_MIN_P <= p <= _HLL_MAX_P:
+            raise ValueError(f"p должно быть от {_HLL_MIN_P} до {_HLL_MAX_P}")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, rel_error: float) -> "HyperLogLog":
+        """
+        Скетч с наименьшим p, у которого стандартная ошибка не больше rel_error.
+        """
+        if rel_error <= 0:
+            raise ValueError("Допустимая ошибка должна быть положительной.")
+        p = math.ceil(math.log2((1.04 / rel_error) ** 2))
+        return cls(min(_HLL_MAX_P, max(_HLL_MIN_P, p)))
+
+    @property
+    def rel_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        tail_bits = 64 - self.p
+        idx = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # Позиция первой единицы в оставшихся битах = tail_bits - bit_length + 1.
+        smeared = tail.copy()
+        for shift in (1, 2, 4, 8, 16, 32):
+            smeared |= smeared >> np.uint64(shift)
+        rank = (tail_bits - np.bitwise_count(smeared) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def add_series(self, s: pd.Series) -> None:
+        hashes, null_mask = hash_series(s, categorize=False)
+        self.add_hashes(hashes[~null_mask])
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("Нельзя объединить HyperLogLog с разной точностью.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Поправка для малых мощностей (linear counting).
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+    def to_bytes(self) -> bytes:
+        return _HLL_MAGIC + struct.pack("<B", self.p) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        if data[:4] != _HLL_MAGIC:
+            raise ValueError("Это не сериализованный HyperLogLog.")
+        (p,) = struct.unpack("<B", data[4:5])
+        sketch = cls(p)
+        sketch.registers = np.frombuffer(data[5:], dtype=np.uint8).copy()
+        return sketch
+
+
+# ---------- Space-Saving ----------
+
+
+class SpaceSaving:
+    """
+    Space-Saving: следит не более чем за ``capacity`` значениями.
+
+    Для каждого значения хранится оценка частоты сверху (``count``) и её
+    максимальная переоценка (``error``): истинная частота лежит в
+    ``[count - error, count]``, а ``error <= total / capacity``.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity должно быть положительным.")
+        self.capacity = capacity
+        self.total = 0
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+
+    @classmethod
+    def for_error(cls, rel_error: float, top_k: int = 1) -> "SpaceSaving":
+        """
+        Скетч, у которого переоценка частоты не больше ``rel_error * total``.
+        """
+        if rel_error <= 0:
+            raise ValueError("Допустимая ошибка должна быть положительной.")
+        return cls(max(top_k, math.ceil(1.0 / rel_error)))
+
+    def _min_count(self) -> int:
+        # Минимальная частота среди отслеживаемых - верхняя граница частоты
+        # любого неотслеживаемого значения (0, пока скетч не заполнен).
+        if len(self.counts) < self.capacity:
+            return 0
+        return int(self.counts.min())
+
+    def add_counts(self, counts: pd.Series) -> None:
+        """
+        Добавить точные частоты значений очередного чанка.
+        """
+        counts = counts[counts > 0]
+        self._merge_arrays(counts, pd.Series(0, index=counts.index, dtype=np.int64), 0)
+        self.total += int(counts.sum())
+
+    def add_series(self, s: pd.Series) -> None:
+        self.add_counts(s.value_counts(dropna=True, sort=False))
+
+    def merge(self, other: "SpaceSaving") -> None:
+        self._merge_arrays(other.counts, other.errors, other._min_count())
+        self.total += other.total
+
+    def _merge_arrays(self, counts: pd.Series, errors: pd.Series, other_min: int) -> None:
+        # Слияние двух сводок (Cafaro et al.): отсутствующее в одной из сводок
+        # значение получает её минимальную частоту и как оценку, и как ошибку.
+        own_min = self._min_count()
+        index = self.counts.index.append(counts.index).unique()
+        own_counts = self.counts.reindex(index)
+        own_errors = self.errors.reindex(index)
+        new_counts = counts.reindex(index)
+        new_errors = errors.reindex(index)
+        own_missing = own_counts.isna()
+        new_missing = new_counts.isna()
+
+        merged_counts = own_counts.fillna(own_min) + new_counts.fillna(other_min)
+        merged_errors = (
+            own_errors.where(~own_missing, own_min)
+            + new_errors.where(~new_missing, other_min)
+        )
+        order = merged_counts.astype(np.int64).sort_values(ascending=False, kind="stable")
+        keep = order.index[: self.capacity]
+        self.counts = merged_counts.astype(np.int64).loc[keep]
+        self.errors = merged_errors.astype(np.int64).loc[keep]
+
+    def top(self, k: int) -> pd.DataFrame:
+        """
+        Top-k значений: value/count/error, по убыванию count.
+        """
+        order = self.counts.sort_values(ascending=False, kind="stable").head(k)
+        return pd.DataFrame(
+            {
+                "value": order.index,
+                "count": order.values,
+                "error": self.errors.loc[order.index].values,
+            }
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Сериализовать скетч. Значения сохраняются вместе с типами (pickle),
+        так что ``Timestamp``, ``date``, ``Decimal``, ``1`` и ``"1"`` переживают
+        круговой путь; ``from_bytes`` можно вызывать только для своих данных.
+        """
+        payload = (self.capacity, self.total, self.counts, self.errors)
+        return _SPACE_SAVING_MAGIC + pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpaceSaving":
+        if data[:4] != _SPACE_SAVING_MAGIC:
+            raise ValueError("Это не сериализованный SpaceSaving.")
+        capacity, total, counts, errors = pickle.loads(data[4:])
+        sketch = cls(capacity)
+        sketch.total = total
+        sketch.counts = counts
+        sketch.errors = errors
+        return sketch
+
+
+def approx_top_categories_table(sketch: SpaceSaving, top_k: int) -> Optional[pd.DataFrame]:
+    """
+    Таблица value/count/share/count_error по Space-Saving - приближённый
+    аналог ``core.top_categories_table``. None, если значений нет.
+    """
+    top = sketch.top(top_k)
+    if top.empty:
+        return None
+    return pd.DataFrame(
+        {
+            "value": top["value"].astype(str).values,
+            "count": top["count"].values,
+            "share": (top["count"] / top["count"].sum()).values,
+            "count_error": top["error"].values,
+        }
+    )
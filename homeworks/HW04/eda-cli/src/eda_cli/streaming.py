@@ -0,0 +1,790 @@
+"""
+Потоковый (chunked) режим профилирования CSV.
+
+Файл читается через ``pd.read_csv(chunksize=...)``, каждый чанк «сворачивается»
+в аккумуляторы, которые умеют сливаться друг с другом:
+
+- число непустых значений и пропусков, доли пропусков по блокам строк
+  для картинки (``core.MissingMatrix``);
+- среднее/дисперсия по Уэлфорду (слияние по формуле Чана);
+- min/max и число нулей;
+- частоты значений (для ``unique`` и top-k категорий) или, в приближённом
+  режиме, скетчи HyperLogLog и Space-Saving;
+- со-моменты пар числовых колонок для корреляции (``correlation``);
+- хэши строк для поиска дубликатов (``duplicates.DuplicateCounter``: при
+  большом числе строк они выгружаются в разделы на диске);
+- при заданном ``sample_rows`` - выборка строк фиксированного размера для
+  ранговых корреляций и мер связи категорий (``association.RowSample``);
+- кандидаты в примерные значения.
+
+По аккумуляторам строятся те же ``DatasetSummary``, ``missing_table`` и флаги
+``compute_quality_flags``, что и по целому DataFrame. Память ограничена
+размером чанка плюс числом различных значений в колонках (целиком файл
+в память не загружается). Если ``read_csv`` разобрал колонку в разных
+чанках по-разному (числа, а дальше текст), файл читается второй раз, и такие
+колонки пересчитываются по исходному тексту (``StreamingProfile.recount_text``).
+"""
+
+from __future__ import annotations
+
+import io
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from .core import (
+    DEFAULT_MISSING_BINS,
+    ColumnSummary,
+    _is_category_like,
+    DatasetSummary,
+    MissingMatrix,
+    correlation_matrix,
+    missing_table_from_counts,
+    quality_flags_from_stats,
+    top_categories_table,
+)
+from .association import RowSample
+from .correlation import CorrelationAccumulator
+from .defaults import DEFAULT_CHUNKSIZE, STREAMING_THRESHOLD_BYTES  # noqa: F401
+from .duplicates import DuplicateCounter, row_hashes, sample_size_for_error
+from .sketches import HyperLogLog, SpaceSaving, approx_top_categories_table
+from .tracing import traced
+
+PathLike = Union[str, Path]
+
+# Сколько частичных таблиц частот копить перед их слиянием.
+_COUNTS_COMPACT_EVERY = 8
+
+# Размер блока (в байтах) при разборе CSV из потока байтов.
+DEFAULT_BLOCK_BYTES = 4 * 1024 * 1024
+
+_QUOTE = ord('"')
+_NEWLINE = ord("\n")
+
+
+class StreamingProfile:
+    """
+    Сливаемые аккумуляторы статистик по колонкам таблицы.
+
+    Использование::
+
+        profile = StreamingProfile(columns)
+        for chunk in chunks:
+            profile.update(chunk)
+        summary = profile.summary()
+
+    Два профиля с одинаковыми колонками, посчитанные по разным частям файла,
+    объединяются через ``merge`` (порядок частей должен соответствовать
+    порядку строк в файле — от него зависят примерные значения).
+
+    При заданном ``approx_error`` вместо точных частот значений хранятся
+    скетчи фиксированного размера: ``unique`` и top-k становятся
+    приближёнными, зато память не зависит от числа различных значений.
+    Число дубликатов строк в этом режиме оценивается по выборке хэшей строк.
+
+    ``sample_rows`` - сколько строк хранить в выборке для методов
+    корреляции, которым нужны все значения сразу (Спирмен, Кендалл, меры
+    связи категорий); 0 - не хранить. ``missing_bins`` - разрешение
+    матрицы пропусков (число блоков строк).
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[Any],
+        example_values_per_column: int = 3,
+        approx_error: Optional[float] = None,
+        top_k: int = 5,
+        sample_rows: int = 0,
+        missing_bins: int = DEFAULT_MISSING_BINS,
+    ) -> None:
+        self.columns: List[Any] = list(columns)
+        self.example_values_per_column = example_values_per_column
+        self.approx_error = approx_error
+        self.top_k = top_k
+        self.n_rows = 0
+
+        n_cols = len(self.columns)
+        self.dtypes: List[List[Any]] = [[] for _ in range(n_cols)]
+        self.missing = np.zeros(n_cols, dtype=np.int64)
+        self.missing_matrix = MissingMatrix(self.columns, missing_bins)
+
+        # Моменты по числовым чанкам (Уэлфорд/Чан), min/max и нули.
+        self.num_count = np.zeros(n_cols, dtype=np.int64)
+        self.mean = np.zeros(n_cols, dtype=np.float64)
+        self.m2 = np.zeros(n_cols, dtype=np.float64)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+        self.zeros = np.zeros(n_cols, dtype=np.int64)
+        self.correlation = CorrelationAccumulator(n_cols)
+
+        self.value_counts: List[List[pd.Series]] = [[] for _ in range(n_cols)]
+        self.distinct: List[HyperLogLog] = []
+        self.heavy_hitters: List[SpaceSaving] = []
+        if approx_error is not None:
+            self.distinct = [HyperLogLog.for_error(approx_error) for _ in range(n_cols)]
+            self.heavy_hitters = [
+                SpaceSaving.for_error(approx_error, top_k) for _ in range(n_cols)
+            ]
+        self.examples: List[List[Any]] = [[] for _ in range(n_cols)]
+        self.duplicates = self._new_duplicates()
+        self.sample = RowSample(sample_rows)
+        self.preview: Optional[pd.DataFrame] = None
+
+    def _new_duplicates(self) -> DuplicateCounter:
+        approx_error = self.approx_error
+        return DuplicateCounter(
+            sample_size=sample_size_for_error(approx_error) if approx_error is not None else None
+        )
+
+    # ---------- накопление ----------
+
+    @traced
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Добавить очередной чанк (колонки в том же порядке, что и у профиля).
+        """
+        if list(chunk.columns) != self.columns:
+            raise ValueError("Колонки чанка не совпадают с колонками профиля.")
+
+        if self.preview is None:
+            self.preview = chunk
+        n = len(chunk)
+        self.n_rows += n
+        self.missing_matrix.update(chunk)
+
+        series = [s for _, s in chunk.items()]
+        for j, s in enumerate(series):
+            self.dtypes[j].append(s.dtype)
+
+        numeric_positions = [
+            j
+            for j, s in enumerate(series)
+            if ptypes.is_numeric_dtype(s.dtype) and not ptypes.is_complex_dtype(s.dtype)
+        ]
+        block = np.empty((n, len(numeric_positions)), dtype=np.float64, order="F")
+        for k, j in enumerate(numeric_positions):
+            block[:, k] = series[j].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._update_moments(numeric_positions, block)
+        self.correlation.update(block, numeric_positions)
+
+        for j, s in enumerate(series):
+            self.missing[j] += n - self._add_values(j, s)
+
+        hashes = row_hashes(chunk)
+        self.duplicates.add(hashes)
+        self.sample.add(chunk, hashes)
+
+    def _add_values(self, j: int, s: pd.Series) -> int:
+        """
+        Учесть значения колонки ``j`` в частотах (или скетчах) и примерах;
+        вернуть число непустых значений.
+        """
+        if self.approx_error is not None:
+            self.distinct[j].add_series(s)
+            self.heavy_hitters[j].add_series(s)
+            head = s.iloc[: 16 * self.example_values_per_column].dropna()
+            self._add_examples(j, pd.unique(head))
+            return len(s) - int(s.isna().sum())
+        vc = s.value_counts(dropna=True, sort=False)
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # value_counts категорий содержит и ненаблюдавшиеся значения,
+            # а порядок — порядок категорий, а не первого появления.
+            self._add_counts(j, vc[vc > 0])
+            self._add_examples(j, s.dropna().unique())
+        else:
+            self._add_counts(j, vc)
+            self._add_examples(j, vc.index)
+        return int(vc.sum())
+
+    def _update_moments(self, positions: Sequence[int], block: np.ndarray) -> None:
+        if not positions:
+            return
+        idx = np.asarray(positions)
+        nan_mask = np.isnan(block)
+        count_b = block.shape[0] - nan_mask.sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(nan_mask, 0.0, block).sum(axis=0) / count_b
+            centered = np.where(nan_mask, 0.0, block - mean_b)
+            m2_b = (centered * centered).sum(axis=0)
+        mean_b = np.where(count_b > 0, mean_b, 0.0)
+        m2_b = np.where(count_b > 0, m2_b, 0.0)
+
+        self.mean[idx], self.m2[idx], self.num_count[idx] = _merge_moments(
+            self.num_count[idx], self.mean[idx], self.m2[idx], count_b, mean_b, m2_b
+        )
+        self.min[idx] = np.minimum(
+            self.min[idx], np.where(nan_mask, np.inf, block).min(axis=0, initial=np.inf)
+        )
+        self.max[idx] = np.maximum(
+            self.max[idx], np.where(nan_mask, -np.inf, block).max(axis=0, initial=-np.inf)
+        )
+        self.zeros[idx] += (block == 0).sum(axis=0)
+
+    def _add_counts(self, j: int, vc: pd.Series) -> None:
+        parts = self.value_counts[j]
+        parts.append(vc)
+        if len(parts) >= _COUNTS_COMPACT_EVERY:
+            self.value_counts[j] = [_sum_counts(parts)]
+
+    def _add_examples(self, j: int, values: Iterable[Any]) -> None:
+        # Собираем «сырые» значения: строковое представление зависит от
+        # итогового типа колонки, который известен только в конце. Значения
+        # различаем по ``_csv_text``: 3 и 3.0 (или 1 и "1" из чанков разного
+        # типа) совпадут и после приведения, поэтому место занимает только
+        # первое из них, и k различных примеров сохраняются.
+        k = self.example_values_per_column
+        seen = self.examples[j]
+        if len(seen) >= k:
+            return
+        texts = {_csv_text(v) for v in seen}
+        for value in values:
+            text = _csv_text(value)
+            if text not in texts:
+                texts.add(text)
+                seen.append(value)
+                if len(seen) >= k:
+                    break
+
+    def merge(self, other: "StreamingProfile") -> None:
+        """
+        Влить профиль, посчитанный по следующей части файла.
+        """
+        if other.columns != self.columns:
+            raise ValueError("Нельзя объединить профили с разными колонками.")
+
+        self.n_rows += other.n_rows
+        self.missing += other.missing
+        self.missing_matrix.merge(other.missing_matrix)
+        self.mean, self.m2, self.num_count = _merge_moments(
+            self.num_count, self.mean, self.m2, other.num_count, other.mean, other.m2
+        )
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.zeros += other.zeros
+        self.correlation.merge(other.correlation)
+
+        for j in range(len(self.columns)):
+            self.dtypes[j].extend(other.dtypes[j])
+            for vc in other.value_counts[j]:
+                self._add_counts(j, vc)
+            if self.approx_error is not None:
+                self.distinct[j].merge(other.distinct[j])
+                self.heavy_hitters[j].merge(other.heavy_hitters[j])
+            self._add_examples(j, other.examples[j])
+        self.duplicates.merge(other.duplicates)
+        self.sample.merge(other.sample)
+        if self.preview is None:
+            self.preview = other.preview
+
+    def diverged_columns(self) -> List[int]:
+        """
+        Номера колонок, которые ``read_csv`` разобрал в разных чанках по-разному
+        (например, числа, а дальше текст), и по всему файлу они - object.
+        Частоты, примеры и хэши строк собраны из разобранных значений:
+        исходный текст ("01", "1.0", "1e3") по ним уже не восстановить, его
+        нужно перечитать (``recount_text``).
+        """
+        return [
+            j
+            for j, dtypes in enumerate(self.dtypes)
+            if len(set(dtypes)) > 1 and _common_dtype(dtypes) == np.dtype(object)
+        ]
+
+    def recount_text(self, chunks: Iterable[pd.DataFrame]) -> None:
+        """
+        Пересчитать по исходному тексту частоты (или скетчи) и примеры колонок
+        ``diverged_columns``, а заодно хэши строк для дубликатов и выборку
+        строк (в них тоже входят значения этих колонок). ``chunks`` - все
+        строки таблицы, прочитанные заново, где эти колонки прочитаны
+        ``dtype=str``, а остальные - как при первом проходе.
+        """
+        positions = self.diverged_columns()
+        for j in positions:
+            self.value_counts[j] = []
+            self.examples[j] = []
+            if self.approx_error is not None:
+                self.distinct[j] = HyperLogLog.for_error(self.approx_error)
+                self.heavy_hitters[j] = SpaceSaving.for_error(self.approx_error, self.top_k)
+        self.duplicates = self._new_duplicates()
+        self.sample = RowSample(self.sample.capacity)
+        for chunk in chunks:
+            for j in positions:
+                self._add_values(j, chunk.iloc[:, j])
+            hashes = row_hashes(chunk)
+            self.duplicates.add(hashes)
+            self.sample.add(chunk, hashes)
+
+    # ---------- результаты ----------
+
+    def final_dtypes(self) -> List[Any]:
+        """
+        Итоговые типы колонок — такие, какие дал бы ``pd.read_csv`` на всём файле.
+        """
+        return [_common_dtype(dtypes) for dtypes in self.dtypes]
+
+    def _counts(self, j: int) -> pd.Series:
+        parts = self.value_counts[j]
+        if len(parts) != 1:
+            self.value_counts[j] = [_sum_counts(parts)]
+        counts = self.value_counts[j][0]
+        if (
+            len(set(self.dtypes[j])) > 1
+            and _common_dtype(self.dtypes[j]) == np.dtype(object)
+            and counts.index.inferred_type not in ("string", "empty")
+        ):
+            # Колонка числовая в одних чанках и текстовая в других, а
+            # исходный текст не перечитан (recount_text): 1 и "1" считаем
+            # одним значением - лучшее, что можно сделать по разобранным.
+            keys = counts.index.map(_csv_text)
+            counts = counts.groupby(keys, sort=False).sum().rename_axis(counts.index.name)
+            self.value_counts[j] = [counts]
+        return counts
+
+    def _correlation_positions(self) -> List[int]:
+        # Как select_dtypes(include="number"): bool в корреляцию не входит.
+        return [
+            j
+            for j, dtype in enumerate(self.final_dtypes())
+            if ptypes.is_numeric_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+        ]
+
+    def correlation_columns(self) -> List[Any]:
+        """
+        Колонки, входящие в корреляцию (числовые, кроме bool).
+        """
+        return [self.columns[j] for j in self._correlation_positions()]
+
+    @traced
+    def correlation_matrix(self, method: str = "pearson") -> pd.DataFrame:
+        """
+        Корреляция Пирсона числовых колонок по всему файлу
+        (как ``core.correlation_matrix``). Остальные методы считаются по
+        выборке строк (нужен ``sample_rows`` при создании профиля).
+        """
+        if method != "pearson":
+            return correlation_matrix(self.sample_frame(), method=method)
+        positions = self._correlation_positions()
+        if not positions:
+            return pd.DataFrame()
+        names = [self.columns[j] for j in positions]
+        return pd.DataFrame(self.correlation.matrix(positions), index=names, columns=names)
+
+    def correlation_top_pairs(self, k: int = 20) -> pd.DataFrame:
+        """
+        ``k`` пар числовых колонок с наибольшим |r| (см. ``correlation.top_pairs``).
+        """
+        positions = self._correlation_positions()
+        return self.correlation.top_pairs([self.columns[j] for j in positions], k, positions)
+
+    def sample_frame(self) -> pd.DataFrame:
+        """
+        Выборка строк (не больше ``sample_rows``) с итоговыми типами колонок.
+        """
+        if self.sample.frame is None:
+            return pd.DataFrame(columns=self.columns)
+        frame = self.sample.frame
+        changed = {
+            name: dtype
+            for name, dtype in zip(self.columns, self.final_dtypes())
+            if frame[name].dtype != dtype
+        }
+        return frame.astype(changed) if changed else frame
+
+    @traced
+    def summary(self) -> DatasetSummary:
+        """
+        ``DatasetSummary`` по всему файлу.
+        """
+        n_rows = self.n_rows
+        columns: List[ColumnSummary] = []
+        for j, (name, dtype) in enumerate(zip(self.columns, self.final_dtypes())):
+            missing = int(self.missing[j])
+            non_null = n_rows - missing
+            is_numeric = bool(ptypes.is_numeric_dtype(dtype))
+            has_stats = is_numeric and non_null > 0
+            count = int(self.num_count[j])
+            std = float(np.sqrt(self.m2[j] / (count - 1))) if count > 1 else float("nan")
+            if self.approx_error is not None:
+                unique = self.distinct[j].estimate()
+                unique_error: Optional[float] = self.distinct[j].rel_error
+            else:
+                unique = len(self._counts(j))
+                unique_error = None
+            columns.append(
+                ColumnSummary(
+                    name=name,
+                    dtype=str(dtype),
+                    non_null=non_null,
+                    missing=missing,
+                    missing_share=float(missing / n_rows) if n_rows > 0 else 0.0,
+                    unique=unique,
+                    example_values=self._example_strings(j, dtype),
+                    is_numeric=is_numeric,
+                    min=float(self.min[j]) if has_stats else None,
+                    max=float(self.max[j]) if has_stats else None,
+                    mean=float(self.mean[j]) if has_stats else None,
+                    std=std if has_stats else None,
+                    unique_error=unique_error,
+                )
+            )
+        return DatasetSummary(n_rows=n_rows, n_cols=len(self.columns), columns=columns)
+
+    def _example_strings(self, j: int, dtype: Any) -> List[Any]:
+        values = self.examples[j]
+        if not values:
+            return []
+        raw = pd.Series(values, dtype=object)
+        if dtype == np.dtype(object):
+            texts = raw.map(_csv_text)
+        else:
+            texts = raw.astype(dtype).astype(str)
+        return texts.unique()[: self.example_values_per_column].tolist()
+
+    def missing_table(self) -> pd.DataFrame:
+        """
+        Аналог ``core.missing_table`` для всего файла.
+        """
+        total = pd.Series(self.missing, index=pd.Index(self.columns), dtype=np.int64)
+        return missing_table_from_counts(total, self.n_rows)
+
+    @traced
+    def top_categories(self, max_columns: int = 5, top_k: int = 5) -> Dict[str, pd.DataFrame]:
+        """
+        Аналог ``core.top_categories`` для всего файла.
+        """
+        result: Dict[str, pd.DataFrame] = {}
+        candidates = [
+            j
+            for j, dtype in enumerate(self.final_dtypes())
+            if _is_category_like(dtype)
+        ]
+        for j in candidates[:max_columns]:
+            if self.approx_error is not None:
+                table = approx_top_categories_table(self.heavy_hitters[j], top_k)
+            else:
+                counts = self._counts(j).sort_values(ascending=False)
+                table = top_categories_table(counts, top_k)
+            if table is not None:
+                result[self.columns[j]] = table
+        return result
+
+    def num_duplicate_rows(self) -> int:
+        """
+        Число строк, у которых есть полный дубликат (как ``duplicated(keep=False)``).
+        """
+        return self.duplicates.count()
+
+    def zero_ratios(self) -> Dict[str, float]:
+        """
+        Доля нулей среди непустых значений каждой числовой колонки
+        (bool, как и в ``select_dtypes(include="number")``, не считается).
+        """
+        ratios: Dict[str, float] = {}
+        for j, dtype in enumerate(self.final_dtypes()):
+            total_count = self.num_count[j]
+            is_number = ptypes.is_numeric_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+            if is_number and total_count > 0:
+                ratios[self.columns[j]] = self.zeros[j] / total_count
+        return ratios
+
+    @traced
+    def quality_flags(
+        self,
+        summary: Optional[DatasetSummary] = None,
+        missing_df: Optional[pd.DataFrame] = None,
+        min_missing_share: float = 0.3,
+    ) -> Dict[str, Any]:
+        """
+        Аналог ``core.compute_quality_flags`` для всего файла.
+        """
+        return quality_flags_from_stats(
+            summary if summary is not None else self.summary(),
+            missing_df if missing_df is not None else self.missing_table(),
+            num_duplicate_rows=self.num_duplicate_rows(),
+            zero_ratios=self.zero_ratios(),
+            min_missing_share=min_missing_share,
+        )
+
+
+def _merge_moments(
+    n_a: np.ndarray,
+    mean_a: np.ndarray,
+    m2_a: np.ndarray,
+    n_b: np.ndarray,
+    mean_b: np.ndarray,
+    m2_b: np.ndarray,
+):
+    """
+    Слияние (count, mean, M2) двух частей по формуле Чана.
+    """
+    n = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = mean_b - mean_a
+        frac_b = np.where(n > 0, n_b / n, 0.0)
+        mean = mean_a + delta * frac_b
+        m2 = m2_a + m2_b + delta * delta * n_a * frac_b
+    return np.where(n > 0, mean, 0.0), np.where(n > 0, m2, 0.0), n
+
+
+def _sum_counts(parts: Sequence[pd.Series]) -> pd.Series:
+    """
+    Сложить частоты значений; порядок ключей — порядок первого появления.
+    """
+    if len(parts) == 1:
+        return parts[0]
+    combined = pd.concat(parts)
+    return combined.groupby(level=0, sort=False).sum()
+
+
+def _csv_text(value: Any) -> str:
+    """
+    Разобранное значение как текст object-колонки - если исходный текст
+    недоступен (чанки без ``recount_text``). Целые float пишутся без ".0":
+    "1" встречается чаще, чем "1.0".
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (float, np.floating)) and np.isfinite(value) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _common_dtype(dtypes: Sequence[Any]) -> Any:
+    """
+    Тип, который ``read_csv`` вывел бы для колонки по всем чанкам сразу.
+    """
+    unique = list(dict.fromkeys(dtypes))
+    if len(unique) == 1:
+        return unique[0]
+    if all(isinstance(d, np.dtype) and d.kind in "iuf" for d in unique):
+        return np.result_type(*unique)
+    return np.dtype(object)
+
+
+def profile_chunks(
+    chunks: Iterable[pd.DataFrame],
+    columns: Sequence[Any],
+    example_values_per_column: int = 3,
+    approx_error: Optional[float] = None,
+    top_k: int = 5,
+    sample_rows: int = 0,
+    missing_bins: int = DEFAULT_MISSING_BINS,
+) -> StreamingProfile:
+    """
+    Накопить профиль по последовательности чанков (в порядке строк).
+    ``columns`` - колонки таблицы на случай, если чанков нет совсем.
+    """
+    profile: Optional[StreamingProfile] = None
+    for chunk in chunks:
+        if profile is None:
+            profile = StreamingProfile(
+                chunk.columns, example_values_per_column, approx_error, top_k, sample_rows,
+                missing_bins,
+            )
+        profile.update(chunk)
+    if profile is None:
+        profile = StreamingProfile(
+            columns, example_values_per_column, approx_error, top_k, sample_rows, missing_bins
+        )
+    return profile
+
+
+def profile_csv(
+    path: PathLike,
+    sep: str = ",",
+    encoding: str = "utf-8",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    example_values_per_column: int = 3,
+    approx_error: Optional[float] = None,
+    top_k: int = 5,
+) -> StreamingProfile:
+    """
+    Прочитать CSV по чанкам и вернуть накопленный профиль.
+    ``approx_error``/``top_k`` - см. ``StreamingProfile``.
+    """
+    with pd.read_csv(path, sep=sep, encoding=encoding, chunksize=chunksize) as reader:
+        # Файл только с заголовком: чанков нет, но колонки известны.
+        header = pd.read_csv(path, sep=sep, encoding=encoding, nrows=0).columns
+        profile = profile_chunks(reader, header, example_values_per_column, approx_error, top_k)
+    _recount_diverged(profile, path, sep=sep, encoding=encoding, chunksize=chunksize)
+    return profile
+
+
+def _recount_diverged(profile: StreamingProfile, source: Any, chunksize: int, **read_kwargs: Any) -> None:
+    """
+    Если тип какой-то колонки разошёлся между чанками, перечитать файл,
+    прочитав такие колонки текстом (``dtype=str``), и пересчитать их значения
+    и хэши строк - как у ``read_csv`` по всему файлу. Обычный файл второй
+    раз не читается.
+    """
+    positions = profile.diverged_columns()
+    if not positions:
+        return
+    text = {profile.columns[j]: str for j in positions}
+    with pd.read_csv(source, dtype=text, chunksize=chunksize, **read_kwargs) as reader:
+        profile.recount_text(reader)
+
+
+class CsvRecordSplitter:
+    """
+    Нарезает поток байтов CSV на блоки, заканчивающиеся на границе записи.
+
+    Перевод строки считается концом записи, только если до него чётное
+    число кавычек (строки в кавычках могут содержать переводы строк).
+    Первая запись - заголовок, он доступен в ``header``.
+    Кавычки и ``\\n`` однобайтовые в UTF-8, поэтому резать байты безопасно.
+    """
+
+    def __init__(self, block_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
+        self.block_bytes = block_bytes
+        self.header: Optional[bytes] = None
+        self._pending = bytearray()
+        self._scanned = 0  # сколько байтов _pending уже просмотрено
+        self._odd_quotes = False  # чётность кавычек от начала потока до _scanned
+        self._boundary = 0  # конец последней полной записи в _pending
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Добавить байты; вернуть готовые блоки полных записей (без заголовка).
+        """
+        self._pending += data
+        if self.header is None or len(self._pending) >= self.block_bytes:
+            self._scan()
+        blocks: List[bytes] = []
+        if self.header is None:
+            return blocks
+        if len(self._pending) >= self.block_bytes and self._boundary > 0:
+            blocks.append(self._cut(self._boundary))
+        return blocks
+
+    def close(self) -> List[bytes]:
+        """
+        Конец потока: вернуть остаток (последняя запись может быть без ``\\n``).
+        """
+        self._scan()
+        if self.header is None:
+            self.header = bytes(self._pending)
+            self._pending.clear()
+            return []
+        if self._pending:
+            return [self._cut(len(self._pending))]
+        return []
+
+    def _scan(self) -> None:
+        tail = np.frombuffer(memoryview(self._pending)[self._scanned :], dtype=np.uint8)
+        if len(tail) == 0:
+            return
+        quotes = np.flatnonzero(tail == _QUOTE)
+        newlines = np.flatnonzero(tail == _NEWLINE)
+        # tail ссылается на буфер _pending; пока он жив, буфер нельзя менять.
+        del tail
+        # Число кавычек перед каждым переводом строки; кавычек обычно мало,
+        # поэтому searchsorted дешевле накопленной суммы по всем байтам.
+        quotes_before = np.searchsorted(quotes, newlines) + int(self._odd_quotes)
+        ends = newlines[quotes_before % 2 == 0]
+        self._odd_quotes = (len(quotes) + int(self._odd_quotes)) % 2 == 1
+        if len(ends):
+            start = self._scanned
+            if self.header is None:
+                header_end = start + int(ends[0]) + 1
+                self.header = bytes(self._pending[:header_end])
+                del self._pending[:header_end]
+                start -= header_end
+            self._boundary = start + int(ends[-1]) + 1
+        self._scanned = len(self._pending)
+
+    def _cut(self, end: int) -> bytes:
+        block = bytes(self._pending[:end])
+        del self._pending[:end]
+        self._scanned -= end
+        self._boundary = 0
+        return block
+
+
+class CsvStreamProfiler:
+    """
+    Профилирование CSV, приходящего кусками байтов (например, тело
+    HTTP-запроса): байты режутся на блоки полных записей, каждый блок
+    разбирается ``pd.read_csv`` и добавляется в ``StreamingProfile``.
+
+    Память ограничена размером блока плюс состоянием профиля. Принятые байты
+    дописываются во временный файл (первые ``block_bytes`` - в памяти): если
+    тип колонки разошёлся между блоками, в ``finish`` такие колонки
+    перечитываются из него текстом (``StreamingProfile.recount_text``), иначе
+    файл не читается. Он удаляется в ``finish``/``close``.
+    """
+
+    def __init__(
+        self,
+        sep: str = ",",
+        encoding: str = "utf-8",
+        block_bytes: int = DEFAULT_BLOCK_BYTES,
+        example_values_per_column: int = 3,
+        approx_error: Optional[float] = None,
+        top_k: int = 5,
+    ) -> None:
+        self.sep = sep
+        self.encoding = encoding
+        self.example_values_per_column = example_values_per_column
+        self.approx_error = approx_error
+        self.top_k = top_k
+        self.bytes_received = 0
+        self.profile: Optional[StreamingProfile] = None
+        self._splitter = CsvRecordSplitter(block_bytes)
+        self._block_bytes = block_bytes
+        self._spool = tempfile.SpooledTemporaryFile(max_size=block_bytes)
+
+    def feed(self, data: bytes) -> None:
+        self.bytes_received += len(data)
+        self._spool.write(data)
+        for block in self._splitter.feed(data):
+            self._parse(block)
+
+    def finish(self) -> StreamingProfile:
+        """
+        Конец потока: разобрать остаток и вернуть профиль.
+        """
+        try:
+            for block in self._splitter.close():
+                self._parse(block)
+            if self.profile is None:
+                header = self._splitter.header or b""
+                if not header.strip():
+                    raise ValueError("CSV пустой: нет строки заголовка.")
+                self.profile = self._new_profile(self._read(header).columns)
+            elif self.profile.diverged_columns():
+                self._spool.seek(0)
+                # Чанки по числу строк: примерно по блоку, как при разборе.
+                rows = max(1, self.profile.n_rows * self._block_bytes // max(1, self.bytes_received))
+                _recount_diverged(
+                    self.profile, self._spool, chunksize=rows, sep=self.sep, encoding=self.encoding
+                )
+        finally:
+            self.close()
+        return self.profile
+
+    def close(self) -> None:
+        """
+        Удалить временную копию потока (без ``finish`` - при обрыве приёма).
+        """
+        self._spool.close()
+
+    def _parse(self, block: bytes) -> None:
+        assert self._splitter.header is not None
+        chunk = self._read(self._splitter.header + block)
+        if self.profile is None:
+            self.profile = self._new_profile(chunk.columns)
+        self.profile.update(chunk)
+
+    def _read(self, data: bytes) -> pd.DataFrame:
+        return pd.read_csv(io.BytesIO(data), sep=self.sep, encoding=self.encoding)
+
+    def _new_profile(self, columns: Sequence[Any]) -> StreamingProfile:
+        return StreamingProfile(
+            columns, self.example_values_per_column, self.approx_error, self.top_k
+        )
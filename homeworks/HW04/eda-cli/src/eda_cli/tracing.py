@@ -0,0 +1,320 @@
+"""
+Профилирование конвейера EDA: время и аллокации по функциям и колонкам.
+
+Горячие функции ядра и отрисовки помечены ``@traced``, а циклы по
+колонкам - ``span("column", column=...)``. Пока трассировщик не включён,
+это одна проверка ``ContextVar`` на вызов. Включается он так:
+
+    tracer = Tracer()
+    with tracer.activate():
+        ...
+    tracer.write("profile")  # profile.json и profile.collapsed
+
+- ``profile.json`` - события в формате Chrome Trace Event (открывается
+  в Perfetto или ``chrome://tracing``) плюс ``summary``: по каждой функции
+  число вызовов, полное и собственное время, аллокации;
+- ``profile.collapsed`` - свёрнутые стеки для flamegraph.pl / speedscope:
+  ``a;b;c <собственное время, мкс>``.
+
+Аллокации считаются через ``tracemalloc``: ``alloc_bytes`` - сколько памяти
+осталось занято после вызова, ``peak_bytes`` - пик во время вызова сверх
+занятого на входе. ``tracemalloc`` общий на процесс, так что при нескольких
+одновременно профилируемых запросах сервиса цифры аллокаций смешиваются.
+Он же заметно замедляет код с множеством Python-объектов, поэтому
+абсолютное время под профилем выше обычного.
+Вызовы в дочерних процессах (``--workers`` > 1) видны одним интервалом
+вызывающей функции.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: ContextVar[Optional["Tracer"]] = ContextVar("eda_cli_tracer", default=None)
+_NULL = nullcontext()
+
+# tracemalloc один на процесс: его включает первый активный трассировщик
+# с аллокациями и выключает последний (в сервисе их бывает несколько).
+_alloc_lock = threading.Lock()
+_alloc_users = 0
+
+
+def _start_allocations() -> bool:
+    global _alloc_users
+    with _alloc_lock:
+        if _alloc_users == 0:
+            if tracemalloc.is_tracing():
+                # Включён снаружи (например, python -X tracemalloc) - не трогаем.
+                return False
+            tracemalloc.start()
+        _alloc_users += 1
+        return True
+
+
+def _stop_allocations() -> None:
+    global _alloc_users
+    with _alloc_lock:
+        _alloc_users -= 1
+        if _alloc_users == 0:
+            tracemalloc.stop()
+
+
+class _Frame:
+    __slots__ = ("label", "start_ns", "child_ns", "start_bytes", "peak_bytes", "attrs", "parent")
+
+    def __init__(self, label: str, attrs: Dict[str, Any], parent: Optional["_Frame"]) -> None:
+        self.label = label
+        self.attrs = attrs
+        self.parent = parent
+        self.child_ns = 0
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self.start_ns = perf_counter_ns()
+
+
+# Атрибуты интервала, которые входят в имя кадра: "column:price", "render:hist_1_x.png".
+_LABEL_ATTRS = ("column", "figure")
+
+
+def _label(name: str, attrs: Dict[str, Any]) -> str:
+    for key in _LABEL_ATTRS:
+        if key in attrs:
+            name = f"{name}:{attrs[key]}"
+            break
+    # ";" разделяет кадры свёрнутого стека, перевод строки - записи.
+    return name.replace(";", ",").replace("\n", " ")
+
+
+class Tracer:
+    """
+    Дерево интервалов одного запуска. ``allocations=False`` - только время,
+    без ``tracemalloc``.
+    """
+
+    def __init__(self, allocations: bool = True) -> None:
+        self.allocations = allocations
+        self.events: List[Dict[str, Any]] = []
+        # свёрнутый стек -> (собственное время нс, число вызовов)
+        self.stacks: Dict[str, Tuple[int, int]] = {}
+        # кадр -> вызовы, полное и собственное время (нс), аллокации
+        self.functions: Dict[str, Dict[str, int]] = {}
+        self._origin_ns = perf_counter_ns()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """
+        Сделать трассировщик текущим для ``traced``/``span`` в этом контексте.
+        """
+        started = self.allocations and _start_allocations()
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            if started:
+                _stop_allocations()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        frame = self._enter(name, attrs)
+        try:
+            yield
+        finally:
+            self._exit(frame)
+
+    # ---------- запись интервалов ----------
+
+    def _enter(self, name: str, attrs: Dict[str, Any]) -> _Frame:
+        parent = getattr(self._local, "frame", None)
+        if self.allocations and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            if parent is not None:
+                # Пик родителя до этого вызова сохраняем у него: счётчик
+                # пика сейчас будет сброшен.
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+        frame = _Frame(_label(name, attrs), attrs, parent)
+        if self.allocations and tracemalloc.is_tracing():
+            frame.start_bytes = tracemalloc.get_traced_memory()[0]
+        self._local.frame = frame
+        return frame
+
+    def _exit(self, frame: _Frame) -> None:
+        end_ns = perf_counter_ns()
+        duration = end_ns - frame.start_ns
+        alloc = peak = 0
+        if self.allocations and tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            frame.peak_bytes = max(frame.peak_bytes, traced_peak)
+            alloc = current - frame.start_bytes
+            peak = max(0, frame.peak_bytes - frame.start_bytes)
+            if frame.parent is not None:
+                frame.parent.peak_bytes = max(frame.parent.peak_bytes, frame.peak_bytes)
+            tracemalloc.reset_peak()
+        self._local.frame = frame.parent
+        if frame.parent is not None:
+            frame.parent.child_ns += duration
+
+        labels = []
+        node: Optional[_Frame] = frame
+        while node is not None:
+            labels.append(node.label)
+            node = node.parent
+        stack = ";".join(reversed(labels))
+        self_ns = max(0, duration - frame.child_ns)
+
+        args: Dict[str, Any] = {key: _jsonable(value) for key, value in frame.attrs.items()}
+        if self.allocations:
+            args.update(alloc_bytes=alloc, peak_bytes=peak)
+        with self._lock:
+            self.events.append(
+                {
+                    "name": frame.label,
+                    "ph": "X",
+                    "ts": (frame.start_ns - self._origin_ns) / 1000.0,
+                    "dur": duration / 1000.0,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+            total, calls = self.stacks.get(stack, (0, 0))
+            self.stacks[stack] = (total + self_ns, calls + 1)
+            stats = self.functions.setdefault(
+                frame.label,
+                {"calls": 0, "total_ns": 0, "self_ns": 0, "alloc_bytes": 0, "peak_bytes": 0},
+            )
+            stats["calls"] += 1
+            stats["total_ns"] += duration
+            stats["self_ns"] += self_ns
+            stats["alloc_bytes"] += alloc
+            stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+
+    # ---------- выгрузка ----------
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Сводка по кадрам (функция или функция:колонка), по убыванию
+        собственного времени.
+        """
+        with self._lock:
+            items = [(label, dict(stats)) for label, stats in self.functions.items()]
+        items.sort(key=lambda item: item[1]["self_ns"], reverse=True)
+        result: Dict[str, Dict[str, Any]] = {}
+        for label, stats in items:
+            entry: Dict[str, Any] = {
+                "calls": stats["calls"],
+                "total_ms": stats["total_ns"] / 1e6,
+                "self_ms": stats["self_ns"] / 1e6,
+            }
+            if self.allocations:
+                entry.update(alloc_bytes=stats["alloc_bytes"], peak_bytes=stats["peak_bytes"])
+            result[label] = entry
+        return result
+
+    def trace(self) -> Dict[str, Any]:
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms", "summary": self.summary()}
+
+    def collapsed(self) -> str:
+        """
+        Свёрнутые стеки: ``кадр;кадр;кадр <собственное время, мкс>``.
+        """
+        with self._lock:
+            items = sorted(self.stacks.items())
+        return "".join(f"{stack} {max(1, self_ns // 1000)}\n" for stack, (self_ns, _) in items)
+
+    def write(self, prefix: Union[str, Path]) -> Tuple[Path, Path]:
+        """
+        Записать ``<prefix>.json`` (трасса и сводка) и ``<prefix>.collapsed``.
+        """
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        json_path = prefix.with_name(prefix.name + ".json")
+        collapsed_path = prefix.with_name(prefix.name + ".collapsed")
+        json_path.write_text(json.dumps(self.trace(), ensure_ascii=False), encoding="utf-8")
+        collapsed_path.write_text(self.collapsed(), encoding="utf-8")
+        return json_path, collapsed_path
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _forget_in_child() -> None:
+    # Дочерний процесс (fork из пула ColumnPool) наследует активный
+    # трассировщик вместе с tracemalloc; его интервалы всё равно не дойдут
+    # до родителя, а tracemalloc замедлил бы воркер.
+    global _alloc_users
+    _current.set(None)
+    if _alloc_users:
+        _alloc_users = 0
+        tracemalloc.stop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_in_child)
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current.get()
+
+
+def span(name: str, **attrs: Any) -> ContextManager[Any]:
+    """
+    Интервал внутри функции (например, по колонке: ``span("column", column=name)``).
+    Без активного трассировщика - общий пустой контекст.
+    """
+    tracer = _current.get()
+    if tracer is None:
+        return _NULL
+    return tracer.span(name, **attrs)
+
+
+def traced(fn: F) -> F:
+    """
+    Записывать каждый вызов функции интервалом с её ``__qualname__``.
+    """
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        tracer = _current.get()
+        if tracer is None:
+            return fn(*args, **kwargs)
+        with tracer.span(name):
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def bind(tracer: Optional[Tracer], fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    ``fn``, которая выполняется под ``tracer.activate()`` - для передачи
+    в пул потоков (контекст туда не переносится). Без трассировщика - ``fn``.
+    """
+    if tracer is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracer.activate():
+            return fn(*args, **kwargs)
+
+    return wrapper
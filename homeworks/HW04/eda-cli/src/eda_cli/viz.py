@@ -1,12 +1,39 @@
+"""
+Картинки отчёта.
+
+Рисование разделено на две стадии:
+
+- подготовка: по таблице считаются небольшие массивы для картинки
+  (счётчики гистограммы через ``np.histogram``, доли пропусков по блокам
+  строк - ``core.MissingMatrix``, матрица корреляции) и складываются в
+  описания картинок - ``HistogramFigure``, ``MissingMatrixFigure``,
+  ``CorrelationHeatmapFigure``;
+- отрисовка: ``render()`` описания рисует и сохраняет PNG через
+  объектный API matplotlib и холст Agg, без ``pyplot`` и его глобального
+  состояния. Поэтому описания можно рисовать параллельно в пуле процессов
+  (``render_figures``): воркеру передаются только они, а не колонки таблицы.
+
+matplotlib импортируется при первой отрисовке (``load_backend``), а не при
+импорте модуля: подготовке описаний он не нужен.
+"""
+
 from __future__ import annotations
 
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from .core import DEFAULT_MISSING_BINS, MissingMatrix, correlation_matrix, missing_matrix
+from .tracing import span, traced
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
 PathLike = Union[str, Path]
 
 
@@ -16,99 +43,224 @@ def _ensure_dir(path: PathLike) -> Path:
     return p
 
 
-def plot_histograms_per_column(
+def load_backend() -> Tuple[Any, Any]:
+    """
+    Импортировать объектный API matplotlib и холст Agg; возвращает классы
+    ``Figure`` и ``FigureCanvasAgg``. Повторные вызовы ничего не стоят.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    return Figure, FigureCanvasAgg
+
+
+def _new_figure(figsize: Optional[Tuple[float, float]] = None) -> Tuple[Figure, Axes]:
+    Figure, FigureCanvasAgg = load_backend()
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _save(fig: Figure, out_path: Path) -> Path:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.tight_layout()
+    fig.savefig(out_path)
+    return out_path
+
+
+def _placeholder(text: str, out_path: Path) -> Path:
+    fig, ax = _new_figure()
+    ax.text(0.5, 0.5, text, ha="center", va="center")
+    ax.axis("off")
+    return _save(fig, out_path)
+
+
+# ---------- описания картинок ----------
+
+
+@dataclass
+class HistogramFigure:
+    name: str
+    counts: np.ndarray
+    edges: np.ndarray
+    out_path: Path
+
+    def render(self) -> Path:
+        fig, ax = _new_figure()
+        ax.stairs(self.counts, self.edges, fill=True)
+        ax.set_title(f"Histogram of {self.name}")
+        ax.set_xlabel(self.name)
+        ax.set_ylabel("Count")
+        return _save(fig, self.out_path)
+
+
+@dataclass
+class MissingMatrixFigure:
+    # Доли пропусков (блоки строк x колонки); пустая - пустой датасет.
+    shares: np.ndarray
+    columns: List[str]
+    n_rows: int
+    # Строк в одном блоке (последний блок может быть неполным).
+    block_rows: int
+    out_path: Path
+
+    def render(self) -> Path:
+        if self.shares.size == 0:
+            return _placeholder("Empty dataset", self.out_path)
+        n_cols = len(self.columns)
+        fig, ax = _new_figure(figsize=(min(12, max(n_cols * 0.4, 2.0)), 4))
+        # По вертикали - номера строк: блок i занимает свою полосу строк.
+        im = ax.imshow(
+            self.shares,
+            aspect="auto",
+            interpolation="none",
+            vmin=0,
+            vmax=1,
+            extent=(-0.5, n_cols - 0.5, len(self.shares) * self.block_rows, 0),
+        )
+        ax.set_ylim(self.n_rows, 0)
+        ax.set_xlabel("Columns")
+        ax.set_ylabel("Rows")
+        ax.set_title("Missing values matrix")
+        ax.set_xticks(range(n_cols))
+        ax.set_xticklabels(self.columns, rotation=90, fontsize=8)
+        fig.colorbar(im, ax=ax, label="Missing share")
+        return _save(fig, self.out_path)
+
+
+@dataclass
+class CorrelationHeatmapFigure:
+    values: np.ndarray
+    labels: List[str]
+    out_path: Path
+    label: str = "Pearson r"
+
+    def render(self) -> Path:
+        if self.values.shape[1] < 2:
+            return _placeholder("Not enough numeric columns for correlation", self.out_path)
+        n = self.values.shape[1]
+        fig, ax = _new_figure(figsize=(min(10, n), min(8, n)))
+        im = ax.imshow(self.values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
+        ax.set_xticks(range(n))
+        ax.set_xticklabels(self.labels, rotation=90, fontsize=8)
+        ax.set_yticks(range(n))
+        ax.set_yticklabels(self.labels, fontsize=8)
+        ax.set_title("Correlation heatmap")
+        fig.colorbar(im, ax=ax, label=self.label)
+        return _save(fig, self.out_path)
+
+
+Renderable = Union[HistogramFigure, MissingMatrixFigure, CorrelationHeatmapFigure]
+
+
+@traced
+def histogram_figures(
     df: pd.DataFrame,
     out_dir: PathLike,
     max_columns: int = 6,
     bins: int = 20,
-) -> List[Path]:
+) -> List[HistogramFigure]:
     """
-    Для числовых колонок строит по отдельной гистограмме.
-    Возвращает список путей к PNG.
+    Описания гистограмм первых ``max_columns`` числовых колонок: счётчики
+    по ``bins`` равным интервалам (как ``Axes.hist``). Бесконечности и
+    пропуски не учитываются.
     """
-    out_dir = _ensure_dir(out_dir)
+    out_dir = Path(out_dir)
     numeric_df = df.select_dtypes(include="number")
 
-    paths: List[Path] = []
+    figures: List[HistogramFigure] = []
     for i, name in enumerate(numeric_df.columns[:max_columns]):
-        s = numeric_df[name].dropna()
-        if s.empty:
+        values = numeric_df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
             continue
+        counts, edges = np.histogram(values, bins=bins)
+        figures.append(HistogramFigure(str(name), counts, edges, out_dir / f"hist_{i+1}_{name}.png"))
+    return figures
 
-        fig, ax = plt.subplots()
-        ax.hist(s.values, bins=bins)
-        ax.set_title(f"Histogram of {name}")
-        ax.set_xlabel(name)
-        ax.set_ylabel("Count")
-        fig.tight_layout()
 
-        out_path = out_dir / f"hist_{i+1}_{name}.png"
-        fig.savefig(out_path)
-        plt.close(fig)
+@traced
+def missing_matrix_figure(matrix: MissingMatrix, out_path: PathLike) -> MissingMatrixFigure:
+    return MissingMatrixFigure(
+        matrix.shares(),
+        [str(c) for c in matrix.columns],
+        matrix.n_rows,
+        matrix.width,
+        Path(out_path),
+    )
 
-        paths.append(out_path)
 
-    return paths
+@traced
+def correlation_heatmap_figure(
+    corr: pd.DataFrame,
+    out_path: PathLike,
+    label: str = "Pearson r",
+) -> CorrelationHeatmapFigure:
+    return CorrelationHeatmapFigure(
+        corr.to_numpy(dtype=np.float64), [str(c) for c in corr.columns], Path(out_path), label
+    )
+
+
+def _render(figure: Renderable) -> Path:
+    with span("render", figure=figure.out_path.name):
+        return figure.render()
 
 
-def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
+@traced
+def render_figures(figures: Sequence[Renderable], executor: Optional[Executor] = None) -> List[Path]:
     """
-    Простая визуализация пропусков: где True=пропуск, False=значение.
+    Нарисовать картинки по описаниям - в пуле процессов ``executor``, если
+    он задан, иначе по очереди в текущем процессе. Пути - в порядке описаний.
     """
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if executor is None or len(figures) < 2:
+        return [_render(figure) for figure in figures]
+    return list(executor.map(_render, figures))
 
-    if df.empty:
-        # Рисуем пустой график
-        fig, ax = plt.subplots()
-        ax.text(0.5, 0.5, "Empty dataset", ha="center", va="center")
-        ax.axis("off")
-    else:
-        mask = df.isna().values
-        fig, ax = plt.subplots(figsize=(min(12, df.shape[1] * 0.4), 4))
-        ax.imshow(mask, aspect="auto", interpolation="none")
-        ax.set_xlabel("Columns")
-        ax.set_ylabel("Rows")
-        ax.set_title("Missing values matrix")
-        ax.set_xticks(range(df.shape[1]))
-        ax.set_xticklabels(df.columns, rotation=90, fontsize=8)
-        ax.set_yticks([])
 
-    fig.tight_layout()
-    fig.savefig(out_path)
-    plt.close(fig)
-    return out_path
+# ---------- отдельные картинки ----------
 
 
-def plot_correlation_heatmap(df: pd.DataFrame, out_path: PathLike) -> Path:
+def plot_histograms_per_column(
+    df: pd.DataFrame,
+    out_dir: PathLike,
+    max_columns: int = 6,
+    bins: int = 20,
+) -> List[Path]:
     """
-    Тепловая карта корреляции числовых признаков.
+    Для числовых колонок строит по отдельной гистограмме.
+    Возвращает список путей к PNG.
     """
-    out_path = Path(out_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(out_dir)
+    return render_figures(histogram_figures(df, out_dir, max_columns, bins))
 
-    numeric_df = df.select_dtypes(include="number")
-    if numeric_df.shape[1] < 2:
-        fig, ax = plt.subplots()
-        ax.text(0.5, 0.5, "Not enough numeric columns for correlation", ha="center", va="center")
-        ax.axis("off")
-    else:
-        corr = numeric_df.corr(numeric_only=True)
-        fig, ax = plt.subplots(figsize=(min(10, corr.shape[1]), min(8, corr.shape[0])))
-        im = ax.imshow(corr.values, vmin=-1, vmax=1, cmap="coolwarm", aspect="auto")
-        ax.set_xticks(range(corr.shape[1]))
-        ax.set_xticklabels(corr.columns, rotation=90, fontsize=8)
-        ax.set_yticks(range(corr.shape[0]))
-        ax.set_yticklabels(corr.index, fontsize=8)
-        ax.set_title("Correlation heatmap")
-        fig.colorbar(im, ax=ax, label="Pearson r")
 
-    fig.tight_layout()
-    fig.savefig(out_path)
-    plt.close(fig)
-    return out_path
+def plot_missing_matrix(
+    df: pd.DataFrame,
+    out_path: PathLike,
+    resolution: int = DEFAULT_MISSING_BINS,
+) -> Path:
+    """
+    Визуализация пропусков: доля пропусков в каждой колонке по блокам строк
+    (не больше ``resolution`` блоков, см. ``core.MissingMatrix``).
+    """
+    return missing_matrix_figure(missing_matrix(df, resolution), out_path).render()
+
+
+def plot_correlation_heatmap(
+    df: pd.DataFrame,
+    out_path: PathLike,
+    corr: Optional[pd.DataFrame] = None,
+) -> Path:
+    """
+    Тепловая карта корреляции числовых признаков. ``corr`` - уже посчитанная
+    матрица (``core.correlation_matrix``), чтобы не считать её второй раз.
+    """
+    if corr is None:
+        corr = correlation_matrix(df)
+    return correlation_heatmap_figure(corr, out_path).render()
 
 
+@traced
 def save_top_categories_tables(
     top_cats: Dict[str, pd.DataFrame],
     out_dir: PathLike,
@@ -120,7 +272,7 @@ def save_top_categories_tables(
     out_dir = _ensure_dir(out_dir)
     paths: List[Path] = []
     for name, table in top_cats.items():
-        table_to_save = table.head(top_k)         
+        table_to_save = table.head(top_k)
         out_path = out_dir / f"top_values_{name}.csv"
         table_to_save.to_csv(out_path, index=False)
         paths.append(out_path)
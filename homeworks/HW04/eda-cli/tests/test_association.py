@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.association import (
+    RowSample,
+    count_inversions,
+    cramers_v,
+    correlation_ratio,
+    kendall_tau,
+    rank_columns,
+    sample_rows,
+)
+from eda_cli.core import correlation_matrix
+from eda_cli.streaming import profile_chunks
+
+
+def _brute_kendall(x: np.ndarray, y: np.ndarray) -> float:
+    present = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[present], y[present]
+    upper = np.triu_indices(len(x), k=1)
+    dx = np.sign(x[:, None] - x[None, :])[upper]
+    dy = np.sign(y[:, None] - y[None, :])[upper]
+    pairs = len(dx)
+    return float((dx * dy).sum() / np.sqrt((pairs - (dx == 0).sum()) * (pairs - (dy == 0).sum())))
+
+
+def test_rank_columns_matches_pandas_average_ranks():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 20, size=(500, 4)).astype(float)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    expected = pd.DataFrame(values).rank(method="average").to_numpy()
+    np.testing.assert_allclose(rank_columns(values), expected, equal_nan=True)
+
+
+def test_spearman_matches_pandas_without_missing():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(3000, 5)), columns=list("abcde"))
+    df["b"] = np.exp(df["a"]) + rng.normal(scale=0.5, size=len(df))
+    df["c"] = df["c"].round()
+    expected = df.corr(method="spearman")
+    pd.testing.assert_frame_equal(correlation_matrix(df, method="spearman"), expected, atol=1e-12, rtol=0)
+
+
+def test_spearman_matches_pandas_with_missing():
+    # Ранги пары - по строкам, где непусты обе колонки (как у pandas).
+    small = pd.DataFrame({"x": [1.0, 2.0, 3.0, 4.0, 5.0, np.nan], "y": [5.0, np.nan, 4.0, 1.0, 2.0, 0.0]})
+    assert correlation_matrix(small, method="spearman").loc["x", "y"] == pytest.approx(-0.8)
+
+    rng = np.random.default_rng(4)
+    for _ in range(20):
+        n = int(rng.integers(2, 80))
+        df = pd.DataFrame(rng.integers(0, 6, size=(n, 4)).astype(float), columns=list("abcd"))
+        df = df.mask(rng.random(df.shape) < 0.2)
+        df["e"] = df["a"] * 2 - 1  # та же маска пропусков, что у a
+        pd.testing.assert_frame_equal(
+            correlation_matrix(df, method="spearman"), df.corr(method="spearman"), atol=1e-12, rtol=0
+        )
+
+
+def test_kendall_matches_pairwise_definition_with_ties():
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        n = int(rng.integers(2, 200))
+        x = rng.integers(0, 8, n).astype(float)
+        y = rng.integers(0, 5, n) + 0.5 * x
+        x[rng.random(n) < 0.1] = np.nan
+        expected = _brute_kendall(x, y)
+        result = kendall_tau(x, y)
+        if np.isnan(expected):
+            assert np.isnan(result)
+        else:
+            assert result == pytest.approx(expected, abs=1e-12)
+
+    order = rng.permutation(300)
+    expected_inversions = int((order[:, None] > order[None, :])[np.triu_indices(300, k=1)].sum())
+    assert count_inversions(order) == expected_inversions
+
+    df = pd.DataFrame({"x": rng.normal(size=100), "y": rng.normal(size=100)})
+    matrix = correlation_matrix(df, method="kendall")
+    assert matrix.loc["x", "y"] == pytest.approx(_brute_kendall(df["x"].to_numpy(), df["y"].to_numpy()))
+
+
+def test_cramers_v_and_correlation_ratio():
+    rng = np.random.default_rng(3)
+    a = rng.integers(0, 4, 5000)
+    b = (a + rng.integers(0, 2, 5000)) % 4
+    table = pd.crosstab(a, b).to_numpy().astype(float)
+    n = table.sum()
+    expected_counts = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected_counts) ** 2 / expected_counts).sum()
+    assert cramers_v(a, b) == pytest.approx(np.sqrt(chi2 / n / 3))
+    assert cramers_v(a, a) == pytest.approx(1.0)
+
+    values = a * 10.0
+    assert correlation_ratio(a, values) == pytest.approx(1.0)
+    noise = rng.normal(size=5000)
+    assert correlation_ratio(a, noise) < 0.1
+
+
+def test_association_matrix_mixes_column_kinds():
+    rng = np.random.default_rng(4)
+    n = 2000
+    city = rng.choice(["A", "B", "C"], n)
+    df = pd.DataFrame(
+        {
+            "city": city,
+            "region": np.where(city == "C", "south", "north"),
+            "price": np.where(city == "A", 10.0, 20.0) + rng.normal(size=n),
+            "weight": rng.normal(size=n),
+            "flag": rng.random(n) < 0.5,
+            "when": pd.Timestamp("2024-01-01"),
+        }
+    )
+    df.loc[::7, "city"] = None
+
+    matrix = correlation_matrix(df, method="association")
+    assert list(matrix.columns) == ["city", "region", "price", "weight", "flag"]
+    assert matrix.loc["city", "region"] > 0.9
+    assert matrix.loc["city", "price"] > 0.9
+    assert matrix.loc["flag", "weight"] < 0.1
+    np.testing.assert_allclose(matrix.to_numpy(), matrix.to_numpy().T, equal_nan=True)
+
+
+def test_streamed_sample_matches_in_memory_sample():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"x": rng.normal(size=5000), "g": rng.choice(["a", "b"], 5000)})
+    df["y"] = df["x"] ** 3 + (df["g"] == "a")
+
+    sample = RowSample(700)
+    for start in range(0, len(df), 900):
+        sample.add(df.iloc[start : start + 900])
+    expected = sample_rows(df, 700)
+    pd.testing.assert_frame_equal(sample.frame, expected.reset_index(drop=True))
+
+    chunks = (df.iloc[start : start + 900] for start in range(0, len(df), 900))
+    profile = profile_chunks(chunks, df.columns, sample_rows=700)
+    pd.testing.assert_frame_equal(
+        profile.correlation_matrix("spearman"), correlation_matrix(df, method="spearman", max_rows=700)
+    )
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        correlation_matrix(pd.DataFrame({"x": [1.0, 2.0]}), method="distance")
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import csv
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from typer.testing import CliRunner
+
+from eda_cli.batch import expand_inputs, report_dirs, run_isolated
+from eda_cli.cli import app
+
+
+def _job(kind: str) -> str:
+    if kind == "fail":
+        raise ValueError("bad input")
+    if kind == "crash":
+        os._exit(3)
+    if kind == "hang":
+        time.sleep(30)
+    return kind.upper()
+
+
+def test_run_isolated_separates_failures_and_timeouts():
+    jobs = [("ok",), ("fail",), ("crash",), ("hang",), ("last",)]
+    started = time.monotonic()
+    results = dict(run_isolated(_job, jobs, workers=2, timeout=1.0))
+    assert time.monotonic() - started < 10
+
+    assert results[0]["status"] == "ok" and results[0]["value"] == "OK"
+    assert results[1]["status"] == "error" and "bad input" in results[1]["error"]
+    assert results[2]["status"] == "error" and "3" in results[2]["error"]
+    assert results[3]["status"] == "timeout"
+    assert results[4]["value"] == "LAST"
+
+
+def test_expand_inputs_and_report_dirs(tmp_path):
+    for name in ["p1/a.csv", "p2/a.csv", "p2/a.parquet", "p2/notes.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x\n1\n", encoding="utf-8")
+    listing = tmp_path / "list.txt"
+    listing.write_text("# partitions\np1/a.csv\n\np2/*.csv\n", encoding="utf-8")
+
+    from_list = expand_inputs([], [str(listing)])
+    assert [p.relative_to(tmp_path).as_posix() for p in from_list] == ["p1/a.csv", "p2/a.csv"]
+
+    paths = expand_inputs([str(tmp_path / "p2"), str(tmp_path / "**" / "a.csv")])
+    assert [p.relative_to(tmp_path).as_posix() for p in paths] == ["p2/a.csv", "p2/a.parquet", "p1/a.csv"]
+    assert [d.as_posix() for d in report_dirs(paths)] == ["p2/a", "p2/a_parquet", "p1/a"]
+
+
+def test_batch_report_writes_index_and_resumes(tmp_path):
+    rng = np.random.default_rng(0)
+    lake = tmp_path / "lake"
+    lake.mkdir()
+    for name in ["a", "b"]:
+        pd.DataFrame({"x": rng.normal(size=30), "city": "A"}).to_csv(lake / f"{name}.csv", index=False)
+    (lake / "broken.csv").write_text('x\n"unterminated\n', encoding="utf-8")
+    out_dir = tmp_path / "out"
+
+    def run() -> str:
+        result = CliRunner().invoke(app, ["batch-report", str(lake), "--out-dir", str(out_dir)])
+        assert result.exit_code == 1, result.output
+        return result.output
+
+    run()
+    with (out_dir / "index.csv").open(newline="", encoding="utf-8") as f:
+        rows = {Path(row["path"]).name: row for row in csv.DictReader(f)}
+    assert rows["a.csv"]["status"] == "ok" and rows["a.csv"]["n_rows"] == "30"
+    assert float(rows["b.csv"]["quality_score"]) <= 1.0
+    assert rows["broken.csv"]["status"] == "error"
+    assert (out_dir / "a" / "report.md").is_file()
+
+    # Повторный запуск берёт только неудавшийся датасет.
+    output = run()
+    assert "Уже обработано ранее (см. index.csv): 2" in output
+    assert "[1/1] error" in output
+    assert len((out_dir / "index.csv").read_text(encoding="utf-8").splitlines()) == 4
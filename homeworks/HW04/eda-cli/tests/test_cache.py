@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import io
+
+from eda_cli.cache import ResultCache, hash_stream, make_key
+
+
+def test_hash_stream_rewinds_and_keys_depend_on_params():
+    stream = io.BytesIO(b"a,b\n1,2\n" * 1000)
+    digest = hash_stream(stream)
+    assert stream.tell() == 0
+    assert digest == hash_stream(stream)
+
+    assert make_key(digest, "profile", min_missing_share=0.3) == make_key(
+        digest, "profile", min_missing_share=0.3
+    )
+    assert make_key(digest, "profile", min_missing_share=0.3) != make_key(
+        digest, "profile", min_missing_share=0.5
+    )
+    assert make_key(digest, "profile") != make_key(digest, "head")
+
+
+def test_lru_eviction_by_bytes():
+    value = b"x" * 1000
+    cache = ResultCache(max_bytes=2500)
+    cache.put("a", value)
+    cache.put("b", value)
+    assert cache.get("a") == value  # "a" становится самым свежим
+    cache.put("c", value)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["bytes"] <= 2500
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    cache = ResultCache(max_bytes=0, disk_dir=str(tmp_path))
+    cache.put("k", {"rows": 3})
+
+    restarted = ResultCache(max_bytes=10_000, disk_dir=str(tmp_path))
+    assert restarted.get("k") == {"rows": 3}
+    assert restarted.get("k") == {"rows": 3}
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["hits"] == 1
+
+
+def test_disk_tier_budget(tmp_path):
+    cache = ResultCache(max_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=3000)
+    for key in "abcde":
+        cache.put(key, b"x" * 1000)
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 3000
+    assert cache.get("e") is not None
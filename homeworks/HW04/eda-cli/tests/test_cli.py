@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+
+def _imported_after(statement: str, modules: list) -> list:
+    code = f"import sys\n{statement}\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    heavy = ["pandas", "numpy", "matplotlib", "eda_cli.core", "eda_cli.viz"]
+    assert _imported_after("import eda_cli.cli", heavy) == []
+    # Подмодули пакета по-прежнему доступны как атрибуты.
+    assert _imported_after("import eda_cli; eda_cli.core", heavy) == ["pandas", "numpy", "eda_cli.core"]
+
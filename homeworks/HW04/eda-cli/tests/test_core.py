@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import math
+import pickle
+
+import numpy as np
 import pandas as pd
+import pytest
 
+from eda_cli import core
 from eda_cli.core import (
+    ColumnSummary,
+    DatasetSummary,
     compute_quality_flags,
     correlation_matrix,
     flatten_summary_for_print,
@@ -59,3 +67,71 @@ def test_correlation_and_top_categories():
     city_table = top_cats["city"]
     assert "value" in city_table.columns
     assert len(city_table) <= 2
+
+
+def test_summarize_dataset_matches_pandas_reference():
+    df = pd.DataFrame(
+        {
+            "f": [1.5, None, -0.0, 0.0, 1.5],
+            "i": [3, 1, 2, 3, 3],
+            "flag": [True, False, True, True, False],
+            "big": [2**60, 2**60 + 1, 2**60, 2**60, 2**60],
+            "s": ["x", None, "y", "x", "z"],
+        }
+    )
+    summary = summarize_dataset(df, example_values_per_column=2)
+
+    for col in summary.columns:
+        s = df[col.name]
+        assert col.non_null == int(s.notna().sum())
+        assert col.unique == int(s.nunique(dropna=True))
+        assert col.example_values == s.dropna().astype(str).unique()[:2].tolist()
+        if col.is_numeric:
+            assert col.min == pytest.approx(float(s.min()))
+            assert col.max == pytest.approx(float(s.max()))
+            assert col.mean == pytest.approx(float(s.mean()))
+            assert col.std == pytest.approx(float(s.std()))
+
+
+def test_numeric_blocks_bounded_by_bytes(monkeypatch):
+    # Маленькие бюджеты: по 3 колонки в блоке и срезы по 2 строки на
+    # редукцию - результат тот же, что у pandas.
+    monkeypatch.setattr(core, "_NUMERIC_BLOCK_BYTES", 3 * 7 * 8)
+    monkeypatch.setattr(core, "_REDUCE_SLICE_BYTES", 3 * 2 * 8)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(-2, 3, size=(7, 8)).astype(float), columns=list("abcdefgh"))
+    df.iloc[::3, ::2] = np.nan
+    df["h"] = np.nan
+    assert core.numeric_block_width(len(df)) == 3
+
+    for col in summarize_dataset(df).columns:
+        s = df[col.name]
+        assert col.non_null == int(s.notna().sum())
+        assert col.unique == int(s.nunique(dropna=True))
+        if col.non_null:
+            assert col.min == float(s.min()) and col.max == float(s.max())
+            assert col.mean == pytest.approx(float(s.mean()))
+            assert col.std == pytest.approx(float(s.std()), nan_ok=True)
+        else:
+            assert col.mean is None and col.min is None
+
+
+def test_dataset_summary_columnar_storage_round_trips():
+    columns = [
+        ColumnSummary("x", "float64", 1, 2, 2 / 3, 1, ["1.5"], True, 1.5, 1.5, 1.5, float("nan")),
+        ColumnSummary(7, "object", 3, 0, 0.0, 2, ["a", "b"], False, unique_error=0.01),
+        ColumnSummary("empty", "float64", 0, 3, 1.0, 0, [], True),
+    ]
+    summary = DatasetSummary(n_rows=3, n_cols=3, columns=columns)
+
+    assert len(summary.columns) == 3
+    assert summary.columns[-1] == columns[2]
+    assert summary.columns[1:] == columns[1:]
+    # None и настоящий NaN (std по одному значению) различаются.
+    assert summary.columns[2].std is None and math.isnan(summary.columns[0].std)
+    assert summary.to_dict()["columns"][1] == columns[1].to_dict()
+    assert summary.example_values(1) == [["a", "b"], []]
+
+    copy = pickle.loads(pickle.dumps(summary))
+    assert copy.columns[1] == columns[1]
+    assert np.isnan(flatten_summary_for_print(copy)["min"][1])
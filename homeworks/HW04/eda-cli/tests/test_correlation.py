@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import correlation_matrix
+from eda_cli.correlation import CorrelationAccumulator, top_pairs
+from eda_cli.streaming import StreamingProfile
+
+
+def _frame(n: int = 2000, p: int = 12, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(loc=100.0, scale=5.0, size=(n, p))
+    values[:, 1] = values[:, 0] * 0.8 + rng.normal(size=n)
+    values[:, 2] = -values[:, 0]
+    values[rng.random((n, p)) < 0.2] = np.nan
+    df = pd.DataFrame(values, columns=[f"x{i}" for i in range(p)])
+    df["const"] = 3.0
+    df["city"] = rng.choice(["A", "B"], n)
+    return df
+
+
+def test_matches_pandas_pairwise_complete():
+    df = _frame()
+    expected = df.select_dtypes(include="number").corr()
+    result = correlation_matrix(df)
+    pd.testing.assert_frame_equal(result, expected, atol=1e-12, rtol=0)
+
+
+def test_accumulator_merges_chunks_and_column_subsets():
+    df = _frame()
+    numeric = df.select_dtypes(include="number")
+    acc = CorrelationAccumulator(numeric.shape[1])
+    other = CorrelationAccumulator(numeric.shape[1])
+    for start in range(0, len(numeric), 300):
+        block = numeric.iloc[start : start + 300].to_numpy(dtype=np.float64, na_value=np.nan)
+        # В части чанков колонок x3 и x4 нет (как нечисловой тип в чанке CSV).
+        if start % 600 == 0:
+            positions = [j for j in range(numeric.shape[1]) if j not in (3, 4)]
+            target = acc
+        else:
+            positions = list(range(numeric.shape[1]))
+            target = other
+        target.update(block[:, positions], positions)
+    acc.merge(other)
+
+    masked = numeric.copy()
+    for start in range(0, len(numeric), 600):
+        masked.iloc[start : start + 300, [3, 4]] = np.nan
+    np.testing.assert_allclose(acc.matrix(), masked.corr().to_numpy(), atol=1e-12)
+
+
+def test_top_pairs_in_column_bands():
+    df = _frame(p=30, seed=1).select_dtypes(include="number")
+    pairs = top_pairs(df, k=5, block_rows=700, block_columns=4)
+
+    corr = df.corr().to_numpy()
+    upper = np.triu_indices_from(corr, k=1)
+    strength = np.nan_to_num(np.abs(corr[upper]), nan=-1.0)
+    best = np.argsort(-strength, kind="stable")[:5]
+    expected = {(df.columns[upper[0][i]], df.columns[upper[1][i]]) for i in best}
+
+    assert set(zip(pairs["left"], pairs["right"])) == expected
+    assert pairs["r"].abs().is_monotonic_decreasing
+    assert pairs.iloc[0]["r"] == pytest.approx(-1.0)
+
+
+def test_streaming_correlation_covers_whole_file():
+    df = _frame()
+    profile = StreamingProfile(df.columns)
+    for start in range(0, len(df), 500):
+        profile.update(df.iloc[start : start + 500])
+
+    pd.testing.assert_frame_equal(profile.correlation_matrix(), correlation_matrix(df), atol=1e-12, rtol=0)
+    assert len(profile.correlation_top_pairs(3)) == 3
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from eda_cli.dispatch import BoundedExecutor, SaturatedError
+
+
+def test_rejects_when_saturated_and_reports_queue_wait():
+    executor = BoundedExecutor(max_concurrency=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(SaturatedError) as exc_info:
+            await executor.run(lambda: None)
+        assert exc_info.value.retry_after >= 1
+
+        release.set()
+        await running
+        result, queue_wait_ms = await queued
+        return result, queue_wait_ms
+
+    try:
+        result, queue_wait_ms = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert result == "done"
+    assert queue_wait_ms >= 40
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import flatten_summary_for_print, summarize_dataset, top_categories
+from eda_cli.dtypes import compact_frame, read_csv_compact
+
+
+def _frame(n: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(n),
+            "small": rng.integers(0, 100, n),
+            "city": rng.choice(["Москва", "Казань", "Омск", None], n),
+            "email": [f"user{i}@example.org" for i in range(n)],
+            "score": rng.normal(size=n),
+            "half": rng.integers(0, 8, n) / 2,
+        }
+    )
+
+
+def _summary_without_dtype(df: pd.DataFrame) -> pd.DataFrame:
+    return flatten_summary_for_print(summarize_dataset(df)).drop(columns="dtype")
+
+
+def test_read_csv_compact_keeps_summary(tmp_path):
+    path = tmp_path / "data.csv"
+    _frame().to_csv(path, index=False)
+    plain = pd.read_csv(path)
+
+    compact, report = read_csv_compact(path, sample_rows=100, allow_float32=True)
+
+    assert compact["small"].dtype == np.int8
+    assert compact["id"].dtype == np.int16
+    assert compact["city"].dtype == "category"
+    assert compact["half"].dtype == np.float32
+    # float32 потерял бы точность - колонка остаётся float64.
+    assert compact["score"].dtype == np.float64
+    assert report.bytes_after < report.bytes_before
+
+    pd.testing.assert_frame_equal(_summary_without_dtype(plain), _summary_without_dtype(compact))
+    plain_top, compact_top = top_categories(plain), top_categories(compact)
+    assert plain_top.keys() == compact_top.keys()
+    for name in plain_top:
+        pd.testing.assert_frame_equal(plain_top[name], compact_top[name])
+
+
+def test_integer_range_is_taken_from_whole_column(tmp_path):
+    # В выборке значения помещаются в int8, дальше - нет.
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"x": [1] * 50 + [300, -70000]}).to_csv(path, index=False)
+
+    df, _ = read_csv_compact(path, sample_rows=10)
+
+    assert df["x"].dtype == np.int32
+    assert df["x"].tolist()[-2:] == [300, -70000]
+
+
+def test_compact_frame_leaves_mixed_columns():
+    df = pd.DataFrame({"mixed": ["a", 1, "b", 2.5] * 10, "empty": [None] * 40})
+
+    compacted, report = compact_frame(df.copy())
+
+    assert compacted["mixed"].dtype == object
+    assert compacted["empty"].dtype == object
+    assert list(report.columns.index) == ["mixed", "empty"]
+
+
+def test_api_cache_key_includes_compact_dtypes(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from eda_cli import api
+    from eda_cli.cache import ResultCache
+    from eda_cli.dispatch import BoundedExecutor
+
+    monkeypatch.setattr(api, "profiling_executor", BoundedExecutor())
+    monkeypatch.setattr(api, "result_cache", ResultCache(1 << 20))
+    body = _frame(200).to_csv(index=False).encode()
+
+    def small_dtype(client):
+        response = client.post("/summary-from-csv", files={"file": ("data.csv", body, "text/csv")})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        small = next(line for line in lines if line.get("name") == "small")
+        return response.headers["X-Cache"], small["dtype"]
+
+    with TestClient(api.app) as client:
+        assert small_dtype(client) == ("miss", "int64")
+        monkeypatch.setattr(api, "API_COMPACT_DTYPES", True)
+        cache, dtype = small_dtype(client)
+        assert cache == "miss" and dtype != "int64"
+        assert small_dtype(client) == ("hit", dtype)
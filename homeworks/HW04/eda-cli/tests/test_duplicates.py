@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli import duplicates
+from eda_cli.duplicates import DuplicateCounter, count_duplicate_rows, row_hashes
+
+
+def _frame(n: int = 3000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "x": rng.integers(0, 5, n),
+            "y": rng.choice(["a", "b", None], n),
+            "z": rng.choice([0.5, np.nan, -0.0, 0.0], n),
+        }
+    )
+
+
+def test_count_matches_pandas():
+    df = _frame()
+    assert count_duplicate_rows(df) == int(df.duplicated(keep=False).sum())
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        # -0.0 и 0.0 одинаковые; None и NaN - одинаковые при нескольких колонках.
+        pd.DataFrame({"a": [0.0, -0.0, np.nan, None], "b": ["x", "x", None, np.nan]}),
+        # ...но разные у одной колонки object.
+        pd.DataFrame({"m": pd.Series([None, np.nan], dtype=object)}),
+        pd.DataFrame({"m": pd.Series(["x", None, np.nan, None, pd.NaT, "x", np.nan, 1], dtype=object)}),
+        pd.DataFrame({"m": [0.0, -0.0, np.nan, np.nan, 1.0]}),
+    ],
+)
+def test_count_matches_pandas_on_missing_values(df):
+    assert count_duplicate_rows(df) == int(df.duplicated(keep=False).sum())
+
+
+def test_hash_collisions_are_verified(monkeypatch):
+    df = _frame(n=500, seed=1)
+    # Всего 8 различных хэшей: почти все совпадения - коллизии.
+    monkeypatch.setattr(duplicates, "row_hashes", lambda frame: row_hashes(frame) & np.uint64(7))
+    assert duplicates.count_duplicate_rows(df) == int(df.duplicated(keep=False).sum())
+
+
+def test_counter_spills_to_disk(tmp_path):
+    df = pd.concat([_frame(n=20_000), _frame(n=2000, seed=2)], ignore_index=True)
+    counter = DuplicateCounter(max_memory_bytes=16 * 1024, spill_dir=str(tmp_path))
+    head = DuplicateCounter(max_memory_bytes=16 * 1024, spill_dir=str(tmp_path))
+    for start in range(0, len(df), 1000):
+        target = head if start < 10_000 else counter
+        target.add(row_hashes(df.iloc[start : start + 1000]))
+    head.merge(counter)
+
+    assert head.spilled
+    assert head.n_rows == len(df)
+    assert head.count() == int(df.duplicated(keep=False).sum())
+
+
+def test_counter_sample_estimate():
+    rng = np.random.default_rng(3)
+    unique = rng.integers(0, 2**64 - 1, 200_000, dtype=np.uint64, endpoint=True)
+    hashes = np.concatenate([unique, unique[:20_000]])
+    rng.shuffle(hashes)
+
+    counter = DuplicateCounter(sample_size=20_000)
+    for start in range(0, len(hashes), 10_000):
+        counter.add(hashes[start : start + 10_000])
+
+    assert counter.sample_rate < 1
+    assert counter.count() == pytest.approx(40_000, rel=0.15)
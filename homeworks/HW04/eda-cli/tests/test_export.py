@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from typer.testing import CliRunner
+
+from eda_cli.cli import app
+from eda_cli.core import summarize_dataset
+from eda_cli.export import iter_summary_ndjson, write_summary
+
+
+def _sample_summary():
+    df = pd.DataFrame(
+        {
+            "x": [1.0, 2.0, np.nan, 4.0],
+            "city": ["A", "B", None, "A"],
+            "flag": [True, False, True, True],
+        }
+    )
+    return summarize_dataset(df)
+
+
+def test_ndjson_matches_to_dict():
+    summary = _sample_summary()
+    chunks = list(iter_summary_ndjson(summary, batch_columns=2))
+    assert len(chunks) == 3
+
+    lines = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+    assert lines[0] == {"n_rows": 4, "n_cols": 3}
+    # NaN (min/mean у строковой колонки) в JSON - null, как после to_dict + json.
+    expected = json.loads(json.dumps(summary.to_dict()["columns"]).replace("NaN", "null"))
+    assert lines[1:] == expected
+
+
+def test_parquet_and_feather_keep_types(tmp_path):
+    summary = _sample_summary()
+    write_summary(summary, tmp_path / "summary.parquet")
+    write_summary(summary, tmp_path / "summary.arrow")
+
+    for table in (pq.read_table(tmp_path / "summary.parquet"), feather.read_table(tmp_path / "summary.arrow")):
+        assert table.schema.metadata[b"n_rows"] == b"4"
+        assert table.column("name").to_pylist() == ["x", "city", "flag"]
+        assert table.column("missing").type == "int64"
+        assert table.column("min").to_pylist()[:2] == [1.0, None]
+        assert table.column("example_values").to_pylist()[1] == summary.columns[1].example_values
+
+
+def test_report_summary_format(tmp_path):
+    data = tmp_path / "data.csv"
+    pd.DataFrame({"x": [1, 2, 3], "city": ["A", "B", "A"]}).to_csv(data, index=False)
+    out_dir = tmp_path / "report"
+
+    result = CliRunner().invoke(
+        app, ["report", str(data), "--out-dir", str(out_dir), "--summary-format", "parquet"]
+    )
+    assert result.exit_code == 0, result.output
+    assert pq.read_table(out_dir / "summary.parquet").num_rows == 2
+    assert not (out_dir / "summary.csv").exists()
+    assert "summary.parquet" in result.output
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from eda_cli.core import flatten_summary_for_print, summarize_dataset
+from eda_cli.loaders import (
+    count_rows,
+    detect_format,
+    iter_chunks,
+    load_table,
+    parquet_metadata_stats,
+)
+from eda_cli.streaming import profile_chunks
+
+pytest.importorskip("pyarrow")
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": range(10),
+            "score": [1.5, None, 3.0, 4.0, None, 6.0, 7.0, 8.0, 9.0, -1.0],
+            "city": ["A", "B", None, "C", "A", "B", "A", None, "C", "A"],
+        }
+    )
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_load_table_projection_and_nrows(tmp_path, fmt):
+    df = _frame()
+    path = tmp_path / f"data.{fmt}"
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, row_group_size=3)
+    else:
+        df.to_feather(path)
+
+    assert detect_format(path) == fmt
+    with open(path, "rb") as f:
+        assert detect_format(f) == fmt
+        assert f.tell() == 0
+
+    head = load_table(path, columns=["city", "id"], nrows=4)
+    assert list(head.columns) == ["city", "id"]
+    assert head["id"].tolist() == [0, 1, 2, 3]
+
+    full = load_table(path)
+    pd.testing.assert_frame_equal(
+        flatten_summary_for_print(summarize_dataset(full)),
+        flatten_summary_for_print(summarize_dataset(df)),
+    )
+
+    chunks = list(iter_chunks(path, 4, columns=["score"]))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    profile = profile_chunks(chunks, ["score"])
+    assert profile.summary().columns[0].missing == 2
+
+
+def test_parquet_metadata_stats(tmp_path):
+    df = _frame()
+    path = tmp_path / "data.parquet"
+    df.to_parquet(path, row_group_size=3)
+
+    stats = parquet_metadata_stats(path)
+    assert count_rows(path) == 10
+    assert stats.loc["score", "missing_count"] == 2
+    assert stats.loc["city", "missing_count"] == 2
+    assert stats.loc["id", "min"] == 0
+    assert stats.loc["id", "max"] == 9
+    assert stats.loc["score", "min"] == -1.0
+    assert stats.loc["city", "max"] == "C"
+
+
+def test_detect_format_defaults_to_csv():
+    assert detect_format(io.BytesIO(b"a,b\n1,2\n")) == "csv"
+    with pytest.raises(ValueError):
+        detect_format("x.csv", "xlsx")
+
+
+@pytest.mark.filterwarnings("ignore:Feather V1:DeprecationWarning")
+def test_feather_counts_and_chunks_by_record_batch(tmp_path, monkeypatch):
+    import pyarrow.feather as feather
+
+    df = _frame()
+    path = tmp_path / "data.feather"
+    feather.write_feather(df, path, chunksize=3)
+    v1_path = tmp_path / "data_v1.feather"
+    feather.write_feather(df, v1_path, version=1)
+
+    def read_table(*args, **kwargs):
+        raise AssertionError("Feather v2 не должен читаться целиком")
+
+    monkeypatch.setattr(feather, "read_table", read_table)
+    assert count_rows(path) == 10
+    chunks = list(iter_chunks(path, 2, columns=["city", "id"]))
+    assert [len(chunk) for chunk in chunks] == [2, 1, 2, 1, 2, 1, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks, ignore_index=True), df[["city", "id"]]
+    )
+
+    # Feather v1 - не IPC-файл: остаётся полное чтение.
+    monkeypatch.undo()
+    assert count_rows(v1_path) == 10
+    assert [len(chunk) for chunk in iter_chunks(v1_path, 4)] == [4, 4, 2]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from typer.testing import CliRunner
+
+from eda_cli.cli import app
+from eda_cli.manifest import MANIFEST_NAME, ReportManifest, file_fingerprint
+
+
+def test_fingerprint_reuses_hash_for_same_size_and_mtime(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    first = file_fingerprint(path)
+
+    # Тот же размер и mtime - sha256 берётся из прошлого отпечатка.
+    assert file_fingerprint(path, {**first, "sha256": "cached"})["sha256"] == "cached"
+    # Файл перезаписан тем же содержимым - новый mtime, тот же sha256.
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    os.utime(path, ns=(first["mtime_ns"] + 10**9, first["mtime_ns"] + 10**9))
+    again = file_fingerprint(path, first)
+    assert again["sha256"] == first["sha256"]
+    assert again["mtime_ns"] != first["mtime_ns"]
+
+
+def test_manifest_tracks_stage_artifacts(tmp_path):
+    manifest = ReportManifest(tmp_path, {"sha256": "abc"})
+    key = manifest.stage_key("tables", sep=",")
+    assert key != manifest.stage_key("tables", sep=";")
+
+    old, new = tmp_path / "old.csv", tmp_path / "new.csv"
+    old.write_text("x", encoding="utf-8")
+    manifest.record("tables", key, [old])
+    assert manifest.is_fresh("tables", key)
+    manifest.save()
+
+    loaded = ReportManifest.load(tmp_path)
+    assert loaded.is_fresh("tables", key)
+    old.write_text("edited", encoding="utf-8")
+    assert not loaded.is_fresh("tables", key)
+
+    # Файл прошлой сборки, которого нет в новой, удаляется.
+    new.write_text("y", encoding="utf-8")
+    loaded.record("tables", key, [new])
+    assert not old.exists()
+    assert list(loaded.artifacts("tables")) == ["new.csv"]
+
+    (tmp_path / MANIFEST_NAME).write_text("{broken", encoding="utf-8")
+    assert ReportManifest.load(tmp_path).stages == {}
+
+
+def test_report_rebuilds_only_changed_stages(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=50), "y": rng.normal(size=50), "city": "A"})
+    df.loc[::3, "y"] = np.nan
+    data = tmp_path / "data.csv"
+    df.to_csv(data, index=False)
+    out_dir = tmp_path / "report"
+
+    def run(*args: str) -> str:
+        result = CliRunner().invoke(app, ["report", str(data), "--out-dir", str(out_dir), *args])
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    assert "Пересобрано: tables" in run()
+    summary_mtime = (out_dir / "summary.csv").stat().st_mtime_ns
+    assert "Пересобрано: ничего" in run()
+
+    assert "Пересобрано: report\n" in run("--title", "Другой")
+    assert (out_dir / "report.md").read_text(encoding="utf-8").startswith("# Другой\n")
+    assert (out_dir / "summary.csv").stat().st_mtime_ns == summary_mtime
+
+    assert "Пересобрано: histograms, report\n" in run("--title", "Другой", "--max-hist-columns", "1")
+    assert sorted(p.name for p in out_dir.glob("hist_*.png")) == ["hist_1_x.png"]
+
+    manifest = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["stages"]["overview"]["data"]["n_rows"] == 50
+    assert "Пересобрано: tables, top_categories" in run("--title", "Другой", "--max-hist-columns", "1", "--force")
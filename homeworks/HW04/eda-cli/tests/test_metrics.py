@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from eda_cli.metrics import MetricsRegistry, RequestMetrics, get_logger, log_event
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Запросы.", ("endpoint",))
+    latency = registry.histogram("app_seconds", "Время.", ("endpoint",), buckets=(0.1, 1.0))
+    requests.inc(endpoint="/a")
+    requests.inc(2, endpoint='/b"')
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, endpoint="/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE app_requests_total counter" in lines
+    assert 'app_requests_total{endpoint="/a"} 1' in lines
+    assert 'app_requests_total{endpoint="/b\\""} 2' in lines
+    assert 'app_seconds_bucket{endpoint="/a",le="0.1"} 1' in lines
+    assert 'app_seconds_bucket{endpoint="/a",le="1"} 2' in lines
+    assert 'app_seconds_bucket{endpoint="/a",le="+Inf"} 3' in lines
+    assert 'app_seconds_count{endpoint="/a"} 3' in lines
+
+    with pytest.raises(ValueError):
+        requests.inc(path="/a")
+
+
+def test_request_metrics_stages_and_log(capsys):
+    metrics = RequestMetrics("/x")
+    with metrics.stage("read_table"):
+        pass
+    metrics.add("read_table", 0.002)
+    metrics.add("queue_wait", 0.0015)
+    assert metrics.stages["read_table"] >= 0.002
+    assert metrics.server_timing().endswith("queue_wait;dur=1.5")
+
+    log_event(get_logger("eda_cli.test_metrics"), "request", endpoint="/x", stages_ms=metrics.stages_ms())
+    record = json.loads(capsys.readouterr().out)
+    assert record["event"] == "request" and record["stages_ms"]["queue_wait"] == 1.5
+
+
+def test_api_exposes_stage_timings_and_metrics():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from eda_cli.api import app
+
+    body = b"x,city\n" + b"".join(f"{i},A\n".encode() for i in range(50))
+    with TestClient(app) as client:
+        response = client.post(
+            "/quality-flags-from-csv?timings=true&min_missing_share=0.25",
+            files={"file": ("data.csv", body, "text/csv")},
+        )
+        assert response.status_code == 200
+        stages = response.json()["stages_ms"]
+        assert {"upload", "read_table", "summarize_dataset", "compute_quality_flags"} <= set(stages)
+        assert "summarize_dataset;dur=" in response.headers["Server-Timing"]
+
+        text = client.get("/metrics").text
+    assert 'eda_api_requests_total{endpoint="/quality-flags-from-csv",method="POST",status="200"}' in text
+    assert 'eda_api_stage_duration_seconds_count{endpoint="/quality-flags-from-csv",stage="read_table"}' in text
+    assert 'eda_api_rows_processed_total{endpoint="/quality-flags-from-csv"}' in text
+
+
+def test_rejected_profiling_tasks_counter(monkeypatch):
+    pytest.importorskip("httpx")
+    import asyncio
+    import threading
+
+    from fastapi import HTTPException
+
+    from eda_cli import api
+    from eda_cli.dispatch import BoundedExecutor
+
+    executor = BoundedExecutor(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(api, "profiling_executor", executor)
+    before = api.profiling_rejected.value()
+    release = threading.Event()
+
+    async def saturate():
+        running = api._submit_profiling(release.wait)
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                api._submit_profiling(sum, [1])
+            assert exc_info.value.status_code == 503
+        release.set()
+        await running
+
+    asyncio.run(saturate())
+    executor.shutdown()
+    assert api.profiling_rejected.value() == before + 2
+    assert "# TYPE eda_api_profiling_rejected_total counter" in api.metrics_registry.render()
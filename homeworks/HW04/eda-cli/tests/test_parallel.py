@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import (
+    compute_quality_flags,
+    flatten_summary_for_print,
+    missing_table,
+    summarize_dataset,
+    top_categories,
+)
+from eda_cli.parallel import ColumnPool
+
+
+def _make_df() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame({f"x{i}": rng.normal(size=n) for i in range(10)})
+    df["zeros"] = rng.integers(0, 3, size=n)
+    df.loc[::7, "x3"] = np.nan
+    df["city"] = rng.choice(["A", "B", "C", None], size=n)
+    df["flag"] = rng.random(size=n) > 0.5
+    df["when"] = pd.date_range("2024-01-01", periods=n, freq="h")
+    return df
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_column_pool_matches_core(workers):
+    df = _make_df()
+    missing_df = missing_table(df)
+    expected = summarize_dataset(df)
+
+    with ColumnPool(workers) as pool:
+        summary = pool.summarize_dataset(df)
+        top_cats = pool.top_categories(df)
+        flags = pool.compute_quality_flags(df, summary, missing_df)
+
+    pd.testing.assert_frame_equal(
+        flatten_summary_for_print(summary), flatten_summary_for_print(expected)
+    )
+    expected_top = top_categories(df)
+    assert list(top_cats) == list(expected_top)
+    for name, table in expected_top.items():
+        pd.testing.assert_frame_equal(top_cats[name], table)
+    assert flags == compute_quality_flags(df, expected, missing_df)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import (
+    compute_quality_flags,
+    missing_table,
+    quality_flags_from_stats,
+    quality_stats,
+    score_quality_stats,
+    summarize_dataset,
+)
+from eda_cli.rules import DEFAULT_RULES_PATH, RULES_ENV, load_rules, quality_rules
+
+RULES = """
+[demo]
+fields = ["rows", "share"]
+ok_threshold = 0.5
+
+[demo.params]
+limit = 0.3
+
+[[demo.rules]]
+penalty = { field = "share", scale = 2.0, max = 0.5 }
+
+[[demo.rules]]
+flag = "small"
+when = [["rows", "<", 10]]
+penalty = 0.25
+
+[[demo.rules]]
+flag = "high_share"
+when = [["share", ">", "limit"], ["rows", ">=", 10]]
+"""
+
+
+def test_rule_set_evaluates_table(tmp_path):
+    path = tmp_path / "rules.toml"
+    path.write_text(RULES, encoding="utf-8")
+    demo = load_rules(path)["demo"]
+    assert demo.flags == ["small", "high_share"]
+
+    scores = demo.evaluate({"rows": [5, 50, 50, np.nan], "share": [0.1, 0.4, 0.0, 0.1]})
+    np.testing.assert_allclose(scores["quality_score"], [0.55, 0.5, 1.0, 0.8])
+    assert scores["ok_for_model"].tolist() == [True, True, True, True]
+    assert scores["small"].tolist() == [True, False, False, False]
+    assert scores["high_share"].tolist() == [False, True, False, False]
+
+    one = demo.score_one({"rows": 50, "share": 0.4}, limit=0.5)
+    assert one["high_share"] is False and isinstance(one["quality_score"], float)
+    with pytest.raises(ValueError, match="неизвестные параметры"):
+        demo.evaluate({"rows": [1], "share": [0.0]}, other=1.0)
+
+
+@pytest.mark.parametrize(
+    "rule, message",
+    [
+        ('flag = "x"\nwhen = [["nope", "<", 1]]', "неизвестное поле"),
+        ('flag = "x"\nwhen = [["rows", "~", 1]]', "неизвестный оператор"),
+        ('flag = "x"\nwhen = [["rows", "<", "nope"]]', "неизвестный параметр"),
+        ('when = [["rows", "<", 1]]', "нужен flag или penalty"),
+    ],
+)
+def test_invalid_rules_are_rejected(tmp_path, rule, message):
+    path = tmp_path / "rules.toml"
+    path.write_text(f'[demo]\nfields = ["rows"]\n\n[[demo.rules]]\n{rule}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        load_rules(path)
+
+
+def test_include_shares_rules_between_sets(tmp_path):
+    path = tmp_path / "rules.toml"
+    path.write_text(
+        RULES
+        + """
+[child]
+include = "demo"
+fields = ["cols"]
+
+[child.params]
+limit = 0.05
+
+[[child.rules]]
+flag = "wide"
+when = [["cols", ">", 3]]
+penalty = 0.1
+""",
+        encoding="utf-8",
+    )
+    rules = load_rules(path)
+    child = rules["child"]
+    assert child.fields == ["rows", "share", "cols"]
+    assert child.flags == ["small", "high_share", "wide"]
+    assert child.ok_threshold == 0.5 and child.digest != rules["demo"].digest
+
+    one = child.score_one({"rows": 50, "share": 0.1, "cols": 5})
+    assert one["high_share"] is True and one["wide"] is True
+    assert one["quality_score"] == pytest.approx(0.7)
+
+    path.write_text('[a]\ninclude = ["b"]\n\n[b]\ninclude = ["a"]\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="цикл"):
+        load_rules(path)
+
+
+def test_metadata_and_dataset_share_common_rules():
+    metadata, dataset = quality_rules("metadata"), quality_rules("dataset")
+    common = quality_rules("common")
+    assert metadata.flags[: len(common.flags)] == common.flags
+    assert dataset.flags[: len(common.flags)] == common.flags
+    assert metadata.params["min_rows"] == dataset.params["min_rows"]
+
+
+def test_table_of_stats_matches_single_dataset_flags():
+    rng = np.random.default_rng(0)
+    stats, expected = [], []
+    for i in range(30):
+        n = int(rng.integers(20, 200))
+        df = pd.DataFrame(
+            {
+                "x": rng.choice([0.0, 1.0, 2.0, np.nan], n),
+                "city": rng.choice(["A", "B", None], n),
+                "const": 1,
+            }
+        )
+        if i % 3 == 0:
+            df = pd.concat([df, df.head(5)])
+        summary, missing_df = summarize_dataset(df), missing_table(df)
+        flags = compute_quality_flags(df, summary, missing_df)
+        expected.append(flags)
+        stats.append(quality_stats(summary, missing_df, flags["num_duplicate_rows"], flags["zero_ratios"]))
+
+    scored = score_quality_stats(pd.DataFrame(stats))
+    assert scored["quality_score"].tolist() == [flags["quality_score"] for flags in expected]
+    for name in quality_rules("dataset").flags:
+        assert scored[name].tolist() == [flags[name] for flags in expected]
+
+
+def test_rules_file_from_environment(tmp_path, monkeypatch):
+    config = tmp_path / "rules.toml"
+    default = quality_rules("dataset").flags
+    text = DEFAULT_RULES_PATH.read_text(encoding="utf-8")
+    config.write_text(text.replace("min_rows = 100", "min_rows = 10000"), encoding="utf-8")
+    monkeypatch.setenv(RULES_ENV, str(config))
+    assert quality_rules("dataset").flags == default
+
+    df = pd.DataFrame({"x": np.arange(500), "city": ["A", "B"] * 250})
+    summary, missing_df = summarize_dataset(df), missing_table(df)
+    flags = quality_flags_from_stats(summary, missing_df, 0, {"x": 0.002})
+    assert flags["too_few_rows"] is True
+    assert flags["quality_score"] == pytest.approx(0.8)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from eda_cli.cli import app
+from eda_cli.core import compute_quality_flags, missing_table, summarize_dataset
+from eda_cli.sampling import estimate_quality, sample_table
+
+
+def _frame(n: int = 20_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    x = rng.normal(10.0, 2.0, n)
+    x[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame(
+        {
+            "x": x,
+            "zeros": np.where(rng.random(n) < 0.3, 0, rng.integers(1, 5, n)),
+            "city": rng.choice(["A", "B", "C"], n),
+        }
+    )
+
+
+def test_sample_larger_than_table_is_exact(tmp_path):
+    df = _frame(500)
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    sample = sample_table(path, 1000)
+    assert sample.exact and sample.method == "full" and sample.n_rows == 500
+
+    estimate = estimate_quality(sample)
+    assert not estimate.approximate and estimate.flags["approximate"] is False
+    expected = compute_quality_flags(df, summarize_dataset(df), missing_table(df))
+    assert estimate.flags["quality_score"] == pytest.approx(expected["quality_score"])
+    assert estimate.flags["quality_score_low"] == pytest.approx(expected["quality_score"])
+
+
+def test_csv_sample_intervals_cover_truth(tmp_path):
+    df = _frame()
+    # Дубликаты: копии строк попадают в выборку вместе.
+    df = pd.concat([df, df.iloc[:2_000]], ignore_index=True)
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+
+    sample = sample_table(path, 3_000, chunksize=4_000)
+    assert sample.method == "rows" and len(sample.frame) == 3_000 and sample.n_rows == len(df)
+
+    estimate = estimate_quality(sample)
+    assert estimate.approximate and estimate.flags["sample_rows"] == 3_000
+
+    missing = estimate.missing_df.loc["x"]
+    true_missing = df["x"].isna().mean()
+    assert missing["missing_share_low"] <= true_missing <= missing["missing_share_high"]
+
+    mean = estimate.intervals.loc["x"]
+    assert mean["mean_low"] <= df["x"].mean() <= mean["mean_high"]
+    zeros = estimate.intervals.loc["zeros"]
+    assert zeros["zero_share_low"] <= (df["zeros"] == 0).mean() <= zeros["zero_share_high"]
+
+    true_dup = df.duplicated(keep=False).mean()
+    flags = estimate.flags
+    assert flags["duplicate_rows_share_low"] <= true_dup <= flags["duplicate_rows_share_high"]
+    assert flags["quality_score_low"] <= flags["quality_score"] <= flags["quality_score_high"]
+
+
+def test_parquet_samples_row_groups(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _frame(40_000)
+    path = tmp_path / "data.parquet"
+    df.to_parquet(path, row_group_size=1_000)
+
+    sample = sample_table(path, 8_000)
+    assert sample.method == "row_groups"
+    assert sample.n_rows == len(df) and len(sample.frame) <= 8_000
+    assert len(np.unique(sample.groups)) >= 4
+
+    estimate = estimate_quality(sample)
+    missing = estimate.missing_df.loc["x"]
+    assert missing["missing_share_low"] <= df["x"].isna().mean() <= missing["missing_share_high"]
+
+
+def test_overview_sample_rows(tmp_path):
+    path = tmp_path / "data.csv"
+    _frame(5_000).to_csv(path, index=False)
+
+    result = CliRunner().invoke(app, ["overview", str(path), "--sample-rows", "1000"])
+    assert result.exit_code == 0, result.output
+    assert "ПРИБЛИЖЁННО" in result.output
+    assert "Строк: 5000" in result.output
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [["--metadata-only"], ["--workers", "2"], ["--optimize-dtypes"], ["--allow-float32"]],
+)
+def test_overview_sample_rows_rejects_ignored_options(tmp_path, extra):
+    path = tmp_path / "data.csv"
+    _frame(500).to_csv(path, index=False)
+
+    result = CliRunner().invoke(app, ["overview", str(path), "--sample-rows", "100", *extra])
+    assert result.exit_code != 0
+    assert extra[0] in result.output
+
+
+def test_overview_sample_rows_approx_error(tmp_path, monkeypatch):
+    from eda_cli import sampling
+
+    seen = []
+    original = sampling.summarize_dataset
+
+    def summarize(df, example_values_per_column=3, approx_error=None):
+        seen.append(approx_error)
+        return original(df, example_values_per_column, approx_error)
+
+    monkeypatch.setattr(sampling, "summarize_dataset", summarize)
+    path = tmp_path / "data.csv"
+    _frame(500).to_csv(path, index=False)
+
+    result = CliRunner().invoke(
+        app, ["overview", str(path), "--sample-rows", "100", "--approx-error", "0.01"]
+    )
+    assert result.exit_code == 0, result.output
+    assert seen == [0.01]
+
+
+def test_api_quality_sample(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from eda_cli import api
+    from eda_cli.dispatch import BoundedExecutor
+
+    monkeypatch.setattr(api, "profiling_executor", BoundedExecutor())
+    body = _frame(3_000).to_csv(index=False).encode()
+    files = {"file": ("data.csv", body, "text/csv")}
+    with TestClient(api.app) as client:
+        exact = client.post("/quality-from-csv", files=files).json()
+        assert exact["approximate"] is False and exact["quality_score_interval"] is None
+
+        sampled = client.post("/quality-from-csv?sample=500", files=files).json()
+        assert sampled["approximate"] is True and sampled["sample_rows"] == 500
+        assert sampled["dataset_shape"]["n_rows"] == 3_000
+        low, high = sampled["quality_score_interval"]
+        assert low <= sampled["quality_score"] <= high
+
+        flags = client.post("/quality-flags-from-csv?sample=500", files=files).json()
+        assert flags["approximate"] is True
+        assert "quality_score_low" in flags["flags"]
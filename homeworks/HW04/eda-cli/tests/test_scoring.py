@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from eda_cli.scoring import (
+    iter_scores_ndjson,
+    metadata_rules,
+    parse_records,
+    record_columns,
+    score_metadata,
+)
+
+
+def _scalar_quality(n_rows, n_cols, max_missing_share, numeric_cols, categorical_cols):
+    # Эвристики /quality поштучно (порог строк общий с compute_quality_flags).
+    score = 1.0
+    score -= max_missing_share
+    if n_rows < 100:
+        score -= 0.2
+    if n_cols > 100:
+        score -= 0.1
+    if numeric_cols == 0 and categorical_cols > 0:
+        score -= 0.1
+    if categorical_cols == 0 and numeric_cols > 0:
+        score -= 0.05
+    return max(0.0, min(1.0, score))
+
+
+def test_score_metadata_matches_scalar_heuristics():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    records = [
+        {
+            "n_rows": int(rng.integers(0, 3000)),
+            "n_cols": int(rng.integers(0, 200)),
+            "max_missing_share": round(float(rng.random()), 3),
+            "numeric_cols": int(rng.integers(0, 3)),
+            "categorical_cols": int(rng.integers(0, 3)),
+        }
+        for _ in range(n)
+    ]
+    batch = record_columns(records)
+    assert batch.valid.all() and not batch.errors
+
+    scores = score_metadata(batch.columns)
+    for i, record in enumerate(records):
+        expected = _scalar_quality(**record)
+        assert scores["quality_score"][i] == expected
+        assert scores["ok_for_model"][i] == (expected >= 0.7)
+        assert scores["too_many_missing"][i] == (record["max_missing_share"] > 0.5)
+
+
+def test_parse_records_array_and_ndjson():
+    records = [{"n_rows": 1}, {"n_rows": 2}]
+    assert parse_records(json.dumps(records).encode()) == records
+    assert parse_records(b'{"n_rows": 1}\r\n\r\n{"n_rows": 2}\n') == records
+    assert parse_records(b"  \n") == []
+    with pytest.raises(ValueError, match="строка 2"):
+        parse_records(b'{"n_rows": 1}\n{"n_rows": \n')
+
+
+def test_invalid_records_get_errors():
+    good = {"n_rows": 5000, "n_cols": 10, "max_missing_share": 0.1, "numeric_cols": 5, "categorical_cols": 5}
+    records = [
+        {**good, "id": "a"},
+        {**good, "n_rows": -1},
+        {**good, "max_missing_share": 1.5},
+        {key: value for key, value in good.items() if key != "n_cols"},
+        "not a record",
+        {**good, "numeric_cols": "7"},
+    ]
+    batch = record_columns(records)
+    assert batch.valid.tolist() == [True, False, False, False, False, True]
+    assert batch.errors[1].startswith("n_rows") and batch.errors[3].startswith("n_cols")
+    assert "JSON-объект" in batch.errors[4]
+
+    lines = [
+        json.loads(line)
+        for part in iter_scores_ndjson(batch, score_metadata(batch.columns), batch_records=4)
+        for line in part.decode().splitlines()
+    ]
+    assert [line["index"] for line in lines] == list(range(6))
+    assert lines[0]["id"] == "a" and lines[1]["id"] is None
+    assert list(lines[0]["flags"]) == metadata_rules().flags
+    assert lines[0]["quality_score"] == pytest.approx(0.9)
+    assert "error" in lines[2] and "quality_score" not in lines[2]
+
+
+def test_api_quality_batch(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from eda_cli import api
+    from eda_cli.dispatch import BoundedExecutor
+
+    monkeypatch.setattr(api, "profiling_executor", BoundedExecutor())
+    records = [
+        {"n_rows": 500, "n_cols": 3, "max_missing_share": 0.2, "numeric_cols": 0, "categorical_cols": 3},
+        {"n_rows": 5000, "n_cols": 120, "max_missing_share": 0.0, "numeric_cols": 100, "categorical_cols": 20},
+        {"n_rows": 5000},
+    ]
+    with TestClient(api.app) as client:
+        single = [client.post("/quality", json=record).json() for record in records[:2]]
+
+        response = client.post("/quality/batch", json=records)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.headers["X-Records"] == "3" and response.headers["X-Invalid-Records"] == "1"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        for expected, line in zip(single, lines):
+            assert line["quality_score"] == expected["quality_score"]
+            assert line["ok_for_model"] == expected["ok_for_model"]
+            assert line["flags"] == expected["flags"]
+        assert "error" in lines[2]
+
+        body = "\n".join(json.dumps(record) for record in records[:2]).encode()
+        ndjson = client.post("/quality/batch", content=body, headers={"content-type": "application/x-ndjson"})
+        assert [json.loads(line) for line in ndjson.text.splitlines()] == lines[:2]
+
+        bad = client.post("/quality/batch", content=b"{not json")
+        assert bad.status_code == 400
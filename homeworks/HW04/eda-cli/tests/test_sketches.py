@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from eda_cli.core import summarize_dataset, top_categories
+from eda_cli.sketches import HyperLogLog, SpaceSaving
+
+
+def test_hyperloglog_estimate_merge_and_roundtrip():
+    values = pd.Series([f"user-{i}" for i in range(20_000)])
+    left = HyperLogLog.for_error(0.02)
+    right = HyperLogLog.for_error(0.02)
+    left.add_series(values.iloc[:12_000])
+    right.add_series(values.iloc[8_000:])
+
+    merged = HyperLogLog.from_bytes(left.to_bytes())
+    merged.merge(HyperLogLog.from_bytes(right.to_bytes()))
+
+    assert merged.rel_error <= 0.02
+    assert abs(merged.estimate() / 20_000 - 1) < 4 * merged.rel_error
+
+
+def test_space_saving_error_bound_after_merge():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.zipf(1.3, size=50_000).astype(str))
+    exact = values.value_counts()
+
+    sketch = SpaceSaving.for_error(0.01)
+    for part in np.array_split(np.arange(len(values)), 5):
+        partial = SpaceSaving.for_error(0.01)
+        partial.add_series(values.iloc[part])
+        sketch.merge(SpaceSaving.from_bytes(partial.to_bytes()))
+
+    top = sketch.top(5)
+    assert list(top["value"]) == list(exact.index[:5])
+    for value, count, error in top.itertuples(index=False):
+        assert count - error <= exact[value] <= count
+        assert error <= 0.01 * len(values)
+
+
+def test_approximate_mode_reports_errors():
+    df = pd.DataFrame({"id": [str(i) for i in range(1000)], "city": ["A", "B"] * 500})
+
+    summary = summarize_dataset(df, approx_error=0.05)
+    assert all(col.unique_error is not None for col in summary.columns)
+    assert abs(summary.columns[0].unique - 1000) <= 4 * summary.columns[0].unique_error * 1000
+
+    table = top_categories(df, approx_error=0.05)["city"]
+    assert "count_error" in table.columns
+    assert set(table["value"]) == {"A", "B"}
+
+
+def test_space_saving_roundtrip_keeps_value_types():
+    import datetime as dt
+    from decimal import Decimal
+
+    values = pd.Series(
+        [1, "1", 2.5, pd.Timestamp("2024-01-01"), dt.date(2024, 1, 2), Decimal("0.1"), "1"],
+        dtype=object,
+    )
+    sketch = SpaceSaving(16)
+    sketch.add_series(values)
+
+    restored = SpaceSaving.from_bytes(sketch.to_bytes())
+    assert restored.total == sketch.total == len(values)
+    assert [(type(v), v) for v in restored.counts.index] == [(type(v), v) for v in sketch.counts.index]
+    assert restored.counts["1"] == 2 and restored.counts[1] == 1
+    pd.testing.assert_frame_equal(restored.top(10), sketch.top(10))
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import (
+    compute_quality_flags,
+    flatten_summary_for_print,
+    missing_matrix,
+    missing_table,
+    summarize_dataset,
+    top_categories,
+)
+from eda_cli.streaming import (
+    CsvRecordSplitter,
+    CsvStreamProfiler,
+    StreamingProfile,
+    profile_chunks,
+    profile_csv,
+)
+
+
+def _write_csv(tmp_path) -> str:
+    df = pd.DataFrame(
+        {
+            "age": [10, 20, None, 20, 10, 30, None],
+            "zeros": [0, 0, 1, 0, 0, 2, 0],
+            "city": ["A", "B", "A", "B", "A", None, "C"],
+            "flag": [None, None, None, "x", None, None, None],
+        }
+    )
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 100])
+def test_streaming_matches_in_memory(tmp_path, chunksize):
+    path = _write_csv(tmp_path)
+    df = pd.read_csv(path)
+    profile = profile_csv(path, chunksize=chunksize)
+
+    expected = summarize_dataset(df)
+    summary = profile.summary()
+    for exp_col, col in zip(expected.columns, summary.columns):
+        assert col.dtype == exp_col.dtype
+        assert col.non_null == exp_col.non_null
+        assert col.unique == exp_col.unique
+        assert col.example_values == exp_col.example_values
+        if exp_col.is_numeric:
+            assert col.mean == pytest.approx(exp_col.mean)
+            assert col.std == pytest.approx(exp_col.std)
+
+    expected_missing = missing_table(df)
+    pd.testing.assert_frame_equal(profile.missing_table(), expected_missing, check_dtype=False)
+
+    flags = profile.quality_flags()
+    expected_flags = compute_quality_flags(df, expected, expected_missing)
+    assert flags["num_duplicate_rows"] == expected_flags["num_duplicate_rows"]
+    assert flags["zero_ratios"] == pytest.approx(expected_flags["zero_ratios"])
+    assert flags["quality_score"] == pytest.approx(expected_flags["quality_score"])
+
+    tops = profile.top_categories(top_k=2)
+    assert tops.keys() == top_categories(df, top_k=2).keys()
+
+
+MIXED_VALUES = ["0", "1", "2", "0", "1", "2", "01", "1.0", "1e3", "True", "abc", "1000"]
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 5, 100])
+def test_streaming_column_numeric_then_text(tmp_path, chunksize):
+    # v - числа в первых чанках и текст дальше: по всему файлу это object
+    # с исходным текстом, "01", "1.0" и "1" - разные значения, "1e3" и
+    # "1000" тоже. w - int, потом float: 3 и 3.0 - одно значение.
+    path = tmp_path / "mixed.csv"
+    w = [3, 3, 4, "3.0", 5, 6, 7, 8, 9, 10, 11, 12]
+    rows = "".join(f"{v},{x}\n" for v, x in zip(MIXED_VALUES, w))
+    path.write_text("v,w\n" + rows, encoding="utf-8")
+    df = pd.read_csv(path)
+    profile = profile_csv(str(path), chunksize=chunksize)
+
+    pd.testing.assert_frame_equal(
+        flatten_summary_for_print(profile.summary()),
+        flatten_summary_for_print(summarize_dataset(df)),
+    )
+    assert profile.summary().columns[0].unique == 9
+    tops = profile.top_categories(top_k=5)
+    expected = top_categories(df, top_k=5)
+    assert tops.keys() == expected.keys()
+    pd.testing.assert_frame_equal(tops["v"], expected["v"])
+
+    approx = profile_csv(str(path), chunksize=chunksize, approx_error=0.01)
+    assert approx.summary().columns[0].unique == 9
+
+
+def test_streaming_examples_survive_type_conversion():
+    # "3" из int-чанка и "3.0" из float-чанка после приведения к float64 -
+    # одно значение; место в примерах оно занимает одно.
+    profile = StreamingProfile(["x"], example_values_per_column=2)
+    profile.update(pd.DataFrame({"x": [3, 3]}))
+    profile.update(pd.DataFrame({"x": [3.0, 3.0]}))
+    profile.update(pd.DataFrame({"x": [4.5, 6.0]}))
+    assert profile.summary().columns[0].example_values == ["3.0", "4.5"]
+
+
+def test_streaming_profiles_merge(tmp_path):
+    path = _write_csv(tmp_path)
+    df = pd.read_csv(path)
+
+    head = StreamingProfile(df.columns)
+    head.update(df.iloc[:4])
+    tail = StreamingProfile(df.columns)
+    tail.update(df.iloc[4:])
+    head.merge(tail)
+
+    assert head.n_rows == len(df)
+    assert head.summary().columns[0].mean == pytest.approx(df["age"].mean())
+    assert head.num_duplicate_rows() == int(df.duplicated(keep=False).sum())
+
+
+@pytest.mark.parametrize("chunksize", [1, 333, 5000])
+def test_missing_matrix_binned_by_chunks(chunksize):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(5000, 3)), columns=list("abc"))
+    df.loc[rng.random(len(df)) < 0.2, "a"] = np.nan
+    df.loc[2000:2999, "c"] = np.nan
+
+    chunks = (df.iloc[start : start + chunksize] for start in range(0, len(df), chunksize))
+    matrix = profile_chunks(chunks, df.columns, missing_bins=40).missing_matrix
+    expected = missing_matrix(df, 40)
+
+    # 5000 строк в не больше чем 40 блоков: ширина блока - 128 строк.
+    assert matrix.width == 128 and len(matrix.rows) == 40
+    assert matrix.rows.sum() == len(df)
+    np.testing.assert_array_equal(matrix.missing, expected.missing)
+    np.testing.assert_array_equal(matrix.missing.sum(axis=0), df.isna().sum().to_numpy())
+    shares = matrix.shares()
+    assert shares[:, 1].max() == 0
+    assert shares[16:23, 2].min() == 1.0
+
+
+def _feed_in_pieces(data: bytes, piece: int):
+    return [data[i : i + piece] for i in range(0, len(data), piece)]
+
+
+@pytest.mark.parametrize("piece", [1, 5, 64])
+def test_record_splitter_respects_quoted_newlines(piece):
+    data = b'id,text\n1,"multi\nline"\n2,"say ""hi"""\n3,plain\n4,"a,b"'
+    splitter = CsvRecordSplitter(block_bytes=8)
+    blocks = []
+    for part in _feed_in_pieces(data, piece):
+        blocks.extend(splitter.feed(part))
+    blocks.extend(splitter.close())
+
+    assert splitter.header == b"id,text\n"
+    assert splitter.header + b"".join(blocks) == data
+    # Каждый блок - целые записи: разбирается отдельно с заголовком.
+    for block in blocks:
+        assert not (block.count(b'"') % 2)
+    parsed = pd.concat(
+        [pd.read_csv(io.BytesIO(splitter.header + block)) for block in blocks],
+        ignore_index=True,
+    )
+    assert parsed["text"].tolist() == ["multi\nline", 'say "hi"', "plain", "a,b"]
+
+
+def _write_mixed_csv(tmp_path) -> str:
+    # Колонка v - числа в первых блоках по 16 байт и текст в последних.
+    path = tmp_path / "mixed.csv"
+    rows = "".join(f"{i % 3},{i}\n" for i in range(12))
+    tail = "".join(f"{v},x\n" for v in MIXED_VALUES[6:])
+    path.write_text("v,w\n" + rows + tail, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("write_csv", [_write_csv, _write_mixed_csv])
+@pytest.mark.parametrize("block_bytes", [16, 1 << 20])
+def test_stream_profiler_matches_file_profile(tmp_path, block_bytes, write_csv):
+    path = write_csv(tmp_path)
+    data = open(path, "rb").read()
+
+    profiler = CsvStreamProfiler(block_bytes=block_bytes)
+    for part in _feed_in_pieces(data, 7):
+        profiler.feed(part)
+    profile = profiler.finish()
+    expected = profile_csv(path)
+
+    assert profiler.bytes_received == len(data)
+    pd.testing.assert_frame_equal(
+        flatten_summary_for_print(profile.summary()),
+        flatten_summary_for_print(expected.summary()),
+    )
+    assert profile.quality_flags() == expected.quality_flags()
+    tops, expected_tops = profile.top_categories(), expected.top_categories()
+    assert tops.keys() == expected_tops.keys()
+    for name, table in tops.items():
+        pd.testing.assert_frame_equal(table, expected_tops[name])
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from eda_cli.cli import app
+from eda_cli.core import summarize_dataset, top_categories
+from eda_cli.tracing import Tracer, current_tracer, span, traced
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "x": [1.0, 2.0, np.nan, 4.0],
+            "city;name": ["A", "B", None, "A"],
+        }
+    )
+
+
+def test_tracer_records_functions_and_columns():
+    df = _frame()
+    tracer = Tracer()
+    with tracer.activate():
+        summarize_dataset(df)
+        top_categories(df)
+    assert current_tracer() is None
+
+    summary = tracer.summary()
+    assert summary["summarize_dataset"]["calls"] == 1
+    assert summary["numeric_block"]["calls"] == 1
+    # ";" в имени колонки заменяется: он разделяет кадры свёрнутого стека.
+    assert summary["column:city,name"]["calls"] == 2
+    assert {"alloc_bytes", "peak_bytes"} <= set(summary["summarize_dataset"])
+
+    stacks = dict(line.rsplit(" ", 1) for line in tracer.collapsed().splitlines())
+    assert "summarize_dataset;column:city,name" in stacks
+    assert "top_categories;column:city,name" in stacks
+    assert all(int(us) >= 1 for us in stacks.values())
+
+    events = tracer.trace()["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    outer = next(event for event in events if event["name"] == "summarize_dataset")
+    inner = next(event for event in events if event["name"] == "column:city,name")
+    assert outer["ts"] <= inner["ts"] and inner["dur"] <= outer["dur"]
+
+
+def test_span_and_traced_without_tracer_are_noops():
+    @traced
+    def double(value):
+        return value * 2
+
+    with span("column", column="x"):
+        assert double(2) == 4
+    assert double.__name__ == "double"
+
+    tracer = Tracer(allocations=False)
+    with tracer.activate():
+        with span("outer"):
+            double(1)
+    assert set(tracer.summary()) == {"outer", "test_span_and_traced_without_tracer_are_noops.<locals>.double"}
+    assert "alloc_bytes" not in tracer.summary()["outer"]
+
+
+def test_report_profile_writes_trace_and_collapsed(tmp_path):
+    data = tmp_path / "data.csv"
+    pd.DataFrame({"x": [1, 2, 3, 4], "city": ["A", "B", "A", None]}).to_csv(data, index=False)
+    out_dir = tmp_path / "report"
+
+    result = CliRunner().invoke(app, ["report", str(data), "--out-dir", str(out_dir), "--profile"])
+    assert result.exit_code == 0, result.output
+
+    trace = json.loads((out_dir / "profile.json").read_text(encoding="utf-8"))
+    assert "ColumnPool.summarize_dataset" in trace["summary"]
+    assert "render:missing_matrix.png" in trace["summary"]
+    collapsed = (out_dir / "profile.collapsed").read_text(encoding="utf-8")
+    assert "ColumnPool.summarize_dataset;summarize_dataset" in collapsed
+
+
+def test_api_profile_header(monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from eda_cli import api
+    from eda_cli.dispatch import BoundedExecutor
+
+    # lifespan останавливает пул профилирования, а модуль api один на все
+    # тесты: даём этому клиенту свой пул.
+    monkeypatch.setattr(api, "profiling_executor", BoundedExecutor())
+    body = b"x,city\n" + b"".join(f"{i},A\n".encode() for i in range(20))
+    files = {"file": ("data.csv", body, "text/csv")}
+    with TestClient(api.app) as client:
+        plain = client.post("/quality-from-csv", files=files)
+        assert "X-EDA-Profile-Id" not in plain.headers
+
+        # Профилируемый запрос считается заново, а не берётся из кэша.
+        response = client.post("/quality-from-csv", files=files, headers={"X-EDA-Profile": "alloc"})
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "miss"
+        profile_id = response.headers["X-EDA-Profile-Id"]
+
+        trace = client.get(f"/profiles/{profile_id}").json()
+        assert "summarize_dataset" in trace["summary"]
+        collapsed = client.get(f"/profiles/{profile_id}/collapsed").text
+        assert "_profile_upload;ColumnPool.summarize_dataset;summarize_dataset" in collapsed
+        assert client.get("/profiles/unknown").status_code == 404
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eda_cli.core import correlation_matrix, missing_matrix
+from eda_cli.parallel import ColumnPool
+from eda_cli.viz import (
+    correlation_heatmap_figure,
+    histogram_figures,
+    missing_matrix_figure,
+)
+
+
+def test_histogram_counts_precomputed():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=500), "y": rng.integers(0, 5, 500), "city": "A"})
+    df.loc[::10, "x"] = np.nan
+    df.loc[3, "x"] = np.inf
+
+    figures = histogram_figures(df, "out", max_columns=5, bins=7)
+    assert [f.name for f in figures] == ["x", "y"]
+    finite = df["x"][np.isfinite(df["x"])]
+    counts, edges = np.histogram(finite, bins=7)
+    np.testing.assert_array_equal(figures[0].counts, counts)
+    np.testing.assert_allclose(figures[0].edges, edges)
+    assert figures[0].counts.sum() == len(finite)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_figures_in_pool(tmp_path, workers):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(200, 4)), columns=list("abcd"))
+    df.loc[::5, "b"] = np.nan
+
+    figures = histogram_figures(df, tmp_path, max_columns=3)
+    figures.append(missing_matrix_figure(missing_matrix(df, 16), tmp_path / "missing_matrix.png"))
+    figures.append(correlation_heatmap_figure(correlation_matrix(df), tmp_path / "heatmap.png"))
+    figures.append(missing_matrix_figure(missing_matrix(pd.DataFrame()), tmp_path / "empty.png"))
+
+    with ColumnPool(workers) as pool:
+        paths = pool.render_figures(figures)
+
+    assert paths == [f.out_path for f in figures]
+    for path in paths:
+        assert path.read_bytes().startswith(b"\x89PNG")
+
+
+def test_matplotlib_loaded_only_for_rendering():
+    code = (
+        "import sys\n"
+        "import pandas as pd\n"
+        "from eda_cli.viz import histogram_figures\n"
+        "figures = histogram_figures(pd.DataFrame({'x': [1.0, 2.0]}), '.')\n"
+        "print('matplotlib' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"